@@ -0,0 +1,34 @@
+#!/bin/sh
+# PgBouncer auth role for overrides/compose.pgbouncer.yaml
+#
+# Mounted into fcs-press-db's /docker-entrypoint-initdb.d, so it runs once on a
+# fresh data directory. On an existing one, run it by hand (idempotent):
+#   docker compose ... exec db sh /docker-entrypoint-initdb.d/50-pgbouncer-auth.sh
+#
+# pgbouncer_auth is a plain login role: it can only execute
+# pgbouncer.user_lookup(), a SECURITY DEFINER function owned by the superuser
+# that returns one role's SCRAM secret from pg_shadow. PgBouncer runs it as
+# auth_query (auth_dbname = postgres) instead of reading pg_shadow as postgres.
+set -eu
+
+psql -v ON_ERROR_STOP=1 --username "${POSTGRES_USER:-postgres}" --dbname postgres \
+     -v auth_password="${PGBOUNCER_AUTH_PASSWORD:?PGBOUNCER_AUTH_PASSWORD not set}" <<'SQL'
+SELECT 'CREATE ROLE pgbouncer_auth LOGIN'
+ WHERE NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'pgbouncer_auth') \gexec
+SELECT format('ALTER ROLE pgbouncer_auth LOGIN NOSUPERUSER NOCREATEDB NOCREATEROLE NOREPLICATION PASSWORD %L',
+              :'auth_password') \gexec
+
+CREATE SCHEMA IF NOT EXISTS pgbouncer;
+REVOKE ALL ON SCHEMA pgbouncer FROM PUBLIC;
+GRANT USAGE ON SCHEMA pgbouncer TO pgbouncer_auth;
+
+CREATE OR REPLACE FUNCTION pgbouncer.user_lookup(p_usename text, OUT usename name, OUT passwd text)
+RETURNS record
+LANGUAGE sql STABLE SECURITY DEFINER
+SET search_path = pg_catalog, pg_temp
+AS $$
+    SELECT usename, passwd FROM pg_catalog.pg_shadow WHERE usename = p_usename
+$$;
+REVOKE ALL ON FUNCTION pgbouncer.user_lookup(text) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION pgbouncer.user_lookup(text) TO pgbouncer_auth;
+SQL
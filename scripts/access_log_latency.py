@@ -0,0 +1,616 @@
+#!/usr/bin/env python3
+"""
+Per-Site Request Latency from nginx Access Logs - Press SaaS Platform
+
+This script follows the frontend's JSON access log (overrides/nginx-json-log.conf)
+and keeps request latency per site and route class in HDR-style histograms:
+log-linear buckets with 32 sub-buckets per power of two (<= 3.2% relative
+error), one fixed-size array each, up to --max-keys site/route pairs and
+--max-endpoints endpoints (the rest are counted under `(other)`), so memory
+stays bounded however many tenants or URLs show up. Reports rank the slowest
+sites and endpoints by p95 over the last one to two --window periods.
+
+Features:
+- Route classes: api_method, api_resource, desk, page, assets, files, socketio
+- Endpoints normalised (query strings dropped, ids and doc names replaced)
+- Both $request_time and $upstream_response_time (retries summed)
+- Follows the log across rotation/truncation; --truncate-mb empties it in place
+  (like logrotate's copytruncate) once read, so the volume never fills up
+- HTTP mode: /top (JSON) and /metrics with `http_request_duration_seconds` and
+  `http_requests_total` per route class and the p95 of the top-N slowest sites
+- --benchmark: synthetic lines through the same hot path, against the
+  50k lines/s target
+
+Usage:
+    # One report from existing logs
+    python scripts/access_log_latency.py /path/to/nginx-access.json --top 10
+
+    # Follow the log and serve /top and /metrics (what compose.access-log.yaml runs)
+    python scripts/access_log_latency.py --follow /logs/nginx-access.json --listen 0.0.0.0:9101
+
+    # Throughput self-check
+    python scripts/access_log_latency.py --benchmark 500000
+
+Exit codes:
+    0 - success (benchmark: target met)
+    1 - benchmark below target, or log not readable
+
+Addresses: NFR-001, NFR-003, CHK025
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+
+BENCH_TARGET_LPS = 50_000
+SUB_BITS = 5
+SUB_COUNT = 1 << SUB_BITS
+MAX_MS = (1 << 20) - 1  # ~17.5 minutes; slower requests land in the last bucket
+BUCKETS = (MAX_MS.bit_length() - SUB_BITS) * SUB_COUNT + SUB_COUNT
+PROM_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+OTHER = "(other)"
+ROUTE_CLASSES = ("api_method", "api_resource", "desk", "page", "assets", "files", "socketio")
+FIRST_SEGMENT = {
+    "assets": "assets",
+    "files": "files",
+    "private": "files",
+    "socket.io": "socketio",
+    "app": "desk",
+    "desk": "desk",
+}
+_DECODE = json.JSONDecoder().raw_decode
+ID_SEGMENT = re.compile(r"^(?:\d+|[0-9a-f]{8,}|[0-9a-f-]{36})$", re.IGNORECASE)
+
+
+# =============================================================================
+# Histograms
+# =============================================================================
+
+
+def bucket_index(ms: int) -> int:
+    """Log-linear bucket of `ms`: exact below 64, then 32 buckets per power of two"""
+    if ms > MAX_MS:
+        ms = MAX_MS
+    shift = ms.bit_length() - SUB_BITS - 1
+    return ms if shift <= 0 else (shift << SUB_BITS) + (ms >> shift)
+
+
+def bucket_upper(index: int) -> int:
+    """Highest value (ms) that falls in bucket `index`"""
+    if index < 2 * SUB_COUNT:
+        return index
+    shift = (index >> SUB_BITS) - 1
+    return (((index - (shift << SUB_BITS)) + 1) << shift) - 1
+
+
+class Histogram:
+    """Fixed-size latency histogram in milliseconds (count and max are derived from the buckets)"""
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self):
+        self.counts = array("I", bytes(4 * BUCKETS))
+        self.total = 0
+
+    def record(self, ms: int) -> None:
+        self.counts[bucket_index(ms)] += 1
+        self.total += ms
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def max(self) -> int:
+        for index in range(BUCKETS - 1, -1, -1):
+            if self.counts[index]:
+                return bucket_upper(index)
+        return 0
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        counts = self.counts
+        for index, value in enumerate(other.counts):
+            if value:
+                counts[index] += value
+        self.total += other.total
+        return self
+
+    def quantile(self, q: float, count: Optional[int] = None) -> int:
+        """Upper bound (ms) of the bucket holding the q-quantile"""
+        count = self.count if count is None else count
+        if not count:
+            return 0
+        rank = max(1, int(q * count + 0.5))
+        seen = 0
+        for index, value in enumerate(self.counts):
+            seen += value
+            if seen >= rank:
+                return bucket_upper(index)
+        return 0
+
+    def count_le(self, ms: float) -> int:
+        """Observations whose bucket lies entirely at or below `ms`"""
+        limit = bucket_index(int(ms))
+        if bucket_upper(limit) > ms:
+            limit -= 1
+        return sum(self.counts[:limit + 1])
+
+    def summary(self) -> dict:
+        count = self.count
+        return {
+            "count": count,
+            "mean_ms": round(self.total / count, 1) if count else 0,
+            "p50_ms": self.quantile(0.50, count),
+            "p95_ms": self.quantile(0.95, count),
+            "p99_ms": self.quantile(0.99, count),
+            "max_ms": self.max,
+        }
+
+
+# =============================================================================
+# Routes
+# =============================================================================
+
+
+def classify(uri: str) -> tuple[str, str]:
+    """(route class, normalised endpoint) of a request URI"""
+    path = uri.split("?", 1)[0]
+    parts = path.split("/")
+    first = parts[1] if len(parts) > 1 else ""
+    if first == "api" and len(parts) > 3:
+        if parts[2] == "method":
+            return "api_method", f"/api/method/{parts[3]}"
+        if parts[2] == "resource":
+            return "api_resource", "/api/resource/" + parts[3] + ("/:name" if len(parts) > 4 else "")
+    route = FIRST_SEGMENT.get(first)
+    if route == "assets" or route == "files":
+        # one endpoint per app (assets) or file area, not per file
+        return route, ("/".join(parts[:3]) if first != "files" else "/files") + "/*"
+    if route == "socketio":
+        return route, "/socket.io/"
+    endpoint = "/".join(":id" if ID_SEGMENT.match(p) else p for p in parts[:4])
+    return route or "page", endpoint or "/"
+
+
+def seconds_to_ms(value: Any) -> Optional[int]:
+    """nginx time ("0.012", "0.010, 0.020", "0.01 : 0.02", "-") in ms; None if absent"""
+    if value is None or value == "-" or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value * 1000 + 0.5)
+    try:
+        return int(float(value) * 1000 + 0.5)
+    except ValueError:
+        total = 0.0
+        for piece in re.split(r"[,:]", value):
+            piece = piece.strip()
+            if piece and piece != "-":
+                total += float(piece)
+        return int(total * 1000 + 0.5)
+
+
+# =============================================================================
+# Accounting
+# =============================================================================
+
+
+@dataclass
+class Generation:
+    """Histograms of one --window period"""
+
+    started: float
+    sites: dict
+    endpoints: dict
+
+
+class LatencyAccounting:
+    """Per-site/route and per-endpoint histograms, bounded and windowed"""
+
+    def __init__(self, max_keys: int = 5000, max_endpoints: int = 2000, window: float = 300):
+        self.max_keys = max_keys
+        self.max_endpoints = max_endpoints
+        self.window = window
+        self.current = Generation(time.monotonic(), {}, {})
+        self.previous: Optional[Generation] = None
+        # cumulative since start, for Prometheus counters
+        self.routes = {route: Histogram() for route in ROUTE_CLASSES}
+        self.statuses: dict[tuple[str, Any], int] = {}
+        self.lines = 0
+        self.invalid = 0
+        self.lock = threading.Lock()
+        self._classify_cache: dict[str, tuple[str, str]] = {}
+
+    def rotate_if_due(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        if now - self.current.started >= self.window:
+            self.previous = self.current
+            self.current = Generation(now, {}, {})
+
+    def feed(self, lines: list[str]) -> None:
+        """Account a batch of JSON log lines"""
+        decode = _DECODE
+        cache = self._classify_cache
+        routes, statuses = self.routes, self.statuses
+        max_keys, max_endpoints = self.max_keys, self.max_endpoints
+        accepted = invalid = 0
+        with self.lock:
+            self.rotate_if_due()
+            sites, endpoints = self.current.sites, self.current.endpoints
+            for line in lines:
+                try:
+                    entry = decode(line)[0]
+                    uri = entry["uri"]
+                    ms = int(float(entry["request_time"]) * 1000 + 0.5)
+                except (ValueError, KeyError, TypeError, IndexError):
+                    if line.strip():
+                        invalid += 1
+                    continue
+                accepted += 1
+                classified = cache.get(uri)
+                if classified is None:
+                    classified = classify(uri)
+                    if len(cache) < 50_000:
+                        cache[uri] = classified
+                route, endpoint = classified
+
+                key = (entry.get("host") or "-", route)
+                pair = sites.get(key)
+                if pair is None:
+                    if len(sites) >= max_keys:
+                        key = (OTHER, route)
+                        pair = sites.get(key)
+                    if pair is None:
+                        pair = sites[key] = (Histogram(), Histogram())
+                histogram = endpoints.get(endpoint)
+                if histogram is None:
+                    if len(endpoints) >= max_endpoints:
+                        endpoint = OTHER
+                        histogram = endpoints.get(endpoint)
+                    if histogram is None:
+                        histogram = endpoints[endpoint] = Histogram()
+
+                # bucket_index() inlined: this loop is the whole throughput budget
+                if ms > MAX_MS:
+                    ms = MAX_MS
+                shift = ms.bit_length() - SUB_BITS - 1
+                index = ms if shift <= 0 else (shift << SUB_BITS) + (ms >> shift)
+                for target in (pair[0], histogram, routes[route]):
+                    target.counts[index] += 1
+                    target.total += ms
+
+                upstream = entry.get("upstream_time")
+                if upstream and upstream != "-":
+                    upstream_ms = seconds_to_ms(upstream)
+                    if upstream_ms is not None:
+                        pair[1].record(upstream_ms)
+
+                status = entry.get("status")
+                statuses[route, status] = statuses.get((route, status), 0) + 1
+            self.lines += accepted
+            self.invalid += invalid
+
+    def _generations(self) -> list[Generation]:
+        return [g for g in (self.previous, self.current) if g is not None]
+
+    def _site_histograms(self) -> dict[str, tuple[Histogram, Histogram, dict[str, int]]]:
+        merged: dict[str, tuple[Histogram, Histogram, dict[str, int]]] = {}
+        for generation in self._generations():
+            for (site, route), (request, upstream) in generation.sites.items():
+                entry = merged.get(site)
+                if entry is None:
+                    entry = merged[site] = (Histogram(), Histogram(), {})
+                entry[0].merge(request)
+                entry[1].merge(upstream)
+                entry[2][route] = entry[2].get(route, 0) + request.count
+        return merged
+
+    def top_sites(self, n: int, min_requests: int = 20) -> list[dict]:
+        with self.lock:
+            merged = self._site_histograms()
+        rows = []
+        for site, (request, upstream, routes) in merged.items():
+            if request.count < min_requests:
+                continue
+            rows.append({
+                "site": site,
+                **request.summary(),
+                "upstream_p95_ms": upstream.quantile(0.95) if upstream.count else None,
+                "routes": dict(sorted(routes.items(), key=lambda item: -item[1])),
+            })
+        rows.sort(key=lambda row: (-row["p95_ms"], -row["count"]))
+        return rows[:n]
+
+    def top_endpoints(self, n: int, min_requests: int = 20) -> list[dict]:
+        with self.lock:
+            merged: dict[str, Histogram] = {}
+            for generation in self._generations():
+                for endpoint, histogram in generation.endpoints.items():
+                    merged.setdefault(endpoint, Histogram()).merge(histogram)
+        rows = [{"endpoint": endpoint, **histogram.summary()}
+                for endpoint, histogram in merged.items() if histogram.count >= min_requests]
+        rows.sort(key=lambda row: (-row["p95_ms"], -row["count"]))
+        return rows[:n]
+
+    def report(self, n: int, min_requests: int) -> dict:
+        with self.lock:
+            routes = {route: h.summary() for route, h in self.routes.items() if h.count}
+            tracked = sum(len(g.sites) for g in self._generations())
+        return {
+            "lines": self.lines,
+            "invalid": self.invalid,
+            "window_s": self.window,
+            "tracked_site_routes": tracked,
+            "routes": routes,
+            "slowest_sites": self.top_sites(n, min_requests),
+            "slowest_endpoints": self.top_endpoints(n, min_requests),
+        }
+
+    def prometheus(self, n: int, min_requests: int) -> str:
+        lines = ["# HELP http_request_duration_seconds Request time seen by the frontend nginx",
+                 "# TYPE http_request_duration_seconds histogram"]
+        with self.lock:
+            for route, histogram in self.routes.items():
+                for bound in PROM_BUCKETS_S:
+                    lines.append(f'http_request_duration_seconds_bucket{{route_class="{route}",le="{bound}"}} '
+                                 f"{histogram.count_le(bound * 1000)}")
+                lines.append(f'http_request_duration_seconds_bucket{{route_class="{route}",le="+Inf"}} '
+                             f"{histogram.count}")
+                lines.append(f'http_request_duration_seconds_sum{{route_class="{route}"}} {histogram.total / 1000}')
+                lines.append(f'http_request_duration_seconds_count{{route_class="{route}"}} {histogram.count}')
+            statuses: dict[tuple[str, str], int] = {}
+            for (route, status), count in self.statuses.items():
+                key = (route, f"{str(status)[:1]}xx")
+                statuses[key] = statuses.get(key, 0) + count
+        lines += ["# HELP http_requests_total Requests seen by the frontend nginx",
+                  "# TYPE http_requests_total counter"]
+        for (route, status), count in sorted(statuses.items()):
+            lines.append(f'http_requests_total{{route_class="{route}",status="{status}"}} {count}')
+        lines += ["# HELP fcs_site_request_duration_p95_seconds p95 request time of the slowest sites (window)",
+                  "# TYPE fcs_site_request_duration_p95_seconds gauge"]
+        for row in self.top_sites(n, min_requests):
+            site = row["site"].replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'fcs_site_request_duration_p95_seconds{{site="{site}"}} {row["p95_ms"] / 1000}')
+        lines += ["# HELP fcs_access_log_lines_total Access log lines read",
+                  "# TYPE fcs_access_log_lines_total counter",
+                  f'fcs_access_log_lines_total{{result="ok"}} {self.lines}',
+                  f'fcs_access_log_lines_total{{result="invalid"}} {self.invalid}']
+        return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# Input
+# =============================================================================
+
+
+def read_batches(path: Path, batch: int = 4096) -> Iterator[list[str]]:
+    with path.open(encoding="utf-8", errors="replace") as f:
+        while True:
+            lines = f.readlines(batch * 256)
+            if not lines:
+                return
+            yield lines
+
+
+def follow(path: Path, from_start: bool = False, truncate_bytes: int = 0, poll: float = 0.25,
+           stop: Optional[threading.Event] = None) -> Iterator[list[str]]:
+    """Batches of complete lines appended to `path`, across rotation and truncation"""
+    f, inode = None, None
+    pending = b""
+    while stop is None or not stop.is_set():
+        if f is None:
+            try:
+                f = path.open("rb")
+            except FileNotFoundError:
+                from_start = True  # everything in a log created from now on is new
+                yield []
+                time.sleep(poll)
+                continue
+            inode = os.fstat(f.fileno()).st_ino
+            if not from_start:
+                f.seek(0, os.SEEK_END)
+            from_start = True  # files opened after a rotation are read from their start
+        chunk = f.read(1 << 20)
+        if chunk:
+            data = pending + chunk
+            cut = data.rfind(b"\n") + 1
+            pending = data[cut:]
+            if cut:
+                yield data[:cut].decode("utf-8", "replace").splitlines()
+            continue
+        # caught up: empty the log in place if it is big, then see if it was rotated or truncated
+        if truncate_bytes and f.tell() >= truncate_bytes and not pending:
+            os.truncate(path, 0)
+            f.seek(0)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stat = None
+        if stat is None or stat.st_ino != inode:
+            f.close()
+            f, pending = None, b""
+            continue
+        if stat.st_size < f.tell():
+            f.seek(0)
+            pending = b""
+            continue
+        yield []  # idle: lets the caller report and rotate windows
+        time.sleep(poll)
+    if f is not None:
+        f.close()
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+
+def synthetic_lines(count: int, sites: int = 200, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    uris = ["/api/method/frappe.client.get_list?doctype=Item", "/api/method/frappe.desk.form.load.getdoc",
+            "/api/resource/Sales%20Invoice/SINV-00042", "/app/sales-invoice/SINV-00042", "/assets/frappe/dist/js/desk.bundle.js",
+            "/files/logo.png", "/socket.io/?EIO=4&transport=websocket", "/", "/blog/post-12", "/api/method/ping"]
+    template = ('{"time":"2026-01-01T00:00:00+00:00","host":"site%d.localhost","method":"GET","uri":"%s",'
+                '"status":%d,"bytes":%d,"request_time":%.3f,"upstream_time":"%s","upstream_status":"200","cache":"-"}')
+    lines = []
+    for _ in range(count):
+        request_time = rng.lognormvariate(-3.5, 1.2)
+        upstream = f"{request_time * 0.9:.3f}" if rng.random() > 0.2 else "-"
+        lines.append((template % (rng.randrange(sites), rng.choice(uris), rng.choice((200, 200, 200, 304, 404, 500)),
+                                  rng.randrange(100, 50000), request_time, upstream)))
+    return lines
+
+
+def benchmark(count: int) -> dict:
+    """Lines/s of reading and accounting `count` synthetic lines from a temporary log file"""
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        f.write("\n".join(synthetic_lines(count)) + "\n")
+        path = Path(f.name)
+    try:
+        accounting = LatencyAccounting()
+        started = time.perf_counter()
+        for lines in read_batches(path):
+            accounting.feed(lines)
+        elapsed = time.perf_counter() - started
+    finally:
+        path.unlink()
+    rate = count / elapsed if elapsed else float("inf")
+    return {"lines": count, "seconds": round(elapsed, 3), "lines_per_s": int(rate),
+            "target_lines_per_s": BENCH_TARGET_LPS, "met": rate >= BENCH_TARGET_LPS,
+            "invalid": accounting.invalid}
+
+
+# =============================================================================
+# Output
+# =============================================================================
+
+
+def report_text(report: dict) -> str:
+    lines = [f"{report['lines']} requests ({report['invalid']} invalid lines), "
+             f"{report['tracked_site_routes']} site/route histograms", "", "Route classes:"]
+    lines.append(f"  {'route':<14}{'count':>10}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>9}")
+    for route, s in report["routes"].items():
+        lines.append(f"  {route:<14}{s['count']:>10}{s['p50_ms']:>6}ms{s['p95_ms']:>6}ms{s['p99_ms']:>6}ms"
+                     f"{s['max_ms']:>7}ms")
+    lines += ["", "Slowest sites (p95):"]
+    for row in report["slowest_sites"]:
+        upstream = f", upstream p95 {row['upstream_p95_ms']}ms" if row["upstream_p95_ms"] is not None else ""
+        lines.append(f"  {row['site']:<40} p95 {row['p95_ms']:>6}ms  p99 {row['p99_ms']:>6}ms  "
+                     f"{row['count']:>8} req{upstream}")
+    lines += ["", "Slowest endpoints (p95):"]
+    for row in report["slowest_endpoints"]:
+        lines.append(f"  {row['endpoint']:<50} p95 {row['p95_ms']:>6}ms  {row['count']:>8} req")
+    return "\n".join(lines)
+
+
+def serve(accounting: LatencyAccounting, listen: str, top: int, min_requests: int) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                body, content_type = accounting.prometheus(top, min_requests), "text/plain; version=0.0.4"
+            elif path == "/top":
+                body, content_type = json.dumps(accounting.report(top, min_requests), indent=2), "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    host, _, port = listen.rpartition(":")
+    server = ThreadingHTTPServer((host or "0.0.0.0", int(port)), Handler)
+    threading.Thread(target=server.serve_forever, name="http", daemon=True).start()
+    return server
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Per-site request latency histograms from the nginx JSON access log",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("logs", nargs="*", type=Path, help="JSON access log file(s)")
+    parser.add_argument("--follow", action="store_true", help="Keep reading the (single) log as it grows")
+    parser.add_argument("--from-start", action="store_true", help="With --follow, read the existing lines too")
+    parser.add_argument("--truncate-mb", type=int, default=0,
+                        help="With --follow, empty the log in place once read past this size (0: never)")
+    parser.add_argument("--listen", help="host:port serving /top and /metrics while following")
+    parser.add_argument("--interval", type=float, default=60, help="With --follow, print a report every N s (0: never)")
+    parser.add_argument("--window", type=float, default=300, help="Top-N covers the last 1-2 windows (s)")
+    parser.add_argument("--top", type=int, default=10, help="Sites and endpoints per report")
+    parser.add_argument("--min-requests", type=int, default=20, help="Ignore sites/endpoints with fewer requests")
+    parser.add_argument("--max-keys", type=int, default=5000, help="Site/route histograms kept per window")
+    parser.add_argument("--max-endpoints", type=int, default=2000, help="Endpoint histograms kept per window")
+    parser.add_argument("--benchmark", type=int, metavar="LINES", help="Time LINES synthetic lines and exit")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        result = benchmark(args.benchmark)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print(f"{result['lines']} lines in {result['seconds']}s: {result['lines_per_s']} lines/s "
+                  f"(target {BENCH_TARGET_LPS}) - {'OK' if result['met'] else 'BELOW TARGET'}")
+        return 0 if result["met"] else 1
+    if not args.logs:
+        parser.error("give at least one log file (or --benchmark)")
+    if args.follow and len(args.logs) != 1:
+        parser.error("--follow takes exactly one log file")
+
+    accounting = LatencyAccounting(args.max_keys, args.max_endpoints, args.window)
+
+    def emit() -> None:
+        report = accounting.report(args.top, args.min_requests)
+        print(json.dumps(report, indent=2) if args.json else report_text(report), flush=True)
+
+    if not args.follow:
+        try:
+            for path in args.logs:
+                for lines in read_batches(path):
+                    accounting.feed(lines)
+        except OSError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        emit()
+        return 0
+
+    server = serve(accounting, args.listen, args.top, args.min_requests) if args.listen else None
+    last_report = time.monotonic()
+    try:
+        for lines in follow(args.logs[0], args.from_start, args.truncate_mb * 1024 * 1024):
+            accounting.feed(lines)
+            if args.interval and time.monotonic() - last_report >= args.interval:
+                emit()
+                last_report = time.monotonic()
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if server is not None:
+            server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
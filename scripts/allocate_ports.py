@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Host Port Allocator for Press SaaS Platform
+
+This script assigns host ports to a new bench (or any compose project) so
+nothing has to be hand-picked and checked afterwards by validate_ports.sh.
+Every port already claimed is indexed into an interval tree over the
+constitution range 48510-49800: ports declared by compose.yaml and each
+overrides/*.yaml (before override merging, so alternatives such as the
+mariadb and postgres overrides both count), ports published by existing
+containers, and ports documented in spec.md for services not deployed yet.
+Free ports and contiguous blocks are then found first-fit in O(log n) and
+written as a compose override, overrides/compose.ports-<bench>.yaml.
+
+Features:
+- Claims from every compose file (scripts/lib/compose_model.py, parsed files
+  cached by sha256), `<engine> ps -a` and the spec.md port table, plus --reserve
+- AVL interval tree with free-gap augmentation (scripts/lib/intervals.py):
+  claim, overlap check and first-fit of a block in O(log n)
+- Blocks: a container port range (e.g. 9000-9009) gets a contiguous host block
+- Idempotent: re-running for a bench keeps its previous ports while they are
+  still free, so the override only changes when something collides
+- A lock file serialises concurrent runs, the override is written atomically
+- Text or JSON output; --list shows claimed intervals and free space
+
+Usage:
+    # Ports for a second bench: HTTP on the frontend, both redis instances
+    python scripts/allocate_ports.py bench2 --service frontend:8080 \\
+        --service redis-cache:6379 --service redis-queue:6379
+
+    # A block of ten consecutive ports, printed but not written
+    python scripts/allocate_ports.py bench2 --service websocket:9000-9009 --dry-run
+
+    # What is claimed, by whom, and how much space is left
+    python scripts/allocate_ports.py --list
+
+    # Then start the bench with its ports
+    docker compose -p bench2 -f compose.yaml -f overrides/compose.multi-bench.yaml \\
+        -f overrides/compose.ports-bench2.yaml up -d
+
+Addresses: FR-008
+"""
+
+import argparse
+import contextlib
+import fcntl
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lib.bench import DEFAULT_ENGINE  # noqa: E402
+from scripts.lib.compose_model import ComposeError, load_model  # noqa: E402
+from scripts.lib.intervals import IntervalTree  # noqa: E402
+from scripts.validate_compose import EXPECTED_PORTS, PORT_MAX, PORT_MIN, ROOT, default_env_file  # noqa: E402
+
+
+OVERRIDE_TEMPLATE = "overrides/compose.ports-{bench}.yaml"
+LOCK_NAME = "fcs-port-alloc.lock"
+BENCH_NAME = re.compile(r"^[a-z0-9][a-z0-9_-]*$")
+SERVICE_SPEC = re.compile(r"^(?P<service>[A-Za-z0-9._-]+):(?P<start>\d+)(?:-(?P<end>\d+))?(?:/(?P<protocol>tcp|udp))?$")
+# "0.0.0.0:48580->8080/tcp", ":::48590-48591->9000-9001/tcp", "[::]:48580->8080/tcp"
+PUBLISHED = re.compile(r":(\d+)(?:-(\d+))?->")
+# docker: "com.docker.compose.project=bench2,...", podman: "map[com.docker.compose.project:bench2 ...]"
+COMPOSE_PROJECT = re.compile(r"com\.docker\.compose\.project[=:]([^,\s\]]+)")
+
+
+class AllocationError(Exception):
+    """No free block is left, or a request cannot be satisfied."""
+
+
+# =============================================================================
+# Claims
+# =============================================================================
+
+
+@dataclass
+class Claim:
+    """A host port range somebody already uses"""
+
+    start: int
+    end: int
+    owner: str
+    source: str  # compose, container, spec, reserve
+
+
+@dataclass
+class Request:
+    """One container port (or range) of a service that needs host ports"""
+
+    service: str
+    target: tuple[int, int]
+    protocol: str = "tcp"
+
+    @property
+    def size(self) -> int:
+        return self.target[1] - self.target[0] + 1
+
+    @property
+    def target_text(self) -> str:
+        start, end = self.target
+        return str(start) if start == end else f"{start}-{end}"
+
+    @classmethod
+    def parse(cls, spec: str) -> "Request":
+        match = SERVICE_SPEC.match(spec)
+        if not match:
+            raise argparse.ArgumentTypeError(f"expected SERVICE:PORT[-PORT][/tcp|udp], got {spec!r}")
+        start = int(match.group("start"))
+        end = int(match.group("end") or start)
+        if end < start:
+            raise argparse.ArgumentTypeError(f"invalid port range in {spec!r}")
+        return cls(match.group("service"), (start, end), match.group("protocol") or "tcp")
+
+
+@dataclass
+class Assignment:
+    service: str
+    published: tuple[int, int]
+    target: tuple[int, int]
+    protocol: str
+    reused: bool
+
+    @property
+    def mapping(self) -> str:
+        def text(pair: tuple[int, int]) -> str:
+            return str(pair[0]) if pair[0] == pair[1] else f"{pair[0]}-{pair[1]}"
+        suffix = "" if self.protocol == "tcp" else f"/{self.protocol}"
+        return f"{text(self.published)}:{text(self.target)}{suffix}"
+
+
+@dataclass
+class AllocationResult:
+    bench: str
+    output: str
+    claims: list[Claim] = field(default_factory=list)
+    assignments: list[Assignment] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+    free_ports: int = 0
+    largest_free_block: int = 0
+    written: bool = False
+    index_ms: float = 0.0
+    allocate_ms: float = 0.0
+
+
+def container_claims(engine: str, timeout: float = 10, skip_project: str = "") -> list[Claim]:
+    """Host ports published by existing containers (running or not).
+
+    Containers of compose project ``skip_project`` are left out: they are the
+    bench being allocated, whose ports its previous override already holds.
+
+    Raises:
+        OSError: The engine binary cannot be run.
+        subprocess.SubprocessError: ``ps`` failed or timed out.
+    """
+    out = subprocess.run([engine, "ps", "-a", "--format", "{{.Names}}\t{{.Ports}}\t{{.Labels}}"],
+                         capture_output=True, text=True, timeout=timeout, check=True).stdout
+    claims: dict[tuple[str, int, int], Claim] = {}
+    for line in out.splitlines():
+        name, _, rest = line.partition("\t")
+        ports, _, labels = rest.partition("\t")
+        project = COMPOSE_PROJECT.search(labels)
+        if skip_project and project and project.group(1) == skip_project:
+            continue
+        for match in PUBLISHED.finditer(ports):
+            start = int(match.group(1))
+            end = int(match.group(2) or start)
+            # IPv4 and IPv6 bindings of one port are listed separately
+            claims.setdefault((name, start, end), Claim(start, end, name.strip(), "container"))
+    return list(claims.values())
+
+
+def spec_claims() -> list[Claim]:
+    """Ports spec.md documents, whether or not a service publishes them yet"""
+    return [Claim(port, port, service, "spec") for service, port in EXPECTED_PORTS.items()]
+
+
+@contextlib.contextmanager
+def allocation_lock(root: Path) -> Iterator[None]:
+    """Serialise allocations so two benches never pick the same block"""
+    git_dir = root / ".git"
+    path = (git_dir if git_dir.is_dir() else root / "overrides") / LOCK_NAME
+    with open(path, "w") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+# =============================================================================
+# Allocation
+# =============================================================================
+
+
+def build_tree(claims: list[Claim]) -> IntervalTree:
+    tree = IntervalTree(PORT_MIN, PORT_MAX)
+    for claim in claims:
+        tree.claim(claim.start, claim.end)
+    return tree
+
+
+def allocate(tree: IntervalTree, requests: list[Request], previous: dict[tuple[str, tuple[int, int]], tuple[int, int]],
+             start: Optional[int] = None) -> list[Assignment]:
+    """Assign a host block to every request, reusing previous blocks that are still free.
+
+    Raises:
+        AllocationError: No free block of the requested size is left.
+    """
+    assignments = []
+    for request in requests:
+        kept = previous.get((request.service, request.target))
+        if kept and kept[1] - kept[0] + 1 == request.size and tree.is_free(*kept):
+            published, reused = kept, True
+        else:
+            first = tree.first_fit(request.size, start)
+            if first is None:
+                raise AllocationError(f"no free block of {request.size} port(s) for {request.service}:"
+                                      f"{request.target_text} in {PORT_MIN}-{PORT_MAX}")
+            published, reused = (first, first + request.size - 1), False
+        tree.claim(*published)
+        assignments.append(Assignment(request.service, published, request.target, request.protocol, reused))
+    return assignments
+
+
+def _target_pair(target: str) -> tuple[int, int]:
+    start, _, end = target.partition("-")
+    try:
+        return int(start), int(end or start)
+    except ValueError:
+        return (0, 0)
+
+
+def render_override(bench: str, assignments: list[Assignment]) -> str:
+    """Compose override publishing the assigned ports (replacing any a base file publishes)"""
+    lines = [f"# Generated by scripts/allocate_ports.py for bench '{bench}'; re-run it instead of editing.",
+             "services:"]
+    services: dict[str, list[Assignment]] = {}
+    for assignment in assignments:
+        services.setdefault(assignment.service, []).append(assignment)
+    for service, entries in services.items():
+        lines.append(f"  {service}:")
+        lines.append("    ports: !override")
+        lines.extend(f'      - "{entry.mapping}"' for entry in entries)
+    return "\n".join(lines) + "\n"
+
+
+def write_atomic(path: Path, content: str) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(content)
+    os.replace(tmp, path)
+
+
+def run_allocation(root: Path, bench: str, requests: list[Request], engine: Optional[str],
+                   reserve: list[tuple[int, int]], env_file: Optional[Path], start: Optional[int] = None,
+                   dry_run: bool = False) -> AllocationResult:
+    """Index every claim, allocate, and write the bench override.
+
+    Raises:
+        ComposeError: A compose file is missing or cannot be parsed.
+        AllocationError: The range is full.
+    """
+    output = OVERRIDE_TEMPLATE.format(bench=bench) if bench else ""
+    result = AllocationResult(bench, output)
+    with allocation_lock(root):
+        started = time.perf_counter()
+        model = load_model(root, env_file=env_file)
+        previous = {}
+        for port in model.declared:
+            if port.published is None:
+                continue
+            if port.file == output:
+                previous[(port.service, _target_pair(port.target))] = port.published
+                continue
+            result.claims.append(Claim(*port.published, f"{port.file}:{port.line} ({port.service})", "compose"))
+        if engine:
+            try:
+                result.claims.extend(container_claims(engine, skip_project=bench))
+            except (OSError, subprocess.SubprocessError) as e:
+                result.warnings.append(f"containers not indexed ({engine} ps failed: {e})")
+        result.claims.extend(spec_claims())
+        result.claims.extend(Claim(a, b, "--reserve", "reserve") for a, b in reserve)
+        tree = build_tree(result.claims)
+        result.index_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        result.assignments = allocate(tree, requests, previous, start)
+        result.allocate_ms = (time.perf_counter() - started) * 1000
+        result.free_ports = tree.free_count()
+        result.largest_free_block = tree.largest_free()
+
+        if bench and requests and not dry_run:
+            write_atomic(root / output, render_override(bench, result.assignments))
+            result.written = True
+    return result
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+
+def report_text(result: AllocationResult, listing: bool = False) -> str:
+    sources: dict[str, int] = {}
+    for claim in result.claims:
+        sources[claim.source] = sources.get(claim.source, 0) + 1
+    lines = [f"Indexed {len(result.claims)} claim(s) ("
+             + ", ".join(f"{count} {source}" for source, count in sorted(sources.items()))
+             + f") in {result.index_ms:.1f} ms"]
+    for warning in result.warnings:
+        lines.append(f"WARNING: {warning}")
+
+    if listing:
+        lines.append("")
+        lines.append(f"{'Ports':<13} {'Source':<10} Owner")
+        for claim in sorted(result.claims, key=lambda c: (c.start, c.end, c.owner)):
+            ports = str(claim.start) if claim.start == claim.end else f"{claim.start}-{claim.end}"
+            outside = "" if PORT_MIN <= claim.start and claim.end <= PORT_MAX else "  (outside range)"
+            lines.append(f"{ports:<13} {claim.source:<10} {claim.owner}{outside}")
+
+    if result.assignments:
+        lines.append("")
+        lines.append(f"Bench '{result.bench}' ({result.allocate_ms:.2f} ms):")
+        for assignment in result.assignments:
+            note = " (kept)" if assignment.reused else ""
+            lines.append(f"  {assignment.service:<20} {assignment.mapping}{note}")
+        if result.written:
+            lines.append(f"Wrote {result.output}")
+        elif result.bench:
+            lines.append(f"Dry run: {result.output} not written")
+    lines.append("")
+    lines.append(f"Free: {result.free_ports} port(s) in {PORT_MIN}-{PORT_MAX}, "
+                 f"largest free block {result.largest_free_block}")
+    return "\n".join(lines)
+
+
+def parse_range(text: str) -> tuple[int, int]:
+    match = re.match(r"^(\d+)(?:-(\d+))?$", text)
+    if not match:
+        raise argparse.ArgumentTypeError(f"expected PORT or PORT-PORT, got {text!r}")
+    start = int(match.group(1))
+    end = int(match.group(2) or start)
+    if end < start:
+        raise argparse.ArgumentTypeError(f"invalid range {text!r}")
+    return start, end
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Allocate host ports for a bench and write its compose override",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("bench", nargs="?", help=f"Bench name (override: {OVERRIDE_TEMPLATE})")
+    parser.add_argument("--service", action="append", type=Request.parse, default=[],
+                        metavar="SERVICE:PORT[-PORT]", help="Container port(s) of a service to publish (repeatable)")
+    parser.add_argument("--reserve", action="append", type=parse_range, default=[], metavar="PORT[-PORT]",
+                        help="Treat ports as claimed (repeatable)")
+    parser.add_argument("--start", type=int, help=f"Lowest port to hand out (default {PORT_MIN})")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE)
+    parser.add_argument("--no-containers", action="store_true", help="Do not index container ports")
+    parser.add_argument("--root", type=Path, default=ROOT, help="Project root holding compose.yaml")
+    parser.add_argument("--env-file", type=Path, help="Interpolation variables (default .env, else .env.example)")
+    parser.add_argument("--list", action="store_true", help="List every claim")
+    parser.add_argument("--dry-run", action="store_true", help="Allocate without writing the override")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    if args.bench and not BENCH_NAME.match(args.bench):
+        parser.error(f"invalid bench name {args.bench!r} (lowercase letters, digits, '-' and '_')")
+    if args.service and not args.bench:
+        parser.error("--service needs a bench name")
+    if not args.service and not args.list:
+        parser.error("nothing to do: give a bench with --service, or --list")
+
+    try:
+        result = run_allocation(args.root, args.bench or "", args.service,
+                                None if args.no_containers else args.engine, args.reserve,
+                                args.env_file or default_env_file(args.root), args.start, args.dry_run)
+    except (ComposeError, AllocationError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2 if isinstance(e, ComposeError) else 1
+
+    if args.json:
+        print(json.dumps(asdict(result), indent=2))
+    else:
+        print(report_text(result, args.list))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
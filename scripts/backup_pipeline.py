@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Streaming Backup Pipeline for Press SaaS Platform
+
+This script backs up sites to MinIO without staging dumps on disk: pg_dump
+runs in the backend container, its output is compressed by a multithreaded
+zstd on the host and streamed straight into an S3 multipart upload.
+
+Features:
+- pg_dump custom format (-Fc -Z0, restorable with `pg_restore --jobs`) per site database
+- Site files (public/ and private/files) streamed as a tar through the same pipeline
+- zstd -T<n> compression in a pipe; multipart upload with bounded memory
+- Several sites concurrently under a shared IO budget (MB/s of raw dump data)
+- One manifest per backup (backup.json, fields of the Backup entity in data-model.md),
+  written last so a backup without manifest is known to be incomplete
+- Throughput (MB/s) and per-site durations, text or JSON
+
+Usage:
+    # All sites, two at a time
+    python scripts/backup_pipeline.py --parallel 2
+
+    # Selected sites, capped at 50 MB/s of dump reads, database only
+    python scripts/backup_pipeline.py --sites press.localhost,site2.localhost --io-budget 50 --no-files
+
+    # Start the local MinIO first
+    podman compose ... -f overrides/compose.minio.yaml up -d minio
+
+Addresses: FR-010, FR-013, SC-005
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lib.bench import DEFAULT_BACKEND, DEFAULT_ENGINE, Bench, BenchError, SiteConfig  # noqa: E402
+from scripts.lib.s3 import MultipartWriter, S3Client, S3Error  # noqa: E402
+
+
+DEFAULT_BUCKET = os.environ.get("BACKUP_BUCKET", "fcs-press-backups")
+DEFAULT_PREFIX = "backups"
+READ_SIZE = 1024 * 1024
+MB = 1024 * 1024
+
+
+# =============================================================================
+# Pipeline
+# =============================================================================
+
+
+class IOBudget:
+    """Token bucket shared by every pipeline; limits raw bytes read per second."""
+
+    def __init__(self, bytes_per_s: Optional[float]):
+        self.rate = bytes_per_s if bytes_per_s and bytes_per_s > 0 else None
+        self._tokens = self.rate or 0.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, size: int) -> None:
+        """Block until `size` bytes fit in the budget."""
+        if self.rate is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= size
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+@dataclass
+class StreamResult:
+    """One object written by the pipeline"""
+
+    kind: str
+    key: str
+    raw_bytes: int = 0
+    stored_bytes: int = 0
+    sha256: str = ""
+    duration_s: float = 0.0
+    error: str = ""
+
+
+class PipelineError(Exception):
+    """A stage of the dump -> compress -> upload pipeline failed"""
+
+
+def read_stderr(stream: BinaryIO) -> str:
+    """Decoded contents of a stderr temp file (a file, unlike a PIPE, never fills up and blocks the process)"""
+    stream.seek(0)
+    return stream.read().decode("utf-8", "replace").strip()
+
+
+def stream_to_object(
+    source: list[str],
+    env: dict[str, str],
+    zstd: list[str],
+    writer: MultipartWriter,
+    budget: IOBudget,
+    result: StreamResult,
+) -> None:
+    """Run `source | zstd` and write zstd's output into `writer`.
+
+    A feeder thread moves raw bytes from the source to zstd (metered by the IO
+    budget); this thread moves compressed bytes into the multipart upload.
+
+    Raises:
+        PipelineError: If a process exits non-zero
+        S3Error, OSError: If the upload fails (processes are killed first)
+    """
+    src_stderr, zst_stderr = tempfile.TemporaryFile(), tempfile.TemporaryFile()
+    src = subprocess.Popen(source, stdout=subprocess.PIPE, stderr=src_stderr, env={**os.environ, **env})
+    zst = subprocess.Popen(zstd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=zst_stderr)
+    feed_error: list[BaseException] = []
+
+    def feed() -> None:
+        try:
+            while True:
+                chunk = src.stdout.read(READ_SIZE)
+                if not chunk:
+                    break
+                budget.consume(len(chunk))
+                result.raw_bytes += len(chunk)
+                zst.stdin.write(chunk)
+        except (OSError, ValueError) as e:  # zstd died or the pipeline was aborted
+            feed_error.append(e)
+        finally:
+            try:
+                zst.stdin.close()
+            except OSError:
+                pass
+
+    feeder = threading.Thread(target=feed, name=f"feed-{result.kind}", daemon=True)
+    feeder.start()
+    digest = hashlib.sha256()
+    try:
+        while True:
+            chunk = zst.stdout.read(READ_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            writer.write(chunk)
+    except BaseException:
+        src.kill()
+        zst.kill()
+        raise
+    finally:
+        feeder.join()
+        src.wait()
+        zst.wait()
+        src_err, zst_err = read_stderr(src_stderr), read_stderr(zst_stderr)
+        for stream in (src.stdout, zst.stdout, src_stderr, zst_stderr):
+            stream.close()
+
+    if src.returncode != 0:
+        raise PipelineError(f"{result.kind} source exited {src.returncode}: {(src_err.splitlines() or [''])[-1]}")
+    if zst.returncode != 0:
+        raise PipelineError(f"zstd exited {zst.returncode}: {zst_err}")
+    if feed_error:
+        raise PipelineError(f"feeding zstd failed: {feed_error[0]}")
+    result.stored_bytes = writer.bytes_written
+    result.sha256 = digest.hexdigest()
+
+
+def dump_command(bench: Bench, config: SiteConfig) -> tuple[list[str], dict[str, str]]:
+    """pg_dump of the site database in the backend container (password via PGPASSWORD)"""
+    command = [
+        "pg_dump",
+        "-h", config.db_host,
+        "-p", str(config.db_port),
+        "-U", config.db_name,
+        "-d", config.db_name,
+        "--format=custom",
+        "--compress=0",
+        "--no-password",
+    ]
+    env = {"PGPASSWORD": config.db_password}
+    return bench.exec_args(command, env_names=list(env)), env
+
+
+def files_command(bench: Bench, site: str) -> list[str]:
+    """tar of the site's uploaded files (public and private), to stdout, in a stable order"""
+    script = (
+        f"cd 'sites/{site}' && set -- && "
+        "for d in public/files private/files; do [ -d \"$d\" ] && set -- \"$@\" \"$d\"; done; "
+        '[ $# -gt 0 ] || set -- --files-from=/dev/null; '
+        'tar --sort=name -cf - "$@"'
+    )
+    return bench.exec_args(["sh", "-c", script])
+
+
+# =============================================================================
+# Sites
+# =============================================================================
+
+
+@dataclass
+class SiteBackup:
+    """Outcome of one site's backup"""
+
+    site: str
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    backup_time: str = ""
+    prefix: str = ""
+    status: str = "pending"
+    duration_s: float = 0.0
+    streams: list[StreamResult] = field(default_factory=list)
+    error: str = ""
+
+    @property
+    def raw_bytes(self) -> int:
+        return sum(s.raw_bytes for s in self.streams)
+
+    @property
+    def stored_bytes(self) -> int:
+        return sum(s.stored_bytes for s in self.streams)
+
+    def manifest(self, config: SiteConfig) -> dict:
+        """backup.json: the Backup entity plus what a restore needs"""
+        return {
+            "id": self.id,
+            "site": self.site,
+            "db_name": config.db_name,
+            "backup_time": self.backup_time,
+            "type": "full",
+            "status": self.status,
+            "object_key": self.prefix,
+            "size_bytes": self.stored_bytes,
+            "raw_bytes": self.raw_bytes,
+            "duration_s": round(self.duration_s, 3),
+            "objects": {
+                s.kind: {
+                    "key": s.key,
+                    "format": "pg_dump-custom+zstd" if s.kind == "database" else "tar+zstd",
+                    "size_bytes": s.stored_bytes,
+                    "raw_bytes": s.raw_bytes,
+                    "sha256": s.sha256,
+                }
+                for s in self.streams
+            },
+        }
+
+
+class BackupPipeline:
+    """Backs up sites concurrently into one bucket"""
+
+    def __init__(
+        self,
+        bench: Bench,
+        client: S3Client,
+        bucket: str,
+        prefix: str,
+        budget: IOBudget,
+        zstd_level: int = 3,
+        zstd_threads: int = 0,
+        part_size: int = 16 * MB,
+        inflight: int = 4,
+        include_files: bool = True,
+    ):
+        self.bench = bench
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.budget = budget
+        self.zstd = [shutil.which("zstd") or "zstd", f"-T{zstd_threads}", f"-{zstd_level}", "-q", "-c"]
+        self.part_size = part_size
+        self.inflight = inflight
+        self.include_files = include_files
+
+    def _stream(self, backup: SiteBackup, kind: str, name: str, source: list[str], env: dict[str, str]) -> None:
+        result = StreamResult(kind, f"{backup.prefix}/{name}")
+        backup.streams.append(result)
+        started = time.monotonic()
+        writer = MultipartWriter(self.client, self.bucket, result.key, self.part_size, self.inflight,
+                                 content_type="application/zstd")
+        try:
+            stream_to_object(source, env, self.zstd, writer, self.budget, result)
+            writer.close()
+        except BaseException:
+            writer.abort()
+            raise
+        finally:
+            result.duration_s = time.monotonic() - started
+
+    def backup_site(self, config: SiteConfig) -> SiteBackup:
+        """Dump (and files) of one site, then its manifest"""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        backup = SiteBackup(config.name, backup_time=now.isoformat(timespec="seconds"))
+        backup.prefix = f"{self.prefix}/{config.name}/{now.strftime('%Y%m%dT%H%M%SZ')}"
+        started = time.monotonic()
+        try:
+            source, env = dump_command(self.bench, config)
+            self._stream(backup, "database", "database.dump.zst", source, env)
+            if self.include_files:
+                self._stream(backup, "files", "files.tar.zst", files_command(self.bench, config.name), {})
+            backup.status = "success"
+            backup.duration_s = time.monotonic() - started
+            manifest = json.dumps(backup.manifest(config), indent=2).encode()
+            self.client.put_object(self.bucket, f"{backup.prefix}/backup.json", manifest, "application/json")
+        except (OSError, S3Error, PipelineError) as e:
+            backup.status = "failed"
+            backup.error = str(e)
+        backup.duration_s = time.monotonic() - started
+        return backup
+
+    def run(self, configs: list[SiteConfig], parallel: int) -> list[SiteBackup]:
+        """Back up every site, `parallel` at a time, in the given order"""
+        self.client.ensure_bucket(self.bucket)
+        with ThreadPoolExecutor(max_workers=max(parallel, 1), thread_name_prefix="site") as pool:
+            return list(pool.map(self.backup_site, configs))
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+
+def rate(size: int, seconds: float) -> float:
+    return size / MB / seconds if seconds > 0 else 0.0
+
+
+def report_text(backups: list[SiteBackup], wall_s: float) -> str:
+    lines = [
+        f"{'site':<32}{'status':<9}{'time':>8}{'raw':>11}{'stored':>11}{'ratio':>7}{'MB/s':>8}",
+    ]
+    for b in backups:
+        ratio = b.raw_bytes / b.stored_bytes if b.stored_bytes else 0.0
+        lines.append(
+            f"{b.site[:31]:<32}{b.status:<9}{b.duration_s:>7.1f}s{b.raw_bytes / MB:>9.1f}MB"
+            f"{b.stored_bytes / MB:>9.1f}MB{ratio:>6.1f}x{rate(b.raw_bytes, b.duration_s):>8.1f}"
+        )
+        for s in b.streams:
+            lines.append(f"    {s.kind:<10}{s.duration_s:>7.1f}s  {rate(s.raw_bytes, s.duration_s):>7.1f} MB/s  {s.key}")
+        if b.error:
+            lines.append(f"    ERROR: {b.error}")
+    raw = sum(b.raw_bytes for b in backups)
+    stored = sum(b.stored_bytes for b in backups)
+    ok = sum(b.status == "success" for b in backups)
+    lines.append("")
+    lines.append(
+        f"{ok}/{len(backups)} sites in {wall_s:.1f}s: {raw / MB:.1f} MB dumped, {stored / MB:.1f} MB stored, "
+        f"{rate(raw, wall_s):.1f} MB/s raw, {rate(stored, wall_s):.1f} MB/s uploaded"
+    )
+    return "\n".join(lines)
+
+
+def report_json(backups: list[SiteBackup], wall_s: float) -> str:
+    return json.dumps(
+        {
+            "wall_s": round(wall_s, 3),
+            "raw_mb_s": round(rate(sum(b.raw_bytes for b in backups), wall_s), 2),
+            "sites": [
+                {
+                    **{k: v for k, v in asdict(b).items() if k != "streams"},
+                    "raw_bytes": b.raw_bytes,
+                    "stored_bytes": b.stored_bytes,
+                    "streams": [asdict(s) for s in b.streams],
+                }
+                for b in backups
+            ],
+        },
+        indent=2,
+    )
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Stream site backups (pg_dump | zstd) into MinIO",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--sites", default="all", help="Comma-separated sites, or 'all'")
+    parser.add_argument("--parallel", type=int, default=2, help="Sites backed up concurrently")
+    parser.add_argument("--io-budget", type=float, default=0, help="Max MB/s of raw dump data (0 = unlimited)")
+    parser.add_argument("--zstd-level", type=int, default=3)
+    parser.add_argument("--zstd-threads", type=int, default=0, help="zstd -T value per site (0 = all cores)")
+    parser.add_argument("--part-size", type=int, default=16, help="Multipart part size in MB (min 5)")
+    parser.add_argument("--inflight", type=int, default=4, help="Parts buffered or uploading per object")
+    parser.add_argument("--no-files", action="store_true", help="Database only")
+    parser.add_argument("--bucket", default=DEFAULT_BUCKET)
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX)
+    parser.add_argument("--endpoint", help="S3 endpoint (default $MINIO_ENDPOINT or http://localhost:48590)")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE)
+    parser.add_argument("--backend", default=DEFAULT_BACKEND)
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    if not shutil.which("zstd"):
+        print("ERROR: zstd not found on PATH (install the zstd package)", file=sys.stderr)
+        return 1
+
+    bench = Bench(args.engine, args.backend)
+    try:
+        sites = bench.list_sites() if args.sites == "all" else [s for s in args.sites.split(",") if s]
+        configs = bench.site_configs(sites)
+    except BenchError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    if not configs:
+        print("ERROR: no sites found", file=sys.stderr)
+        return 1
+
+    pipeline = BackupPipeline(
+        bench,
+        S3Client.from_env(args.endpoint),
+        args.bucket,
+        args.prefix,
+        IOBudget(args.io_budget * MB),
+        args.zstd_level,
+        args.zstd_threads,
+        args.part_size * MB,
+        args.inflight,
+        include_files=not args.no_files,
+    )
+    started = time.monotonic()
+    try:
+        backups = pipeline.run([configs[s] for s in sites], args.parallel)
+    except (OSError, S3Error) as e:
+        print(f"ERROR: bucket {args.bucket}: {e}", file=sys.stderr)
+        return 1
+    wall_s = time.monotonic() - started
+
+    print(report_json(backups, wall_s) if args.json else report_text(backups, wall_s))
+    return 0 if all(b.status == "success" for b in backups) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -215,6 +215,13 @@ class ScheduleExtractor:
             "intensive": True,
             "tags": ["cleanup", "io-intensive"],
         },
+        "site_pool.py": {
+            "name": "Site Pool Replenish",
+            "schedule": "* * * * *",
+            "duration": 1,
+            "intensive": False,
+            "tags": ["provisioning"],
+        },
     }
 
     def extract_from_file(self, file_path: Path) -> list[ScheduledJob]:
@@ -0,0 +1,730 @@
+#!/usr/bin/env python3
+"""
+Deduplicated (Content-Defined Chunking) Site Backups for Press SaaS Platform
+
+Full dumps every 6 hours mostly re-upload data that did not change. This
+script cuts each site's pg_dump and files tar into content-defined chunks
+(FastCDC, scripts/lib/cdc.py), stores every chunk once in MinIO under its
+SHA-256 and writes one manifest per backup listing the chunks of each
+stream. An unchanged table or upload maps to the same chunks as in the
+previous backup, so only changed regions are compressed and transferred.
+
+Features:
+- pg_dump custom format without compression (-Fc -Z0) so unchanged rows give identical bytes
+- Site files (public/ and private/files) as a name-sorted tar through the same chunker
+- Chunks stored once under chunks/<aa>/<sha256>.<codec>, shared by all sites and backups;
+  the previous manifest of the site is the first dedup index, HEAD requests the second
+- Chunking on a process pool (64 MiB segments), compression and uploads on a thread pool
+- One manifest per backup (manifest.json, format fcs-cdc-v1), written last; an
+  in-progress.json marker exists while the backup runs, so the chunk sweep waits for it
+- Parallel restore: chunks fetched concurrently and written at their offsets, every
+  chunk and the reassembled streams verified against their SHA-256
+- Dedup ratio, bytes uploaded and MB/s, text or JSON
+
+Usage:
+    # All sites, two at a time
+    python scripts/dedup_backup.py --parallel 2
+
+    # Database only, capped at 50 MB/s of dump reads
+    python scripts/dedup_backup.py --sites press.localhost --io-budget 50 --no-files
+
+    # Reassemble the latest backup of a site into ./restore/press.localhost/<timestamp>/
+    python scripts/dedup_backup.py --restore press.localhost
+
+    # A given backup, into a given directory
+    python scripts/dedup_backup.py --restore press.localhost --backup 20260101T060000Z --output /tmp/r
+
+Chunks are only ever added here; unreferenced chunks are removed by the
+retention job (mark and sweep over the manifests it keeps). A chunk found by
+HEAD is copied onto itself, so reusing it restarts its sweep grace period.
+
+Addresses: FR-013, FR-015, SC-005
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Deque, Iterator, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.backup_pipeline import (  # noqa: E402
+    DEFAULT_BUCKET,
+    DEFAULT_PREFIX,
+    MB,
+    READ_SIZE,
+    IOBudget,
+    PipelineError,
+    dump_command,
+    files_command,
+    rate,
+    read_stderr,
+)
+from scripts.lib.bench import DEFAULT_BACKEND, DEFAULT_ENGINE, Bench, BenchError, SiteConfig  # noqa: E402
+from scripts.lib.cdc import ChunkParams, chunk_stream  # noqa: E402
+from scripts.lib.s3 import S3Client, S3Error  # noqa: E402
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+MANIFEST_FORMAT = "fcs-cdc-v1"
+MANIFEST_NAME = "manifest.json"
+IN_PROGRESS_NAME = "in-progress.json"
+DEFAULT_CHUNK_PREFIX = "chunks"
+STREAM_FILES = {"database": "database.dump", "files": "files.tar"}
+STREAM_FORMATS = {"database": "pg_dump-custom", "files": "tar"}
+CODEC_EXTENSIONS = {"zstd": "zst", "zlib": "zz"}
+
+
+# =============================================================================
+# Chunk store
+# =============================================================================
+
+
+def default_codec() -> str:
+    """zstd when the zstandard module is installed, else zlib (stdlib)"""
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def compress(codec: str, data: bytes, level: int) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return zlib.compress(data, min(level, 9))
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    """Raises:
+        ValueError: If the codec is unknown or unavailable
+    """
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("chunks are zstd-compressed: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"unknown chunk codec {codec!r}")
+
+
+def chunk_key(prefix: str, digest: str, codec: str) -> str:
+    return f"{prefix}/{digest[:2]}/{digest}.{CODEC_EXTENSIONS[codec]}"
+
+
+class ChunkStore:
+    """Content-addressed chunks in one bucket; each digest is uploaded at most once per run.
+
+    Streams that meet a chunk another stream is still uploading wait for that
+    upload, so no manifest can reference a chunk whose upload failed.
+    """
+
+    def __init__(self, client: S3Client, bucket: str, prefix: str = DEFAULT_CHUNK_PREFIX,
+                 codec: Optional[str] = None, level: int = 3):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.codec = codec or default_codec()
+        self.level = level
+        self._known: set[str] = set()
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def key(self, digest: str) -> str:
+        return chunk_key(self.prefix, digest, self.codec)
+
+    def remember(self, digests) -> None:
+        """Digests known to be stored (e.g. listed by a previous manifest)"""
+        with self._lock:
+            self._known.update(digests)
+
+    def ensure(self, digest: str, data: bytes, executor: Executor) -> tuple[Optional[Future], bool]:
+        """Schedule the upload of `digest` unless it is stored or already being uploaded.
+
+        Returns:
+            (future to wait on or None if the chunk is known, True if this call scheduled the upload)
+        """
+        with self._lock:
+            if digest in self._known:
+                return None, False
+            pending = self._pending.get(digest)
+            if pending is not None:
+                return pending, False
+            future = executor.submit(self._store, digest, data)
+            self._pending[digest] = future
+            return future, True
+
+    def _store(self, digest: str, data: bytes) -> int:
+        """Upload a chunk unless the bucket already has it; returns bytes uploaded."""
+        key = self.key(digest)
+        try:
+            if self.client.head_object(self.bucket, key) is None:
+                blob = compress(self.codec, data, self.level)
+                self.client.put_object(self.bucket, key, blob)
+            else:
+                # Reused: refresh LastModified so a sweep cannot judge it by an older backup's age
+                self.client.copy_object(self.bucket, key, key)
+                blob = b""
+        except BaseException:
+            with self._lock:
+                self._pending.pop(digest, None)
+            raise
+        with self._lock:
+            self._known.add(digest)
+            self._pending.pop(digest, None)
+        return len(blob)
+
+
+def fetch_chunk(client: S3Client, bucket: str, key: str, codec: str, digest: str, size: int) -> bytes:
+    """Download, decompress and verify one chunk.
+
+    Raises:
+        PipelineError: If the chunk does not match its digest
+    """
+    try:
+        data = decompress(codec, client.get_object(bucket, key))
+    except (ValueError, zlib.error) as e:
+        raise PipelineError(f"chunk {digest[:12]}: {e}") from e
+    if len(data) != size or hashlib.sha256(data).hexdigest() != digest:
+        raise PipelineError(f"chunk {digest[:12]} is corrupt ({key})")
+    return data
+
+
+# =============================================================================
+# Backup
+# =============================================================================
+
+
+class MeteredReader:
+    """File-like wrapper that charges every read to the IO budget."""
+
+    def __init__(self, raw: BinaryIO, budget: IOBudget):
+        self.raw = raw
+        self.budget = budget
+
+    def read(self, size: int) -> bytes:
+        data = self.raw.read(min(size, READ_SIZE))
+        self.budget.consume(len(data))
+        return data
+
+
+@dataclass
+class ChunkedStream:
+    """One stream of a backup and its chunk list"""
+
+    kind: str
+    size_bytes: int = 0
+    sha256: str = ""
+    chunks: list[list] = field(default_factory=list)
+    new_chunks: int = 0
+    new_bytes: int = 0
+    stored_bytes: int = 0
+    duration_s: float = 0.0
+
+    @property
+    def reused_chunks(self) -> int:
+        return len(self.chunks) - self.new_chunks
+
+
+@dataclass
+class DedupBackup:
+    """Outcome of one site's deduplicated backup"""
+
+    site: str
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    backup_time: str = ""
+    prefix: str = ""
+    parent: str = ""
+    status: str = "pending"
+    duration_s: float = 0.0
+    streams: list[ChunkedStream] = field(default_factory=list)
+    error: str = ""
+
+    @property
+    def raw_bytes(self) -> int:
+        return sum(s.size_bytes for s in self.streams)
+
+    @property
+    def stored_bytes(self) -> int:
+        return sum(s.stored_bytes for s in self.streams)
+
+    @property
+    def new_bytes(self) -> int:
+        return sum(s.new_bytes for s in self.streams)
+
+    def manifest(self, config: SiteConfig, params: ChunkParams, store: ChunkStore) -> dict:
+        """manifest.json: the Backup entity plus the chunk lists a restore needs"""
+        return {
+            "format": MANIFEST_FORMAT,
+            "id": self.id,
+            "site": self.site,
+            "db_name": config.db_name,
+            "backup_time": self.backup_time,
+            "type": "incremental" if self.parent else "full",
+            "status": self.status,
+            "object_key": self.prefix,
+            "parent": self.parent or None,
+            "size_bytes": self.stored_bytes,
+            "raw_bytes": self.raw_bytes,
+            "duration_s": round(self.duration_s, 3),
+            "chunking": {"algorithm": "fastcdc-gear64", **asdict(params)},
+            "codec": store.codec,
+            "chunk_prefix": store.prefix,
+            "streams": {
+                s.kind: {
+                    "format": STREAM_FORMATS[s.kind],
+                    "size_bytes": s.size_bytes,
+                    "sha256": s.sha256,
+                    "new_chunks": s.new_chunks,
+                    "new_bytes": s.new_bytes,
+                    "stored_bytes": s.stored_bytes,
+                    "chunks": s.chunks,
+                }
+                for s in self.streams
+            },
+        }
+
+
+def latest_manifest(client: S3Client, bucket: str, prefix: str, site: str) -> Optional[tuple[str, dict]]:
+    """(key, manifest) of the site's most recent successful CDC backup"""
+    keys = sorted((o.key for o in client.list_objects(bucket, f"{prefix.strip('/')}/{site}/")
+                   if o.key.endswith(f"/{MANIFEST_NAME}")), reverse=True)
+    for key in keys:
+        try:
+            manifest = json.loads(client.get_object(bucket, key))
+        except ValueError:
+            continue
+        if manifest.get("format") == MANIFEST_FORMAT and manifest.get("status") == "success":
+            return key, manifest
+    return None
+
+
+def manifest_digests(manifest: dict) -> set[str]:
+    """Every chunk digest referenced by a manifest"""
+    return {digest for stream in manifest.get("streams", {}).values() for digest, _ in stream["chunks"]}
+
+
+class DedupPipeline:
+    """Chunks, deduplicates and uploads site backups"""
+
+    def __init__(
+        self,
+        bench: Bench,
+        client: S3Client,
+        bucket: str,
+        prefix: str,
+        store: ChunkStore,
+        chunker: Executor,
+        uploader: Executor,
+        budget: IOBudget,
+        params: ChunkParams = ChunkParams(),
+        include_files: bool = True,
+    ):
+        self.bench = bench
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.store = store
+        self.chunker = chunker
+        self.uploader = uploader
+        self.budget = budget
+        self.params = params
+        self.include_files = include_files
+
+    def _stream(self, backup: DedupBackup, kind: str, source: list[str], env: dict[str, str]) -> None:
+        """Run `source`, chunk its stdout and upload the chunks not yet stored.
+
+        Raises:
+            PipelineError: If the source exits non-zero
+            S3Error, OSError: If an upload fails (the source is killed first)
+        """
+        result = ChunkedStream(kind)
+        backup.streams.append(result)
+        started = time.monotonic()
+        digest = hashlib.sha256()
+        src_stderr = tempfile.TemporaryFile()
+        src = subprocess.Popen(source, stdout=subprocess.PIPE, stderr=src_stderr, env={**os.environ, **env})
+        try:
+            for data, chunks in chunk_stream(MeteredReader(src.stdout, self.budget), self.params, self.chunker):
+                base = chunks[0].offset
+                digest.update(data)
+                view = memoryview(data)
+                own: list[Future] = []
+                shared: list[Future] = []
+                for chunk in chunks:
+                    result.chunks.append([chunk.digest, chunk.size])
+                    start = chunk.offset - base
+                    future, scheduled = self.store.ensure(chunk.digest, view[start:start + chunk.size],
+                                                          self.uploader)
+                    if scheduled:
+                        result.new_chunks += 1
+                        result.new_bytes += chunk.size
+                        own.append(future)
+                    elif future is not None:
+                        shared.append(future)
+                # Wait per segment: bounds memory while the next segments are being chunked
+                wait(own + shared)
+                result.stored_bytes += sum(f.result() for f in own)
+                for future in shared:
+                    future.result()
+                result.size_bytes += len(data)
+        except BaseException:
+            src.kill()
+            raise
+        finally:
+            src.wait()
+            src_err = read_stderr(src_stderr)
+            src.stdout.close()
+            src_stderr.close()
+            result.duration_s = time.monotonic() - started
+        if src.returncode != 0:
+            raise PipelineError(f"{kind} source exited {src.returncode}: {(src_err.splitlines() or [''])[-1]}")
+        result.sha256 = digest.hexdigest()
+
+    def backup_site(self, config: SiteConfig) -> DedupBackup:
+        """Dump (and files) of one site, then its manifest"""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        backup = DedupBackup(config.name, backup_time=now.isoformat(timespec="seconds"))
+        backup.prefix = f"{self.prefix}/{config.name}/{now.strftime('%Y%m%dT%H%M%SZ')}"
+        started = time.monotonic()
+        marker = f"{backup.prefix}/{IN_PROGRESS_NAME}"
+        try:
+            # Before any chunk is reused: prune_backups.py does not sweep while a marker exists
+            self.client.put_object(self.bucket, marker, json.dumps({"id": backup.id, "site": backup.site,
+                                   "backup_time": backup.backup_time}).encode(), "application/json")
+            previous = latest_manifest(self.client, self.bucket, self.prefix, config.name)
+            if previous:
+                backup.parent = previous[0]
+                if previous[1].get("codec") == self.store.codec and previous[1].get("chunk_prefix") == self.store.prefix:
+                    self.store.remember(manifest_digests(previous[1]))
+            source, env = dump_command(self.bench, config)
+            self._stream(backup, "database", source, env)
+            if self.include_files:
+                self._stream(backup, "files", files_command(self.bench, config.name), {})
+            backup.status = "success"
+            backup.duration_s = time.monotonic() - started
+            manifest = json.dumps(backup.manifest(config, self.params, self.store), separators=(",", ":")).encode()
+            self.client.put_object(self.bucket, f"{backup.prefix}/{MANIFEST_NAME}", manifest, "application/json")
+        except (OSError, S3Error, PipelineError) as e:
+            backup.status = "failed"
+            backup.error = str(e)
+        try:
+            self.client.delete_object(self.bucket, marker)
+        except (OSError, S3Error):
+            pass  # left behind, it is pruned as an incomplete backup after its grace period
+        backup.duration_s = time.monotonic() - started
+        return backup
+
+    def run(self, configs: list[SiteConfig], parallel: int) -> list[DedupBackup]:
+        """Back up every site, `parallel` at a time, in the given order"""
+        self.client.ensure_bucket(self.bucket)
+        with ThreadPoolExecutor(max_workers=max(parallel, 1), thread_name_prefix="site") as pool:
+            return list(pool.map(self.backup_site, configs))
+
+
+# =============================================================================
+# Restore
+# =============================================================================
+
+
+@dataclass
+class RestoredStream:
+    """One stream reassembled from chunks"""
+
+    kind: str
+    path: str
+    size_bytes: int = 0
+    chunks: int = 0
+    fetched_bytes: int = 0
+    duration_s: float = 0.0
+    verified: bool = False
+
+
+def resolve_backup(client: S3Client, bucket: str, prefix: str, site: str,
+                   backup: Optional[str] = None) -> tuple[str, dict]:
+    """(key, manifest) of `backup` (a timestamp directory) or of the site's latest CDC backup.
+
+    Raises:
+        PipelineError: If no such backup exists
+    """
+    prefix = prefix.strip("/")
+    if backup:
+        key = f"{prefix}/{site}/{backup}/{MANIFEST_NAME}"
+        try:
+            return key, json.loads(client.get_object(bucket, key))
+        except S3Error as e:
+            raise PipelineError(f"{key}: {e}") from e
+    found = latest_manifest(client, bucket, prefix, site)
+    if found:
+        return found
+    raise PipelineError(f"no deduplicated backup of {site} in {bucket}/{prefix}")
+
+
+def restore_stream(client: S3Client, bucket: str, manifest: dict, kind: str, path: Path,
+                   pool: Executor) -> RestoredStream:
+    """Reassemble one stream of `manifest` into `path` with concurrent chunk fetches.
+
+    Each distinct chunk is fetched once and written (pwrite) at every offset
+    it occurs; the whole file is then checked against the stream's SHA-256.
+
+    Raises:
+        PipelineError: If a chunk or the reassembled stream fails verification
+        S3Error, OSError: If a download or a write fails
+    """
+    stream = manifest["streams"][kind]
+    result = RestoredStream(kind, str(path), stream["size_bytes"], len(stream["chunks"]))
+    started = time.monotonic()
+    offsets: dict[str, list[int]] = {}
+    sizes: dict[str, int] = {}
+    position = 0
+    for digest, size in stream["chunks"]:
+        offsets.setdefault(digest, []).append(position)
+        sizes[digest] = size
+        position += size
+    if position != stream["size_bytes"]:
+        raise PipelineError(f"{kind}: chunk sizes add up to {position}, expected {stream['size_bytes']}")
+
+    codec, chunk_prefix = manifest["codec"], manifest["chunk_prefix"]
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.ftruncate(fd, position)
+
+        def fetch(digest: str) -> int:
+            data = fetch_chunk(client, bucket, chunk_key(chunk_prefix, digest, codec), codec, digest, sizes[digest])
+            for offset in offsets[digest]:
+                os.pwrite(fd, data, offset)
+            return len(data)
+
+        futures = [pool.submit(fetch, digest) for digest in offsets]
+        try:
+            result.fetched_bytes = sum(f.result() for f in futures)
+        except BaseException:
+            for f in futures:
+                f.cancel()
+            raise
+    finally:
+        os.close(fd)
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_SIZE), b""):
+            digest.update(block)
+    if digest.hexdigest() != stream["sha256"]:
+        raise PipelineError(f"{kind}: reassembled stream does not match its sha256")
+    result.verified = True
+    result.duration_s = time.monotonic() - started
+    return result
+
+
+def iter_chunks(client: S3Client, bucket: str, manifest: dict, kind: str, pool: Executor,
+                window: int = 16) -> Iterator[bytes]:
+    """Verified chunks of one stream in order, up to `window` downloads ahead of the consumer.
+
+    For consumers that need the stream sequentially (a pipe into tar or a
+    container); :func:`restore_stream` is faster when writing to a file.
+    """
+    codec, chunk_prefix = manifest["codec"], manifest["chunk_prefix"]
+    pending: Deque[Future] = deque()
+    try:
+        for digest, size in manifest["streams"][kind]["chunks"]:
+            pending.append(pool.submit(fetch_chunk, client, bucket, chunk_key(chunk_prefix, digest, codec),
+                                       codec, digest, size))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def restore_backup(client: S3Client, bucket: str, manifest: dict, output: Path,
+                   workers: int = 16) -> list[RestoredStream]:
+    """Reassemble every stream of a backup into `output` (database.dump, files.tar)"""
+    output.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="chunk") as pool:
+        return [restore_stream(client, bucket, manifest, kind, output / STREAM_FILES[kind], pool)
+                for kind in manifest["streams"]]
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+
+def report_text(backups: list[DedupBackup], wall_s: float) -> str:
+    lines = [
+        f"{'site':<32}{'status':<9}{'time':>8}{'raw':>11}{'new':>11}{'stored':>11}{'dedup':>8}{'MB/s':>8}",
+    ]
+    for b in backups:
+        ratio = b.raw_bytes / b.stored_bytes if b.stored_bytes else 0.0
+        lines.append(
+            f"{b.site[:31]:<32}{b.status:<9}{b.duration_s:>7.1f}s{b.raw_bytes / MB:>9.1f}MB"
+            f"{b.new_bytes / MB:>9.1f}MB{b.stored_bytes / MB:>9.1f}MB{ratio:>7.1f}x"
+            f"{rate(b.raw_bytes, b.duration_s):>8.1f}"
+        )
+        for s in b.streams:
+            lines.append(
+                f"    {s.kind:<10}{s.duration_s:>7.1f}s  {rate(s.size_bytes, s.duration_s):>7.1f} MB/s  "
+                f"{len(s.chunks)} chunks, {s.new_chunks} new, {s.reused_chunks} reused"
+            )
+        if b.parent:
+            lines.append(f"    parent: {b.parent}")
+        if b.error:
+            lines.append(f"    ERROR: {b.error}")
+    raw = sum(b.raw_bytes for b in backups)
+    stored = sum(b.stored_bytes for b in backups)
+    ok = sum(b.status == "success" for b in backups)
+    lines.append("")
+    lines.append(
+        f"{ok}/{len(backups)} sites in {wall_s:.1f}s: {raw / MB:.1f} MB dumped, {stored / MB:.1f} MB uploaded "
+        f"({raw / stored if stored else 0.0:.1f}x), {rate(raw, wall_s):.1f} MB/s raw"
+    )
+    return "\n".join(lines)
+
+
+def report_json(backups: list[DedupBackup], wall_s: float) -> str:
+    return json.dumps(
+        {
+            "wall_s": round(wall_s, 3),
+            "raw_mb_s": round(rate(sum(b.raw_bytes for b in backups), wall_s), 2),
+            "sites": [
+                {
+                    **{k: v for k, v in asdict(b).items() if k != "streams"},
+                    "raw_bytes": b.raw_bytes,
+                    "new_bytes": b.new_bytes,
+                    "stored_bytes": b.stored_bytes,
+                    "streams": [
+                        {**{k: v for k, v in asdict(s).items() if k != "chunks"},
+                         "chunks": len(s.chunks), "reused_chunks": s.reused_chunks}
+                        for s in b.streams
+                    ],
+                }
+                for b in backups
+            ],
+        },
+        indent=2,
+    )
+
+
+def report_restore(site: str, key: str, streams: list[RestoredStream], wall_s: float) -> str:
+    lines = [f"Restored {key}"]
+    for s in streams:
+        lines.append(
+            f"    {s.kind:<10}{s.duration_s:>7.1f}s  {rate(s.size_bytes, s.duration_s):>7.1f} MB/s  "
+            f"{s.chunks} chunks, {s.fetched_bytes / MB:.1f} MB fetched, sha256 {'ok' if s.verified else 'FAILED'}  "
+            f"{s.path}"
+        )
+    total = sum(s.size_bytes for s in streams)
+    lines.append(f"{site}: {total / MB:.1f} MB in {wall_s:.1f}s ({rate(total, wall_s):.1f} MB/s)")
+    return "\n".join(lines)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def run_restore(args, client: S3Client) -> int:
+    started = time.monotonic()
+    try:
+        key, manifest = resolve_backup(client, args.bucket, args.prefix, args.restore, args.backup)
+        output = Path(args.output or Path("restore") / args.restore / key.rsplit("/", 2)[-2])
+        streams = restore_backup(client, args.bucket, manifest, output, args.uploads)
+    except (OSError, S3Error, PipelineError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    wall_s = time.monotonic() - started
+    if args.json:
+        print(json.dumps({"backup": key, "wall_s": round(wall_s, 3), "streams": [asdict(s) for s in streams]},
+                         indent=2))
+    else:
+        print(report_restore(args.restore, key, streams, wall_s))
+    return 0
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Deduplicated (content-defined chunking) site backups in MinIO",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--sites", default="all", help="Comma-separated sites, or 'all'")
+    parser.add_argument("--parallel", type=int, default=2, help="Sites backed up concurrently")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Chunking processes")
+    parser.add_argument("--uploads", type=int, default=8, help="Concurrent chunk uploads (or downloads on restore)")
+    parser.add_argument("--io-budget", type=float, default=0, help="Max MB/s of raw dump data (0 = unlimited)")
+    parser.add_argument("--avg-chunk", type=int, default=1024, help="Average chunk size in KB (power of two)")
+    parser.add_argument("--level", type=int, default=3, help="Chunk compression level")
+    parser.add_argument("--no-files", action="store_true", help="Database only")
+    parser.add_argument("--restore", metavar="SITE", help="Reassemble a backup of SITE instead of backing up")
+    parser.add_argument("--backup", help="Backup timestamp to restore (default: latest)")
+    parser.add_argument("--output", help="Restore directory (default: restore/<site>/<timestamp>)")
+    parser.add_argument("--bucket", default=DEFAULT_BUCKET)
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX)
+    parser.add_argument("--chunk-prefix", default=DEFAULT_CHUNK_PREFIX)
+    parser.add_argument("--endpoint", help="S3 endpoint (default $MINIO_ENDPOINT or http://localhost:48590)")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE)
+    parser.add_argument("--backend", default=DEFAULT_BACKEND)
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    client = S3Client.from_env(args.endpoint)
+    if args.restore:
+        return run_restore(args, client)
+
+    avg = args.avg_chunk * 1024
+    try:
+        params = ChunkParams(min_size=avg // 2, avg_size=avg, max_size=avg * 4)
+    except ValueError as e:
+        print(f"ERROR: --avg-chunk: {e}", file=sys.stderr)
+        return 1
+    if avg & (avg - 1):
+        print("ERROR: --avg-chunk must be a power of two", file=sys.stderr)
+        return 1
+
+    bench = Bench(args.engine, args.backend)
+    try:
+        sites = bench.list_sites() if args.sites == "all" else [s for s in args.sites.split(",") if s]
+        configs = bench.site_configs(sites)
+    except BenchError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    if not configs:
+        print("ERROR: no sites found", file=sys.stderr)
+        return 1
+
+    store = ChunkStore(client, args.bucket, args.chunk_prefix, level=args.level)
+    started = time.monotonic()
+    # The process pool is created before any thread so workers fork from a quiet parent
+    with ProcessPoolExecutor(max_workers=max(args.workers, 1)) as chunker, \
+            ThreadPoolExecutor(max_workers=max(args.uploads, 1), thread_name_prefix="upload") as uploader:
+        pipeline = DedupPipeline(
+            bench, client, args.bucket, args.prefix, store, chunker, uploader,
+            IOBudget(args.io_budget * MB), params, include_files=not args.no_files,
+        )
+        try:
+            backups = pipeline.run([configs[s] for s in sites], args.parallel)
+        except (OSError, S3Error) as e:
+            print(f"ERROR: bucket {args.bucket}: {e}", file=sys.stderr)
+            return 1
+    wall_s = time.monotonic() - started
+
+    print(report_json(backups, wall_s) if args.json else report_text(backups, wall_s))
+    return 0 if all(b.status == "success" for b in backups) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
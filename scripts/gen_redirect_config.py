@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Host Redirect Config Generator for Press SaaS Platform
+
+This script generates the nginx config mounted by compose.localhost-redirect.yaml:
+one server block whose redirect target comes from a `map` on $host, instead of
+one server block (or an `if` chain) per tenant hostname.
+
+Features:
+- Any number of alias -> site redirects (exact names and `*.example.com` wildcards)
+- Single `return 301` server, no `if`; lookups go through nginx's host hash
+- Hash sizes (map/server_names) derived from the host count, so 1000+ aliases load
+- Hostname validation, duplicate and redirect-loop detection
+- Synthetic host sets for benchmarking (tests/performance/test_redirect_scale.py)
+
+Usage:
+    # Regenerate the default localhost -> press.localhost redirect
+    python scripts/gen_redirect_config.py --output overrides/nginx-localhost-redirect.conf
+
+    # Tenant aliases from a file ("alias target" per line, # comments)
+    python scripts/gen_redirect_config.py --hosts-file redirects.txt --output overrides/nginx-localhost-redirect.conf
+
+    # Extra aliases on the command line
+    python scripts/gen_redirect_config.py --redirect www.acme.localhost=acme.localhost
+
+Addresses: FR-001, NFR-002
+"""
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+DEFAULT_REDIRECTS = [("localhost", "press.localhost")]
+PUBLIC_PORT = 48580
+LISTEN_PORT = 8080
+
+HOSTNAME = re.compile(r"^(\*\.)?([a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?)(\.[a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?)*$")
+
+
+# =============================================================================
+# Model
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class Redirect:
+    """One alias hostname redirected to a site"""
+
+    alias: str
+    target: str
+
+
+class RedirectConfigError(ValueError):
+    """Invalid or inconsistent redirect set"""
+
+
+def normalize_host(value: str) -> str:
+    """Lower-case and validate a hostname (optionally a leading `*.` wildcard).
+
+    Raises:
+        RedirectConfigError: If the value is not a valid hostname
+    """
+    host = value.strip().lower().rstrip(".")
+    if not HOSTNAME.match(host) or len(host) > 253:
+        raise RedirectConfigError(f"invalid hostname: {value!r}")
+    return host
+
+
+def build_redirects(pairs: list[tuple[str, str]]) -> list[Redirect]:
+    """Validate alias/target pairs.
+
+    Args:
+        pairs: (alias, target) tuples in priority order
+
+    Returns:
+        Redirects with normalized names, duplicates of the same pair dropped
+
+    Raises:
+        RedirectConfigError: On invalid names, conflicting aliases or loops
+    """
+    redirects: dict[str, Redirect] = {}
+    for alias, target in pairs:
+        alias, target = normalize_host(alias), normalize_host(target)
+        if target.startswith("*."):
+            raise RedirectConfigError(f"target cannot be a wildcard: {target}")
+        existing = redirects.get(alias)
+        if existing and existing.target != target:
+            raise RedirectConfigError(f"{alias} redirects to both {existing.target} and {target}")
+        redirects[alias] = Redirect(alias, target)
+
+    for redirect in redirects.values():
+        if redirect.target in redirects or any(
+            r.alias.startswith("*.") and redirect.target.endswith(r.alias[1:]) for r in redirects.values()
+        ):
+            raise RedirectConfigError(f"redirect loop: {redirect.alias} -> {redirect.target} is itself an alias")
+    return list(redirects.values())
+
+
+def read_hosts_file(path: Path) -> list[tuple[str, str]]:
+    """Parse `alias target` lines (blank lines and # comments ignored).
+
+    Raises:
+        RedirectConfigError: On malformed lines
+    """
+    pairs = []
+    for line_no, line in enumerate(path.read_text().splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        fields = line.split()
+        if len(fields) != 2:
+            raise RedirectConfigError(f"{path}:{line_no}: expected 'alias target', got {line!r}")
+        pairs.append((fields[0], fields[1]))
+    return pairs
+
+
+def synthetic_redirects(count: int, domain: str = "localhost") -> list[Redirect]:
+    """`count` aliases www.tenantN.<domain> -> tenantN.<domain> for benchmarks"""
+    return [Redirect(f"www.tenant{i}.{domain}", f"tenant{i}.{domain}") for i in range(count)]
+
+
+# =============================================================================
+# Rendering
+# =============================================================================
+
+
+def hash_sizes(redirects: list[Redirect]) -> tuple[int, int]:
+    """Return (max_size, bucket_size) large enough for the map and server_name hashes.
+
+    nginx's defaults (map 2048/64, server_names 512/32-64) refuse to start once
+    the host count or the longest name outgrows them.
+    """
+    max_size = 1024
+    while max_size < 2 * len(redirects):
+        max_size *= 2
+    longest = max((len(r.alias) for r in redirects), default=0)
+    bucket_size = 64
+    while bucket_size < longest + 16:
+        bucket_size *= 2
+    return max_size, bucket_size
+
+
+def render_config(redirects: list[Redirect], scheme: str = "http", port: Optional[int] = PUBLIC_PORT,
+                  listen: int = LISTEN_PORT, header: Optional[str] = None) -> str:
+    """Render the conf.d snippet (included in nginx's http context).
+
+    Args:
+        redirects: Validated redirects
+        scheme: Scheme of the redirect location
+        port: Public port appended to the target (None/80/443 omit it)
+        listen: Port the server block listens on inside the container
+        header: Optional comment placed at the top
+
+    Returns:
+        nginx configuration text
+    """
+    max_size, bucket_size = hash_sizes(redirects)
+    suffix = f":{port}" if port and port not in (80, 443) else ""
+    width = max((len(r.alias) for r in redirects), default=0)
+
+    lines = [f"# {line}".rstrip() for line in (header or "").splitlines()]
+    lines += [
+        "# Generated by scripts/gen_redirect_config.py - edit the host list and regenerate",
+        f"# {len(redirects)} redirect(s), one server block, map lookup on $host (no if)",
+        "",
+        f"map_hash_max_size {max_size};",
+        f"map_hash_bucket_size {bucket_size};",
+        f"server_names_hash_max_size {max_size};",
+        f"server_names_hash_bucket_size {bucket_size};",
+        "",
+        "map $host $fcs_redirect_origin {",
+        "    hostnames;",
+        '    default "";',
+    ]
+    lines += [f"    {r.alias:<{width}} {scheme}://{r.target}{suffix};" for r in redirects]
+    lines += [
+        "}",
+        "",
+        "server {",
+        f"    listen {listen};",
+        "    server_name",
+    ]
+    lines += [f"        {r.alias}" for r in redirects]
+    lines[-1] += ";"
+    lines += [
+        "",
+        "    return 301 $fcs_redirect_origin$request_uri;",
+        "}",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def parse_redirect(value: str) -> tuple[str, str]:
+    """Parse alias=target"""
+    alias, sep, target = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected alias=target, got {value!r}")
+    return alias, target
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Generate the map-based nginx host redirect config",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--redirect",
+        type=parse_redirect,
+        action="append",
+        default=[],
+        help="alias=target (repeatable)",
+    )
+    parser.add_argument("--hosts-file", type=Path, help="File with 'alias target' lines")
+    parser.add_argument(
+        "--no-default",
+        action="store_true",
+        help="Do not include localhost -> press.localhost",
+    )
+    parser.add_argument("--scheme", default="http", choices=["http", "https"])
+    parser.add_argument("--port", type=int, default=PUBLIC_PORT, help="Public port in the redirect location")
+    parser.add_argument("--listen", type=int, default=LISTEN_PORT, help="Port nginx listens on in the container")
+    parser.add_argument("--output", type=Path, help="Write here instead of stdout")
+    args = parser.parse_args()
+
+    pairs = [] if args.no_default else list(DEFAULT_REDIRECTS)
+    try:
+        if args.hosts_file:
+            pairs += read_hosts_file(args.hosts_file)
+        pairs += args.redirect
+        redirects = build_redirects(pairs)
+    except (OSError, RedirectConfigError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    if not redirects:
+        print("ERROR: no redirects to generate", file=sys.stderr)
+        return 1
+
+    config = render_config(
+        redirects,
+        args.scheme,
+        args.port,
+        args.listen,
+        header="Host redirects for the frontend (mounted by compose.localhost-redirect.yaml)",
+    )
+    if args.output:
+        args.output.write_text(config)
+        print(f"Wrote {len(redirects)} redirect(s) to {args.output}", file=sys.stderr)
+    else:
+        print(config, end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
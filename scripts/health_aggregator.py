@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Stack Health Aggregator for Press SaaS Platform
+
+This script answers `GET /health` for the whole stack with the HealthStatus
+body of contracts/press-api.yaml: an overall status plus, per component, its
+status and latency. Every component is probed concurrently under its own
+deadline; the result is cached for --ttl seconds and concurrent requests
+during a refresh share one probe run (single flight), so load balancers can
+poll as often as they like without adding load to the stack.
+
+What "healthy" means per component (CHK008):
+- postgres: connect, authenticate and `SELECT version()`
+- redis-cache / redis-queue: connect (AUTH) and `PING` -> PONG
+- backend: gunicorn `GET /api/method/ping` for --site -> 200 "pong"
+- frontend: the same request through nginx
+- websocket: socket.io polling handshake -> 200 with an open packet
+- workers: a live RQ worker (heartbeat younger than --worker-ttl) for every
+  queue of --worker-queues; `degraded` if some queue has none
+- minio: `GET /minio/health/live` -> 200
+A component that answers but slower than --degraded-ms is `degraded`; one that
+fails or misses its deadline is `down`. The stack is `unhealthy` (HTTP 503)
+when a critical component (postgres, redis-cache, redis-queue, backend) is
+down, `degraded` (HTTP 200) when anything else is not up, else `healthy`.
+
+Features:
+- Concurrent probes, per-probe deadline (--timeout), latency per component
+- TTL cache with single flight; `Cache-Control: max-age` and `Age` headers
+- GET and HEAD /health; `--once` prints one result for scripts
+- overrides/compose.health.yaml runs it as fcs-press-health on 48562
+
+Usage:
+    # In the stack (see overrides/compose.health.yaml)
+    curl -s http://localhost:48562/health
+
+    # One check from the host against the published ports
+    DB_PASSWORD=... python scripts/health_aggregator.py --once \\
+        --postgres localhost:48532 --redis-cache localhost:48510 --redis-queue localhost:48511 \\
+        --backend http://localhost:48580 --frontend '' --websocket '' --minio http://localhost:48590
+
+Exit codes (--once):
+    0 - healthy
+    1 - degraded
+    2 - unhealthy
+
+Addresses: FR-009, CHK008
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lib import resp  # noqa: E402
+from scripts.lib.probes import ProbeResult, probe_http, probe_postgres, probe_redis  # noqa: E402
+
+
+CRITICAL = ("postgres", "redis-cache", "redis-queue", "backend")
+EXIT_CODES = {"healthy": 0, "degraded": 1, "unhealthy": 2}
+DEFAULT_SITE = os.environ.get("FRAPPE_SITE_NAME", "press.localhost")
+
+
+@dataclass
+class Check:
+    """One component in the HealthStatus `services` map"""
+
+    status: str
+    latency_ms: int
+    critical: bool
+    detail: str = ""
+    error: str = ""
+
+
+def split_address(value: str) -> tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    return host or "localhost", int(port)
+
+
+# =============================================================================
+# Probes
+# =============================================================================
+
+
+def probe_rq_workers(host: str, port: int, queues: list[str], worker_ttl: float, timeout: float) -> ProbeResult:
+    """Live RQ workers per queue, from the worker hashes RQ keeps in redis-queue"""
+    result = ProbeResult("workers", f"{host}:{port}", ok=False)
+    started = time.perf_counter()
+    try:
+        with resp.connect(host, port, os.environ.get("REDIS_PASSWORD") or None, timeout=timeout) as conn:
+            keys = sorted(conn.command("SMEMBERS", "rq:workers") or [])
+            replies = conn.pipeline([("HMGET", key, "queues", "last_heartbeat") for key in keys]) if keys else []
+    except Exception as e:  # noqa: BLE001 - a probe reports, never raises
+        result.error = str(e) or type(e).__name__
+        return result
+    result.rtt_ms = (time.perf_counter() - started) * 1000
+
+    now = datetime.now(timezone.utc)
+    live: dict[str, int] = {}
+    for queue_list, heartbeat in replies:
+        try:
+            beat = datetime.strptime(heartbeat or "", "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+        if (now - beat).total_seconds() > worker_ttl:
+            continue
+        # Frappe qualifies queue names with the bench: "<bench-id>:long"
+        for name in (queue_list or "").split(","):
+            short = name.rpartition(":")[2]
+            live[short] = live.get(short, 0) + 1
+    missing = [queue for queue in queues if not live.get(queue)]
+    result.detail = ", ".join(f"{queue}: {live.get(queue, 0)}" for queue in queues)
+    if not live:
+        result.error = f"no live worker ({len(keys)} registered)"
+    elif missing:
+        # answered, but partly: reported as degraded by to_check()
+        result.ok = True
+        result.error = f"no live worker for {', '.join(missing)}"
+    else:
+        result.ok = True
+    return result
+
+
+def timed(probe: Callable[[], ProbeResult]) -> tuple[ProbeResult, float]:
+    started = time.perf_counter()
+    try:
+        result = probe()
+    except Exception as e:  # noqa: BLE001 - one broken probe must not fail the whole report
+        result = ProbeResult(getattr(probe, "__name__", "probe"), "", ok=False, error=str(e) or type(e).__name__)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def to_check(name: str, result: ProbeResult, elapsed_ms: float, degraded_ms: float) -> Check:
+    # a failed probe may have no phase timings: report how long it took to fail
+    latency = int(round(result.total_ms if result.ok else elapsed_ms))
+    if not result.ok:
+        status = "down"
+    elif result.error or latency > degraded_ms:
+        status = "degraded"
+    else:
+        status = "up"
+    error = result.error or (f"slower than {degraded_ms:g}ms" if status == "degraded" else "")
+    return Check(status, latency, name in CRITICAL, result.detail, error)
+
+
+# =============================================================================
+# Aggregation
+# =============================================================================
+
+
+class HealthAggregator:
+    """Concurrent probes under a deadline, cached for `ttl` with single flight"""
+
+    def __init__(self, probes: dict[str, Callable[[], ProbeResult]], timeout: float, ttl: float,
+                 degraded_ms: float):
+        self.probes = probes
+        self.timeout = timeout
+        self.ttl = ttl
+        self.degraded_ms = degraded_ms
+        self.pool = ThreadPoolExecutor(max_workers=max(len(probes), 1), thread_name_prefix="probe")
+        self.running: dict[str, Future] = {}
+        self.cached: Optional[dict] = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+        self.refreshing: Optional[threading.Event] = None
+
+    def _run(self) -> dict:
+        futures: dict[str, Future] = {}
+        for name, probe in self.probes.items():
+            previous = self.running.get(name)
+            # a probe stuck past its deadline is not started twice
+            if previous is None or previous.done():
+                self.running[name] = previous = self.pool.submit(timed, probe)
+            futures[name] = previous
+        wait(futures.values(), timeout=self.timeout)
+
+        services = {}
+        for name, future in futures.items():
+            if future.done():
+                services[name] = to_check(name, *future.result(), self.degraded_ms)
+            else:
+                services[name] = Check("down", int(self.timeout * 1000), name in CRITICAL,
+                                       error=f"no answer within {self.timeout:g}s")
+        if any(c.status == "down" and c.critical for c in services.values()):
+            status = "unhealthy"
+        elif any(c.status != "up" for c in services.values()):
+            status = "degraded"
+        else:
+            status = "healthy"
+        return {
+            "status": status,
+            "checked_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "services": {name: asdict(check) for name, check in services.items()},
+        }
+
+    def check(self) -> tuple[dict, float]:
+        """(HealthStatus, age in seconds): cached if younger than ttl, else one shared refresh"""
+        while True:
+            with self.lock:
+                age = time.monotonic() - self.checked_at
+                if self.cached is not None and age < self.ttl:
+                    return self.cached, age
+                event = self.refreshing
+                if event is None:
+                    event = self.refreshing = threading.Event()
+                    leader = True
+                else:
+                    leader = False
+            if not leader:
+                event.wait()
+                continue
+            try:
+                result = self._run()
+                with self.lock:
+                    self.cached, self.checked_at = result, time.monotonic()
+                return result, 0.0
+            finally:
+                with self.lock:
+                    self.refreshing = None
+                event.set()
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def build_probes(args: argparse.Namespace) -> dict[str, Callable[[], ProbeResult]]:
+    timeout = args.timeout
+    probes: dict[str, Callable[[], ProbeResult]] = {}
+    if args.postgres:
+        pg_host, pg_port = split_address(args.postgres)
+        probes["postgres"] = lambda: probe_postgres(pg_host, pg_port, timeout=timeout, name="postgres")
+    for name, address in (("redis-cache", args.redis_cache), ("redis-queue", args.redis_queue)):
+        if address:
+            host, port = split_address(address)
+            probes[name] = (lambda h, p, n: lambda: probe_redis(h, p, timeout=timeout, name=n))(host, port, name)
+    if args.backend:
+        probes["backend"] = lambda: probe_http(f"{args.backend.rstrip('/')}/api/method/ping", timeout, "backend",
+                                               args.site, expect_body=b"pong")
+    if args.frontend:
+        probes["frontend"] = lambda: probe_http(f"{args.frontend.rstrip('/')}/api/method/ping", timeout,
+                                                "frontend", args.site, expect_body=b"pong")
+    if args.websocket:
+        probes["websocket"] = lambda: probe_http(f"{args.websocket.rstrip('/')}/socket.io/?EIO=4&transport=polling",
+                                                 timeout, "websocket", args.site, expect_body=b'0{"sid"')
+    if args.redis_queue and args.worker_queues:
+        host, port = split_address(args.redis_queue)
+        queues = [q.strip() for q in args.worker_queues.split(",") if q.strip()]
+        probes["workers"] = lambda: probe_rq_workers(host, port, queues, args.worker_ttl, timeout)
+    if args.minio:
+        probes["minio"] = lambda: probe_http(f"{args.minio.rstrip('/')}/minio/health/live", timeout, "minio")
+    return probes
+
+
+# =============================================================================
+# HTTP server
+# =============================================================================
+
+
+def make_handler(aggregator: HealthAggregator) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        def _respond(self, send_body: bool) -> None:
+            if self.path.split("?", 1)[0] != "/health":
+                self.send_error(404)
+                return
+            result, age = aggregator.check()
+            body = json.dumps(result).encode()
+            self.send_response(503 if result["status"] == "unhealthy" else 200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", f"max-age={max(int(aggregator.ttl - age), 0)}")
+            self.send_header("Age", str(int(age)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            self._respond(True)
+
+        def do_HEAD(self):
+            self._respond(False)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Aggregated, cached /health for the whole stack",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--listen", default="0.0.0.0:8000", help="host:port to serve /health on")
+    parser.add_argument("--once", action="store_true", help="Print one result and exit with its status")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Deadline per probe (s)")
+    parser.add_argument("--ttl", type=float, default=2.0, help="Seconds a result is served from cache")
+    parser.add_argument("--degraded-ms", type=float, default=500, help="Slower answers count as degraded")
+    parser.add_argument("--site", default=DEFAULT_SITE, help="Site (Host header) for the HTTP probes")
+    parser.add_argument("--postgres", default="db:5432", help="host:port ('' skips the probe, as for all below)")
+    parser.add_argument("--redis-cache", default="redis-cache:6379")
+    parser.add_argument("--redis-queue", default="redis-queue:6379")
+    parser.add_argument("--backend", default="http://backend:8000")
+    parser.add_argument("--frontend", default="http://frontend:8080")
+    parser.add_argument("--websocket", default="http://websocket:9000")
+    parser.add_argument("--minio", default="", help="MinIO URL, e.g. http://minio:9000 (compose.minio.yaml)")
+    parser.add_argument("--worker-queues", default="short,default,long", help="Queues that need a live worker")
+    parser.add_argument("--worker-ttl", type=float, default=480, help="Max RQ heartbeat age (s)")
+    args = parser.parse_args()
+
+    aggregator = HealthAggregator(build_probes(args), args.timeout, args.ttl, args.degraded_ms)
+    if args.once:
+        result, _ = aggregator.check()
+        print(json.dumps(result, indent=2))
+        aggregator.close()
+        return EXIT_CODES[result["status"]]
+
+    host, _, port = args.listen.rpartition(":")
+    server = ThreadingHTTPServer((host or "0.0.0.0", int(port)), make_handler(aggregator))
+    print(f"Serving /health ({', '.join(aggregator.probes)}) on http://{args.listen}/health", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        aggregator.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
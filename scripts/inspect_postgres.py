@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""
+PostgreSQL Inspector for Press SaaS Platform
+
+This script connects to fcs-press-db over the published port and reports
+where the Frappe databases (one per site) spend their time, then generates
+a tuned configuration override for the host it runs on.
+
+Features:
+- Top queries by total and mean execution time (pg_stat_statements)
+- Per-database table bloat estimate (dead tuples vs table size)
+- Missing-index candidates from sequential-scan ratios
+- Cache hit ratio per database
+- Connection usage vs max_connections
+- Tuned settings sized to host RAM/CPU, written as a compose override
+  (`postgres -c ...` flags, pg_stat_statements preloaded) or a postgresql.conf snippet
+
+Usage:
+    # Inspect (DB_PASSWORD from the environment)
+    python scripts/inspect_postgres.py
+
+    # Enable pg_stat_statements views once the library is preloaded
+    python scripts/inspect_postgres.py --create-extension
+
+    # Generate a tuned override giving PostgreSQL half of an 8-core/16 GiB host
+    python scripts/inspect_postgres.py --tune --ram-gb 16 --cpus 8 \\
+        --output overrides/compose.postgres-tuned.yaml
+
+    # JSON report for CI artifacts
+    python scripts/inspect_postgres.py --json
+
+Addresses: NFR-002, SC-003
+"""
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lib import pgwire  # noqa: E402
+
+
+# Tables smaller than this are cheaper to seq-scan than to index
+MIN_ROWS_FOR_INDEX = 10_000
+BLOAT_WARN_RATIO = 0.2
+
+TUNED_SETTINGS = [
+    "max_connections", "shared_buffers", "effective_cache_size", "maintenance_work_mem",
+    "work_mem", "wal_buffers", "min_wal_size", "max_wal_size", "checkpoint_completion_target",
+    "random_page_cost", "effective_io_concurrency", "default_statistics_target",
+    "max_worker_processes", "max_parallel_workers", "max_parallel_workers_per_gather",
+    "max_parallel_maintenance_workers", "shared_preload_libraries", "pg_stat_statements.track",
+    "track_io_timing",
+]
+
+
+# =============================================================================
+# Collectors
+# =============================================================================
+
+
+@dataclass
+class QueryStat:
+    """One pg_stat_statements entry."""
+
+    database: str
+    calls: int
+    total_ms: float
+    mean_ms: float
+    rows: int
+    hit_ratio: Optional[float]
+    query: str
+
+
+@dataclass
+class TableStat:
+    """Scan and bloat indicators for one table."""
+
+    database: str
+    table: str
+    live_rows: int
+    dead_rows: int
+    size_bytes: int
+    seq_scan: int
+    idx_scan: int
+    seq_rows_read: int
+    last_autovacuum: Optional[str]
+
+    @property
+    def dead_ratio(self) -> float:
+        total = self.live_rows + self.dead_rows
+        return self.dead_rows / total if total else 0.0
+
+    @property
+    def bloat_bytes(self) -> int:
+        return int(self.size_bytes * self.dead_ratio)
+
+    @property
+    def seq_ratio(self) -> float:
+        scans = self.seq_scan + self.idx_scan
+        return self.seq_scan / scans if scans else 0.0
+
+
+@dataclass
+class DatabaseStat:
+    """pg_stat_database counters for one database."""
+
+    database: str
+    size_bytes: int
+    connections: int
+    blks_hit: int
+    blks_read: int
+    commits: int
+    rollbacks: int
+    temp_bytes: int
+    deadlocks: int
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        total = self.blks_hit + self.blks_read
+        return self.blks_hit / total if total else None
+
+
+@dataclass
+class Inspection:
+    """Everything collected in one run."""
+
+    server_version: str
+    settings: dict[str, str]
+    max_connections: int
+    connections_by_state: dict[str, int]
+    databases: list[DatabaseStat]
+    tables: list[TableStat] = field(default_factory=list)
+    queries_by_total: list[QueryStat] = field(default_factory=list)
+    queries_by_mean: list[QueryStat] = field(default_factory=list)
+    statements_error: Optional[str] = None
+
+
+class PostgresInspector:
+    """Collects performance statistics from every database on the server."""
+
+    def __init__(self, host: str, port: int, user: str, password: Optional[str], timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+
+    def _connect(self, database: str = "postgres") -> pgwire.PgConnection:
+        return pgwire.connect(self.host, self.port, self.user, self.password, database, self.timeout)
+
+    def inspect(self, top: int = 10, create_extension: bool = False) -> Inspection:
+        """
+        Collect server-wide and per-database statistics.
+
+        Args:
+            top: Number of queries to keep per ranking
+            create_extension: Run CREATE EXTENSION pg_stat_statements if missing
+
+        Returns:
+            Inspection with all collected data
+        """
+        with self._connect() as conn:
+            settings = {
+                row["name"]: row["value"]
+                for row in conn.query(
+                    "SELECT name, current_setting(name) AS value FROM pg_settings WHERE name IN ("
+                    + ", ".join(f"'{name}'" for name in TUNED_SETTINGS) + ")"
+                )
+            }
+            states = {
+                row["state"] or "background": int(row["count"])
+                for row in conn.query("SELECT state, count(*) FROM pg_stat_activity GROUP BY state")
+            }
+            databases = [
+                DatabaseStat(
+                    database=row["datname"],
+                    size_bytes=int(row["size"]),
+                    connections=int(row["numbackends"]),
+                    blks_hit=int(row["blks_hit"]),
+                    blks_read=int(row["blks_read"]),
+                    commits=int(row["xact_commit"]),
+                    rollbacks=int(row["xact_rollback"]),
+                    temp_bytes=int(row["temp_bytes"]),
+                    deadlocks=int(row["deadlocks"]),
+                )
+                for row in conn.query(
+                    "SELECT d.datname, pg_database_size(d.datname) AS size, s.numbackends, s.blks_hit,"
+                    " s.blks_read, s.xact_commit, s.xact_rollback, s.temp_bytes, s.deadlocks"
+                    " FROM pg_database d JOIN pg_stat_database s ON s.datid = d.oid"
+                    " WHERE d.datallowconn AND NOT d.datistemplate ORDER BY size DESC"
+                )
+            ]
+            inspection = Inspection(
+                server_version=conn.parameters.get("server_version", "?"),
+                settings=settings,
+                max_connections=int(settings.get("max_connections", "100")),
+                connections_by_state=states,
+                databases=databases,
+            )
+            self._collect_statements(conn, inspection, top, create_extension)
+
+        for db in databases:
+            try:
+                inspection.tables.extend(self.table_stats(db.database))
+            except (OSError, pgwire.PgError) as e:
+                print(f"  WARNING: skipping tables of {db.database}: {e}", file=sys.stderr)
+        return inspection
+
+    def _collect_statements(self, conn: pgwire.PgConnection, inspection: Inspection,
+                            top: int, create_extension: bool) -> None:
+        if create_extension:
+            try:
+                conn.query("CREATE EXTENSION IF NOT EXISTS pg_stat_statements")
+            except pgwire.PgError as e:
+                inspection.statements_error = str(e)
+                return
+
+        def ranked(order: str) -> list[QueryStat]:
+            rows = conn.query(
+                "SELECT d.datname, s.calls, s.total_exec_time, s.mean_exec_time, s.rows,"
+                " s.shared_blks_hit, s.shared_blks_read, left(regexp_replace(s.query, '\\s+', ' ', 'g'), 200) AS query"
+                " FROM pg_stat_statements s JOIN pg_database d ON d.oid = s.dbid"
+                f" ORDER BY s.{order} DESC LIMIT {int(top)}"
+            )
+            stats = []
+            for row in rows:
+                hit, read = int(row["shared_blks_hit"]), int(row["shared_blks_read"])
+                stats.append(QueryStat(
+                    database=row["datname"],
+                    calls=int(row["calls"]),
+                    total_ms=float(row["total_exec_time"]),
+                    mean_ms=float(row["mean_exec_time"]),
+                    rows=int(row["rows"]),
+                    hit_ratio=hit / (hit + read) if hit + read else None,
+                    query=row["query"],
+                ))
+            return stats
+
+        try:
+            inspection.queries_by_total = ranked("total_exec_time")
+            inspection.queries_by_mean = ranked("mean_exec_time")
+        except pgwire.PgError as e:
+            # 42P01: extension not created; 55000: library not preloaded
+            inspection.statements_error = str(e)
+
+    def table_stats(self, database: str) -> list[TableStat]:
+        """Scan counters and dead tuples for every user table of one database."""
+        with self._connect(database) as conn:
+            rows = conn.query(
+                "SELECT schemaname || '.' || relname AS tbl, n_live_tup, n_dead_tup,"
+                " pg_total_relation_size(relid) AS size, seq_scan, coalesce(idx_scan, 0) AS idx_scan,"
+                " seq_tup_read, greatest(last_autovacuum, last_vacuum)::text AS vacuumed"
+                " FROM pg_stat_user_tables"
+            )
+        return [
+            TableStat(
+                database=database,
+                table=row["tbl"],
+                live_rows=int(row["n_live_tup"]),
+                dead_rows=int(row["n_dead_tup"]),
+                size_bytes=int(row["size"]),
+                seq_scan=int(row["seq_scan"]),
+                idx_scan=int(row["idx_scan"]),
+                seq_rows_read=int(row["seq_tup_read"]),
+                last_autovacuum=row["vacuumed"],
+            )
+            for row in rows
+        ]
+
+
+def bloat_candidates(tables: list[TableStat], min_bytes: int = 8 * 1024 * 1024) -> list[TableStat]:
+    """Tables whose dead tuples are a large share of a non-trivial size."""
+    return sorted(
+        (t for t in tables if t.size_bytes >= min_bytes and t.dead_ratio >= BLOAT_WARN_RATIO),
+        key=lambda t: t.bloat_bytes,
+        reverse=True,
+    )
+
+
+def index_candidates(tables: list[TableStat]) -> list[TableStat]:
+    """Large tables read mostly by sequential scans."""
+    return sorted(
+        (t for t in tables if t.live_rows >= MIN_ROWS_FOR_INDEX and t.seq_scan > t.idx_scan and t.seq_scan > 10),
+        key=lambda t: t.seq_rows_read,
+        reverse=True,
+    )
+
+
+# =============================================================================
+# Tuning
+# =============================================================================
+
+
+def host_memory_bytes() -> int:
+    """Physical memory of this host (Linux /proc/meminfo, else sysconf)."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+def fmt_size(value_bytes: float) -> str:
+    """Format bytes as a PostgreSQL memory unit (kB/MB/GB)."""
+    kb = int(value_bytes // 1024)
+    if kb >= 1024 * 1024 and kb % (1024 * 1024) == 0:
+        return f"{kb // (1024 * 1024)}GB"
+    if kb >= 1024:
+        return f"{kb // 1024}MB"
+    return f"{max(kb, 64)}kB"
+
+
+def tuned_settings(ram_bytes: int, cpus: int, max_connections: int = 100, ssd: bool = True) -> dict[str, str]:
+    """
+    Size PostgreSQL for a mixed OLTP (web) workload.
+
+    Follows the usual PGTune rules of thumb: shared_buffers 25% and
+    effective_cache_size 75% of the memory given to PostgreSQL, work_mem
+    split across connections and parallel workers.
+
+    Args:
+        ram_bytes: Memory available to PostgreSQL (not the whole host if shared)
+        cpus: CPUs available to PostgreSQL
+        max_connections: Connection ceiling (lower it behind a pooler)
+        ssd: Storage is SSD/NVMe (cheap random reads)
+
+    Returns:
+        Setting name -> value
+    """
+    gib = 1024 ** 3
+    shared_buffers = ram_bytes // 4
+    parallel_per_gather = max(1, min(4, cpus // 2))
+    work_mem = (ram_bytes - shared_buffers) // (max_connections * 3) // parallel_per_gather
+    return {
+        "max_connections": str(max_connections),
+        "shared_buffers": fmt_size(shared_buffers),
+        "effective_cache_size": fmt_size(ram_bytes * 3 // 4),
+        "maintenance_work_mem": fmt_size(min(ram_bytes // 16, 2 * gib)),
+        "work_mem": fmt_size(max(work_mem, 4 * 1024 * 1024)),
+        "wal_buffers": fmt_size(min(max(shared_buffers // 32, 64 * 1024), 16 * 1024 * 1024)),
+        "min_wal_size": "1GB",
+        "max_wal_size": "4GB",
+        "checkpoint_completion_target": "0.9",
+        "random_page_cost": "1.1" if ssd else "4",
+        "effective_io_concurrency": "200" if ssd else "2",
+        "default_statistics_target": "100",
+        "max_worker_processes": str(max(8, cpus)),
+        "max_parallel_workers": str(cpus),
+        "max_parallel_workers_per_gather": str(parallel_per_gather),
+        "max_parallel_maintenance_workers": str(parallel_per_gather),
+        "shared_preload_libraries": "pg_stat_statements",
+        "pg_stat_statements.track": "all",
+        "track_io_timing": "on",
+    }
+
+
+def render_compose_override(settings: dict[str, str], shm_bytes: int) -> str:
+    """Compose override layering `-c` flags on top of overrides/compose.postgres.yaml."""
+    lines = [
+        "# Generated by scripts/inspect_postgres.py --tune",
+        "# Use with: -f overrides/compose.postgres.yaml -f <this file>",
+        "services:",
+        "  db:",
+        "    command:",
+        "      - postgres",
+    ]
+    for name, value in settings.items():
+        lines.append("      - -c")
+        lines.append(f"      - {name}={value}")
+    # Parallel queries allocate dynamic shared memory from /dev/shm (64MB by default in containers)
+    lines.append(f"    shm_size: {fmt_size(shm_bytes).replace('GB', 'g').replace('MB', 'm').replace('kB', 'k')}")
+    return "\n".join(lines) + "\n"
+
+
+def render_conf(settings: dict[str, str]) -> str:
+    lines = ["# Generated by scripts/inspect_postgres.py --tune"]
+    lines.extend(f"{name} = '{value}'" for name, value in settings.items())
+    return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# Reporter
+# =============================================================================
+
+
+def human_bytes(value: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(value) < 1024 or unit == "GiB":
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}GiB"
+
+
+class InspectionReporter:
+    """Reports an inspection in text or JSON."""
+
+    def __init__(self, top: int = 10):
+        self.top = top
+
+    def report_text(self, inspection: Inspection, tuned: Optional[dict[str, str]] = None) -> str:
+        """Generate text report."""
+        lines = []
+        lines.append("\n" + "=" * 60)
+        lines.append(f"POSTGRESQL INSPECTION (server {inspection.server_version})")
+        lines.append("=" * 60)
+
+        used = sum(inspection.connections_by_state.values())
+        states = ", ".join(f"{k}={v}" for k, v in sorted(inspection.connections_by_state.items()))
+        lines.append(f"\nConnections: {used}/{inspection.max_connections} "
+                     f"({used / inspection.max_connections:.0%}) — {states}")
+
+        lines.append("\nDatabases:")
+        lines.append(f"  {'database':<28}{'size':>10}{'conns':>7}{'hit %':>8}{'temp':>10}{'deadlocks':>10}")
+        for db in inspection.databases:
+            hit = f"{db.hit_ratio:.1%}" if db.hit_ratio is not None else "n/a"
+            lines.append(f"  {db.database:<28}{human_bytes(db.size_bytes):>10}{db.connections:>7}"
+                         f"{hit:>8}{human_bytes(db.temp_bytes):>10}{db.deadlocks:>10}")
+
+        if inspection.statements_error:
+            lines.append(f"\nTop queries unavailable: {inspection.statements_error}")
+            lines.append("  Preload pg_stat_statements (see --tune) and run with --create-extension.")
+        for title, queries in (("total", inspection.queries_by_total), ("mean", inspection.queries_by_mean)):
+            if not queries:
+                continue
+            lines.append(f"\nTop queries by {title} time:")
+            for q in queries[:self.top]:
+                hit = f"{q.hit_ratio:.0%}" if q.hit_ratio is not None else "n/a"
+                lines.append(f"  {q.total_ms:>10.0f}ms total {q.mean_ms:>8.2f}ms mean {q.calls:>8} calls "
+                             f"hit {hit:>4}  [{q.database}]")
+                lines.append(f"      {q.query[:110]}")
+
+        bloated = bloat_candidates(inspection.tables)
+        if bloated:
+            lines.append("\nBloat (dead tuples >= 20% of tables over 8 MiB):")
+            for t in bloated[:self.top]:
+                lines.append(f"  {t.database}/{t.table:<40} ~{human_bytes(t.bloat_bytes):>10} dead "
+                             f"({t.dead_ratio:.0%} of {human_bytes(t.size_bytes)}), vacuumed {t.last_autovacuum or 'never'}")
+
+        candidates = index_candidates(inspection.tables)
+        if candidates:
+            lines.append(f"\nMissing-index candidates (>= {MIN_ROWS_FOR_INDEX} rows, mostly seq-scanned):")
+            for t in candidates[:self.top]:
+                avg = t.seq_rows_read / t.seq_scan if t.seq_scan else 0
+                lines.append(f"  {t.database}/{t.table:<40} seq {t.seq_ratio:.0%} of {t.seq_scan + t.idx_scan} scans, "
+                             f"~{avg:.0f} rows/scan, {t.live_rows} rows")
+
+        if tuned:
+            lines.append("\nSettings (current -> tuned):")
+            for name, value in tuned.items():
+                current = inspection.settings.get(name, "?")
+                marker = "" if current == value else "  *"
+                lines.append(f"  {name:<36}{current:>16} -> {value}{marker}")
+
+        return "\n".join(lines)
+
+    def report_json(self, inspection: Inspection, tuned: Optional[dict[str, str]] = None) -> str:
+        """Generate JSON report."""
+        report = asdict(inspection)
+        report.pop("tables")
+        report["databases"] = [dict(asdict(db), hit_ratio=db.hit_ratio) for db in inspection.databases]
+        report["bloat"] = [
+            dict(asdict(t), dead_ratio=t.dead_ratio, bloat_bytes=t.bloat_bytes)
+            for t in bloat_candidates(inspection.tables)[:self.top]
+        ]
+        report["index_candidates"] = [
+            dict(asdict(t), seq_ratio=t.seq_ratio) for t in index_candidates(inspection.tables)[:self.top]
+        ]
+        if tuned:
+            report["tuned_settings"] = tuned
+        return json.dumps(report, indent=2)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Inspect PostgreSQL performance and generate tuned settings",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--host", default=os.environ.get("STACK_HOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("POSTGRES_PORT", "48532")))
+    parser.add_argument("--user", default="postgres")
+    parser.add_argument("--top", type=int, default=10, help="Rows per ranking")
+    parser.add_argument(
+        "--create-extension",
+        action="store_true",
+        help="CREATE EXTENSION pg_stat_statements in the postgres database",
+    )
+    parser.add_argument("--tune", action="store_true", help="Generate tuned settings")
+    parser.add_argument(
+        "--ram-gb",
+        type=float,
+        help="Host memory in GiB (default: detected)",
+    )
+    parser.add_argument("--cpus", type=int, default=os.cpu_count() or 2, help="Host CPUs (default: detected)")
+    parser.add_argument(
+        "--ram-fraction",
+        type=float,
+        default=0.5,
+        help="Share of host memory given to PostgreSQL; the rest of the stack runs alongside (default: 0.5)",
+    )
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--hdd", action="store_true", help="Data directory is on spinning disks")
+    parser.add_argument(
+        "--format",
+        choices=["compose", "conf"],
+        default="compose",
+        help="Tuned settings as a compose override or a postgresql.conf snippet",
+    )
+    parser.add_argument("--output", help="Write tuned settings to this file (default: stdout)")
+    parser.add_argument("--offline", action="store_true", help="Only generate tuned settings; don't connect")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    tuned = None
+    rendered = None
+    if args.tune or args.offline:
+        ram = int(args.ram_gb * 1024 ** 3) if args.ram_gb else host_memory_bytes()
+        budget = int(ram * args.ram_fraction)
+        tuned = tuned_settings(budget, args.cpus, args.max_connections, ssd=not args.hdd)
+        shm = max(256 * 1024 ** 2, min(budget // 8, 1024 ** 3))
+        rendered = render_compose_override(tuned, shm) if args.format == "compose" else render_conf(tuned)
+
+    if not args.offline:
+        inspector = PostgresInspector(args.host, args.port, args.user, os.environ.get("DB_PASSWORD"))
+        try:
+            inspection = inspector.inspect(args.top, args.create_extension)
+        except (OSError, pgwire.PgError) as e:
+            print(f"ERROR: cannot inspect {args.host}:{args.port}: {e}", file=sys.stderr)
+            return 1
+        reporter = InspectionReporter(args.top)
+        print(reporter.report_json(inspection, tuned) if args.json else reporter.report_text(inspection, tuned))
+    elif args.json:
+        print(json.dumps({"tuned_settings": tuned}, indent=2))
+
+    if rendered:
+        if args.output:
+            Path(args.output).write_text(rendered)
+            print(f"\nTuned settings written to: {args.output}", file=sys.stderr)
+        elif not args.json:
+            print("\n" + rendered)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Access to the Frappe bench inside the backend container.
+
+Site discovery and ``site_config.json`` reads over ``<engine> exec``, and
+``exec`` command lines for streaming tools (pg_dump, pg_restore, tar) whose
+stdin/stdout are piped through the host. Secrets are passed with ``-e NAME``
+so their values come from the engine client's environment and never appear
+in a process list.
+
+With the ``local`` engine the commands run directly in the current directory
+instead, for jobs that already run inside a bench container (e.g. from an
+ofelia ``job-exec``) with the bench as their working directory.
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+DEFAULT_ENGINE = os.environ.get("CONTAINER_ENGINE", "podman")
+DEFAULT_BACKEND = "frappe_docker_git-backend-1"
+LOCAL_ENGINE = "local"
+SITE_SEPARATOR = "----fcs-site-config----"
+
+
+class BenchError(Exception):
+    """An exec into the backend failed or returned unusable output."""
+
+
+@dataclass
+class SiteConfig:
+    """Connection settings of one site (site_config.json over common_site_config.json)."""
+
+    name: str
+    db_name: str
+    db_password: str
+    db_host: str = "db"
+    db_port: int = 5432
+    db_type: str = "postgres"
+    raw: Dict[str, Any] = field(default_factory=dict)
+
+
+class Bench:
+    """The bench directory of one backend container."""
+
+    def __init__(self, engine: str = DEFAULT_ENGINE, container: str = DEFAULT_BACKEND):
+        self.engine = engine
+        self.container = container
+
+    def exec_args(self, command: Sequence[str], interactive: bool = False,
+                  env_names: Sequence[str] = ()) -> List[str]:
+        """``<engine> exec`` argv for ``command``; ``env_names`` are forwarded from the caller's env."""
+        if self.engine == LOCAL_ENGINE:
+            return list(command)
+        args = [self.engine, "exec"]
+        if interactive:
+            args.append("-i")
+        for name in env_names:
+            args += ["-e", name]
+        return args + [self.container] + list(command)
+
+    def run(self, command: Sequence[str], timeout: float = 60, env: Optional[Mapping[str, str]] = None,
+            check: bool = True) -> subprocess.CompletedProcess:
+        """Run a short command in the container and capture its output.
+
+        Raises:
+            BenchError: If the engine is missing, times out, or (with ``check``) the command fails
+        """
+        names = list(env or {})
+        try:
+            result = subprocess.run(self.exec_args(command, env_names=names), capture_output=True, text=True,
+                                    timeout=timeout, env={**os.environ, **(env or {})})
+        except FileNotFoundError as e:
+            raise BenchError(f"{self.engine}: not found") from e
+        except subprocess.TimeoutExpired as e:
+            raise BenchError(f"{' '.join(command[:2])}: timed out after {timeout}s") from e
+        if check and result.returncode != 0:
+            raise BenchError(f"{' '.join(command[:2])} in {self.container}: "
+                             f"{(result.stderr or result.stdout).strip() or f'exit {result.returncode}'}")
+        return result
+
+    def list_sites(self) -> List[str]:
+        """Directories under sites/ that have a site_config.json."""
+        result = self.run(["sh", "-c", 'for d in sites/*/; do d=${d%/}; '
+                                       '[ -f "$d/site_config.json" ] && echo "${d#sites/}"; done; true'])
+        return sorted(line.strip() for line in result.stdout.splitlines() if line.strip())
+
+    def site_configs(self, sites: Sequence[str]) -> Dict[str, SiteConfig]:
+        """Read common_site_config.json and each site's config in one exec.
+
+        Raises:
+            BenchError: If a site is missing or its config has no database settings
+        """
+        script = "cat sites/common_site_config.json 2>/dev/null || echo '{}'"
+        for site in sites:
+            script += f"; echo '{SITE_SEPARATOR}'; cat 'sites/{site}/site_config.json'"
+        chunks = self.run(["sh", "-c", script]).stdout.split(SITE_SEPARATOR)
+        try:
+            common = json.loads(chunks[0] or "{}")
+            configs = {}
+            for site, text in zip(sites, chunks[1:]):
+                merged = {**common, **json.loads(text)}
+                configs[site] = SiteConfig(
+                    name=site,
+                    db_name=merged["db_name"],
+                    db_password=merged.get("db_password", ""),
+                    db_host=merged.get("db_host", "db"),
+                    db_port=int(merged.get("db_port") or 5432),
+                    db_type=merged.get("db_type", "postgres"),
+                    raw=merged,
+                )
+        except (ValueError, KeyError) as e:
+            raise BenchError(f"unreadable site config: {e}") from e
+        if len(configs) != len(sites):
+            raise BenchError(f"missing site config for {', '.join(s for s in sites if s not in configs)}")
+        return configs
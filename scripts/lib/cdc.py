@@ -0,0 +1,129 @@
+"""Content-defined chunking (FastCDC) for deduplicated backups.
+
+Chunk boundaries depend only on the bytes around them (a 64-bit gear hash
+over the last 64 bytes), so an insertion or deletion in a dump only changes
+the chunks it touches and every other chunk keeps its hash. Normalized
+chunking (a stricter mask before the average size, a looser one after)
+keeps chunk sizes close to ``avg_size``; ``min_size`` bytes are skipped
+without hashing.
+
+The hash loop is pure Python, so :func:`chunk_stream` cuts the input into
+large segments and chunks them on a process pool. A boundary is forced at
+each segment end; after a shift in the data, boundaries re-synchronise
+within about one chunk of the next segment start, which costs roughly
+``avg_size / segment_size`` of the dedup ratio.
+"""
+from __future__ import annotations
+
+import hashlib
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+MASK64 = (1 << 64) - 1
+
+# Deterministic gear table: chunk boundaries must never change between runs
+GEAR = tuple(
+    int.from_bytes(hashlib.sha256(b"fcs-press-cdc-gear" + bytes([i])).digest()[:8], "big") for i in range(256)
+)
+
+
+@dataclass(frozen=True)
+class ChunkParams:
+    min_size: int = 512 * 1024
+    avg_size: int = 1024 * 1024
+    max_size: int = 4 * 1024 * 1024
+    segment_size: int = 64 * 1024 * 1024
+
+    def __post_init__(self):
+        if not 0 < self.min_size < self.avg_size < self.max_size <= self.segment_size:
+            raise ValueError("expected 0 < min_size < avg_size < max_size <= segment_size")
+
+    @property
+    def masks(self) -> Tuple[int, int]:
+        """(strict, loose) masks on the high bits of the hash: avg bits + 2 and avg bits - 2"""
+        bits = self.avg_size.bit_length() - 1
+        strict = ((1 << (bits + 2)) - 1) << (64 - bits - 2)
+        loose = ((1 << (bits - 2)) - 1) << (64 - bits + 2)
+        return strict, loose
+
+
+@dataclass(frozen=True)
+class Chunk:
+    offset: int
+    size: int
+    digest: str
+
+
+def cut_point(data: bytes, start: int, params: ChunkParams) -> int:
+    """Length of the chunk beginning at ``start``."""
+    remaining = len(data) - start
+    if remaining <= params.min_size:
+        return remaining
+    end = start + min(remaining, params.max_size)
+    normal = start + min(remaining, params.avg_size)
+    strict, loose = params.masks
+    gear = GEAR
+    h = 0
+    pos = start + params.min_size
+    for byte in data[pos:normal]:
+        h = ((h << 1) + gear[byte]) & MASK64
+        pos += 1
+        if not h & strict:
+            return pos - start
+    for byte in data[normal:end]:
+        h = ((h << 1) + gear[byte]) & MASK64
+        pos += 1
+        if not h & loose:
+            return pos - start
+    return end - start
+
+
+def chunk_segment(data: bytes, params: ChunkParams) -> List[Tuple[int, int, str]]:
+    """(offset, size, sha256) of every chunk in ``data``; runs in pool workers."""
+    chunks = []
+    offset = 0
+    while offset < len(data):
+        size = cut_point(data, offset, params)
+        chunks.append((offset, size, hashlib.sha256(data[offset:offset + size]).hexdigest()))
+        offset += size
+    return chunks
+
+
+def _read_segment(stream: BinaryIO, size: int) -> bytes:
+    parts = []
+    remaining = size
+    while remaining:
+        part = stream.read(remaining)
+        if not part:
+            break
+        parts.append(part)
+        remaining -= len(part)
+    return b"".join(parts)
+
+
+def chunk_stream(stream: BinaryIO, params: ChunkParams, executor: Optional[Executor] = None,
+                 prefetch: int = 2) -> Iterator[Tuple[bytes, List[Chunk]]]:
+    """Yield ``(segment bytes, chunks)`` in stream order.
+
+    With an ``executor`` (ideally a ProcessPoolExecutor) up to ``prefetch``
+    further segments are read and chunked while the caller handles one, so
+    memory stays around ``(prefetch + 2) * segment_size``.
+    """
+    base = 0
+    pending = []
+    while True:
+        while len(pending) <= prefetch:
+            data = _read_segment(stream, params.segment_size)
+            if not data:
+                break
+            if executor is None:
+                pending.append((data, chunk_segment(data, params)))
+            else:
+                pending.append((data, executor.submit(chunk_segment, data, params)))
+        if not pending:
+            return
+        data, result = pending.pop(0)
+        chunks = result if isinstance(result, list) else result.result()
+        yield data, [Chunk(base + offset, size, digest) for offset, size, digest in chunks]
+        base += len(data)
@@ -0,0 +1,444 @@
+"""In-memory model of the compose project.
+
+Parses ``compose.yaml`` and every ``overrides/*.yaml`` once and merges them
+into one service model the compose validators run their rules against,
+instead of each validator re-finding and grepping the YAML itself.
+
+Only what the rules need is extracted per file (service names, container
+names, published ports and healthcheck start periods), with the file and line
+each value came from. Anchors and ``<<`` merge keys are resolved by the YAML
+composer, compose's ``!reset`` / ``!override`` tags are honoured when merging,
+and ``${VAR:-default}`` interpolation is applied at model build time against
+the environment and the project ``.env`` file, as ``docker compose`` would.
+
+Per-file extracts are cached in SQLite keyed by the file's sha256, so a
+re-run with unchanged files does not need to parse YAML (or even import
+PyYAML) at all.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+SCHEMA_VERSION = 1
+CACHE_FILE = "fcs-compose-model.sqlite"
+BASE_FILES = ("compose.yaml",)
+OVERRIDE_GLOB = "overrides/*.yaml"
+EXTRACTOR_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+_INTERPOLATION = re.compile(
+    r"\$(?:(?P<escaped>\$)|\{(?P<braced>[A-Za-z_][A-Za-z0-9_]*)(?:(?P<op>:?[-?+])(?P<arg>[^}]*))?\}"
+    r"|(?P<named>[A-Za-z_][A-Za-z0-9_]*))"
+)
+
+
+class ComposeError(Exception):
+    """A compose file is missing or cannot be parsed."""
+
+
+# =============================================================================
+# Model
+# =============================================================================
+
+
+@dataclass
+class Port:
+    """One published port entry of a service, after interpolation."""
+
+    service: str
+    raw: str
+    file: str
+    line: int
+    host_ip: str = ""
+    published: Optional[Tuple[int, int]] = None
+    target: str = ""
+    protocol: str = "tcp"
+    unresolved: List[str] = field(default_factory=list)
+    error: str = ""
+
+    @property
+    def host_ports(self) -> List[int]:
+        """Published host ports (both ends of a range; empty if not published)."""
+        if self.published is None:
+            return []
+        start, end = self.published
+        return [start] if start == end else [start, end]
+
+
+@dataclass
+class Service:
+    """A service merged across every file that defines it."""
+
+    name: str
+    files: List[str] = field(default_factory=list)
+    line: int = 0
+    container_name: Optional[str] = None
+    container_name_source: Tuple[str, int] = ("", 0)
+    ports: List[Port] = field(default_factory=list)
+    start_periods: List[Tuple[str, str, int]] = field(default_factory=list)
+
+    @property
+    def file(self) -> str:
+        """File that first defines the service."""
+        return self.files[0] if self.files else ""
+
+
+@dataclass
+class ComposeFile:
+    path: str
+    sha256: str
+    cached: bool
+
+
+@dataclass
+class ComposeModel:
+    """Merged services of the compose project plus where each file came from.
+
+    ``declared`` holds every port entry exactly as each file writes it, before
+    ``!reset`` / ``!override`` merging, i.e. every port some combination of the
+    files may publish.
+    """
+
+    root: Path
+    files: List[ComposeFile]
+    services: Dict[str, Service]
+    declared: List[Port] = field(default_factory=list)
+    env_file: Optional[Path] = None
+
+    def ports(self) -> List[Port]:
+        return [port for service in self.services.values() for port in service.ports]
+
+    def published_ports(self) -> Dict[int, List[Port]]:
+        """Host port -> entries publishing it (ranges expanded)."""
+        published: Dict[int, List[Port]] = {}
+        for port in self.ports():
+            if port.published is None:
+                continue
+            start, end = port.published
+            for number in range(start, end + 1):
+                published.setdefault(number, []).append(port)
+        return published
+
+
+# =============================================================================
+# Interpolation and port syntax
+# =============================================================================
+
+
+def read_env_file(path: Path) -> Dict[str, str]:
+    """``KEY=VALUE`` pairs of a compose ``.env`` file (missing file -> empty)."""
+    env: Dict[str, str] = {}
+    if not path.is_file():
+        return env
+    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        key = key.strip()
+        if key.startswith("export "):
+            key = key[len("export "):].strip()
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        env[key] = value
+    return env
+
+
+def interpolate(value: str, env: Mapping[str, str]) -> Tuple[str, List[str]]:
+    """Apply compose variable interpolation.
+
+    Returns:
+        The interpolated string and the variables that were unset with no
+        default (compose substitutes an empty string for those).
+    """
+    missing: List[str] = []
+
+    def substitute(match: re.Match) -> str:
+        if match.group("escaped"):
+            return "$"
+        name = match.group("braced") or match.group("named")
+        op, arg = match.group("op"), match.group("arg") or ""
+        current = env.get(name)
+        if op in (":-", "-"):
+            use_default = current is None or (op == ":-" and current == "")
+            return arg if use_default else current
+        if op in (":+", "+"):
+            present = current is not None and (op == "+" or current != "")
+            return arg if present else ""
+        if current is None or (op == ":?" and current == ""):
+            missing.append(name)
+            return ""
+        return current
+
+    return _INTERPOLATION.sub(substitute, value), missing
+
+
+def _port_range(text: str) -> Optional[Tuple[int, int]]:
+    if not text:
+        return None
+    start, _, end = text.partition("-")
+    if not start.isdigit() or (end and not end.isdigit()):
+        raise ValueError(f"invalid port {text!r}")
+    first, last = int(start), int(end or start)
+    if last < first:
+        raise ValueError(f"invalid port range {text!r}")
+    return first, last
+
+
+def parse_port(service: str, raw: object, file: str, line: int, env: Mapping[str, str]) -> Port:
+    """Parse a short (``[IP:][HOST:]CONTAINER[/PROTO]``) or long syntax port entry."""
+    if isinstance(raw, dict):
+        port = Port(service, json.dumps(raw, sort_keys=True), file, line)
+        fields: Dict[str, str] = {}
+        for key in ("target", "published", "host_ip", "protocol"):
+            if raw.get(key) is not None:
+                fields[key], missing = interpolate(str(raw[key]), env)
+                port.unresolved.extend(missing)
+        port.target = fields.get("target", "")
+        port.host_ip = fields.get("host_ip", "")
+        port.protocol = fields.get("protocol", "tcp")
+        try:
+            port.published = _port_range(fields.get("published", ""))
+        except ValueError as exc:
+            port.error = str(exc)
+        return port
+
+    port = Port(service, str(raw), file, line)
+    text, port.unresolved = interpolate(str(raw), env)
+    text, _, protocol = text.partition("/")
+    port.protocol = protocol or "tcp"
+    if text.startswith("["):
+        ip, sep, text = text[1:].partition("]:")
+        if not sep:
+            port.error = f"invalid IPv6 port mapping {raw!r}"
+            return port
+        port.host_ip = ip
+        host, _, target = text.rpartition(":")
+    else:
+        parts = text.split(":")
+        if len(parts) > 3:
+            port.error = f"invalid port mapping {raw!r}"
+            return port
+        target = parts[-1]
+        host = parts[-2] if len(parts) >= 2 else ""
+        port.host_ip = parts[0] if len(parts) == 3 else ""
+    port.target = target
+    try:
+        port.published = _port_range(host)
+        _port_range(target)
+    except ValueError as exc:
+        port.error = str(exc)
+    return port
+
+
+# =============================================================================
+# Per-file extraction
+# =============================================================================
+
+
+def _line(node) -> int:
+    return node.start_mark.line + 1
+
+
+def _scalar(node) -> Optional[str]:
+    if node.__class__.__name__ != "ScalarNode" or node.tag == "tag:yaml.org,2002:null":
+        return None
+    return node.value
+
+
+def _mode(node) -> str:
+    return {"!reset": "reset", "!override": "override"}.get(node.tag, "merge")
+
+
+def _plain(node):
+    """Scalars, sequences and mappings of a (small) node as plain Python values."""
+    kind = node.__class__.__name__
+    if kind == "MappingNode":
+        return {k.value: _plain(v) for k, v in node.value}
+    if kind == "SequenceNode":
+        return [_plain(item) for item in node.value]
+    return _scalar(node)
+
+
+def extract(text: str, path: str) -> dict:
+    """Extract what the rules need from one compose file.
+
+    Raises:
+        ComposeError: PyYAML is not installed or the YAML is invalid.
+    """
+    try:
+        import yaml  # imported here so runs served from the cache do not pay for it
+    except ImportError:  # pragma: no cover - optional dependency
+        raise ComposeError("PyYAML is required to parse compose files (pip install pyyaml)") from None
+    loader_class = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    loader = loader_class(text)
+    try:
+        root = loader.get_single_node()
+        if root is None:
+            return {"services": {}}
+        if root.__class__.__name__ != "MappingNode":
+            raise ComposeError(f"{path}: top level is not a mapping")
+        services: Dict[str, dict] = {}
+        for key, value in root.value:
+            if key.value != "services" or value.__class__.__name__ != "MappingNode":
+                continue
+            for name_node, body in value.value:
+                entry: dict = {"line": _line(name_node), "ports": [], "start_periods": []}
+                services[name_node.value] = entry
+                if body.__class__.__name__ != "MappingNode":
+                    continue
+                loader.flatten_mapping(body)
+                for field_node, field_value in body.value:
+                    name = field_node.value
+                    if name == "container_name":
+                        entry["container_name"] = [_scalar(field_value), _line(field_value), _mode(field_value)]
+                    elif name == "ports":
+                        entry["ports_mode"] = _mode(field_value)
+                        if field_value.__class__.__name__ == "SequenceNode":
+                            entry["ports"] = [[_plain(item), _line(item)] for item in field_value.value]
+                    elif name == "healthcheck" and field_value.__class__.__name__ == "MappingNode":
+                        loader.flatten_mapping(field_value)
+                        for hc_key, hc_value in field_value.value:
+                            if hc_key.value == "start_period" and _scalar(hc_value) is not None:
+                                entry["start_periods"].append([hc_value.value, _line(hc_value)])
+        return {"services": services}
+    except yaml.YAMLError as exc:
+        raise ComposeError(f"{path}: {exc}") from exc
+    finally:
+        loader.dispose()
+
+
+class ExtractCache:
+    """Per-file extracts keyed by path and content sha256."""
+
+    def __init__(self, path: Path):
+        self.db = sqlite3.connect(str(path))
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, sha256 TEXT NOT NULL, extract TEXT NOT NULL);
+        """)
+        meta = dict(self.db.execute("SELECT key, value FROM meta"))
+        if meta.get("schema_version") != str(SCHEMA_VERSION) or meta.get("extractor") != EXTRACTOR_VERSION:
+            with self.db:
+                self.db.execute("DELETE FROM files")
+                self.db.execute("DELETE FROM meta")
+                self.db.executemany("INSERT INTO meta VALUES (?, ?)",
+                                    [("schema_version", str(SCHEMA_VERSION)), ("extractor", EXTRACTOR_VERSION)])
+
+    def get(self, path: str, sha256: str) -> Optional[dict]:
+        row = self.db.execute("SELECT extract FROM files WHERE path = ? AND sha256 = ?", (path, sha256)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, path: str, sha256: str, data: dict) -> None:
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)", (path, sha256, json.dumps(data)))
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def default_cache_path(root: Path) -> Optional[Path]:
+    """Cache inside ``.git`` so it never shows up as a working-tree change."""
+    git_dir = root / ".git"
+    return git_dir / CACHE_FILE if git_dir.is_dir() else None
+
+
+# =============================================================================
+# Merge
+# =============================================================================
+
+
+def project_files(root: Path) -> List[Path]:
+    """``compose.yaml`` followed by the overrides, in name order.
+
+    Raises:
+        ComposeError: ``compose.yaml`` is missing.
+    """
+    base = [root / name for name in BASE_FILES]
+    for path in base:
+        if not path.is_file():
+            raise ComposeError(f"{path} not found")
+    return base + sorted(root.glob(OVERRIDE_GLOB))
+
+
+def merge(extracts: Sequence[Tuple[str, dict]], env: Mapping[str, str]) -> Dict[str, Service]:
+    """Merge per-file extracts in order, following compose override rules."""
+    services: Dict[str, Service] = {}
+    for rel, data in extracts:
+        for name, entry in data["services"].items():
+            service = services.get(name)
+            if service is None:
+                service = services[name] = Service(name, line=entry["line"])
+            service.files.append(rel)
+
+            if "container_name" in entry:
+                value, line, mode = entry["container_name"]
+                if mode == "reset":
+                    service.container_name, service.container_name_source = None, ("", 0)
+                else:
+                    resolved, _ = interpolate(value, env) if value is not None else (None, [])
+                    service.container_name, service.container_name_source = resolved, (rel, line)
+
+            mode = entry.get("ports_mode", "merge")
+            if mode in ("reset", "override"):
+                service.ports = []
+            known = {port.raw for port in service.ports}
+            for raw, line in entry["ports"]:
+                port = parse_port(name, raw, rel, line, env)
+                if port.raw not in known:
+                    service.ports.append(port)
+                    known.add(port.raw)
+
+            service.start_periods.extend((value, rel, line) for value, line in entry["start_periods"])
+    return services
+
+
+def load_model(root: Path, cache_path: Optional[Path] = None, use_cache: bool = True,
+               env_file: Optional[Path] = None, env: Optional[Mapping[str, str]] = None) -> ComposeModel:
+    """Parse (or fetch from the cache) every compose file and merge them.
+
+    Args:
+        root: Repository root holding ``compose.yaml`` and ``overrides/``.
+        cache_path: SQLite cache location (default: inside ``.git``).
+        use_cache: Set to False to always re-parse.
+        env_file: Variables file to interpolate with (default: ``.env``),
+            overlaid by the process environment.
+        env: Exact interpolation variables (overrides ``env_file``).
+
+    Raises:
+        ComposeError: A file is missing, unparsable, or PyYAML is needed but
+            not installed.
+    """
+    root = root.resolve()
+    env_file = env_file or root / ".env"
+    if env is None:
+        env = {**read_env_file(env_file), **os.environ}
+    cache_path = cache_path or default_cache_path(root)
+    cache = ExtractCache(cache_path) if use_cache and cache_path else None
+    files: List[ComposeFile] = []
+    extracts: List[Tuple[str, dict]] = []
+    try:
+        for path in project_files(root):
+            rel = str(path.relative_to(root))
+            content = path.read_bytes()
+            digest = hashlib.sha256(content).hexdigest()
+            data = cache.get(rel, digest) if cache else None
+            files.append(ComposeFile(rel, digest, data is not None))
+            if data is None:
+                data = extract(content.decode("utf-8"), rel)
+                if cache:
+                    cache.put(rel, digest, data)
+            extracts.append((rel, data))
+    finally:
+        if cache:
+            cache.close()
+    declared = [parse_port(name, raw, rel, line, env)
+                for rel, data in extracts for name, entry in data["services"].items() for raw, line in entry["ports"]]
+    return ComposeModel(root, files, merge(extracts, env), declared, env_file if env_file.is_file() else None)
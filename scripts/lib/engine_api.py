@@ -0,0 +1,121 @@
+"""Minimal Docker Engine API client over the engine's unix socket.
+
+Speaks the Docker-compatible REST API that both ``dockerd`` and
+``podman system service`` expose, with nothing but :mod:`http.client`: one
+short request per call, except :meth:`EngineAPI.stream` which keeps the
+response open and yields one JSON document per line (``stats``, ``events``).
+
+The socket is ``$CONTAINER_SOCKET`` if set, else the first of the usual
+Docker and Podman (rootful, then rootless) paths that exists.
+"""
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import socket
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+SOCKET_PATHS = (
+    "/var/run/docker.sock",
+    "/run/podman/podman.sock",
+    os.path.join(os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}"), "podman", "podman.sock"),
+)
+
+
+class EngineError(Exception):
+    """The engine socket is unreachable or answered with an error status."""
+
+
+def default_socket() -> str:
+    explicit = os.environ.get("CONTAINER_SOCKET")
+    if explicit:
+        return explicit
+    for path in SOCKET_PATHS:
+        if os.path.exists(path):
+            return path
+    return SOCKET_PATHS[0]
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float]):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class EngineAPI:
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = 5.0):
+        self.socket_path = socket_path or default_socket()
+        self.timeout = timeout
+
+    def _open(self, path: str, timeout: Optional[float]) -> Tuple[_UnixHTTPConnection, http.client.HTTPResponse]:
+        conn = _UnixHTTPConnection(self.socket_path, timeout)
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+        except OSError as e:
+            conn.close()
+            raise EngineError(f"{self.socket_path}: {e}") from e
+        if response.status >= 400:
+            body = response.read().decode(errors="replace")
+            conn.close()
+            try:
+                message = json.loads(body).get("message", body)
+            except ValueError:
+                message = body
+            raise EngineError(f"GET {path}: HTTP {response.status} {message.strip()}")
+        return conn, response
+
+    def get(self, path: str, timeout: Optional[float] = None) -> Any:
+        """GET ``path`` and decode its JSON body."""
+        conn, response = self._open(path, timeout or self.timeout)
+        try:
+            return json.loads(response.read())
+        except (OSError, ValueError) as e:
+            raise EngineError(f"GET {path}: {e}") from e
+        finally:
+            conn.close()
+
+    def stream(self, path: str, idle_timeout: float = 30.0) -> Iterator[Dict[str, Any]]:
+        """Yield the JSON lines of a streaming endpoint until it ends or stays idle ``idle_timeout`` s."""
+        conn, response = self._open(path, idle_timeout)
+        try:
+            while True:
+                try:
+                    line = response.readline()
+                except OSError:
+                    return
+                if not line:
+                    return
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        finally:
+            conn.close()
+
+    def containers(self, include_stopped: bool = False) -> List[Dict[str, Any]]:
+        return self.get(f"/containers/json?all={'true' if include_stopped else 'false'}")
+
+    def stats(self, container: str, stream: bool = True, idle_timeout: float = 30.0) -> Iterator[Dict[str, Any]]:
+        """Stats samples of ``container``, about one per second while ``stream``."""
+        path = f"/containers/{quote(container)}/stats?stream={'true' if stream else 'false'}"
+        return self.stream(path, idle_timeout)
+
+
+def container_name(summary: Dict[str, Any]) -> str:
+    """Name of a ``/containers/json`` entry without the leading slash."""
+    names = summary.get("Names") or [summary.get("Id", "")[:12]]
+    return names[0].lstrip("/")
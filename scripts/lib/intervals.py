@@ -0,0 +1,229 @@
+"""Free-space interval tree over a bounded integer range.
+
+An AVL tree of disjoint, coalesced ``[start, end]`` intervals (claimed
+ports), each node augmented with its subtree's lowest start, highest end and
+largest free gap between consecutive intervals. That gives O(log n)
+claims, overlap checks and first-fit searches for a free block of ``size``
+consecutive values, which is what port allocation needs.
+
+The bounds are held as two sentinel intervals just outside the range, so the
+space before the first claim and after the last is an ordinary gap.
+"""
+from __future__ import annotations
+
+from typing import Iterator, List, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ("start", "end", "left", "right", "height", "lo", "hi", "gap")
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+        self.left: Optional[_Node] = None
+        self.right: Optional[_Node] = None
+        self.height = 1
+        self.lo = start
+        self.hi = end
+        self.gap = 0
+
+
+def _height(node: Optional[_Node]) -> int:
+    return node.height if node else 0
+
+
+def _update(node: _Node) -> _Node:
+    left, right = node.left, node.right
+    node.height = 1 + max(_height(left), _height(right))
+    node.lo = left.lo if left else node.start
+    node.hi = right.hi if right else node.end
+    gap = 0
+    if left:
+        gap = max(left.gap, node.start - left.hi - 1)
+    if right:
+        gap = max(gap, right.gap, right.lo - node.end - 1)
+    node.gap = gap
+    return node
+
+
+def _rotate_right(node: _Node) -> _Node:
+    pivot = node.left
+    node.left = pivot.right
+    pivot.right = _update(node)
+    return _update(pivot)
+
+
+def _rotate_left(node: _Node) -> _Node:
+    pivot = node.right
+    node.right = pivot.left
+    pivot.left = _update(node)
+    return _update(pivot)
+
+
+def _balance(node: _Node) -> _Node:
+    _update(node)
+    skew = _height(node.left) - _height(node.right)
+    if skew > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if skew < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    return node
+
+
+def _insert(node: Optional[_Node], start: int, end: int) -> _Node:
+    if node is None:
+        return _Node(start, end)
+    if start < node.start:
+        node.left = _insert(node.left, start, end)
+    else:
+        node.right = _insert(node.right, start, end)
+    return _balance(node)
+
+
+def _pop_min(node: _Node) -> Tuple[Optional[_Node], _Node]:
+    if node.left is None:
+        return node.right, node
+    node.left, smallest = _pop_min(node.left)
+    return _balance(node), smallest
+
+
+def _delete(node: Optional[_Node], start: int) -> Optional[_Node]:
+    if node is None:
+        return None
+    if start < node.start:
+        node.left = _delete(node.left, start)
+    elif start > node.start:
+        node.right = _delete(node.right, start)
+    else:
+        if node.left is None or node.right is None:
+            return node.left or node.right
+        node.right, successor = _pop_min(node.right)
+        successor.left, successor.right = node.left, node.right
+        node = successor
+    return _balance(node)
+
+
+class IntervalTree:
+    """Claimed values of ``[minimum, maximum]`` as coalesced intervals."""
+
+    def __init__(self, minimum: int, maximum: int):
+        if maximum < minimum:
+            raise ValueError(f"empty range {minimum}-{maximum}")
+        self.minimum = minimum
+        self.maximum = maximum
+        self._root: Optional[_Node] = None
+        self._root = _insert(self._root, minimum - 1, minimum - 1)
+        self._root = _insert(self._root, maximum + 1, maximum + 1)
+
+    def _floor(self, value: int) -> Optional[_Node]:
+        """Interval with the greatest start <= value."""
+        node, best = self._root, None
+        while node:
+            if node.start <= value:
+                best, node = node, node.right
+            else:
+                node = node.left
+        return best
+
+    def _ceiling(self, value: int) -> Optional[_Node]:
+        """Interval with the smallest start >= value."""
+        node, best = self._root, None
+        while node:
+            if node.start >= value:
+                best, node = node, node.left
+            else:
+                node = node.right
+        return best
+
+    def is_free(self, start: int, end: Optional[int] = None) -> bool:
+        """True if no value of ``[start, end]`` is claimed and all are in range."""
+        end = start if end is None else end
+        if start < self.minimum or end > self.maximum or end < start:
+            return False
+        floor = self._floor(end)
+        return floor is None or floor.end < start
+
+    def claim(self, start: int, end: Optional[int] = None) -> None:
+        """Mark ``[start, end]`` claimed (clipped to the range; overlaps merge)."""
+        end = start if end is None else end
+        start, end = max(start, self.minimum), min(end, self.maximum)
+        if end < start:
+            return
+        # absorb the interval ending at or after start - 1 that begins before us
+        floor = self._floor(start)
+        if floor and floor.end >= start - 1 and floor.start >= self.minimum:
+            start, end = floor.start, max(end, floor.end)
+            self._root = _delete(self._root, floor.start)
+        # and every interval that begins inside (or right after) the new one
+        while True:
+            following = self._ceiling(start)
+            if following is None or following.start > end + 1 or following.start > self.maximum:
+                break
+            end = max(end, following.end)
+            self._root = _delete(self._root, following.start)
+        self._root = _insert(self._root, start, end)
+
+    def first_fit(self, size: int, start: Optional[int] = None) -> Optional[int]:
+        """Lowest value ``v >= start`` such that ``[v, v + size - 1]`` is free, or None."""
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        start = self.minimum if start is None else max(start, self.minimum)
+        return self._first_fit(self._root, size, start)
+
+    def _first_fit(self, node: Optional[_Node], size: int, start: int) -> Optional[int]:
+        if node is None or node.hi < start:
+            return None
+        if start <= node.lo:
+            if node.gap < size:
+                return None
+            return self._leftmost_gap(node, size)
+        # start falls inside this subtree: the gaps that begin before ``start`` only count from ``start``
+        if node.left and node.left.hi >= start:
+            found = self._first_fit(node.left, size, start)
+            if found is not None:
+                return found
+            if node.start - max(node.left.hi + 1, start) >= size:
+                return max(node.left.hi + 1, start)
+        elif node.left and node.start - max(node.left.hi + 1, start) >= size:
+            return max(node.left.hi + 1, start)
+        if node.right:
+            begin = max(node.end + 1, start)
+            if node.right.lo - begin >= size:
+                return begin
+            return self._first_fit(node.right, size, start)
+        return None
+
+    def _leftmost_gap(self, node: _Node, size: int) -> int:
+        while True:
+            left, right = node.left, node.right
+            if left and left.gap >= size:
+                node = left
+            elif left and node.start - left.hi - 1 >= size:
+                return left.hi + 1
+            elif right and right.lo - node.end - 1 >= size:
+                return node.end + 1
+            else:
+                node = right
+
+    def intervals(self) -> Iterator[Tuple[int, int]]:
+        """Claimed intervals in order (sentinels excluded)."""
+        stack: List[_Node] = []
+        node = self._root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            if self.minimum <= node.start <= self.maximum:
+                yield node.start, node.end
+            node = node.right
+
+    def free_count(self) -> int:
+        return (self.maximum - self.minimum + 1) - sum(end - start + 1 for start, end in self.intervals())
+
+    def largest_free(self) -> int:
+        return self._root.gap if self._root else 0
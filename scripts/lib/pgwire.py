@@ -0,0 +1,233 @@
+"""Minimal PostgreSQL frontend/backend protocol (v3) client.
+
+Speaks just enough of the wire protocol to open a session and run simple
+queries from the host against the published port, so checks don't need a
+``psql`` binary, a driver install or a ``podman exec`` into a container:
+
+- startup message and trust / cleartext / md5 / SCRAM-SHA-256 authentication
+- simple query protocol, returning every value as text (or None for NULL)
+
+Each connection step is a separate call (:meth:`PgConnection.open`,
+:meth:`PgConnection.startup`, :meth:`PgConnection.query`) so callers can time
+TCP connect, authentication and query round-trip independently.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import os
+import socket
+import struct
+from typing import Dict, List, Optional, Tuple
+
+PROTOCOL_VERSION = 196608  # 3.0
+
+AUTH_OK = 0
+AUTH_CLEARTEXT = 3
+AUTH_MD5 = 5
+AUTH_SASL = 10
+AUTH_SASL_CONTINUE = 11
+AUTH_SASL_FINAL = 12
+
+
+class PgError(Exception):
+    """ErrorResponse from the server, or a protocol violation."""
+
+    def __init__(self, message: str, fields: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.fields = fields or {}
+
+    @property
+    def sqlstate(self) -> str:
+        return self.fields.get("C", "")
+
+
+def _parse_error_fields(payload: bytes) -> Dict[str, str]:
+    fields = {}
+    for part in payload.split(b"\0"):
+        if part:
+            fields[chr(part[0])] = part[1:].decode("utf-8", "replace")
+    return fields
+
+
+class PgConnection:
+    """One PostgreSQL session over a plain TCP socket."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self._reader = sock.makefile("rb")
+        self.parameters: Dict[str, str] = {}
+        self.backend_pid: Optional[int] = None
+
+    @classmethod
+    def open(cls, host: str, port: int, timeout: float = 5.0) -> "PgConnection":
+        """TCP connect only; call :meth:`startup` to authenticate."""
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return cls(sock)
+
+    # -- framing -------------------------------------------------------------
+
+    def _send(self, kind: bytes, payload: bytes) -> None:
+        self.sock.sendall(kind + struct.pack("!I", len(payload) + 4) + payload)
+
+    def _recv(self) -> Tuple[bytes, bytes]:
+        header = self._reader.read(5)
+        if len(header) < 5:
+            raise PgError("connection closed by server")
+        length = struct.unpack("!I", header[1:])[0] - 4
+        payload = self._reader.read(length)
+        if len(payload) < length:
+            raise PgError("connection closed by server")
+        return header[:1], payload
+
+    def _raise_error(self, payload: bytes) -> None:
+        fields = _parse_error_fields(payload)
+        raise PgError(f"{fields.get('S', 'ERROR')}: {fields.get('M', 'unknown error')}", fields)
+
+    # -- session -------------------------------------------------------------
+
+    def startup(self, user: str, password: Optional[str] = None, database: Optional[str] = None,
+                application_name: str = "fcs-probe") -> None:
+        """Send the startup message, authenticate and wait for ReadyForQuery."""
+        params = {"user": user, "database": database or user, "application_name": application_name}
+        body = struct.pack("!I", PROTOCOL_VERSION)
+        body += b"".join(k.encode() + b"\0" + v.encode() + b"\0" for k, v in params.items()) + b"\0"
+        self.sock.sendall(struct.pack("!I", len(body) + 4) + body)
+
+        scram: Optional[_Scram] = None
+        while True:
+            kind, payload = self._recv()
+            if kind == b"E":
+                self._raise_error(payload)
+            elif kind == b"R":
+                code = struct.unpack("!I", payload[:4])[0]
+                if code == AUTH_OK:
+                    continue
+                if password is None:
+                    raise PgError(f"server requested authentication (method {code}) but no password given")
+                if code == AUTH_CLEARTEXT:
+                    self._send(b"p", password.encode() + b"\0")
+                elif code == AUTH_MD5:
+                    inner = hashlib.md5(password.encode() + user.encode()).hexdigest()
+                    digest = hashlib.md5(inner.encode() + payload[4:8]).hexdigest()
+                    self._send(b"p", b"md5" + digest.encode() + b"\0")
+                elif code == AUTH_SASL:
+                    mechanisms = [m.decode() for m in payload[4:].split(b"\0") if m]
+                    if "SCRAM-SHA-256" not in mechanisms:
+                        raise PgError(f"no supported SASL mechanism in {mechanisms}")
+                    scram = _Scram(password)
+                    first = scram.client_first()
+                    self._send(b"p", b"SCRAM-SHA-256\0" + struct.pack("!I", len(first)) + first)
+                elif code == AUTH_SASL_CONTINUE and scram:
+                    self._send(b"p", scram.client_final(payload[4:]))
+                elif code == AUTH_SASL_FINAL and scram:
+                    scram.verify_server(payload[4:])
+                else:
+                    raise PgError(f"unsupported authentication method {code}")
+            elif kind == b"S":
+                name, value, _ = payload.split(b"\0", 2)
+                self.parameters[name.decode()] = value.decode()
+            elif kind == b"K":
+                self.backend_pid = struct.unpack("!I", payload[:4])[0]
+            elif kind == b"Z":
+                return
+            # NoticeResponse and anything else during startup is ignored
+
+    def query(self, sql: str) -> List[Dict[str, Optional[str]]]:
+        """Run a simple query and return the rows of its last result set."""
+        self._send(b"Q", sql.encode() + b"\0")
+        columns: List[str] = []
+        rows: List[Dict[str, Optional[str]]] = []
+        error: Optional[bytes] = None
+        while True:
+            kind, payload = self._recv()
+            if kind == b"T":
+                count = struct.unpack("!H", payload[:2])[0]
+                columns, offset = [], 2
+                for _ in range(count):
+                    end = payload.index(b"\0", offset)
+                    columns.append(payload[offset:end].decode())
+                    offset = end + 1 + 18  # table oid, attnum, type oid, typlen, typmod, format
+                rows = []
+            elif kind == b"D":
+                count = struct.unpack("!H", payload[:2])[0]
+                values, offset = [], 2
+                for _ in range(count):
+                    size = struct.unpack("!i", payload[offset:offset + 4])[0]
+                    offset += 4
+                    if size < 0:
+                        values.append(None)
+                    else:
+                        values.append(payload[offset:offset + size].decode("utf-8", "replace"))
+                        offset += size
+                rows.append(dict(zip(columns, values)))
+            elif kind == b"E":
+                error = payload
+            elif kind == b"Z":
+                if error is not None:
+                    self._raise_error(error)
+                return rows
+            # CommandComplete, EmptyQueryResponse, NoticeResponse: nothing to keep
+
+    def close(self) -> None:
+        try:
+            self._send(b"X", b"")
+        except OSError:
+            pass
+        self._reader.close()
+        self.sock.close()
+
+    def __enter__(self) -> "PgConnection":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _Scram:
+    """Client side of SCRAM-SHA-256 (RFC 5802/7677) without channel binding."""
+
+    def __init__(self, password: str):
+        self.password = password.encode()
+        self.nonce = base64.b64encode(os.urandom(18)).decode()
+        self.client_first_bare = f"n=,r={self.nonce}"
+        self.server_signature = b""
+
+    def client_first(self) -> bytes:
+        return f"n,,{self.client_first_bare}".encode()
+
+    def client_final(self, server_first: bytes) -> bytes:
+        attrs = dict(item.split("=", 1) for item in server_first.decode().split(","))
+        if not attrs["r"].startswith(self.nonce):
+            raise PgError("SCRAM server nonce does not extend client nonce")
+        salted = hashlib.pbkdf2_hmac("sha256", self.password, base64.b64decode(attrs["s"]), int(attrs["i"]))
+        client_key = hmac.digest(salted, b"Client Key", "sha256")
+        stored_key = hashlib.sha256(client_key).digest()
+        final_bare = f"c=biws,r={attrs['r']}"
+        auth_message = f"{self.client_first_bare},{server_first.decode()},{final_bare}".encode()
+        signature = hmac.digest(stored_key, auth_message, "sha256")
+        proof = bytes(a ^ b for a, b in zip(client_key, signature))
+        server_key = hmac.digest(salted, b"Server Key", "sha256")
+        self.server_signature = hmac.digest(server_key, auth_message, "sha256")
+        return f"{final_bare},p={base64.b64encode(proof).decode()}".encode()
+
+    def verify_server(self, server_final: bytes) -> None:
+        attrs = dict(item.split("=", 1) for item in server_final.decode().split(","))
+        if "e" in attrs:
+            raise PgError(f"SCRAM authentication failed: {attrs['e']}")
+        if not hmac.compare_digest(base64.b64decode(attrs.get("v", "")), self.server_signature):
+            raise PgError("SCRAM server signature mismatch")
+
+
+def connect(host: str, port: int, user: str, password: Optional[str] = None,
+            database: Optional[str] = None, timeout: float = 5.0) -> PgConnection:
+    """Open and authenticate a session in one call."""
+    conn = PgConnection.open(host, port, timeout)
+    try:
+        conn.startup(user, password, database)
+    except BaseException:
+        conn.sock.close()
+        raise
+    return conn
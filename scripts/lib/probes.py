@@ -0,0 +1,174 @@
+"""Host-side readiness probes for the stack's PostgreSQL, Redis and HTTP services.
+
+Probes talk to the published ports directly (see :mod:`scripts.lib.pgwire`
+and :mod:`scripts.lib.resp`) instead of exec'ing ``psql`` / ``redis-cli``
+inside a container, and time each phase separately:
+
+- ``connect_ms``: TCP handshake
+- ``auth_ms``: startup + authentication (Redis: AUTH, only when a password is set)
+- ``rtt_ms``: one trivial request/response (``SELECT version()`` / ``PING`` / ``GET``)
+
+They never raise: connection errors as well as malformed replies (a truncated
+packet, an unparsable port) come back as ``ProbeResult(ok=False, error=...)``,
+so they can be polled as readiness checks with :func:`wait_ready`.
+"""
+from __future__ import annotations
+
+import http.client
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from scripts.lib import pgwire, resp
+
+DEFAULT_HOST = os.environ.get("STACK_HOST", "localhost")
+
+
+@dataclass
+class ProbeResult:
+    """Outcome and phase timings of one probe."""
+
+    name: str
+    target: str
+    ok: bool
+    connect_ms: Optional[float] = None
+    auth_ms: Optional[float] = None
+    rtt_ms: Optional[float] = None
+    detail: str = ""
+    error: str = ""
+
+    @property
+    def total_ms(self) -> float:
+        return sum(v for v in (self.connect_ms, self.auth_ms, self.rtt_ms) if v is not None)
+
+    def timings(self) -> str:
+        """``connect 0.3ms, auth 4.1ms, rtt 0.5ms`` for the phases that ran."""
+        phases = [("connect", self.connect_ms), ("auth", self.auth_ms), ("rtt", self.rtt_ms)]
+        return ", ".join(f"{label} {value:.1f}ms" for label, value in phases if value is not None)
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def probe_postgres(host: str = DEFAULT_HOST, port: Optional[int] = None, user: str = "postgres",
+                   password: Optional[str] = None, database: str = "postgres",
+                   timeout: float = 2.0, name: str = "postgres") -> ProbeResult:
+    """Connect, authenticate and run ``SELECT version()``."""
+    port = port or int(os.environ.get("POSTGRES_PORT", "48532"))
+    if password is None:
+        password = os.environ.get("DB_PASSWORD")
+    result = ProbeResult(name, f"{host}:{port}", ok=False)
+    conn = None
+    try:
+        start = time.perf_counter()
+        conn = pgwire.PgConnection.open(host, port, timeout)
+        result.connect_ms = _elapsed_ms(start)
+
+        start = time.perf_counter()
+        conn.startup(user, password, database)
+        result.auth_ms = _elapsed_ms(start)
+
+        start = time.perf_counter()
+        rows = conn.query("SELECT version()")
+        result.rtt_ms = _elapsed_ms(start)
+
+        result.detail = rows[0]["version"] if rows else conn.parameters.get("server_version", "")
+        result.ok = True
+    except Exception as e:  # noqa: BLE001 - malformed replies must not escape a probe
+        result.error = str(e) or type(e).__name__
+    finally:
+        if conn is not None:
+            conn.close()
+    return result
+
+
+def probe_redis(host: str = DEFAULT_HOST, port: Optional[int] = None, password: Optional[str] = None,
+                timeout: float = 2.0, name: str = "redis") -> ProbeResult:
+    """Connect, AUTH (when a password is set) and PING."""
+    port = port or int(os.environ.get("REDIS_CACHE_PORT", "48510"))
+    if password is None:
+        password = os.environ.get("REDIS_PASSWORD") or None
+    result = ProbeResult(name, f"{host}:{port}", ok=False)
+    conn = None
+    try:
+        start = time.perf_counter()
+        conn = resp.RedisConnection.open(host, port, timeout)
+        result.connect_ms = _elapsed_ms(start)
+
+        if password:
+            start = time.perf_counter()
+            conn.auth(password)
+            result.auth_ms = _elapsed_ms(start)
+
+        start = time.perf_counter()
+        reply = conn.command("PING")
+        result.rtt_ms = _elapsed_ms(start)
+
+        result.detail = reply
+        result.ok = reply == "PONG"
+        if not result.ok:
+            result.error = f"unexpected reply {reply!r}"
+    except Exception as e:  # noqa: BLE001 - malformed replies must not escape a probe
+        result.error = str(e) or type(e).__name__
+    finally:
+        if conn is not None:
+            conn.close()
+    return result
+
+
+def probe_http(url: str, timeout: float = 2.0, name: str = "http", host_header: Optional[str] = None,
+               expect_status: Sequence[int] = (200,), expect_body: Optional[bytes] = None) -> ProbeResult:
+    """Connect and GET ``url``; ok when the status (and, if given, a body substring) match."""
+    parts = urlsplit(url)
+    result = ProbeResult(name, parts.netloc, ok=False)
+    conn = None
+    try:
+        # .port raises ValueError on a malformed port
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        conn = connection_class(parts.hostname or DEFAULT_HOST, parts.port, timeout=timeout)
+        start = time.perf_counter()
+        conn.connect()
+        result.connect_ms = _elapsed_ms(start)
+
+        start = time.perf_counter()
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        conn.request("GET", path, headers={"Host": host_header} if host_header else {})
+        response = conn.getresponse()
+        body = response.read(65536)
+        result.rtt_ms = _elapsed_ms(start)
+
+        result.detail = f"HTTP {response.status}"
+        if response.status not in expect_status:
+            result.error = f"HTTP {response.status}"
+        elif expect_body is not None and expect_body not in body:
+            result.error = f"HTTP {response.status}, body without {expect_body.decode(errors='replace')!r}"
+        else:
+            result.ok = True
+    except Exception as e:  # noqa: BLE001 - malformed replies must not escape a probe
+        result.error = str(e) or type(e).__name__
+    finally:
+        if conn is not None:
+            conn.close()
+    return result
+
+
+def stack_probes(host: str = DEFAULT_HOST) -> List[Callable[[], ProbeResult]]:
+    """Probes for the default stack's published data services."""
+    return [
+        lambda: probe_postgres(host, name="postgres"),
+        lambda: probe_redis(host, int(os.environ.get("REDIS_CACHE_PORT", "48510")), name="redis-cache"),
+        lambda: probe_redis(host, int(os.environ.get("REDIS_QUEUE_PORT", "48511")), name="redis-queue"),
+    ]
+
+
+def wait_ready(probe: Callable[[], ProbeResult], timeout: float, interval: float = 0.25) -> ProbeResult:
+    """Poll ``probe`` until it succeeds or ``timeout`` seconds pass; return the last result."""
+    deadline = time.monotonic() + timeout
+    while True:
+        result = probe()
+        if result.ok or time.monotonic() + interval > deadline:
+            return result
+        time.sleep(interval)
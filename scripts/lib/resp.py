@@ -0,0 +1,120 @@
+"""Minimal Redis (RESP2) client.
+
+Enough of the Redis serialization protocol to talk to the published
+redis-cache / redis-queue ports from the host without ``redis-cli`` or the
+``redis`` package: AUTH, single commands and pipelined batches.
+"""
+from __future__ import annotations
+
+import socket
+from typing import Any, Iterable, List, Optional, Sequence
+
+
+class RespError(Exception):
+    """Error reply from the server (``-ERR ...``) or a protocol violation."""
+
+
+def encode_command(*args: Any) -> bytes:
+    """Encode one command as a RESP array of bulk strings."""
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+class RedisConnection:
+    """One Redis connection over a plain TCP socket."""
+
+    def __init__(self, sock: socket.socket, decode: bool = True):
+        self.sock = sock
+        self.decode = decode
+        self._reader = sock.makefile("rb")
+
+    @classmethod
+    def open(cls, host: str, port: int, timeout: float = 5.0, decode: bool = True) -> "RedisConnection":
+        """TCP connect only; call :meth:`auth` if the server requires a password."""
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return cls(sock, decode)
+
+    def auth(self, password: str, username: Optional[str] = None) -> None:
+        if username:
+            self.command("AUTH", username, password)
+        else:
+            self.command("AUTH", password)
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise RespError("connection closed by server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode() if self.decode else body
+        if kind == b"-":
+            raise RespError(body.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            size = int(body)
+            if size < 0:
+                return None
+            data = self._reader.read(size + 2)[:-2]
+            return data.decode("utf-8", "replace") if self.decode else data
+        if kind == b"*":
+            size = int(body)
+            if size < 0:
+                return None
+            return [self._read_reply() for _ in range(size)]
+        raise RespError(f"unexpected reply type {kind!r}")
+
+    def command(self, *args: Any) -> Any:
+        """Send one command and return its decoded reply."""
+        self.sock.sendall(encode_command(*args))
+        return self._read_reply()
+
+    def pipeline(self, commands: Iterable[Sequence[Any]], raise_on_error: bool = True) -> List[Any]:
+        """Send a batch of commands in one write and read all replies.
+
+        With ``raise_on_error=False`` error replies are returned as
+        :class:`RespError` instances instead of aborting the batch.
+        """
+        commands = list(commands)
+        self.sock.sendall(b"".join(encode_command(*cmd) for cmd in commands))
+        replies = []
+        for _ in commands:
+            try:
+                replies.append(self._read_reply())
+            except RespError as e:
+                if str(e) == "connection closed by server":
+                    raise
+                replies.append(e)
+        # Read every reply before raising so the connection stays in sync
+        if raise_on_error:
+            for reply in replies:
+                if isinstance(reply, RespError):
+                    raise reply
+        return replies
+
+    def close(self) -> None:
+        self._reader.close()
+        self.sock.close()
+
+    def __enter__(self) -> "RedisConnection":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def connect(host: str, port: int, password: Optional[str] = None, username: Optional[str] = None,
+            timeout: float = 5.0, decode: bool = True) -> RedisConnection:
+    """Open (and authenticate, if a password is given) a connection in one call."""
+    conn = RedisConnection.open(host, port, timeout, decode)
+    try:
+        if password:
+            conn.auth(password, username)
+    except BaseException:
+        conn.close()
+        raise
+    return conn
@@ -0,0 +1,445 @@
+"""Minimal S3 client for MinIO.
+
+Signature V4 over ``http.client`` with path-style addressing, so backup and
+restore tooling can talk to the fcs-press-minio container from the host
+without ``boto3``: bucket create, object put/get (ranged)/head/list/delete
+and multipart uploads, plus :class:`MultipartWriter` to stream an upload of
+unknown size with a bounded number of parts in flight and :class:`RangedReader`
+to stream a download as concurrent ranged GETs.
+
+Connections are kept alive per thread, so one client can be shared by a
+thread pool.
+"""
+from __future__ import annotations
+
+import base64
+import datetime
+import hashlib
+import hmac
+import http.client
+import os
+import threading
+import urllib.parse
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+DEFAULT_ENDPOINT = "http://localhost:48590"
+DEFAULT_REGION = "us-east-1"
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_DELETE_BATCH = 1000
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+
+class S3Error(Exception):
+    """Error response from the server (``<Error><Code>...``)."""
+
+    def __init__(self, status: int, code: str, message: str, resource: str = ""):
+        super().__init__(f"{status} {code}: {message}" + (f" ({resource})" if resource else ""))
+        self.status = status
+        self.code = code
+        self.resource = resource
+
+
+@dataclass
+class Response:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+@dataclass
+class ObjectInfo:
+    key: str
+    size: int
+    last_modified: str
+    etag: str
+
+
+def _quote(value: str, safe: str = "-_.~") -> str:
+    return urllib.parse.quote(value, safe=safe)
+
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode(), hashlib.sha256).digest()
+
+
+def sign_v4(method: str, host: str, path: str, query: Mapping[str, str], headers: Mapping[str, str],
+            payload_hash: str, access_key: str, secret_key: str, region: str = DEFAULT_REGION,
+            service: str = "s3", now: Optional[datetime.datetime] = None) -> Dict[str, str]:
+    """Return ``headers`` plus ``Host``, ``X-Amz-Date`` and ``Authorization`` (AWS Signature V4).
+
+    ``path`` must already be URI-encoded; every header passed in is signed.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date = amz_date[:8]
+    signed = {"host": host, "x-amz-date": amz_date}
+    signed.update({k.lower(): " ".join(str(v).split()) for k, v in headers.items()})
+    names = sorted(signed)
+    canonical_query = "&".join(f"{_quote(k)}={_quote(v)}" for k, v in sorted(query.items()))
+    canonical = "\n".join([
+        method,
+        path,
+        canonical_query,
+        "".join(f"{n}:{signed[n]}\n" for n in names),
+        ";".join(names),
+        payload_hash,
+    ])
+    scope = f"{date}/{region}/{service}/aws4_request"
+    to_sign = "\n".join(["AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical.encode()).hexdigest()])
+    key = _hmac(_hmac(_hmac(_hmac(f"AWS4{secret_key}".encode(), date), region), service), "aws4_request")
+    signature = hmac.new(key, to_sign.encode(), hashlib.sha256).hexdigest()
+    result = dict(headers)
+    result["Host"] = host
+    result["X-Amz-Date"] = amz_date
+    result["Authorization"] = (f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+                               f"SignedHeaders={';'.join(names)}, Signature={signature}")
+    return result
+
+
+def _strip_ns(root: ET.Element) -> ET.Element:
+    for element in root.iter():
+        if "}" in element.tag:
+            element.tag = element.tag.split("}", 1)[1]
+    return root
+
+
+class S3Client:
+    """Path-style S3 client bound to one endpoint and credential pair."""
+
+    def __init__(self, endpoint: str, access_key: str, secret_key: str, region: str = DEFAULT_REGION,
+                 timeout: float = 120.0):
+        parsed = urllib.parse.urlsplit(endpoint)
+        self.secure = parsed.scheme == "https"
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or (443 if self.secure else 80)
+        self.netloc = parsed.netloc
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls, endpoint: Optional[str] = None) -> "S3Client":
+        """Client for MINIO_ENDPOINT (default the published fcs-press-minio port) and MINIO_ROOT_* credentials."""
+        return cls(
+            endpoint or os.environ.get("MINIO_ENDPOINT", DEFAULT_ENDPOINT),
+            os.environ.get("MINIO_ROOT_USER", "minio"),
+            os.environ.get("MINIO_ROOT_PASSWORD", ""),
+            os.environ.get("MINIO_REGION", DEFAULT_REGION),
+        )
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+            conn = cls(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def request(self, method: str, bucket: str = "", key: str = "", query: Optional[Mapping[str, str]] = None,
+                headers: Optional[Mapping[str, str]] = None, body: bytes = b"",
+                expect: Sequence[int] = (200,)) -> Response:
+        """Signed request; raises :class:`S3Error` unless the status is in ``expect``."""
+        path = "/" + "/".join(_quote(part, safe="-_.~/") for part in (bucket, key) if part)
+        query = dict(query or {})
+        payload_hash = hashlib.sha256(body).hexdigest() if body else EMPTY_SHA256
+        signed = sign_v4(method, self.netloc, path, query,
+                         {**(headers or {}), "x-amz-content-sha256": payload_hash},
+                         self.access_key, self.secret_key, self.region)
+        target = path + ("?" + "&".join(f"{_quote(k)}={_quote(v)}" for k, v in sorted(query.items()))
+                         if query else "")
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, target, body=body or None, headers=signed)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.BadStatusLine):
+                # A kept-alive connection closed by the server; retry once on a fresh one
+                self._drop_connection()
+                if attempt:
+                    raise
+            except (OSError, http.client.HTTPException):
+                self._drop_connection()
+                raise
+        result = Response(response.status, {k.lower(): v for k, v in response.getheaders()}, data)
+        if result.status not in expect:
+            code, message = "HTTP", response.reason
+            if data:
+                try:
+                    root = _strip_ns(ET.fromstring(data))
+                    code = root.findtext("Code") or code
+                    message = root.findtext("Message") or message
+                except ET.ParseError:
+                    pass
+            raise S3Error(result.status, code, message, f"{bucket}/{key}".rstrip("/"))
+        return result
+
+    # -- buckets ---------------------------------------------------------------
+
+    def bucket_exists(self, bucket: str) -> bool:
+        return self.request("HEAD", bucket, expect=(200, 404)).status == 200
+
+    def ensure_bucket(self, bucket: str) -> None:
+        """Create the bucket unless it already exists."""
+        if not self.bucket_exists(bucket):
+            self.request("PUT", bucket, expect=(200, 409))
+
+    # -- objects ---------------------------------------------------------------
+
+    def put_object(self, bucket: str, key: str, data: bytes, content_type: str = "application/octet-stream") -> str:
+        """Upload one object; returns its ETag."""
+        response = self.request("PUT", bucket, key, headers={"Content-Type": content_type}, body=data)
+        return response.headers.get("etag", "").strip('"')
+
+    def get_object(self, bucket: str, key: str, start: Optional[int] = None, end: Optional[int] = None) -> bytes:
+        """Whole object, or bytes ``start..end`` inclusive."""
+        headers = {}
+        if start is not None:
+            headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+        return self.request("GET", bucket, key, headers=headers, expect=(200, 206)).body
+
+    def head_object(self, bucket: str, key: str) -> Optional[Dict[str, str]]:
+        """Response headers, or None if the object does not exist."""
+        response = self.request("HEAD", bucket, key, expect=(200, 404))
+        return response.headers if response.status == 200 else None
+
+    def copy_object(self, bucket: str, key: str, source_key: str,
+                    content_type: str = "application/octet-stream") -> None:
+        """Server-side copy within ``bucket``; copying a key onto itself refreshes its LastModified."""
+        headers = {"x-amz-copy-source": "/" + _quote(f"{bucket}/{source_key}", safe="-_.~/"),
+                   "x-amz-metadata-directive": "REPLACE", "Content-Type": content_type}
+        response = self.request("PUT", bucket, key, headers=headers)
+        # CopyObject can fail after the 200 status line: the error is then the body
+        root = _strip_ns(ET.fromstring(response.body)) if response.body else None
+        if root is not None and root.tag == "Error":
+            raise S3Error(response.status, root.findtext("Code") or "HTTP", root.findtext("Message") or "",
+                          f"{bucket}/{key}")
+
+    def delete_object(self, bucket: str, key: str) -> None:
+        self.request("DELETE", bucket, key, expect=(200, 204))
+
+    def list_objects(self, bucket: str, prefix: str = "") -> Iterator[ObjectInfo]:
+        """Every object under ``prefix`` (ListObjectsV2, follows continuation tokens)."""
+        token = None
+        while True:
+            query = {"list-type": "2", "prefix": prefix, "max-keys": "1000"}
+            if token:
+                query["continuation-token"] = token
+            root = _strip_ns(ET.fromstring(self.request("GET", bucket, query=query).body))
+            for item in root.findall("Contents"):
+                yield ObjectInfo(item.findtext("Key", ""), int(item.findtext("Size", "0")),
+                                 item.findtext("LastModified", ""), item.findtext("ETag", "").strip('"'))
+            if root.findtext("IsTruncated") != "true":
+                return
+            token = root.findtext("NextContinuationToken")
+
+    def delete_objects(self, bucket: str, keys: Sequence[str]) -> List[Tuple[str, str]]:
+        """Multi-object delete of up to 1000 keys; returns (key, error message) for failures."""
+        if len(keys) > MAX_DELETE_BATCH:
+            raise ValueError(f"at most {MAX_DELETE_BATCH} keys per DeleteObjects request")
+        if not keys:
+            return []
+        root = ET.Element("Delete")
+        ET.SubElement(root, "Quiet").text = "true"
+        for key in keys:
+            ET.SubElement(ET.SubElement(root, "Object"), "Key").text = key
+        body = ET.tostring(root, encoding="utf-8", xml_declaration=True)
+        md5 = base64.b64encode(hashlib.md5(body).digest()).decode()
+        response = self.request("POST", bucket, query={"delete": ""}, body=body,
+                                headers={"Content-MD5": md5, "Content-Type": "application/xml"})
+        result = _strip_ns(ET.fromstring(response.body)) if response.body else None
+        if result is None:
+            return []
+        return [(e.findtext("Key", ""), e.findtext("Message", "") or e.findtext("Code", ""))
+                for e in result.findall("Error")]
+
+    # -- multipart -------------------------------------------------------------
+
+    def create_multipart_upload(self, bucket: str, key: str,
+                                content_type: str = "application/octet-stream") -> str:
+        response = self.request("POST", bucket, key, query={"uploads": ""}, headers={"Content-Type": content_type})
+        return _strip_ns(ET.fromstring(response.body)).findtext("UploadId", "")
+
+    def upload_part(self, bucket: str, key: str, upload_id: str, number: int, data: bytes) -> str:
+        response = self.request("PUT", bucket, key, query={"partNumber": str(number), "uploadId": upload_id},
+                                body=data)
+        return response.headers.get("etag", "")
+
+    def complete_multipart_upload(self, bucket: str, key: str, upload_id: str,
+                                  parts: Sequence[Tuple[int, str]]) -> None:
+        root = ET.Element("CompleteMultipartUpload")
+        for number, etag in sorted(parts):
+            part = ET.SubElement(root, "Part")
+            ET.SubElement(part, "PartNumber").text = str(number)
+            ET.SubElement(part, "ETag").text = etag
+        response = self.request("POST", bucket, key, query={"uploadId": upload_id},
+                                body=ET.tostring(root, encoding="utf-8"))
+        # Errors during completion can arrive as a 200 with an <Error> body
+        if b"<Error>" in response.body[:512]:
+            root = _strip_ns(ET.fromstring(response.body))
+            raise S3Error(200, root.findtext("Code", ""), root.findtext("Message", ""), f"{bucket}/{key}")
+
+    def abort_multipart_upload(self, bucket: str, key: str, upload_id: str) -> None:
+        self.request("DELETE", bucket, key, query={"uploadId": upload_id}, expect=(204, 200, 404))
+
+
+class MultipartWriter:
+    """Write-only stream that becomes one object.
+
+    Buffers ``part_size`` bytes, then uploads parts on a small pool while the
+    caller keeps writing; at most ``max_inflight`` parts are buffered or in
+    flight, which bounds memory to about ``(max_inflight + 1) * part_size``.
+    Objects smaller than one part are sent with a single PUT.
+    """
+
+    def __init__(self, client: S3Client, bucket: str, key: str, part_size: int = 16 * 1024 * 1024,
+                 max_inflight: int = 4, content_type: str = "application/octet-stream"):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.content_type = content_type
+        self.bytes_written = 0
+        self.parts: List[Tuple[int, str]] = []
+        self.upload_id: Optional[str] = None
+        self._buffer = bytearray()
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._pool = ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix="s3-part")
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+
+    def _upload(self, number: int, data: bytes) -> None:
+        try:
+            etag = self.client.upload_part(self.bucket, self.key, self.upload_id, number, data)
+            with self._lock:
+                self.parts.append((number, etag))
+        except BaseException as e:  # surfaced on the next write()/close()
+            with self._lock:
+                self._error = self._error or e
+        finally:
+            self._slots.release()
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _flush_part(self) -> None:
+        if self.upload_id is None:
+            self.upload_id = self.client.create_multipart_upload(self.bucket, self.key, self.content_type)
+        data = bytes(self._buffer[:self.part_size])
+        del self._buffer[:self.part_size]
+        self._slots.acquire()
+        self._check()
+        number = len(self._futures) + 1
+        self._futures.append(self._pool.submit(self._upload, number, data))
+
+    def write(self, data: bytes) -> int:
+        self._check()
+        self._buffer += data
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._flush_part()
+        return len(data)
+
+    def close(self) -> str:
+        """Upload what is left and complete the object; returns the object key."""
+        try:
+            if self.upload_id is None:
+                self.client.put_object(self.bucket, self.key, bytes(self._buffer), self.content_type)
+                self._buffer.clear()
+                return self.key
+            if self._buffer:
+                self._flush_part()
+            for future in self._futures:
+                future.result()
+            self._check()
+            self.client.complete_multipart_upload(self.bucket, self.key, self.upload_id, self.parts)
+            return self.key
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self._pool.shutdown(wait=True)
+
+    def abort(self) -> None:
+        """Drop buffered data and any uploaded parts (safe to call more than once)."""
+        self._buffer.clear()
+        for future in self._futures:
+            future.cancel()
+        self._pool.shutdown(wait=True)
+        if self.upload_id is not None:
+            try:
+                self.client.abort_multipart_upload(self.bucket, self.key, self.upload_id)
+            except (OSError, S3Error):
+                pass
+            self.upload_id = None
+
+    def __enter__(self) -> "MultipartWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class RangedReader:
+    """Iterate over an object's bytes, fetched as concurrent ranged GETs.
+
+    Up to ``concurrency`` ranges of ``part_size`` bytes are downloading ahead
+    of the consumer and parts are yielded in order, so memory stays around
+    ``concurrency * part_size`` whatever the object size.
+    """
+
+    def __init__(self, client: S3Client, bucket: str, key: str, size: Optional[int] = None,
+                 part_size: int = 8 * 1024 * 1024, concurrency: int = 8):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self.part_size = max(part_size, 1)
+        self.concurrency = max(concurrency, 1)
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self.size is None:
+            headers = self.client.head_object(self.bucket, self.key)
+            if headers is None:
+                raise S3Error(404, "NoSuchKey", "The specified key does not exist.", f"{self.bucket}/{self.key}")
+            self.size = int(headers.get("content-length", "0"))
+        ranges = iter(range(0, self.size, self.part_size))
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="s3-range")
+        pending: Deque[Tuple[int, Future]] = deque()
+        try:
+            for start in ranges:
+                end = min(start + self.part_size, self.size) - 1
+                pending.append((end - start + 1, pool.submit(self.client.get_object, self.bucket, self.key, start, end)))
+                if len(pending) >= self.concurrency:
+                    yield self._next(pending)
+            while pending:
+                yield self._next(pending)
+        finally:
+            for _, future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
+
+    def _next(self, pending: Deque[Tuple[int, Future]]) -> bytes:
+        expected, future = pending.popleft()
+        data = future.result()
+        if len(data) != expected:
+            raise S3Error(206, "ShortRead", f"expected {expected} bytes, got {len(data)}", f"{self.bucket}/{self.key}")
+        return data
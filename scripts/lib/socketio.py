@@ -0,0 +1,238 @@
+"""Minimal asyncio socket.io client.
+
+Socket.IO v4 over Engine.IO v4, websocket transport only (no long-polling
+upgrade), on top of a small RFC 6455 client. Enough to open many realtime
+connections to Frappe's ``socketio.js`` through the frontend without the
+``python-socketio`` / ``websockets`` packages: namespace connect, emit,
+receiving events and answering the server's pings.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+class SocketIOError(Exception):
+    """Handshake failure, connect error from the server or a protocol violation."""
+
+
+class WebSocket:
+    """One client WebSocket connection over an asyncio stream."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+
+    @classmethod
+    async def connect(cls, host: str, port: int, path: str, headers: Optional[Dict[str, str]] = None,
+                      timeout: float = 10.0) -> "WebSocket":
+        """Open the TCP connection and perform the HTTP upgrade.
+
+        ``headers`` may override ``Host`` (e.g. to pick a Frappe site behind nginx).
+        """
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        key = base64.b64encode(os.urandom(16)).decode()
+        request = {
+            "Host": f"{host}:{port}",
+            "Upgrade": "websocket",
+            "Connection": "Upgrade",
+            "Sec-WebSocket-Key": key,
+            "Sec-WebSocket-Version": "13",
+            **(headers or {}),
+        }
+        lines = [f"GET {path} HTTP/1.1"] + [f"{k}: {v}" for k, v in request.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            writer.close()
+            raise SocketIOError(f"upgrade failed: {e}") from e
+        except asyncio.TimeoutError:
+            writer.close()
+            raise
+
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        response = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            response[name.strip().lower()] = value.strip()
+        if " 101 " not in f"{status_line} ":
+            writer.close()
+            raise SocketIOError(f"upgrade refused: {status_line}")
+        expected = base64.b64encode(hashlib.sha1(key.encode() + WS_GUID).digest()).decode()
+        if response.get("sec-websocket-accept") != expected:
+            writer.close()
+            raise SocketIOError("upgrade failed: bad Sec-WebSocket-Accept")
+        return cls(reader, writer)
+
+    def _send_frame(self, opcode: int, payload: bytes) -> None:
+        # Client frames are always masked (RFC 6455 5.3)
+        header = bytearray([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header.append(0x80 | length)
+        elif length < 1 << 16:
+            header.append(0x80 | 126)
+            header += struct.pack("!H", length)
+        else:
+            header.append(0x80 | 127)
+            header += struct.pack("!Q", length)
+        mask = os.urandom(4)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        self.writer.write(bytes(header) + mask + masked)
+
+    async def send_text(self, text: str) -> None:
+        self._send_frame(OP_TEXT, text.encode())
+        await self.writer.drain()
+
+    async def _read_frame(self) -> Tuple[bool, int, bytes]:
+        first, second = await self.reader.readexactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", await self.reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+        mask = await self.reader.readexactly(4) if second & 0x80 else None
+        payload = await self.reader.readexactly(length)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return bool(first & 0x80), first & 0x0F, payload
+
+    async def recv(self) -> Optional[str]:
+        """Next text (or binary, decoded) message; None once the connection is closed."""
+        message: List[bytes] = []
+        while not self.closed:
+            try:
+                fin, opcode, payload = await self._read_frame()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self.closed = True
+                return None
+            if opcode == OP_PING:
+                self._send_frame(OP_PONG, payload)
+                await self.writer.drain()
+            elif opcode == OP_CLOSE:
+                await self.close()
+                return None
+            elif opcode in (OP_TEXT, OP_BINARY, OP_CONTINUATION):
+                message.append(payload)
+                if fin:
+                    return b"".join(message).decode("utf-8", "replace")
+        return None
+
+    async def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._send_frame(OP_CLOSE, struct.pack("!H", 1000))
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+        self.writer.close()
+
+
+class SocketIOClient:
+    """One socket.io connection bound to a single namespace.
+
+    Frappe uses one namespace per site (``/<site name>``).
+    """
+
+    def __init__(self, ws: WebSocket, namespace: str, handshake: Dict[str, Any]):
+        self.ws = ws
+        self.namespace = namespace
+        self.handshake = handshake
+        self._prefix = "" if namespace == "/" else f"{namespace},"
+
+    @classmethod
+    async def connect(cls, host: str, port: int, namespace: str = "/", headers: Optional[Dict[str, str]] = None,
+                      path: str = "/socket.io/", timeout: float = 10.0) -> "SocketIOClient":
+        """Connect the transport, then the namespace.
+
+        Raises:
+            SocketIOError: If the server refuses the namespace (``connect_error``)
+            asyncio.TimeoutError: If either step takes longer than ``timeout``
+        """
+        ws = await WebSocket.connect(host, port, f"{path}?EIO=4&transport=websocket", headers, timeout)
+        try:
+            opening = await asyncio.wait_for(ws.recv(), timeout)
+            if not opening or not opening.startswith("0"):
+                raise SocketIOError(f"expected Engine.IO open packet, got {opening!r}")
+            client = cls(ws, namespace, json.loads(opening[1:]))
+            await ws.send_text(f"40{client._prefix}")
+            await asyncio.wait_for(client._await_connect(), timeout)
+            return client
+        except BaseException:
+            await ws.close()
+            raise
+
+    async def _await_connect(self) -> None:
+        while True:
+            packet = await self.ws.recv()
+            if packet is None:
+                raise SocketIOError("connection closed during namespace connect")
+            if packet == "2":
+                await self.ws.send_text("3")
+            elif packet.startswith(f"40{self._prefix}"):
+                return
+            elif packet.startswith(f"44{self._prefix}"):
+                body = packet[2 + len(self._prefix):]
+                try:
+                    message = json.loads(body).get("message", body)
+                except (ValueError, AttributeError):
+                    message = body
+                raise SocketIOError(f"connect_error: {message}")
+
+    @property
+    def sid(self) -> Optional[str]:
+        return self.handshake.get("sid")
+
+    async def emit(self, event: str, *args: Any) -> None:
+        await self.ws.send_text(f"42{self._prefix}{json.dumps([event, *args])}")
+
+    async def recv_event(self) -> Optional[Tuple[str, List[Any]]]:
+        """Next (event, args) for this namespace; None when disconnected.
+
+        Pings are answered transparently.
+        """
+        while True:
+            packet = await self.ws.recv()
+            if packet is None:
+                return None
+            if packet == "2":
+                await self.ws.send_text("3")
+            elif packet == "1" or packet.startswith(f"41{self._prefix}"):
+                await self.ws.close()
+                return None
+            elif packet.startswith(f"42{self._prefix}"):
+                body = packet[2 + len(self._prefix):].lstrip("0123456789")  # drop an ack id
+                data = json.loads(body)
+                return data[0], data[1:]
+
+    async def close(self) -> None:
+        if not self.ws.closed:
+            try:
+                await self.ws.send_text(f"41{self._prefix}")
+            except ConnectionError:
+                pass
+        await self.ws.close()
+
+
+async def connect(host: str, port: int, namespace: str = "/", headers: Optional[Dict[str, str]] = None,
+                  timeout: float = 10.0) -> SocketIOClient:
+    """Open a websocket-transport socket.io connection to ``namespace``."""
+    return await SocketIOClient.connect(host, port, namespace, headers, timeout=timeout)
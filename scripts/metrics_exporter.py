@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Prometheus Metrics Exporter for Press SaaS Platform
+
+This script serves one `/metrics` endpoint for the whole stack: container
+resources from the engine's stats stream, PostgreSQL, both Redis instances,
+RQ queue depth, the warm site pool and nginx stub_status. It runs as the
+`metrics` service of overrides/compose.metrics.yaml (published on 48560) or
+from the host with the published ports.
+
+Every scrape runs the collectors concurrently, each with its own deadline:
+a collector that misses it is reported as `fcs_exporter_collector_up 0`
+and the scrape returns on time with everything else. A collector still busy
+from an earlier scrape is not started again.
+
+Features:
+- Containers: one long-lived stats stream per running container (Docker or
+  Podman API socket), latest sample served at scrape time: CPU seconds,
+  memory usage/limit, block IO and network bytes, PIDs
+- PostgreSQL: connections by state, max_connections, commits, rollbacks,
+  cache hits/reads, deadlocks, temp bytes, database count and size
+- Redis (cache and queue): memory, clients, hits/misses, evictions,
+  commands, keys per db
+- RQ: jobs waiting per queue (`background_job_queue_depth`), started,
+  failed, scheduled and deferred jobs, workers
+- Warm site pool (site_pool.py): depth, target, claims and claim latency
+- nginx stub_status (overrides/nginx-status.conf): connections and requests
+- Exporter self-metrics: per-collector up/duration, scrape duration
+- Standard library only; `--once` prints one scrape and exits
+
+Usage:
+    # In the stack (see overrides/compose.metrics.yaml)
+    curl -s http://localhost:48560/metrics
+
+    # From the host against the published ports
+    DB_PASSWORD=... python scripts/metrics_exporter.py --listen 127.0.0.1:48560 \\
+        --pg-host localhost --pg-port 48532 \\
+        --redis cache=localhost:48510 --redis queue=localhost:48511 --nginx-status ''
+
+    # One scrape to stdout, PostgreSQL and Redis only
+    python scripts/metrics_exporter.py --once --collector postgres --collector redis
+
+Addresses: CHK005, CHK025, NFR-003
+"""
+
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lib import pgwire, resp  # noqa: E402
+from scripts.lib.engine_api import EngineAPI, EngineError, container_name  # noqa: E402
+from scripts.profile_redis import parse_info, parse_target  # noqa: E402
+from scripts.site_pool import KEY_PREFIX, PoolStore, prometheus as site_pool_metrics  # noqa: E402
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_TIMEOUT = 2.0
+STATS_MAX_AGE_S = 30
+STUB_STATUS = re.compile(
+    r"Active connections:\s*(\d+)\s+server accepts handled requests\s+(\d+)\s+(\d+)\s+(\d+)\s+"
+    r"Reading:\s*(\d+)\s+Writing:\s*(\d+)\s+Waiting:\s*(\d+)"
+)
+REDIS_GAUGES = {
+    "used_memory": ("fcs_redis_memory_used_bytes", "Memory used by Redis"),
+    "maxmemory": ("fcs_redis_memory_max_bytes", "maxmemory (0 = unbounded)"),
+    "connected_clients": ("fcs_redis_connected_clients", "Client connections"),
+    "blocked_clients": ("fcs_redis_blocked_clients", "Clients blocked on BLPOP and friends"),
+}
+REDIS_COUNTERS = {
+    "keyspace_hits": ("fcs_redis_keyspace_hits_total", "Successful key lookups"),
+    "keyspace_misses": ("fcs_redis_keyspace_misses_total", "Failed key lookups"),
+    "evicted_keys": ("fcs_redis_evicted_keys_total", "Keys evicted by maxmemory"),
+    "expired_keys": ("fcs_redis_expired_keys_total", "Keys expired"),
+    "total_commands_processed": ("fcs_redis_commands_processed_total", "Commands processed"),
+}
+RQ_REGISTRIES = ("started", "failed", "scheduled", "deferred")
+RQ_REGISTRY_KEYS = {"started": "rq:wip:{}", "failed": "rq:failed:{}", "scheduled": "rq:scheduled:{}",
+                    "deferred": "rq:deferred:{}"}
+
+
+# =============================================================================
+# Exposition format
+# =============================================================================
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+@dataclass
+class Family:
+    name: str
+    kind: str
+    help: str
+    samples: list[tuple[dict[str, str], float]] = field(default_factory=list)
+
+
+class MetricSet:
+    """Metric families of one collector, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.families: dict[str, Family] = {}
+        self.raw: list[str] = []
+
+    def add(self, name: str, kind: str, help_text: str, value: Optional[float], /, **labels: Any) -> None:
+        if value is None:
+            return
+        family = self.families.setdefault(name, Family(name, kind, help_text))
+        family.samples.append(({k: str(v) for k, v in labels.items()}, float(value)))
+
+    def gauge(self, name: str, help_text: str, value: Optional[float], /, **labels: Any) -> None:
+        self.add(name, "gauge", help_text, value, **labels)
+
+    def counter(self, name: str, help_text: str, value: Optional[float], /, **labels: Any) -> None:
+        self.add(name, "counter", help_text, value, **labels)
+
+    def extend(self, other: "MetricSet") -> None:
+        for name, family in other.families.items():
+            mine = self.families.setdefault(name, Family(name, family.kind, family.help))
+            mine.samples.extend(family.samples)
+        self.raw.extend(other.raw)
+
+    def render(self) -> str:
+        lines = []
+        for family in self.families.values():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for labels, value in family.samples:
+                label_text = ",".join(f'{k}="{escape_label(v)}"' for k, v in labels.items())
+                text = str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+                lines.append(f"{family.name}{{{label_text}}} {text}" if label_text else f"{family.name} {text}")
+        lines.extend(self.raw)
+        return "\n".join(lines) + "\n"
+
+
+def number(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+# =============================================================================
+# Collectors
+# =============================================================================
+
+
+class ContainerStats:
+    """Latest engine stats sample per running container, from one stream each"""
+
+    def __init__(self, engine: EngineAPI):
+        self.engine = engine
+        self.samples: dict[str, tuple[str, float, dict]] = {}
+        self.streams: dict[str, threading.Thread] = {}
+        self.lock = threading.Lock()
+
+    def _follow(self, container_id: str, name: str) -> None:
+        try:
+            for sample in self.engine.stats(container_id, idle_timeout=STATS_MAX_AGE_S):
+                with self.lock:
+                    self.samples[container_id] = (name, time.monotonic(), sample)
+        except EngineError:
+            pass
+        finally:
+            with self.lock:
+                self.streams.pop(container_id, None)
+
+    def sync(self, timeout: float) -> None:
+        """Start a stream for every running container that has none"""
+        running = {c["Id"]: container_name(c) for c in self.engine.get("/containers/json", timeout)}
+        with self.lock:
+            for container_id in list(self.samples):
+                if container_id not in running:
+                    del self.samples[container_id]
+            for container_id, name in running.items():
+                if container_id not in self.streams:
+                    thread = threading.Thread(target=self._follow, args=(container_id, name),
+                                              name=f"stats-{name}", daemon=True)
+                    self.streams[container_id] = thread
+                    thread.start()
+
+    def collect(self, timeout: float) -> MetricSet:
+        self.sync(timeout)
+        metrics = MetricSet()
+        now = time.monotonic()
+        with self.lock:
+            samples = [(name, sample) for name, at, sample in self.samples.values() if now - at < STATS_MAX_AGE_S]
+        metrics.gauge("fcs_containers_running", "Running containers seen by the engine", len(self.streams))
+        for name, sample in sorted(samples, key=lambda item: item[0]):
+            cpu = sample.get("cpu_stats") or {}
+            memory = sample.get("memory_stats") or {}
+            memory_detail = memory.get("stats") or {}
+            metrics.counter("fcs_container_cpu_seconds_total", "CPU time consumed",
+                            (number((cpu.get("cpu_usage") or {}).get("total_usage")) or 0) / 1e9, name=name)
+            usage = number(memory.get("usage"))
+            if usage is not None:
+                # what `docker stats` shows: page cache that can be reclaimed is not counted
+                inactive = memory_detail.get("inactive_file", memory_detail.get("total_inactive_file", 0))
+                metrics.gauge("fcs_container_memory_usage_bytes", "Memory in use (without inactive page cache)",
+                              usage - (number(inactive) or 0), name=name)
+            limit = number(memory.get("limit"))
+            if limit:
+                metrics.gauge("fcs_container_memory_limit_bytes", "Memory limit", limit, name=name)
+            io = {"read": 0.0, "write": 0.0}
+            for entry in (sample.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []:
+                op = str(entry.get("op", "")).lower()
+                if op in io:
+                    io[op] += number(entry.get("value")) or 0
+            for op, value in io.items():
+                metrics.counter("fcs_container_blkio_bytes_total", "Block device bytes", value, name=name, op=op)
+            networks = sample.get("networks") or {}
+            for direction, key in (("rx", "rx_bytes"), ("tx", "tx_bytes")):
+                total = sum(number(n.get(key)) or 0 for n in networks.values())
+                metrics.counter("fcs_container_network_bytes_total", "Network bytes", total, name=name,
+                                direction=direction)
+            metrics.gauge("fcs_container_pids", "Processes and threads",
+                          number((sample.get("pids_stats") or {}).get("current")), name=name)
+        return metrics
+
+
+@dataclass
+class PostgresCollector:
+    host: str
+    port: int
+    user: str
+    password: Optional[str]
+
+    def collect(self, timeout: float) -> MetricSet:
+        metrics = MetricSet()
+        with pgwire.connect(self.host, self.port, self.user, self.password, "postgres", timeout=timeout) as conn:
+            states = conn.query("SELECT coalesce(state, 'unknown') AS state, count(*) AS n FROM pg_stat_activity "
+                                "WHERE backend_type = 'client backend' GROUP BY 1")
+            max_connections = conn.query("SHOW max_connections")[0]["max_connections"]
+            totals = conn.query(
+                "SELECT count(*) AS databases, sum(xact_commit) AS commits, sum(xact_rollback) AS rollbacks, "
+                "sum(blks_hit) AS blks_hit, sum(blks_read) AS blks_read, sum(deadlocks) AS deadlocks, "
+                "sum(temp_bytes) AS temp_bytes FROM pg_stat_database WHERE datname IS NOT NULL"
+            )[0]
+            size = conn.query("SELECT sum(pg_database_size(datname)) AS bytes FROM pg_database "
+                              "WHERE datallowconn")[0]["bytes"]
+        for row in states:
+            metrics.gauge("fcs_postgres_connections", "Client backends by state", number(row["n"]),
+                          state=row["state"])
+        metrics.gauge("db_connection_pool_size", "PostgreSQL max_connections", number(max_connections))
+        metrics.gauge("fcs_postgres_databases", "Databases (one per site)", number(totals["databases"]))
+        metrics.gauge("fcs_postgres_database_size_bytes", "Size of every database", number(size))
+        metrics.counter("fcs_postgres_transactions_total", "Transactions", number(totals["commits"]),
+                        result="commit")
+        metrics.counter("fcs_postgres_transactions_total", "Transactions", number(totals["rollbacks"]),
+                        result="rollback")
+        metrics.counter("fcs_postgres_blocks_total", "Block reads", number(totals["blks_hit"]), source="cache")
+        metrics.counter("fcs_postgres_blocks_total", "Block reads", number(totals["blks_read"]), source="disk")
+        metrics.counter("fcs_postgres_deadlocks_total", "Deadlocks detected", number(totals["deadlocks"]))
+        metrics.counter("fcs_postgres_temp_bytes_total", "Bytes written to temporary files",
+                        number(totals["temp_bytes"]))
+        return metrics
+
+
+@dataclass
+class RedisCollector:
+    """INFO of every Redis instance; RQ and the site pool on the queue instance"""
+
+    targets: list[tuple[str, str, int]]
+    password: Optional[str]
+    queue: str = "queue"
+
+    def _connect(self, host: str, port: int, timeout: float) -> resp.RedisConnection:
+        return resp.connect(host, port, self.password, timeout=timeout)
+
+    def collect(self, timeout: float) -> MetricSet:
+        metrics = MetricSet()
+        for name, host, port in self.targets:
+            with self._connect(host, port, timeout) as conn:
+                info = parse_info(conn.command("INFO"))
+            for key, (metric, help_text) in REDIS_GAUGES.items():
+                metrics.gauge(metric, help_text, number(info.get(key)), instance=name)
+            for key, (metric, help_text) in REDIS_COUNTERS.items():
+                metrics.counter(metric, help_text, number(info.get(key)), instance=name)
+            for db, stats in info.items():
+                if isinstance(stats, dict):
+                    metrics.gauge("fcs_redis_keys", "Keys per database", stats.get("keys"), instance=name, db=db)
+        return metrics
+
+    def _queue_target(self) -> tuple[str, str, int]:
+        for target in self.targets:
+            if target[0] == self.queue:
+                return target
+        raise ValueError(f"no Redis target named {self.queue!r}")
+
+    def collect_rq(self, timeout: float) -> MetricSet:
+        metrics = MetricSet()
+        _, host, port = self._queue_target()
+        with self._connect(host, port, timeout) as conn:
+            queue_keys = sorted(conn.command("SMEMBERS", "rq:queues") or [])
+            names = [key[len("rq:queue:"):] for key in queue_keys]
+            commands = [("LLEN", key) for key in queue_keys]
+            for queue in names:
+                commands += [("ZCARD", RQ_REGISTRY_KEYS[registry].format(queue)) for registry in RQ_REGISTRIES]
+            commands.append(("SCARD", "rq:workers"))
+            replies = conn.pipeline(commands)
+        workers = replies.pop()
+        depths, registries = replies[:len(names)], replies[len(names):]
+        for index, full_name in enumerate(names):
+            # Frappe qualifies queues with the bench: "<bench-id>:long"
+            bench, _, queue = full_name.rpartition(":")
+            metrics.gauge("background_job_queue_depth", "Jobs waiting in an RQ queue", depths[index],
+                          queue=queue, bench=bench)
+            for offset, registry in enumerate(RQ_REGISTRIES):
+                metrics.gauge("fcs_rq_jobs", "Jobs in an RQ registry",
+                              registries[index * len(RQ_REGISTRIES) + offset], queue=queue, bench=bench,
+                              state=registry)
+        metrics.gauge("fcs_rq_workers", "Registered RQ workers", workers)
+        return metrics
+
+    def collect_site_pool(self, timeout: float) -> MetricSet:
+        metrics = MetricSet()
+        _, host, port = self._queue_target()
+        with self._connect(host, port, timeout) as conn:
+            store = PoolStore(conn, KEY_PREFIX)
+            if conn.command("EXISTS", store.key("ready"), store.key("metrics"), store.key("gauges")):
+                metrics.raw.extend(site_pool_metrics(store).splitlines())
+        return metrics
+
+
+@dataclass
+class NginxCollector:
+    url: str
+
+    def collect(self, timeout: float) -> MetricSet:
+        with urllib.request.urlopen(self.url, timeout=timeout) as response:
+            text = response.read().decode()
+        match = STUB_STATUS.search(text)
+        if not match:
+            raise ValueError(f"{self.url}: not a stub_status page")
+        active, accepted, handled, requests, reading, writing, waiting = (int(v) for v in match.groups())
+        metrics = MetricSet()
+        for state, value in (("active", active), ("reading", reading), ("writing", writing),
+                             ("waiting", waiting)):
+            metrics.gauge("fcs_nginx_connections", "Client connections by state", value, state=state)
+        metrics.counter("fcs_nginx_connections_accepted_total", "Accepted client connections", accepted)
+        metrics.counter("fcs_nginx_connections_handled_total", "Handled client connections", handled)
+        metrics.counter("fcs_nginx_http_requests_total", "Client requests", requests)
+        return metrics
+
+
+# =============================================================================
+# Concurrent scrape
+# =============================================================================
+
+
+class Exporter:
+    """Runs every collector concurrently under a per-collector deadline"""
+
+    def __init__(self, collectors: dict[str, Callable[[], MetricSet]], timeout: float = DEFAULT_TIMEOUT):
+        self.collectors = collectors
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=max(len(collectors), 1), thread_name_prefix="collector")
+        self.running: dict[str, Future] = {}
+        self.errors: dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    def scrape(self) -> str:
+        started = time.monotonic()
+        futures: dict[str, Future] = {}
+        with self.lock:
+            for name, collect in self.collectors.items():
+                previous = self.running.get(name)
+                if previous is not None and not previous.done():
+                    continue
+                futures[name] = self.running[name] = self.pool.submit(self._timed, collect)
+        wait(futures.values(), timeout=self.timeout)
+
+        metrics, status = MetricSet(), MetricSet()
+        for name in self.collectors:
+            future = futures.get(name)
+            if future is None or not future.done():
+                # not started because an earlier run is still going counts as the same timeout
+                error = f"no answer within {self.timeout}s"
+                up, duration = 0, self.timeout
+            elif future.exception() is not None:
+                error, up, duration = f"{type(future.exception()).__name__}: {future.exception()}", 0, None
+            else:
+                result, duration = future.result()
+                metrics.extend(result)
+                error, up = "", 1
+            status.gauge("fcs_exporter_collector_up", "1 if the collector answered within its deadline", up,
+                         collector=name)
+            if duration is not None:
+                status.gauge("fcs_exporter_collector_duration_seconds", "Collector run time", duration,
+                             collector=name)
+            # log when a collector starts or stops failing, not on every scrape
+            if error != self.errors.get(name, ""):
+                print(f"metrics_exporter: {name}: {error or 'recovered'}", file=sys.stderr)
+                self.errors[name] = error
+        status.gauge("fcs_exporter_scrape_duration_seconds", "Time to answer the scrape",
+                     round(time.monotonic() - started, 6))
+        return metrics.render() + status.render()
+
+    @staticmethod
+    def _timed(collect: Callable[[], MetricSet]) -> tuple[MetricSet, float]:
+        started = time.monotonic()
+        result = collect()
+        return result, round(time.monotonic() - started, 6)
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def build_collectors(args: argparse.Namespace) -> dict[str, Callable[[], MetricSet]]:
+    timeout = args.timeout
+    redis = RedisCollector([parse_target(t) for t in args.redis], os.environ.get("REDIS_PASSWORD"))
+    available: dict[str, Callable[[], MetricSet]] = {}
+    if args.engine_socket != "":
+        stats = ContainerStats(EngineAPI(args.engine_socket, timeout))
+        available["containers"] = lambda: stats.collect(timeout)
+    available["postgres"] = lambda: PostgresCollector(args.pg_host, args.pg_port, args.pg_user,
+                                                      os.environ.get("DB_PASSWORD")).collect(timeout)
+    if redis.targets:
+        available["redis"] = lambda: redis.collect(timeout)
+        if any(name == redis.queue for name, _, _ in redis.targets):
+            available["rq"] = lambda: redis.collect_rq(timeout)
+            available["site_pool"] = lambda: redis.collect_site_pool(timeout)
+    if args.nginx_status:
+        nginx = NginxCollector(args.nginx_status)
+        available["nginx"] = lambda: nginx.collect(timeout)
+    if args.collector:
+        unknown = set(args.collector) - set(available)
+        if unknown:
+            raise ValueError(f"unknown or unconfigured collector(s): {', '.join(sorted(unknown))}")
+        return {name: available[name] for name in args.collector}
+    return available
+
+
+# =============================================================================
+# HTTP server
+# =============================================================================
+
+
+def make_handler(exporter: Exporter) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] == "/metrics":
+                body, status, content_type = exporter.scrape().encode(), 200, CONTENT_TYPE
+            elif self.path == "/":
+                body, status, content_type = b'<a href="/metrics">/metrics</a>\n', 200, "text/html"
+            else:
+                body, status, content_type = b"not found\n", 404, "text/plain"
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Serve stack-wide Prometheus metrics on /metrics",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--listen", default="0.0.0.0:9100", help="host:port to serve /metrics on")
+    parser.add_argument("--once", action="store_true", help="Print one scrape and exit")
+    parser.add_argument("--collector", action="append",
+                        help="Only run these collectors (containers, postgres, redis, rq, site_pool, nginx)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Deadline per collector (s)")
+    parser.add_argument("--engine-socket", default=None,
+                        help="Docker/Podman API socket (default: $CONTAINER_SOCKET or the usual paths; '' disables)")
+    parser.add_argument("--pg-host", default="db")
+    parser.add_argument("--pg-port", type=int, default=5432)
+    parser.add_argument("--pg-user", default="postgres")
+    parser.add_argument("--redis", action="append", metavar="NAME=HOST:PORT",
+                        help="Redis instance (repeatable); RQ and the site pool are read from 'queue'")
+    parser.add_argument("--nginx-status", default="http://frontend:8081/nginx_status",
+                        help="stub_status URL ('' disables)")
+    args = parser.parse_args()
+    args.redis = args.redis or ["cache=redis-cache:6379", "queue=redis-queue:6379"]
+
+    try:
+        collectors = build_collectors(args)
+    except ValueError as e:
+        parser.error(str(e))
+    exporter = Exporter(collectors, args.timeout)
+
+    if args.once:
+        # containers need a moment for the first stats sample
+        if "containers" in collectors:
+            exporter.scrape()
+            time.sleep(min(args.timeout, 1.5))
+        print(exporter.scrape(), end="")
+        exporter.close()
+        return 0
+
+    host, _, port = args.listen.rpartition(":")
+    server = ThreadingHTTPServer((host or "0.0.0.0", int(port)), make_handler(exporter))
+    print(f"Serving {', '.join(collectors)} metrics on http://{args.listen}/metrics", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        exporter.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
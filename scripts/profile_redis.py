@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Redis Profiler for Press SaaS Platform
+
+This script samples the redis-cache and redis-queue instances over time to
+decide when the cache needs resizing or sharding under multi-tenant load.
+
+Features:
+- Periodic INFO, LATENCY LATEST, SLOWLOG and MEMORY STATS sampling (one pipelined round-trip)
+- Cache hit ratio, eviction rate and ops/s per interval
+- Keyspace size and memory per Frappe site prefix (`<db_name>|key`), estimated
+  from a bounded SCAN sample plus MEMORY USAGE
+- Optional mapping of db_name prefixes back to site names
+- Sizing hints (unbounded maxmemory, evictions, dominant tenants)
+- Text or JSON output
+
+Usage:
+    # Profile both instances: 6 samples, 10s apart
+    python scripts/profile_redis.py --samples 6 --interval 10
+
+    # Cache only, bigger keyspace sample, resolve site names from the backend
+    python scripts/profile_redis.py --target cache=localhost:48510 --scan-keys 20000 --resolve-sites
+
+    # JSON for dashboards / CI artifacts
+    python scripts/profile_redis.py --json > redis_profile.json
+
+Addresses: NFR-002, SC-003
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lib import resp  # noqa: E402
+
+
+DEFAULT_TARGETS = [
+    f"cache=localhost:{os.environ.get('REDIS_CACHE_PORT', '48510')}",
+    f"queue=localhost:{os.environ.get('REDIS_QUEUE_PORT', '48511')}",
+]
+
+# MEMORY STATS fields worth keeping (the reply has ~30)
+MEMORY_STATS_FIELDS = [
+    "peak.allocated", "total.allocated", "startup.allocated", "clients.normal",
+    "overhead.total", "keys.count", "keys.bytes-per-key", "dataset.bytes",
+    "dataset.percentage", "fragmentation",
+]
+
+
+# =============================================================================
+# Sampling
+# =============================================================================
+
+
+def parse_info(text: str) -> dict[str, Any]:
+    """Parse INFO output into a flat dict; `dbN` lines become nested dicts."""
+    info: dict[str, Any] = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#") or ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        if re.fullmatch(r"db\d+", key):
+            info[key] = {k: int(v) for k, v in (item.split("=") for item in value.split(","))}
+            continue
+        try:
+            info[key] = int(value)
+        except ValueError:
+            try:
+                info[key] = float(value)
+            except ValueError:
+                info[key] = value
+    return info
+
+
+def site_prefix(key: str) -> str:
+    """Group a key by tenant.
+
+    Frappe prefixes cache keys with the site's db_name (`_5e5899d8|website_page`);
+    other keys (RQ, locks) are grouped by their first two `:` segments.
+    """
+    if "|" in key:
+        return key.split("|", 1)[0]
+    return ":".join(key.split(":")[:2])
+
+
+@dataclass
+class PrefixUsage:
+    """Estimated footprint of one key prefix."""
+
+    prefix: str
+    keys: float = 0.0
+    bytes: float = 0.0
+
+
+@dataclass
+class KeyspaceEstimate:
+    """Keyspace breakdown extrapolated from a SCAN sample."""
+
+    total_keys: int
+    sampled: int
+    exact: bool
+    prefixes: dict[str, PrefixUsage] = field(default_factory=dict)
+
+    def top(self, n: int) -> list[PrefixUsage]:
+        return sorted(self.prefixes.values(), key=lambda p: p.bytes, reverse=True)[:n]
+
+
+@dataclass
+class InstanceSample:
+    """One sampling round of one Redis instance."""
+
+    at: float
+    info: dict[str, Any]
+    memory: dict[str, Any]
+    latency: list[dict[str, Any]]
+    slowlog: list[dict[str, Any]]
+    keyspace: Optional[KeyspaceEstimate] = None
+
+
+class RedisProfiler:
+    """Samples one Redis instance."""
+
+    def __init__(
+        self,
+        name: str,
+        host: str,
+        port: int,
+        password: Optional[str] = None,
+        scan_keys: int = 5000,
+        timeout: float = 5.0,
+    ):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.password = password
+        self.scan_keys = scan_keys
+        self.timeout = timeout
+        self.samples: list[InstanceSample] = []
+        self._last_slowlog_id = -1
+        self._conn: Optional[resp.RedisConnection] = None
+
+    @property
+    def target(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def _connection(self) -> resp.RedisConnection:
+        if self._conn is None:
+            self._conn = resp.connect(self.host, self.port, self.password, timeout=self.timeout)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def sample(self, scan: bool = True) -> InstanceSample:
+        """
+        Take one sample.
+
+        Args:
+            scan: Also estimate the per-prefix keyspace (the expensive part)
+
+        Returns:
+            The sample, also appended to self.samples
+        """
+        conn = self._connection()
+        info_text, latency, slowlog, memory = conn.pipeline(
+            [("INFO", "all"), ("LATENCY", "LATEST"), ("SLOWLOG", "GET", "32"), ("MEMORY", "STATS")],
+            raise_on_error=False,
+        )
+        if isinstance(info_text, resp.RespError):
+            raise info_text
+
+        sample = InstanceSample(
+            at=time.time(),
+            info=parse_info(info_text),
+            memory=self._parse_memory_stats(memory),
+            latency=self._parse_latency(latency),
+            slowlog=self._parse_slowlog(slowlog),
+        )
+        if scan:
+            sample.keyspace = self.estimate_keyspace()
+        self.samples.append(sample)
+        return sample
+
+    @staticmethod
+    def _parse_memory_stats(reply: Any) -> dict[str, Any]:
+        # Disabled/renamed commands come back as errors; profile without them
+        if not isinstance(reply, list):
+            return {}
+        stats = dict(zip(reply[0::2], reply[1::2]))
+        # RESP2 returns the ratio/percentage fields as bulk strings
+        return {k: float(v) if isinstance(v, str) else v for k, v in stats.items() if k in MEMORY_STATS_FIELDS}
+
+    @staticmethod
+    def _parse_latency(reply: Any) -> list[dict[str, Any]]:
+        if not isinstance(reply, list):
+            return []
+        return [
+            {"event": event, "at": int(at), "latest_ms": int(latest), "max_ms": int(worst)}
+            for event, at, latest, worst in reply
+        ]
+
+    def _parse_slowlog(self, reply: Any) -> list[dict[str, Any]]:
+        """Only entries not seen in a previous sample."""
+        if not isinstance(reply, list):
+            return []
+        fresh = []
+        for entry in reply:
+            entry_id, at, duration_us, args = entry[:4]
+            if entry_id <= self._last_slowlog_id:
+                continue
+            fresh.append({
+                "id": entry_id,
+                "at": at,
+                "duration_us": duration_us,
+                "command": " ".join(str(a) for a in args[:3])[:80],
+            })
+        if reply:
+            self._last_slowlog_id = max(self._last_slowlog_id, max(e[0] for e in reply))
+        return fresh
+
+    def estimate_keyspace(self, batch: int = 500) -> KeyspaceEstimate:
+        """
+        Estimate keys and bytes per prefix from a bounded SCAN.
+
+        SCAN walks hash-table buckets in reverse-binary order, i.e. in an order
+        unrelated to key names, so stopping after `scan_keys` keys yields a fair
+        sample; counts are scaled by DBSIZE / sampled. A scan that completes is exact.
+
+        Args:
+            batch: SCAN COUNT hint and MEMORY USAGE pipeline size
+
+        Returns:
+            KeyspaceEstimate for the current database
+        """
+        conn = self._connection()
+        total = conn.command("DBSIZE")
+        keys: set[str] = set()
+        cursor = "0"
+        while True:
+            cursor, chunk = conn.command("SCAN", cursor, "COUNT", batch)
+            keys.update(chunk)
+            if cursor == "0" or len(keys) >= self.scan_keys:
+                break
+
+        estimate = KeyspaceEstimate(total_keys=total, sampled=len(keys), exact=cursor == "0")
+        scale = total / len(keys) if keys and not estimate.exact else 1.0
+        ordered = list(keys)
+        for start in range(0, len(ordered), batch):
+            chunk = ordered[start:start + batch]
+            sizes = conn.pipeline([("MEMORY", "USAGE", k) for k in chunk], raise_on_error=False)
+            for key, size in zip(chunk, sizes):
+                usage = estimate.prefixes.setdefault(site_prefix(key), PrefixUsage(site_prefix(key)))
+                usage.keys += scale
+                # Keys expiring between SCAN and MEMORY USAGE return nil
+                usage.bytes += (size if isinstance(size, int) else 0) * scale
+        return estimate
+
+
+def resolve_site_names(engine: str, container: str) -> dict[str, str]:
+    """Map db_name cache prefixes to site names from the backend's site configs."""
+    result = subprocess.run(
+        [engine, "exec", container, "sh", "-c", "grep -H '\"db_name\"' sites/*/site_config.json"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    names = {}
+    for line in result.stdout.splitlines():
+        match = re.match(r"sites/([^/]+)/site_config\.json:.*\"db_name\":\s*\"([^\"]+)\"", line)
+        if match:
+            names[match.group(2)] = match.group(1)
+    return names
+
+
+# =============================================================================
+# Analysis
+# =============================================================================
+
+
+@dataclass
+class Interval:
+    """Rates between two consecutive samples."""
+
+    seconds: float
+    hit_ratio: Optional[float]
+    evictions_per_sec: float
+    expirations_per_sec: float
+    ops_per_sec: float
+    used_memory: int
+
+
+def intervals(samples: list[InstanceSample]) -> list[Interval]:
+    """Derive per-interval rates from cumulative INFO counters."""
+    out = []
+    for prev, cur in zip(samples, samples[1:]):
+        dt = max(cur.at - prev.at, 1e-6)
+
+        def delta(key: str) -> int:
+            return max(0, cur.info.get(key, 0) - prev.info.get(key, 0))
+
+        lookups = delta("keyspace_hits") + delta("keyspace_misses")
+        out.append(Interval(
+            seconds=dt,
+            hit_ratio=delta("keyspace_hits") / lookups if lookups else None,
+            evictions_per_sec=delta("evicted_keys") / dt,
+            expirations_per_sec=delta("expired_keys") / dt,
+            ops_per_sec=delta("total_commands_processed") / dt,
+            used_memory=cur.info.get("used_memory", 0),
+        ))
+    return out
+
+
+def lifetime_hit_ratio(info: dict[str, Any]) -> Optional[float]:
+    lookups = info.get("keyspace_hits", 0) + info.get("keyspace_misses", 0)
+    return info.get("keyspace_hits", 0) / lookups if lookups else None
+
+
+def sizing_hints(profiler: RedisProfiler) -> list[str]:
+    """Heuristics for when to resize or shard."""
+    last = profiler.samples[-1]
+    info = last.info
+    hints = []
+    maxmemory = info.get("maxmemory", 0)
+    used = info.get("used_memory", 0)
+    if maxmemory == 0:
+        hints.append("maxmemory is unset: the instance can grow until the host OOMs; "
+                     "set maxmemory and an eviction policy (allkeys-lru for a cache)")
+    elif used / maxmemory > 0.8:
+        hints.append(f"used_memory at {used / maxmemory:.0%} of maxmemory: resize before evictions start")
+
+    rates = intervals(profiler.samples)
+    if any(r.evictions_per_sec > 0 for r in rates):
+        ratios = [r.hit_ratio for r in rates if r.hit_ratio is not None]
+        if ratios and min(ratios) < 0.8:
+            hints.append("evicting while hit ratio < 80%: working set exceeds maxmemory; resize or shard by site")
+        else:
+            hints.append("evictions observed: watch hit ratio as tenants are added")
+
+    if last.keyspace and last.keyspace.prefixes:
+        top = last.keyspace.top(1)[0]
+        total_bytes = sum(p.bytes for p in last.keyspace.prefixes.values())
+        if total_bytes and top.bytes / total_bytes > 0.5 and len(last.keyspace.prefixes) > 1:
+            hints.append(f"prefix {top.prefix} holds {top.bytes / total_bytes:.0%} of sampled memory: "
+                         f"noisy tenant, consider a dedicated shard")
+
+    fragmentation = info.get("mem_fragmentation_ratio", 1.0)
+    if used > 64 * 1024 * 1024 and fragmentation > 1.5:
+        hints.append(f"mem_fragmentation_ratio {fragmentation:.2f}: enable activedefrag or restart off-peak")
+    if not any(s.latency for s in profiler.samples) and info.get("latency_monitor_threshold", 0) == 0:
+        hints.append("LATENCY LATEST is empty: CONFIG SET latency-monitor-threshold 10 to record spikes")
+    return hints
+
+
+# =============================================================================
+# Reporter
+# =============================================================================
+
+
+def human_bytes(value: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(value) < 1024 or unit == "GiB":
+            return f"{value:.1f}{unit}" if unit != "B" else f"{value:.0f}B"
+        value /= 1024
+    return f"{value:.1f}GiB"
+
+
+class ProfileReporter:
+    """Reports Redis profiles in text or JSON."""
+
+    def __init__(self, site_names: Optional[dict[str, str]] = None, top: int = 10):
+        self.site_names = site_names or {}
+        self.top = top
+
+    def _label(self, prefix: str) -> str:
+        site = self.site_names.get(prefix)
+        return f"{prefix} ({site})" if site else prefix
+
+    def report_text(self, profilers: list[RedisProfiler]) -> str:
+        """Generate text report."""
+        lines = []
+        for profiler in profilers:
+            if not profiler.samples:
+                continue
+            first, last = profiler.samples[0], profiler.samples[-1]
+            info = last.info
+            lines.append("\n" + "=" * 60)
+            lines.append(f"REDIS PROFILE: {profiler.name} ({profiler.target})")
+            lines.append("=" * 60)
+            ratio = lifetime_hit_ratio(info)
+            lines.append(f"  Version: {info.get('redis_version', '?')}  "
+                         f"policy: {info.get('maxmemory_policy', '?')}  "
+                         f"clients: {info.get('connected_clients', '?')}")
+            lines.append(f"  Memory: {human_bytes(info.get('used_memory', 0))} used, "
+                         f"peak {human_bytes(info.get('used_memory_peak', 0))}, "
+                         f"maxmemory {human_bytes(info['maxmemory']) if info.get('maxmemory') else 'unset'}, "
+                         f"fragmentation {info.get('mem_fragmentation_ratio', 0):.2f}")
+            lines.append(f"  Lifetime hit ratio: {f'{ratio:.1%}' if ratio is not None else 'n/a'}, "
+                         f"evicted keys: {info.get('evicted_keys', 0)}")
+            if last.memory:
+                lines.append(f"  Dataset: {human_bytes(last.memory.get('dataset.bytes', 0))} "
+                             f"({last.memory.get('dataset.percentage', 0):.0f}% of allocated), "
+                             f"{last.memory.get('keys.bytes-per-key', 0)} bytes/key overhead")
+
+            rates = intervals(profiler.samples)
+            if rates:
+                lines.append("\n  Interval    hit%    evict/s   expire/s     ops/s      memory")
+                lines.append("  " + "-" * 60)
+                for i, r in enumerate(rates, 1):
+                    hit = f"{r.hit_ratio:6.1%}" if r.hit_ratio is not None else "   n/a"
+                    lines.append(f"  {i:>8}  {hit:>6} {r.evictions_per_sec:>10.1f} {r.expirations_per_sec:>10.1f}"
+                                 f" {r.ops_per_sec:>9.0f} {human_bytes(r.used_memory):>11}")
+
+            if last.keyspace:
+                ks = last.keyspace
+                mode = "exact" if ks.exact else f"sampled {ks.sampled}/{ks.total_keys}"
+                lines.append(f"\n  Top prefixes by memory ({ks.total_keys} keys, {mode}):")
+                before = first.keyspace.prefixes if first.keyspace and first is not last else {}
+                for usage in ks.top(self.top):
+                    trend = ""
+                    if usage.prefix in before and before[usage.prefix].bytes:
+                        trend = f"  {usage.bytes / before[usage.prefix].bytes - 1:+.0%}"
+                    lines.append(f"    {self._label(usage.prefix):<40} {usage.keys:>9.0f} keys "
+                                 f"{human_bytes(usage.bytes):>10}{trend}")
+
+            events = {e["event"]: e for s in profiler.samples for e in s.latency}
+            if events:
+                lines.append("\n  Latency events (latest / max ms):")
+                for e in sorted(events.values(), key=lambda e: e["max_ms"], reverse=True):
+                    lines.append(f"    {e['event']:<24} {e['latest_ms']:>6} / {e['max_ms']}")
+
+            slow = [e for s in profiler.samples for e in s.slowlog]
+            if slow:
+                lines.append("\n  Slowest commands:")
+                for e in sorted(slow, key=lambda e: e["duration_us"], reverse=True)[:self.top]:
+                    lines.append(f"    {e['duration_us'] / 1000:>8.1f}ms  {e['command']}")
+
+            hints = sizing_hints(profiler)
+            if hints:
+                lines.append("\n  Hints:")
+                lines.extend(f"    - {h}" for h in hints)
+        return "\n".join(lines)
+
+    def report_json(self, profilers: list[RedisProfiler]) -> str:
+        """Generate JSON report."""
+        report = []
+        for profiler in profilers:
+            report.append({
+                "name": profiler.name,
+                "target": profiler.target,
+                "samples": [
+                    {
+                        "at": s.at,
+                        "used_memory": s.info.get("used_memory"),
+                        "maxmemory": s.info.get("maxmemory"),
+                        "keyspace_hits": s.info.get("keyspace_hits"),
+                        "keyspace_misses": s.info.get("keyspace_misses"),
+                        "evicted_keys": s.info.get("evicted_keys"),
+                        "memory_stats": s.memory,
+                        "latency": s.latency,
+                        "slowlog": s.slowlog,
+                        "keyspace": {
+                            "total_keys": s.keyspace.total_keys,
+                            "sampled": s.keyspace.sampled,
+                            "exact": s.keyspace.exact,
+                            "top": [
+                                {"prefix": p.prefix, "site": self.site_names.get(p.prefix),
+                                 "keys": round(p.keys), "bytes": round(p.bytes)}
+                                for p in s.keyspace.top(self.top)
+                            ],
+                        } if s.keyspace else None,
+                    }
+                    for s in profiler.samples
+                ],
+                "intervals": [vars(r) for r in intervals(profiler.samples)],
+                "hints": sizing_hints(profiler) if profiler.samples else [],
+            })
+        return json.dumps(report, indent=2)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def parse_target(value: str) -> tuple[str, str, int]:
+    """`name=host:port` (name optional)."""
+    name, _, address = value.rpartition("=")
+    host, _, port = address.rpartition(":")
+    return name or address, host or "localhost", int(port)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Profile the Press Redis instances (hit ratio, evictions, per-site memory)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--target",
+        action="append",
+        help="name=host:port to profile (repeatable; default: cache and queue)",
+    )
+    parser.add_argument("--samples", type=int, default=3, help="Number of sampling rounds")
+    parser.add_argument("--interval", type=float, default=10.0, help="Seconds between rounds")
+    parser.add_argument(
+        "--scan-keys",
+        type=int,
+        default=5000,
+        help="Keys to SCAN per estimate (0 disables the keyspace breakdown)",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Prefixes / slow commands to show")
+    parser.add_argument(
+        "--resolve-sites",
+        action="store_true",
+        help="Map db_name prefixes to site names via the backend container",
+    )
+    parser.add_argument("--engine", default=os.environ.get("CONTAINER_ENGINE", "podman"))
+    parser.add_argument("--backend", default="frappe_docker_git-backend-1")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    password = os.environ.get("REDIS_PASSWORD") or None
+    profilers = []
+    for value in args.target or DEFAULT_TARGETS:
+        name, host, port = parse_target(value)
+        profilers.append(RedisProfiler(name, host, port, password, args.scan_keys))
+
+    site_names = resolve_site_names(args.engine, args.backend) if args.resolve_sites else {}
+
+    failed = False
+    try:
+        for round_no in range(args.samples):
+            if round_no:
+                time.sleep(args.interval)
+            for profiler in profilers:
+                try:
+                    profiler.sample(scan=args.scan_keys > 0)
+                except (OSError, resp.RespError) as e:
+                    print(f"  ERROR: {profiler.name} ({profiler.target}): {e}", file=sys.stderr)
+                    profiler.close()
+                    failed = True
+            if not args.json:
+                print(f"  sampled round {round_no + 1}/{args.samples}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for profiler in profilers:
+            profiler.close()
+
+    reporter = ProfileReporter(site_names, args.top)
+    if args.json:
+        print(reporter.report_json(profilers))
+    else:
+        print(reporter.report_text(profilers))
+
+    return 1 if failed and not any(p.samples for p in profilers) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Site Provisioning Pipeline for Press SaaS Platform
+
+This script creates Frappe sites from a pre-built template instead of running
+`bench new-site --install-app ...` (every app's install hooks, minutes per
+site) once per site, serially. A template site is installed once and dumped
+(`pg_dump -Fc`) inside the backend container. Each new site then gets its own
+role and database, a `pg_restore --jobs` of that dump, a fresh site_config.json
+(new db credentials and encryption_key) and its Administrator password, with
+several sites provisioned concurrently by a bounded worker pool. The time to
+create each site is reported against SC-002 (< 5 minutes).
+
+Features:
+- Template built once: `bench new-site` of a template site, then a custom-format
+  dump in sites/.fcs-templates/ with the apps fingerprint it was built from
+- Per site: CREATE ROLE/DATABASE over the wire, pg_restore --jobs into it, secrets
+  inherited from the template stripped (encrypted __Auth rows, sessions), new
+  encryption_key and Administrator password (pbkdf2_sha256, as frappe hashes it)
+- Bounded pool: --workers sites at a time, each restore with --jobs connections
+- Stale template detection: the apps and their git commits must match the bench,
+  unless --migrate runs `bench migrate` on every new site
+- A failed site is rolled back (database, role and site directory removed)
+- Per-site timings (database, restore, configure, migrate, total), SC-002 check,
+  text or JSON output
+
+Usage:
+    # Build (or rebuild) the template once, or after an app update
+    ADMIN_PASSWORD=... DB_PASSWORD=... python scripts/provision_sites.py --build-template --apps erpnext
+
+    # Create ten sites, four at a time
+    ADMIN_PASSWORD=... DB_PASSWORD=... python scripts/provision_sites.py \\
+        --sites shop{1..10}.localhost --workers 4
+
+    # Sites from a file, one per line, as JSON
+    python scripts/provision_sites.py --sites-file tenants.txt --json
+
+Addresses: SC-002, NFR-002
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import re
+import secrets
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lib import pgwire  # noqa: E402
+from scripts.lib.bench import DEFAULT_BACKEND, DEFAULT_ENGINE, Bench, BenchError  # noqa: E402
+from scripts.lib.stats import percentile  # noqa: E402
+
+
+DEFAULT_TEMPLATE = "template.localhost"
+TEMPLATE_DIR = "sites/.fcs-templates"
+SC002_TARGET_S = 300
+PBKDF2_ROUNDS = 29000  # passlib's pbkdf2_sha256 default, what frappe's passlibctx produces
+SITE_NAME = re.compile(r"^(?=.{1,253}$)[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?(?:\.[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?)*$")
+# Template site_config.json keys that must not be shared with the sites made from it
+SITE_SPECIFIC_KEYS = ("db_name", "db_password", "encryption_key", "admin_password", "host_name",
+                      "pause_scheduler", "maintenance_mode")
+APPS_FINGERPRINT = (
+    'cat sites/apps.txt; for app in $(cat sites/apps.txt); do '
+    'printf "%s " "$app"; git -C "apps/$app" rev-parse HEAD 2>/dev/null || echo unknown; done'
+)
+
+
+class ProvisionError(Exception):
+    """A site cannot be provisioned (or the template cannot be used)."""
+
+
+# =============================================================================
+# Secrets
+# =============================================================================
+
+
+def _ab64(data: bytes) -> str:
+    """passlib's "adapted base64": no padding, '.' instead of '+'"""
+    return base64.b64encode(data).decode().rstrip("=").replace("+", ".")
+
+
+def hash_password(password: str, rounds: int = PBKDF2_ROUNDS) -> str:
+    """Password hash in passlib's pbkdf2_sha256 format, which frappe verifies in __Auth"""
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, rounds)
+    return f"$pbkdf2-sha256${rounds}${_ab64(salt)}${_ab64(digest)}"
+
+
+def db_name_for(site: str) -> str:
+    """Database (and role) name the way `bench new-site` derives it"""
+    return "_" + hashlib.sha1(site.encode()).hexdigest()[:16]
+
+
+def quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+# =============================================================================
+# Template
+# =============================================================================
+
+
+@dataclass
+class Template:
+    """The dump new sites are restored from, and what it was built from"""
+
+    site: str
+    db_name: str
+    db_host: str
+    db_port: int
+    dump: str
+    fingerprint: str
+    apps: list[str] = field(default_factory=list)
+    dump_bytes: int = 0
+    built_at: str = ""
+    config: dict = field(default_factory=dict)
+
+
+def template_paths(site: str) -> tuple[str, str]:
+    """(dump, metadata) paths relative to the bench directory"""
+    return f"{TEMPLATE_DIR}/{site}.dump", f"{TEMPLATE_DIR}/{site}.json"
+
+
+def write_file(bench: Bench, path: str, content: str) -> None:
+    """Write `content` to `path` (relative to the bench) inside the container, mode 600.
+
+    Raises:
+        BenchError: The engine is missing or the write failed.
+    """
+    args = bench.exec_args(["sh", "-c", 'umask 077 && mkdir -p "$(dirname "$1")" && cat > "$1"', "sh", path],
+                           interactive=True)
+    try:
+        result = subprocess.run(args, input=content, capture_output=True, text=True, timeout=60)
+    except FileNotFoundError as e:
+        raise BenchError(f"{bench.engine}: not found") from e
+    if result.returncode != 0:
+        raise BenchError(f"writing {path}: {result.stderr.strip() or f'exit {result.returncode}'}")
+
+
+def apps_fingerprint(bench: Bench) -> tuple[str, list[str]]:
+    """sha256 of the bench's app list and each app's git commit, plus the app list"""
+    out = bench.run(["sh", "-c", APPS_FINGERPRINT]).stdout
+    apps = [line.strip() for line in out.splitlines() if line.strip() and " " not in line.strip()]
+    return hashlib.sha256(out.encode()).hexdigest(), apps
+
+
+def load_template(bench: Bench, site: str) -> Template:
+    """Read the template metadata written by build_template.
+
+    Raises:
+        ProvisionError: There is no template, or its dump is missing.
+    """
+    dump, meta = template_paths(site)
+    result = bench.run(["sh", "-c", 'test -s "$2" && cat "$1"', "sh", meta, dump], check=False)
+    if result.returncode != 0:
+        raise ProvisionError(f"no template for {site} (run with --build-template first)")
+    try:
+        return Template(**json.loads(result.stdout))
+    except (ValueError, TypeError) as e:
+        raise ProvisionError(f"unreadable template metadata {meta}: {e}") from e
+
+
+def build_template(bench: Bench, site: str, apps: list[str], db_root_user: str) -> Template:
+    """Install the template site (unless it exists) and dump its database.
+
+    ADMIN_PASSWORD and DB_PASSWORD are forwarded to the container with ``-e``
+    so they never appear in a host process list.
+
+    Raises:
+        BenchError: bench new-site or pg_dump failed.
+        ProvisionError: ADMIN_PASSWORD or DB_PASSWORD is not set.
+    """
+    for name in ("ADMIN_PASSWORD", "DB_PASSWORD"):
+        if not os.environ.get(name):
+            raise ProvisionError(f"{name} must be set to build the template")
+
+    if site not in bench.list_sites():
+        command = (f"bench new-site {shlex.quote(site)} --db-type postgres "
+                   f"--db-root-username {shlex.quote(db_root_user)} "
+                   '--db-root-password "$DB_PASSWORD" --admin-password "$ADMIN_PASSWORD"')
+        command += "".join(f" --install-app {shlex.quote(app)}" for app in apps)
+        bench.run(["sh", "-c", command], timeout=3600,
+                  env={name: os.environ[name] for name in ("ADMIN_PASSWORD", "DB_PASSWORD")})
+    # the template is only ever a dump source; keep its scheduler from touching the data
+    bench.run(["bench", "--site", site, "set-config", "pause_scheduler", "1"], timeout=120)
+
+    config = bench.site_configs([site])[site]
+    own_config = json.loads(bench.run(["cat", f"sites/{site}/site_config.json"]).stdout)
+    dump, meta = template_paths(site)
+    size = bench.run(
+        ["sh", "-c", 'umask 077 && mkdir -p "$(dirname "$1")" && '
+                     'pg_dump -h "$3" -p "$4" -U "$2" -Fc --no-owner --no-privileges -f "$1.tmp" "$2" && '
+                     'mv "$1.tmp" "$1" && wc -c < "$1"',
+         "sh", dump, config.db_name, config.db_host, str(config.db_port)],
+        timeout=3600, env={"PGPASSWORD": config.db_password},
+    ).stdout.strip()
+    fingerprint, installed = apps_fingerprint(bench)
+    template = Template(
+        site=site,
+        db_name=config.db_name,
+        db_host=config.db_host,
+        db_port=config.db_port,
+        dump=dump,
+        fingerprint=fingerprint,
+        apps=installed,
+        dump_bytes=int(size or 0),
+        built_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        config={k: v for k, v in own_config.items() if k not in SITE_SPECIFIC_KEYS},
+    )
+    write_file(bench, meta, json.dumps(asdict(template), indent=2))
+    return template
+
+
+# =============================================================================
+# Provisioning
+# =============================================================================
+
+
+@dataclass
+class SiteProvision:
+    """Outcome and timings of one site"""
+
+    site: str
+    db_name: str = ""
+    status: str = "pending"
+    database_s: float = 0.0
+    restore_s: float = 0.0
+    configure_s: float = 0.0
+    migrate_s: float = 0.0
+    total_s: float = 0.0
+    secrets_removed: int = 0
+    error: str = ""
+
+    @property
+    def within_target(self) -> bool:
+        return self.status == "success" and self.total_s < SC002_TARGET_S
+
+
+class Provisioner:
+    """Creates sites from one template, `workers` at a time"""
+
+    def __init__(
+        self,
+        bench: Bench,
+        template: Template,
+        pg_host: str,
+        pg_port: int,
+        pg_user: str,
+        pg_password: Optional[str],
+        admin_password: str,
+        jobs: int = 2,
+        migrate: bool = False,
+    ):
+        self.bench = bench
+        self.template = template
+        self.pg_host = pg_host
+        self.pg_port = pg_port
+        self.pg_user = pg_user
+        self.pg_password = pg_password
+        self.admin_password = admin_password
+        self.jobs = jobs
+        self.migrate = migrate
+
+    def _root(self) -> pgwire.PgConnection:
+        return pgwire.connect(self.pg_host, self.pg_port, self.pg_user, self.pg_password, "postgres")
+
+    def create_database(self, db_name: str, password: str) -> None:
+        """Role and database named like bench new-site names them, owned by the role.
+
+        Raises:
+            ProvisionError: The role or database already exists.
+        """
+        with self._root() as conn:
+            if conn.query(f"SELECT 1 FROM pg_roles WHERE rolname = {quote_literal(db_name)} UNION ALL "
+                          f"SELECT 1 FROM pg_database WHERE datname = {quote_literal(db_name)}"):
+                raise ProvisionError(f"role or database {db_name} already exists")
+            conn.query(f"CREATE ROLE {quote_ident(db_name)} LOGIN PASSWORD {quote_literal(password)}")
+            conn.query(f"CREATE DATABASE {quote_ident(db_name)} OWNER {quote_ident(db_name)}")
+
+    def restore(self, db_name: str, password: str) -> None:
+        """pg_restore --jobs of the template dump, every object owned by the site's role"""
+        template = self.template
+        self.bench.run(
+            [
+                "pg_restore",
+                "-h", template.db_host,
+                "-p", str(template.db_port),
+                "-U", db_name,
+                "-d", db_name,
+                f"--jobs={self.jobs}",
+                "--no-owner",
+                "--no-privileges",
+                "--no-password",
+                "--exit-on-error",
+                template.dump,
+            ],
+            timeout=3600,
+            env={"PGPASSWORD": password},
+        )
+
+    def configure(self, site: str, db_name: str, password: str, admin_password: Optional[str] = None) -> int:
+        """Strip what the site must not inherit, set its admin password, write its site_config.json.
+
+        Returns:
+            Number of encrypted __Auth rows removed (sealed with the template's encryption_key).
+        """
+        with pgwire.connect(self.pg_host, self.pg_port, db_name, password, db_name) as conn:
+            removed = len(conn.query('DELETE FROM "__Auth" WHERE encrypted = 1 RETURNING name'))
+            conn.query(f'UPDATE "__Auth" SET password = {quote_literal(hash_password(admin_password or self.admin_password))} '
+                       "WHERE doctype = 'User' AND name = 'Administrator' AND fieldname = 'password'")
+            # a session id of the template must not open every tenant
+            conn.query("DO $$ BEGIN IF to_regclass('\"tabSessions\"') IS NOT NULL THEN "
+                       'DELETE FROM "tabSessions"; END IF; END $$')
+        config = {
+            **self.template.config,
+            "db_name": db_name,
+            "db_password": password,
+            "db_type": "postgres",
+            "encryption_key": base64.urlsafe_b64encode(os.urandom(32)).decode(),
+        }
+        self.bench.run(["sh", "-c", 'cd sites && mkdir -p "$1/public/files" "$1/private/files" '
+                                    '"$1/private/backups" "$1/locks" "$1/logs"', "sh", site])
+        write_file(self.bench, f"sites/{site}/site_config.json", json.dumps(config, indent=1))
+        return removed
+
+    def rollback(self, site: str, db_name: str, created_dir: bool) -> None:
+        """Best effort: leave nothing behind for a site that failed"""
+        if created_dir:
+            self.bench.run(["rm", "-rf", f"sites/{site}"], check=False)
+        try:
+            with self._root() as conn:
+                conn.query(f"DROP DATABASE IF EXISTS {quote_ident(db_name)} WITH (FORCE)")
+                conn.query(f"DROP ROLE IF EXISTS {quote_ident(db_name)}")
+        except (OSError, pgwire.PgError):
+            pass
+
+    def provision(self, site: str, admin_password: Optional[str] = None) -> SiteProvision:
+        """Create one site; `admin_password` overrides the shared one for this site only"""
+        result = SiteProvision(site, db_name_for(site))
+        password = secrets.token_hex(16)
+        started = step = time.monotonic()
+        created, created_dir = False, False
+        try:
+            self.create_database(result.db_name, password)
+            created = True
+            result.database_s = time.monotonic() - step
+
+            step = time.monotonic()
+            self.restore(result.db_name, password)
+            result.restore_s = time.monotonic() - step
+
+            step = time.monotonic()
+            created_dir = True
+            result.secrets_removed = self.configure(site, result.db_name, password, admin_password)
+            result.configure_s = time.monotonic() - step
+
+            if self.migrate:
+                step = time.monotonic()
+                self.bench.run(["bench", "--site", site, "migrate"], timeout=3600)
+                result.migrate_s = time.monotonic() - step
+            result.status = "success"
+        except (OSError, pgwire.PgError, BenchError, ProvisionError) as e:
+            result.status = "failed"
+            result.error = str(e)
+            if created:
+                self.rollback(site, result.db_name, created_dir)
+        result.total_s = time.monotonic() - started
+        return result
+
+    def run(self, sites: list[str], workers: int) -> list[SiteProvision]:
+        """Provision every site, `workers` at a time, in the given order"""
+        with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="provision") as pool:
+            return list(pool.map(self.provision, sites))
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+
+def summary(results: list[SiteProvision], wall_s: float) -> dict:
+    ok = [r.total_s for r in results if r.status == "success"]
+    return {
+        "sites": len(results),
+        "created": len(ok),
+        "wall_s": round(wall_s, 3),
+        "sites_per_min": round(len(ok) / wall_s * 60, 2) if wall_s else 0.0,
+        "ttc_p50_s": round(statistics.median(ok), 3) if ok else None,
+        "ttc_p95_s": round(percentile(ok, 95), 3) if ok else None,
+        "ttc_max_s": round(max(ok), 3) if ok else None,
+        "sc002_target_s": SC002_TARGET_S,
+        "sc002_met": bool(ok) and all(t < SC002_TARGET_S for t in ok),
+    }
+
+
+def report_text(results: list[SiteProvision], wall_s: float) -> str:
+    lines = [f"{'site':<32}{'status':<9}{'db':>7}{'restore':>9}{'config':>8}{'migrate':>9}{'TTC':>8}  SC-002"]
+    for r in results:
+        verdict = "ok" if r.within_target else ("over" if r.status == "success" else "-")
+        lines.append(f"{r.site[:31]:<32}{r.status:<9}{r.database_s:>6.1f}s{r.restore_s:>8.1f}s{r.configure_s:>7.1f}s"
+                     f"{r.migrate_s:>8.1f}s{r.total_s:>7.1f}s  {verdict}")
+        if r.secrets_removed:
+            lines.append(f"    {r.secrets_removed} encrypted credential(s) inherited from the template removed")
+        if r.error:
+            lines.append(f"    ERROR: {r.error}")
+    s = summary(results, wall_s)
+    lines.append("")
+    line = f"{s['created']}/{s['sites']} sites created in {wall_s:.1f}s ({s['sites_per_min']} sites/min)"
+    if s["created"]:
+        line += f", time to create p50 {s['ttc_p50_s']:.1f}s, p95 {s['ttc_p95_s']:.1f}s, max {s['ttc_max_s']:.1f}s"
+    lines.append(line)
+    lines.append(f"SC-002 (< {SC002_TARGET_S // 60} min per site): {'met' if s['sc002_met'] else 'NOT met'}")
+    return "\n".join(lines)
+
+
+def report_json(results: list[SiteProvision], wall_s: float, template: Optional[Template]) -> str:
+    return json.dumps({
+        **summary(results, wall_s),
+        "template": {k: v for k, v in asdict(template).items() if k != "config"} if template else None,
+        "results": [{**asdict(r), "within_target": r.within_target} for r in results],
+    }, indent=2)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def read_sites(args: argparse.Namespace) -> list[str]:
+    sites = [s for item in args.sites or [] for s in item.split(",")]
+    if args.sites_file:
+        sites += args.sites_file.read_text().split()
+    return list(dict.fromkeys(s.strip().lower() for s in sites if s.strip()))
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Provision Frappe sites concurrently from a pre-built template database",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--sites", nargs="+", help="Sites to create (space or comma separated)")
+    parser.add_argument("--sites-file", type=Path, help="File with one site per line")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, help="Template site name")
+    parser.add_argument("--build-template", action="store_true", help="Install (if needed) and dump the template")
+    parser.add_argument("--apps", default="erpnext", help="Comma-separated apps for a new template site")
+    parser.add_argument("--workers", type=int, default=4, help="Sites provisioned concurrently")
+    parser.add_argument("--jobs", type=int, default=2, help="pg_restore --jobs per site")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Run bench migrate on each new site (needed if apps changed since the template)")
+    parser.add_argument("--pg-host", default="localhost", help="PostgreSQL host as seen from here")
+    parser.add_argument("--pg-port", type=int, default=48532)
+    parser.add_argument("--pg-user", default="postgres", help="Role allowed to create roles and databases")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE)
+    parser.add_argument("--backend", default=DEFAULT_BACKEND)
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    sites = read_sites(args)
+    invalid = [s for s in sites if not SITE_NAME.match(s)]
+    if invalid:
+        parser.error(f"invalid site name(s): {', '.join(invalid)}")
+    if not sites and not args.build_template:
+        parser.error("nothing to do: give --sites/--sites-file and/or --build-template")
+
+    bench = Bench(args.engine, args.backend)
+    try:
+        if args.build_template:
+            started = time.monotonic()
+            template = build_template(bench, args.template, [a for a in args.apps.split(",") if a], args.pg_user)
+            if not args.json:
+                print(f"Template {template.site}: {template.dump} ({template.dump_bytes / 1024 ** 2:.1f} MB, "
+                      f"apps {', '.join(template.apps)}) built in {time.monotonic() - started:.1f}s")
+            if not sites:
+                if args.json:
+                    print(json.dumps(asdict(template), indent=2))
+                return 0
+        template = load_template(bench, args.template)
+        fingerprint, _ = apps_fingerprint(bench)
+        if fingerprint != template.fingerprint and not args.migrate:
+            raise ProvisionError(f"apps changed since template {template.site} was built ({template.built_at}): "
+                                 "rebuild it with --build-template, or pass --migrate")
+        existing = set(bench.list_sites())
+    except (BenchError, ProvisionError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    if not os.environ.get("ADMIN_PASSWORD"):
+        print("ERROR: ADMIN_PASSWORD must be set (Administrator password of the new sites)", file=sys.stderr)
+        return 1
+
+    provisioner = Provisioner(bench, template, args.pg_host, args.pg_port, args.pg_user,
+                              os.environ.get("DB_PASSWORD"), os.environ["ADMIN_PASSWORD"], args.jobs, args.migrate)
+    todo = [s for s in sites if s not in existing]
+    skipped = [SiteProvision(s, db_name_for(s), "failed", error="site already exists") for s in sites if s in existing]
+    started = time.monotonic()
+    done = {r.site: r for r in provisioner.run(todo, args.workers) + skipped}
+    wall_s = time.monotonic() - started
+    results = [done[s] for s in sites]
+
+    print(report_json(results, wall_s, template) if args.json else report_text(results, wall_s))
+    return 0 if all(r.status == "success" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
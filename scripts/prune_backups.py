@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Backup Pruning Engine for Press SaaS Platform
+
+This script enforces backup retention (FR-015: 30 days) on the MinIO backup
+bucket written by backup_pipeline.py and dedup_backup.py. One paginated
+listing of the bucket refreshes a local SQLite index of backup objects
+(site, backup time, size); keep/delete sets are computed from that index
+and deleted with concurrent multi-object deletes (1000 keys per request),
+so no per-object HEAD request is ever made.
+
+Features:
+- Local index (site, backup_time, size) refreshed from a single bucket listing
+- GFS-style retention: everything within --keep-days, the newest --keep-last per site,
+  plus the newest backup of the last N days, ISO weeks and months before that window
+- Backups without a manifest (interrupted runs) removed once older than a grace period
+- Manifests deleted first, so an interrupted prune never leaves a backup that looks complete
+- Mark and sweep of deduplicated chunks: chunks referenced by no kept manifest.json and
+  older than a grace period are deleted (manifest chunk lists are cached in the index);
+  skipped while a dedup backup is in progress, and the backup prefix is listed again right
+  before deleting so manifests written since the index refresh protect their chunks
+- Concurrent DeleteObjects requests; per-phase timings, text or JSON; --dry-run
+
+Usage:
+    # Prune with the FR-015 policy (30 days, always keep the latest backup)
+    python scripts/prune_backups.py
+
+    # What would go with 7 dailies, 4 weeklies and 6 monthlies beyond 30 days
+    python scripts/prune_backups.py --daily 7 --weekly 4 --monthly 6 --dry-run
+
+    # Plan from the cached index without listing the bucket
+    python scripts/prune_backups.py --no-refresh --dry-run
+
+Runs daily at 03:00, an hour after the backups (KNOWN_JOBS in check_schedule_conflicts.py).
+
+Addresses: FR-015, CHK032
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.backup_pipeline import DEFAULT_BUCKET, DEFAULT_PREFIX, MB  # noqa: E402
+from scripts.dedup_backup import DEFAULT_CHUNK_PREFIX, IN_PROGRESS_NAME, MANIFEST_FORMAT, MANIFEST_NAME  # noqa: E402
+from scripts.lib.s3 import MAX_DELETE_BATCH, S3Client, S3Error  # noqa: E402
+
+
+SCHEMA_VERSION = 1
+DEFAULT_INDEX = Path(os.environ.get("BACKUP_INDEX_DB", Path(__file__).with_name("backup-index.sqlite")))
+MANIFEST_NAMES = ("backup.json", MANIFEST_NAME)
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%SZ"
+
+
+# =============================================================================
+# Index
+# =============================================================================
+
+
+@dataclass
+class IndexedBackup:
+    """One backup directory (backups/<site>/<timestamp>/) as seen in the index"""
+
+    site: str
+    timestamp: str
+    backup_time: datetime.datetime
+    keys: list[str] = field(default_factory=list)
+    size_bytes: int = 0
+    manifest: str = ""
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.manifest)
+
+    @property
+    def in_progress(self) -> bool:
+        """A dedup backup that has not finished (or died without removing its marker)"""
+        return not self.complete and any(k.endswith(f"/{IN_PROGRESS_NAME}") for k in self.keys)
+
+
+def parse_timestamp(value: str) -> Optional[datetime.datetime]:
+    try:
+        return datetime.datetime.strptime(value, TIMESTAMP_FORMAT).replace(tzinfo=datetime.timezone.utc)
+    except ValueError:
+        return None
+
+
+def parse_last_modified(value: str) -> datetime.datetime:
+    """ListObjects LastModified (e.g. 2026-01-01T06:00:00.000Z); epoch if unparseable"""
+    try:
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return datetime.datetime.fromtimestamp(0, datetime.timezone.utc)
+
+
+class BackupIndex:
+    """SQLite index of the backup bucket: backup objects, chunks and cached manifest chunk lists"""
+
+    def __init__(self, path: Path = DEFAULT_INDEX):
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS objects (
+                bucket TEXT NOT NULL,
+                key TEXT NOT NULL,
+                site TEXT NOT NULL,
+                backup_time TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                PRIMARY KEY (bucket, key)
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                bucket TEXT NOT NULL,
+                key TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_modified TEXT NOT NULL,
+                PRIMARY KEY (bucket, key)
+            );
+            CREATE TABLE IF NOT EXISTS manifest_chunks (
+                bucket TEXT NOT NULL,
+                key TEXT NOT NULL,
+                digests TEXT NOT NULL,
+                PRIMARY KEY (bucket, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_objects_site ON objects(bucket, site, backup_time);
+        """)
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None:
+            self.db.execute("INSERT INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            self.db.commit()
+        elif int(row[0]) != SCHEMA_VERSION:
+            raise RuntimeError(f"Backup index {path} has schema v{row[0]}, expected v{SCHEMA_VERSION}")
+
+    def refresh(self, client: S3Client, bucket: str, prefix: str = DEFAULT_PREFIX,
+                chunk_prefix: str = DEFAULT_CHUNK_PREFIX) -> int:
+        """Replace the bucket's rows with one paginated listing; returns the number of objects listed."""
+        prefix, chunk_prefix = prefix.strip("/") + "/", chunk_prefix.strip("/") + "/"
+        objects, chunks, listed = [], [], 0
+        for obj in client.list_objects(bucket):
+            listed += 1
+            if obj.key.startswith(prefix):
+                parts = obj.key[len(prefix):].split("/")
+                if len(parts) == 3 and parse_timestamp(parts[1]):
+                    objects.append((bucket, obj.key, parts[0], parts[1], obj.size))
+            elif obj.key.startswith(chunk_prefix):
+                digest = obj.key.rsplit("/", 1)[-1].split(".", 1)[0]
+                chunks.append((bucket, obj.key, digest, obj.size, obj.last_modified))
+        with self.db:
+            self.db.execute("DELETE FROM objects WHERE bucket = ?", (bucket,))
+            self.db.execute("DELETE FROM chunks WHERE bucket = ?", (bucket,))
+            self.db.executemany("INSERT INTO objects VALUES (?, ?, ?, ?, ?)", objects)
+            self.db.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?, ?)", chunks)
+            # Manifests that no longer exist never come back (keys embed the backup time)
+            self.db.execute("DELETE FROM manifest_chunks WHERE bucket = ? AND key NOT IN "
+                            "(SELECT key FROM objects WHERE bucket = ?)", (bucket, bucket))
+        return listed
+
+    def backups(self, bucket: str) -> dict[str, list[IndexedBackup]]:
+        """Backups per site, oldest first"""
+        sites: dict[str, list[IndexedBackup]] = {}
+        current: Optional[IndexedBackup] = None
+        for key, site, stamp, size in self.db.execute(
+                "SELECT key, site, backup_time, size FROM objects WHERE bucket = ? "
+                "ORDER BY site, backup_time, key", (bucket,)):
+            if current is None or (current.site, current.timestamp) != (site, stamp):
+                current = IndexedBackup(site, stamp, parse_timestamp(stamp))
+                sites.setdefault(site, []).append(current)
+            current.keys.append(key)
+            current.size_bytes += size
+            if key.rsplit("/", 1)[-1] in MANIFEST_NAMES:
+                current.manifest = key
+        return sites
+
+    def chunks(self, bucket: str) -> list[tuple[str, str, int, str]]:
+        """(key, digest, size, last_modified) of every chunk object"""
+        return self.db.execute("SELECT key, digest, size, last_modified FROM chunks WHERE bucket = ?",
+                               (bucket,)).fetchall()
+
+    def manifest_chunks(self, bucket: str, key: str) -> Optional[set[str]]:
+        row = self.db.execute("SELECT digests FROM manifest_chunks WHERE bucket = ? AND key = ?",
+                              (bucket, key)).fetchone()
+        return set(row[0].split()) if row else None
+
+    def store_manifest_chunks(self, bucket: str, key: str, digests: Iterable[str]) -> None:
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO manifest_chunks VALUES (?, ?, ?)",
+                            (bucket, key, " ".join(sorted(digests))))
+
+    def forget(self, bucket: str, keys: Iterable[str]) -> None:
+        """Drop deleted objects and chunks from the index"""
+        rows = [(bucket, key) for key in keys]
+        with self.db:
+            self.db.executemany("DELETE FROM objects WHERE bucket = ? AND key = ?", rows)
+            self.db.executemany("DELETE FROM chunks WHERE bucket = ? AND key = ?", rows)
+            self.db.executemany("DELETE FROM manifest_chunks WHERE bucket = ? AND key = ?", rows)
+
+    def close(self) -> None:
+        self.db.close()
+
+
+# =============================================================================
+# Retention
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Which backups of a site to keep.
+
+    A complete backup is kept if it is younger than ``keep_days``, among the
+    ``keep_last`` newest, or the newest of one of the ``daily`` most recent
+    days, ``weekly`` ISO weeks or ``monthly`` months that have a backup older
+    than ``keep_days`` (the GFS slots extend retention beyond that window).
+    Incomplete backups are kept only while younger than ``incomplete_grace_h``.
+    """
+
+    keep_days: int = 30
+    keep_last: int = 1
+    daily: int = 0
+    weekly: int = 0
+    monthly: int = 0
+    incomplete_grace_h: float = 24
+
+    def plan(self, backups: list[IndexedBackup], now: datetime.datetime) -> tuple[list[IndexedBackup],
+                                                                                   list[IndexedBackup]]:
+        """(keep, delete) for one site's backups"""
+        complete = sorted((b for b in backups if b.complete), key=lambda b: b.backup_time, reverse=True)
+        window = datetime.timedelta(days=self.keep_days)
+        keep = {id(b) for b in complete[:self.keep_last]}
+        keep.update(id(b) for b in complete if now - b.backup_time < window)
+        older = [b for b in complete if now - b.backup_time >= window]
+        for count, bucket_of in (
+            (self.daily, lambda t: t.date()),
+            (self.weekly, lambda t: t.isocalendar()[:2]),
+            (self.monthly, lambda t: (t.year, t.month)),
+        ):
+            seen: set = set()
+            for b in older:
+                if len(seen) >= count:
+                    break
+                period = bucket_of(b.backup_time)
+                if period not in seen:
+                    seen.add(period)
+                    keep.add(id(b))
+        grace = datetime.timedelta(hours=self.incomplete_grace_h)
+        keep.update(id(b) for b in backups if not b.complete and now - b.backup_time < grace)
+        return [b for b in backups if id(b) in keep], [b for b in backups if id(b) not in keep]
+
+
+# =============================================================================
+# Pruning
+# =============================================================================
+
+
+@dataclass
+class SitePrune:
+    """Retention outcome of one site"""
+
+    site: str
+    backups: int = 0
+    kept: int = 0
+    deleted: int = 0
+    incomplete_deleted: int = 0
+    objects_deleted: int = 0
+    bytes_freed: int = 0
+    oldest_kept: str = ""
+
+
+@dataclass
+class PruneResult:
+    """Whole run: per-site outcomes, chunk sweep and timings"""
+
+    bucket: str
+    dry_run: bool
+    listed: int = 0
+    sites: list[SitePrune] = field(default_factory=list)
+    chunks_total: int = 0
+    chunks_live: int = 0
+    chunks_deleted: int = 0
+    chunk_bytes_freed: int = 0
+    sweep_skipped: str = ""
+    delete_requests: int = 0
+    errors: list[str] = field(default_factory=list)
+    list_s: float = 0.0
+    plan_s: float = 0.0
+    delete_s: float = 0.0
+    sweep_s: float = 0.0
+
+    @property
+    def objects_deleted(self) -> int:
+        return sum(s.objects_deleted for s in self.sites) + self.chunks_deleted
+
+
+class Pruner:
+    """Applies a retention policy to one bucket"""
+
+    def __init__(self, client: S3Client, bucket: str, index: BackupIndex, policy: RetentionPolicy,
+                 concurrency: int = 8, chunk_grace_h: float = 24, dry_run: bool = False,
+                 prefix: str = DEFAULT_PREFIX):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/"
+        self.index = index
+        self.policy = policy
+        self.concurrency = concurrency
+        self.chunk_grace_h = chunk_grace_h
+        self.dry_run = dry_run
+
+    def delete(self, keys: list[str], result: PruneResult) -> int:
+        """Concurrent DeleteObjects in batches of 1000; returns the number of keys deleted."""
+        if self.dry_run or not keys:
+            return len(keys)
+        batches = [keys[i:i + MAX_DELETE_BATCH] for i in range(0, len(keys), MAX_DELETE_BATCH)]
+        failed: set[str] = set()
+        with ThreadPoolExecutor(max_workers=max(self.concurrency, 1), thread_name_prefix="delete") as pool:
+            futures = {pool.submit(self.client.delete_objects, self.bucket, batch): batch for batch in batches}
+            for future, batch in futures.items():
+                result.delete_requests += 1
+                try:
+                    errors = future.result()
+                except (OSError, S3Error) as e:
+                    errors = [(key, str(e)) for key in batch]
+                for key, message in errors:
+                    failed.add(key)
+                    if len(result.errors) < 20:
+                        result.errors.append(f"{key}: {message}")
+        self.index.forget(self.bucket, [k for k in keys if k not in failed])
+        return len(keys) - len(failed)
+
+    def live_chunks(self, manifests: list[str]) -> set[str]:
+        """Digests referenced by the given manifest.json keys (fetched concurrently, cached in the index)
+
+        Raises:
+            S3Error, OSError, ValueError: If a manifest cannot be read (nothing must be swept then)
+        """
+        live: set[str] = set()
+        missing = []
+        for key in manifests:
+            cached = self.index.manifest_chunks(self.bucket, key)
+            if cached is None:
+                missing.append(key)
+            else:
+                live |= cached
+
+        def load(key: str) -> tuple[str, Optional[set[str]]]:
+            manifest = json.loads(self.client.get_object(self.bucket, key))
+            if manifest.get("format") != MANIFEST_FORMAT:
+                return key, None
+            return key, {d for stream in manifest["streams"].values() for d, _ in stream["chunks"]}
+
+        with ThreadPoolExecutor(max_workers=max(self.concurrency, 1), thread_name_prefix="manifest") as pool:
+            for key, digests in pool.map(load, missing):
+                if digests is not None:
+                    self.index.store_manifest_chunks(self.bucket, key, digests)
+                    live |= digests
+        return live
+
+    def recheck(self, known_manifests: set[str], now: datetime.datetime) -> tuple[list[str], list[str]]:
+        """List the backup prefix again: (dedup backups now in progress, manifests not in the index)"""
+        grace = datetime.timedelta(hours=self.policy.incomplete_grace_h)
+        running, manifests = [], []
+        for obj in self.client.list_objects(self.bucket, self.prefix):
+            parts = obj.key[len(self.prefix):].split("/")
+            stamp = parse_timestamp(parts[1]) if len(parts) == 3 else None
+            if stamp is None:
+                continue
+            if parts[2] == IN_PROGRESS_NAME and now - stamp < grace:
+                running.append(obj.key)
+            elif parts[2] == MANIFEST_NAME and obj.key not in known_manifests:
+                manifests.append(obj.key)
+        return running, manifests
+
+    def run(self, now: Optional[datetime.datetime] = None) -> PruneResult:
+        """Plan from the index, delete expired backups (manifests first), then sweep chunks"""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        result = PruneResult(self.bucket, self.dry_run)
+        started = time.monotonic()
+        manifests, others, kept_manifests, running = [], [], [], []
+        for site, backups in sorted(self.index.backups(self.bucket).items()):
+            keep, delete = self.policy.plan(backups, now)
+            running += [f"{site}/{b.timestamp}" for b in keep if b.in_progress]
+            site_result = SitePrune(site, len(backups), len(keep), len(delete))
+            site_result.incomplete_deleted = sum(not b.complete for b in delete)
+            site_result.bytes_freed = sum(b.size_bytes for b in delete)
+            site_result.objects_deleted = sum(len(b.keys) for b in delete)
+            if keep:
+                site_result.oldest_kept = min(b.timestamp for b in keep)
+            result.sites.append(site_result)
+            kept_manifests += [b.manifest for b in keep if b.manifest.endswith(f"/{MANIFEST_NAME}")]
+            for b in delete:
+                manifests += [k for k in b.keys if k == b.manifest]
+                others += [k for k in b.keys if k != b.manifest]
+        result.plan_s = time.monotonic() - started
+
+        started = time.monotonic()
+        self.delete(manifests, result)
+        self.delete(others, result)
+        result.delete_s = time.monotonic() - started
+
+        started = time.monotonic()
+        chunks = self.index.chunks(self.bucket)
+        result.chunks_total = len(chunks)
+        if chunks and running:
+            # It may reuse any chunk, including ones its previous manifest listed
+            result.sweep_skipped = f"dedup backup in progress ({', '.join(running[:3])})"
+        elif chunks:
+            live = self.live_chunks(kept_manifests)
+            cutoff = now - datetime.timedelta(hours=self.chunk_grace_h)
+            dead = [(key, digest, size) for key, digest, size, modified in chunks
+                    if digest not in live and parse_last_modified(modified) < cutoff]
+            if dead:
+                # The index is as old as the listing: catch backups started or finished since
+                running, new_manifests = self.recheck(set(kept_manifests) | set(manifests), now)
+                if running:
+                    result.sweep_skipped = f"dedup backup started during the prune ({running[0]})"
+                    dead = []
+                elif new_manifests:
+                    live |= self.live_chunks(new_manifests)
+                    dead = [entry for entry in dead if entry[1] not in live]
+            result.chunks_live = len(live)
+            result.chunks_deleted = self.delete([key for key, _, _ in dead], result)
+            result.chunk_bytes_freed = sum(size for _, _, size in dead)
+        result.sweep_s = time.monotonic() - started
+        return result
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+
+def report_text(result: PruneResult) -> str:
+    lines = [f"{'site':<32}{'backups':>8}{'kept':>6}{'deleted':>9}{'partial':>9}{'freed':>11}  oldest kept"]
+    for s in result.sites:
+        lines.append(f"{s.site[:31]:<32}{s.backups:>8}{s.kept:>6}{s.deleted:>9}{s.incomplete_deleted:>9}"
+                     f"{s.bytes_freed / MB:>9.1f}MB  {s.oldest_kept or '-'}")
+    if result.chunks_total:
+        lines.append("")
+        if result.sweep_skipped:
+            lines.append(f"chunks: {result.chunks_total} stored, sweep skipped: {result.sweep_skipped}")
+        else:
+            lines.append(f"chunks: {result.chunks_total} stored, {result.chunks_live} referenced by kept backups, "
+                         f"{result.chunks_deleted} unreferenced past grace ({result.chunk_bytes_freed / MB:.1f} MB)")
+    for error in result.errors:
+        lines.append(f"    ERROR: {error}")
+    verb = "would delete" if result.dry_run else "deleted"
+    freed = sum(s.bytes_freed for s in result.sites) + result.chunk_bytes_freed
+    lines.append("")
+    lines.append(
+        f"{result.listed} objects listed in {result.list_s:.2f}s, {verb} {result.objects_deleted} "
+        f"({freed / MB:.1f} MB) in {result.delete_requests} requests: plan {result.plan_s:.2f}s, "
+        f"delete {result.delete_s:.2f}s, chunk sweep {result.sweep_s:.2f}s"
+    )
+    return "\n".join(lines)
+
+
+def report_json(result: PruneResult) -> str:
+    return json.dumps({**asdict(result), "objects_deleted": result.objects_deleted}, indent=2)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Apply backup retention to the MinIO backup bucket",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--keep-days", type=int, default=30, help="Keep every backup younger than this")
+    parser.add_argument("--keep-last", type=int, default=1, help="Always keep the newest N backups per site")
+    parser.add_argument("--daily", type=int, default=0, help="Also keep the newest backup of the last N days")
+    parser.add_argument("--weekly", type=int, default=0, help="... of the last N ISO weeks")
+    parser.add_argument("--monthly", type=int, default=0, help="... of the last N months")
+    parser.add_argument("--incomplete-grace", type=float, default=24,
+                        help="Hours before a backup without manifest is deleted")
+    parser.add_argument("--chunk-grace", type=float, default=24,
+                        help="Hours before an unreferenced chunk is deleted")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent delete requests")
+    parser.add_argument("--dry-run", action="store_true", help="Plan only, delete nothing")
+    parser.add_argument("--no-refresh", action="store_true", help="Use the cached index, do not list the bucket")
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX, help="SQLite index path")
+    parser.add_argument("--bucket", default=DEFAULT_BUCKET)
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX)
+    parser.add_argument("--chunk-prefix", default=DEFAULT_CHUNK_PREFIX)
+    parser.add_argument("--endpoint", help="S3 endpoint (default $MINIO_ENDPOINT or http://localhost:48590)")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    if args.no_refresh and not args.dry_run:
+        print("ERROR: --no-refresh plans from a possibly stale index; use it with --dry-run", file=sys.stderr)
+        return 1
+
+    client = S3Client.from_env(args.endpoint)
+    index = BackupIndex(args.index)
+    policy = RetentionPolicy(args.keep_days, args.keep_last, args.daily, args.weekly, args.monthly,
+                             args.incomplete_grace)
+    pruner = Pruner(client, args.bucket, index, policy, args.concurrency, args.chunk_grace, args.dry_run,
+                    args.prefix)
+    try:
+        started = time.monotonic()
+        listed = 0 if args.no_refresh else index.refresh(client, args.bucket, args.prefix, args.chunk_prefix)
+        list_s = time.monotonic() - started
+        result = pruner.run()
+    except (OSError, S3Error, ValueError) as e:
+        print(f"ERROR: bucket {args.bucket}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        index.close()
+    result.listed, result.list_s = listed, list_s
+
+    print(report_json(result) if args.json else report_text(result))
+    return 0 if not result.errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
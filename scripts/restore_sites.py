@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Parallel Site Restore Engine for Press SaaS Platform
+
+This script restores sites from the backups written by backup_pipeline.py
+(backup.json, zstd-compressed objects) and dedup_backup.py (manifest.json,
+deduplicated chunks) and measures the recovery time of each site.
+
+The dump is downloaded with concurrent ranged GETs (or chunk GETs),
+decompressed on the host and piped into the backend container. pg_restore
+can only run parallel jobs from a seekable archive, so the dump lands in a
+spool file inside the container (never on the host) and `pg_restore --jobs N`
+restores it; the site files are extracted by tar into a staging directory
+while the database is downloading and restoring, and only copied over the
+site once their SHA-256 matched.
+
+Features:
+- Latest backup of each site, or a given backup timestamp, in either backup format
+- Concurrent ranged GETs (backup.json) or chunk GETs (manifest.json), streamed in order
+- pg_restore --jobs N --clean --if-exists into the site's own database
+- Files extracted into a staging directory concurrently with the database restore, moved into
+  sites/<site>/ only after verification
+- Several sites restored in parallel
+- RTO per site with a breakdown (download, pg_restore, files), text or JSON
+- Every downloaded stream verified against the SHA-256 in its manifest before it reaches the site
+
+Usage:
+    # Show what would be restored
+    python scripts/restore_sites.py --sites press.localhost
+
+    # Restore two sites in parallel, 4 pg_restore jobs each
+    python scripts/restore_sites.py --sites press.localhost,site2.localhost --jobs 4 --yes
+
+    # A given backup, database only
+    python scripts/restore_sites.py --sites press.localhost --backup 20260101T060000Z --no-files --yes
+
+Restoring overwrites the site's database and uploaded files: nothing is
+changed without --yes.
+
+Addresses: CHK004, CHK019, FR-013
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.backup_pipeline import DEFAULT_BUCKET, DEFAULT_PREFIX, MB, PipelineError, rate  # noqa: E402
+from scripts.dedup_backup import MANIFEST_FORMAT, iter_chunks  # noqa: E402
+from scripts.lib.bench import DEFAULT_BACKEND, DEFAULT_ENGINE, Bench, BenchError, SiteConfig  # noqa: E402
+from scripts.lib.s3 import RangedReader, S3Client, S3Error  # noqa: E402
+
+
+MANIFEST_NAMES = ("backup.json", "manifest.json")
+
+
+# =============================================================================
+# Backups
+# =============================================================================
+
+
+class RestoreError(Exception):
+    """A backup could not be found, downloaded or restored"""
+
+
+@dataclass
+class BackupRef:
+    """One backup of a site and its manifest"""
+
+    site: str
+    key: str
+    timestamp: str
+    manifest: dict
+
+    @property
+    def deduplicated(self) -> bool:
+        return self.manifest.get("format") == MANIFEST_FORMAT
+
+    @property
+    def kinds(self) -> list[str]:
+        return list(self.manifest["streams" if self.deduplicated else "objects"])
+
+    def raw_bytes(self, kind: str) -> int:
+        if self.deduplicated:
+            return self.manifest["streams"][kind]["size_bytes"]
+        return self.manifest["objects"][kind]["raw_bytes"]
+
+
+def find_backup(client: S3Client, bucket: str, prefix: str, site: str, backup: Optional[str] = None) -> BackupRef:
+    """Latest successful backup of `site` (or the one in directory `backup`), either format.
+
+    Raises:
+        RestoreError: If there is none
+    """
+    candidates = []
+    for obj in client.list_objects(bucket, f"{prefix.strip('/')}/{site}/"):
+        parts = obj.key.rsplit("/", 2)
+        if len(parts) == 3 and parts[2] in MANIFEST_NAMES and (backup is None or parts[1] == backup):
+            candidates.append((parts[1], obj.key))
+    for timestamp, key in sorted(candidates, reverse=True):
+        try:
+            manifest = json.loads(client.get_object(bucket, key))
+        except ValueError:
+            continue
+        if manifest.get("status") == "success":
+            return BackupRef(site, key, timestamp, manifest)
+    raise RestoreError(f"no successful backup of {site}{f' at {backup}' if backup else ''} in {bucket}/{prefix}")
+
+
+# =============================================================================
+# Pipes
+# =============================================================================
+
+
+def pipe_stream(parts: Iterable[bytes], sink: list[str], decompress: Optional[list[str]] = None,
+                env: Optional[dict[str, str]] = None) -> tuple[int, str]:
+    """Write `parts` into `sink`'s stdin, through `decompress` if given.
+
+    Returns:
+        (bytes written, sha256 of those bytes)
+
+    Raises:
+        RestoreError: If a process exits non-zero
+        S3Error, PipelineError: If a download fails (the processes are killed first)
+    """
+    target = subprocess.Popen(sink, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                              env={**os.environ, **(env or {})})
+    procs = [target]
+    if decompress:
+        procs.insert(0, subprocess.Popen(decompress, stdin=subprocess.PIPE, stdout=target.stdin,
+                                         stderr=subprocess.PIPE))
+        target.stdin.close()  # the decompressor holds the only write end now
+    head = procs[0]
+    errors: dict[int, str] = {}
+
+    def drain(proc: subprocess.Popen) -> None:
+        errors[proc.pid] = proc.stderr.read().decode("utf-8", "replace").strip()
+
+    drains = [threading.Thread(target=drain, args=(p,), daemon=True) for p in procs]
+    for t in drains:
+        t.start()
+    digest = hashlib.sha256()
+    written = 0
+    broken = False
+    try:
+        for part in parts:
+            digest.update(part)
+            written += len(part)
+            try:
+                head.stdin.write(part)
+            except BrokenPipeError:
+                broken = True
+                break
+    except BaseException:
+        for p in procs:
+            p.kill()
+        raise
+    finally:
+        try:
+            head.stdin.close()
+        except OSError:
+            pass
+        for p in procs:
+            p.wait()
+        for t in drains:
+            t.join()
+        for p in procs:
+            p.stderr.close()
+    for p in procs:
+        if p.returncode != 0:
+            message = (errors.get(p.pid, "").splitlines() or [""])[-1]
+            raise RestoreError(f"{p.args[0] if p is not target else 'restore target'} exited {p.returncode}: {message}")
+    if broken:
+        raise RestoreError("restore target closed its input early")
+    return written, digest.hexdigest()
+
+
+# =============================================================================
+# Restore
+# =============================================================================
+
+
+@dataclass
+class SiteRestore:
+    """Outcome and timings of one site's restore"""
+
+    site: str
+    backup: str = ""
+    format: str = ""
+    status: str = "pending"
+    rto_s: float = 0.0
+    download_bytes: int = 0
+    database_bytes: int = 0
+    files_bytes: int = 0
+    fetch_s: float = 0.0
+    pg_restore_s: float = 0.0
+    files_s: float = 0.0
+    error: str = ""
+
+
+class RestoreEngine:
+    """Restores sites concurrently from one bucket"""
+
+    def __init__(
+        self,
+        bench: Bench,
+        client: S3Client,
+        bucket: str,
+        prefix: str,
+        jobs: int = 4,
+        part_size: int = 8 * MB,
+        concurrency: int = 8,
+        include_files: bool = True,
+        backup: Optional[str] = None,
+    ):
+        self.bench = bench
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.jobs = jobs
+        self.part_size = part_size
+        self.concurrency = concurrency
+        self.include_files = include_files
+        self.backup = backup
+        self.zstd = [shutil.which("zstd") or "zstd", "-d", "-q", "-c"]
+
+    def _download(self, ref: BackupRef, kind: str, pool: ThreadPoolExecutor) -> tuple[Iterator[bytes], str, bool]:
+        """(parts, expected sha256 of the parts, parts are zstd-compressed)"""
+        if ref.deduplicated:
+            stream = ref.manifest["streams"][kind]
+            return iter_chunks(self.client, self.bucket, ref.manifest, kind, pool, self.concurrency), \
+                stream["sha256"], False
+        obj = ref.manifest["objects"][kind]
+        reader = RangedReader(self.client, self.bucket, obj["key"], obj["size_bytes"], self.part_size,
+                              self.concurrency)
+        return iter(reader), obj["sha256"], True
+
+    def _transfer(self, ref: BackupRef, kind: str, sink: list[str], result: SiteRestore) -> int:
+        """Download one stream of `ref` into `sink`, verifying it; returns the raw bytes written."""
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="chunk") as pool:
+            parts, expected, compressed = self._download(ref, kind, pool)
+            written, digest = pipe_stream(parts, sink, self.zstd if compressed else None)
+        result.download_bytes += written
+        if digest != expected:
+            raise RestoreError(f"{kind}: downloaded stream does not match its sha256")
+        return ref.raw_bytes(kind)
+
+    def restore_database(self, ref: BackupRef, config: SiteConfig, result: SiteRestore) -> None:
+        """Spool the dump in the container, then pg_restore --jobs into the site database"""
+        spool = f"/tmp/fcs-restore-{ref.site}-{uuid.uuid4().hex[:8]}.dump"
+        sink = self.bench.exec_args(["sh", "-c", 'umask 077 && cat > "$1"', "sh", spool], interactive=True)
+        started = time.monotonic()
+        try:
+            result.database_bytes = self._transfer(ref, "database", sink, result)
+            result.fetch_s = time.monotonic() - started
+            started = time.monotonic()
+            self.bench.run(
+                [
+                    "pg_restore",
+                    "-h", config.db_host,
+                    "-p", str(config.db_port),
+                    "-U", config.db_name,
+                    "-d", config.db_name,
+                    f"--jobs={self.jobs}",
+                    "--clean",
+                    "--if-exists",
+                    "--no-owner",
+                    "--no-privileges",
+                    "--no-password",
+                    spool,
+                ],
+                timeout=24 * 3600,
+                env={"PGPASSWORD": config.db_password},
+            )
+            result.pg_restore_s = time.monotonic() - started
+        finally:
+            self.bench.run(["rm", "-f", spool], check=False)
+
+    def restore_files(self, ref: BackupRef, result: SiteRestore) -> None:
+        """Extract the files tar into a staging directory, then copy it over sites/<site>/ once verified"""
+        # sites/.<name>: same filesystem as the site, and skipped by the sites/*/ glob
+        staging = f"sites/.fcs-restore-{ref.site}-{uuid.uuid4().hex[:8]}"
+        sink = self.bench.exec_args(["sh", "-c", 'mkdir -m 700 "$1" && cd "$1" && tar -xf -', "sh", staging],
+                                    interactive=True)
+        started = time.monotonic()
+        try:
+            # raises on a sha256 mismatch, before anything reaches the live site
+            result.files_bytes = self._transfer(ref, "files", sink, result)
+            self.bench.run(["sh", "-c", 'cp -a "$1/." "sites/$2/"', "sh", staging, ref.site], timeout=3600)
+        finally:
+            self.bench.run(["rm", "-rf", staging], check=False)
+        result.files_s = time.monotonic() - started
+
+    def restore_site(self, config: SiteConfig) -> SiteRestore:
+        """Database and files of one site concurrently; RTO is until both are done"""
+        result = SiteRestore(config.name)
+        started = time.monotonic()
+        try:
+            ref = find_backup(self.client, self.bucket, self.prefix, config.name, self.backup)
+            result.backup = ref.key
+            result.format = "dedup" if ref.deduplicated else "zstd"
+            if not ref.deduplicated and not shutil.which(self.zstd[0]):
+                raise RestoreError("zstd not found on PATH (install the zstd package)")
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"restore-{config.name}") as pool:
+                futures = [pool.submit(self.restore_database, ref, config, result)]
+                if self.include_files and "files" in ref.kinds:
+                    futures.append(pool.submit(self.restore_files, ref, result))
+                for future in futures:
+                    future.result()
+            result.status = "success"
+        except (OSError, S3Error, BenchError, PipelineError, RestoreError) as e:
+            result.status = "failed"
+            result.error = str(e)
+        result.rto_s = time.monotonic() - started
+        return result
+
+    def run(self, configs: list[SiteConfig], parallel: int) -> list[SiteRestore]:
+        """Restore every site, `parallel` at a time, in the given order"""
+        with ThreadPoolExecutor(max_workers=max(parallel, 1), thread_name_prefix="site") as pool:
+            return list(pool.map(self.restore_site, configs))
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+
+def report_text(results: list[SiteRestore], wall_s: float) -> str:
+    lines = [
+        f"{'site':<32}{'status':<9}{'format':<8}{'RTO':>8}{'fetch':>8}{'pg_rest':>9}{'files':>8}{'raw':>11}{'MB/s':>8}",
+    ]
+    for r in results:
+        raw = r.database_bytes + r.files_bytes
+        lines.append(
+            f"{r.site[:31]:<32}{r.status:<9}{r.format:<8}{r.rto_s:>7.1f}s{r.fetch_s:>7.1f}s{r.pg_restore_s:>8.1f}s"
+            f"{r.files_s:>7.1f}s{raw / MB:>9.1f}MB{rate(raw, r.rto_s):>8.1f}"
+        )
+        if r.backup:
+            lines.append(f"    {r.backup}")
+        if r.error:
+            lines.append(f"    ERROR: {r.error}")
+    ok = [r for r in results if r.status == "success"]
+    lines.append("")
+    summary = f"{len(ok)}/{len(results)} sites restored in {wall_s:.1f}s"
+    if ok:
+        summary += f", RTO max {max(r.rto_s for r in ok):.1f}s, mean {sum(r.rto_s for r in ok) / len(ok):.1f}s"
+    lines.append(summary)
+    return "\n".join(lines)
+
+
+def report_json(results: list[SiteRestore], wall_s: float) -> str:
+    return json.dumps({"wall_s": round(wall_s, 3), "sites": [asdict(r) for r in results]}, indent=2)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Restore sites from MinIO backups (parallel downloads, pg_restore --jobs)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--sites", required=True, help="Comma-separated sites, or 'all'")
+    parser.add_argument("--backup", help="Backup timestamp directory (default: latest per site)")
+    parser.add_argument("--parallel", type=int, default=2, help="Sites restored concurrently")
+    parser.add_argument("--jobs", type=int, default=4, help="pg_restore --jobs per site")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent GETs per stream")
+    parser.add_argument("--part-size", type=int, default=8, help="Ranged GET size in MB")
+    parser.add_argument("--no-files", action="store_true", help="Database only")
+    parser.add_argument("--yes", action="store_true", help="Overwrite the sites' databases and files")
+    parser.add_argument("--bucket", default=DEFAULT_BUCKET)
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX)
+    parser.add_argument("--endpoint", help="S3 endpoint (default $MINIO_ENDPOINT or http://localhost:48590)")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE)
+    parser.add_argument("--backend", default=DEFAULT_BACKEND)
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    bench = Bench(args.engine, args.backend)
+    try:
+        sites = bench.list_sites() if args.sites == "all" else [s for s in args.sites.split(",") if s]
+        configs = bench.site_configs(sites)
+    except BenchError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    if not configs:
+        print("ERROR: no sites found", file=sys.stderr)
+        return 1
+
+    client = S3Client.from_env(args.endpoint)
+    if not args.yes:
+        for site in sites:
+            try:
+                ref = find_backup(client, args.bucket, args.prefix, site, args.backup)
+                print(f"{site}: would restore {ref.key} ({', '.join(ref.kinds)}) into {configs[site].db_name}")
+            except (OSError, S3Error, RestoreError) as e:
+                print(f"{site}: {e}")
+        print("\nNothing changed: pass --yes to restore.")
+        return 1
+
+    engine = RestoreEngine(
+        bench,
+        client,
+        args.bucket,
+        args.prefix,
+        jobs=args.jobs,
+        part_size=args.part_size * MB,
+        concurrency=args.concurrency,
+        include_files=not args.no_files,
+        backup=args.backup,
+    )
+    started = time.monotonic()
+    results = engine.run([configs[s] for s in sites], args.parallel)
+    wall_s = time.monotonic() - started
+
+    print(report_json(results, wall_s) if args.json else report_text(results, wall_s))
+    return 0 if all(r.status == "success" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -42,8 +42,12 @@ import time
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from pathlib import Path
 from typing import Any, Callable, Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lib.probes import ProbeResult, probe_postgres, probe_redis, wait_ready  # noqa: E402
+
 
 # =============================================================================
 # Configuration
@@ -69,6 +73,8 @@ class SecretConfig:
     env_var_name: str
     min_length: int = 16
     validation_command: Optional[str] = None
+    # Host-side wire probe, called with the new secret (preferred over validation_command)
+    validation_probe: Optional[Callable[[str], ProbeResult]] = None
 
 
 # Secret configurations
@@ -79,7 +85,7 @@ SECRET_CONFIGS = {
         affected_services=["fcs-press-postgres", "fcs-press-manager"],
         env_var_name="POSTGRES_PASSWORD",
         min_length=20,
-        validation_command="pg_isready -h localhost -p 5432",
+        validation_probe=lambda password: probe_postgres(password=password),
     ),
     SecretType.MINIO_ROOT_PASSWORD: SecretConfig(
         name="minio_root_password",
@@ -103,7 +109,7 @@ SECRET_CONFIGS = {
         affected_services=["fcs-press-redis-queue", "fcs-press-redis-cache"],
         env_var_name="REDIS_PASSWORD",
         min_length=16,
-        validation_command="redis-cli ping",
+        validation_probe=lambda password: probe_redis(password=password),
     ),
 }
 
@@ -460,8 +466,20 @@ class SecretRotationOrchestrator:
             if not all_healthy:
                 print("  WARNING: Some services may not be healthy")
 
-            # Step 4: Validate connectivity (if command provided)
-            if config.validation_command and not self.dry_run:
+            # Step 4: Validate connectivity (if probe or command provided)
+            if config.validation_probe and not self.dry_run:
+                print(f"\n  Validating connectivity with the new secret...")
+                probe_result = wait_ready(lambda: config.validation_probe(new_value), timeout=60)
+                if probe_result.ok:
+                    print(f"  {probe_result.name} at {probe_result.target} OK ({probe_result.timings()})")
+                    log_entry["validation"] = {
+                        "connect_ms": probe_result.connect_ms,
+                        "auth_ms": probe_result.auth_ms,
+                        "rtt_ms": probe_result.rtt_ms,
+                    }
+                else:
+                    print(f"  WARNING: Validation probe failed: {probe_result.error}")
+            elif config.validation_command and not self.dry_run:
                 print(f"\n  Running validation: {config.validation_command}")
                 result = subprocess.run(
                     config.validation_command,
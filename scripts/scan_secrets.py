@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Repository Secret Scanner for Press SaaS Platform
+
+This script looks for committed credentials in every blob of the git
+history, not only in the working tree. Objects are enumerated with
+`git rev-list --objects` and read through one streaming `git cat-file
+--batch` process; each blob is matched once against a compiled multi-pattern
+set plus an entropy check, and the blob SHAs already scanned are cached in
+.git/, so a re-run only reads blobs that appeared since the last one.
+
+Features:
+- Full history (all refs) or HEAD only, one `git cat-file --batch` process
+- Known credential formats (private keys, AWS/GitHub/Slack/Google tokens, JWTs,
+  URLs with a password) and password/secret/token assignments with a literal value
+- Stock passwords (admin, frappe, changeme, ...) assigned to a password key, whatever their length
+- Entropy detection for long random-looking strings next to a credential keyword
+- Incremental: refs tips and scanned blob SHAs cached (SQLite in .git/); findings are
+  stored per blob, so path exclusions can change without a rescan
+- Documentation (*.md), .github/, tests/ and *.example files excluded, as are values that
+  are variable references or placeholders; `pragma: allowlist secret` on a line skips it
+- Findings with path, line, rule and a redacted excerpt, text or JSON
+
+Usage:
+    # Whole history (incremental after the first run)
+    python scripts/scan_secrets.py
+
+    # Current tree only, without the cache
+    python scripts/scan_secrets.py --no-history --no-cache
+
+    # JSON for CI
+    python scripts/scan_secrets.py --json
+
+Addresses: NFR-005, CHK027
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+
+MAX_BLOB_SIZE = 1024 * 1024
+BINARY_SNIFF = 8000
+EXCLUDED_PREFIXES = (".github/", "tests/")
+EXCLUDED_SUFFIXES = (".md",)
+EXCLUDED_MARKERS = (".example",)
+ALLOWLIST_MARKER = "pragma: allowlist secret"
+# Stock passwords of the images and tutorials this stack is built from, flagged at any length
+WEAK_PASSWORDS = ("admin", "password", "123456", "12345678", "frappe", "erpnext", "changeme", "secret", "root",
+                  "postgres", "mariadb", "default", "letmein", "qwerty")
+PLACEHOLDER_WORDS = ("placeholder", "template", "example", "changeme", "your_", "your-", "xxxx", "<", "redacted")
+CACHE_NAME = "fcs-secret-scan.sqlite"
+SCHEMA_VERSION = 1
+
+
+# =============================================================================
+# Rules
+# =============================================================================
+
+
+RULES = {
+    "private-key": r"-----BEGIN (?:RSA |EC |DSA |OPENSSH |PGP |ENCRYPTED )?PRIVATE KEY(?: BLOCK)?-----",
+    "aws-access-key": r"\b(?:AKIA|ASIA)[0-9A-Z]{16}\b",
+    "github-token": r"\b(?:gh[pousr]_[A-Za-z0-9]{36,}|github_pat_[A-Za-z0-9_]{40,})\b",
+    "slack-token": r"\bxox[abposr]-[A-Za-z0-9-]{10,}",
+    "google-api-key": r"\bAIza[0-9A-Za-z_-]{35}\b",
+    "jwt": r"\beyJ[A-Za-z0-9_-]{10,}\.eyJ[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,}",
+    "url-credentials": r"\b[a-z][a-z0-9+.-]*://[^\s:/@'\"]+:(?P<url_secret>[^\s:/@'\"$]{4,})@",
+    # Listed before "assignment", which would consume `password=password` and then discard it
+    "weak-default": (
+        r"\b[\w.-]*(?i:password|passwd|pass|pwd)\b[\"']?\s*(?:=|:|:=|=>)\s*(?P<weak_quote>[\"']?)"
+        rf"(?P<weak>(?i:{'|'.join(WEAK_PASSWORDS)}))(?P=weak_quote)(?=$|[\s,;)\]}}])"
+    ),
+    # `#` starts a comment only after whitespace: `DB_PASSWORD=Xk9#mQ2vLp8wRt` is one value
+    "assignment": (
+        r"\b[\w.-]*(?i:password|passwd|secret|api[_-]?key|access[_-]?key|auth[_-]?token|token)\b"
+        r"[\"']?\s*(?:=|:|:=|=>)\s*(?P<quote>[\"']?)"
+        r"(?P<value>[^\s\"'`,;#()\[\]{}<>=][^\s\"'`,;()\[\]{}<>=]{7,})(?P=quote)"
+        r"(?=$|[\s,;)\]}])"
+    ),
+    "high-entropy": (
+        r"(?i:key|secret|token|passw|credential|auth)[\w.-]*[\"']?\s*(?:=|:|:=|=>)?\s*"
+        r"[\"'](?P<entropy>[A-Za-z0-9+/=_-]{20,})[\"']"
+    ),
+}
+# One alternation: the regex engine walks each blob once for all rules
+PATTERN = re.compile("|".join(f"(?P<r_{name.replace('-', '_')}>{rx})" for name, rx in RULES.items()))
+# Any change to the rules or filters of this file invalidates cached findings
+RULESET_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:12]
+
+
+def shannon_entropy(value: str) -> float:
+    """Bits per character"""
+    if not value:
+        return 0.0
+    counts = Counter(value)
+    return -sum(c / len(value) * math.log2(c / len(value)) for c in counts.values())
+
+
+def is_placeholder(value: str) -> bool:
+    """Variable references, templates, code expressions and obvious dummies"""
+    lowered = value.lower()
+    if any(marker in value for marker in ("${", "$(", "{{", "%(", "os.environ", "getenv")):
+        return True
+    if value.startswith(("$", "<", "{", "%")) or value.endswith(("(", ")")):
+        return True
+    if re.fullmatch(r"[A-Za-z_][\w]*(?:\.[A-Za-z_][\w]*)+(?:\(.*)?", value):  # attribute or call
+        return True
+    return any(word in lowered for word in PLACEHOLDER_WORDS)
+
+
+def match_secret(match: re.Match) -> Optional[tuple[str, str]]:
+    """(rule, secret value) for a PATTERN match, or None when it is not credible"""
+    rule = match.lastgroup[2:].replace("_", "-") if match.lastgroup else ""
+    if rule == "assignment":
+        value = match.group("value")
+        if match.string.startswith("${", max(match.start() - 2, 0)):
+            return None  # `${DB_PASSWORD:-dev-default}`: a compose/shell default
+        if is_placeholder(value) or (not match.group("quote") and re.fullmatch(r"[A-Za-z_]+", value)):
+            return None  # `password=password_var` is code, not a credential
+        if value.isidentifier() and re.search(r"(?i)passw|secret|token|key", value):
+            return None  # the name of a secret ("postgres_password"), not its value
+        if shannon_entropy(value) < 2.5:
+            return None
+        return rule, value
+    if rule == "weak-default":
+        if match.string.startswith("${", max(match.start() - 2, 0)):
+            return None
+        if not match.group("weak_quote"):
+            # Unquoted, only a config line counts (`PASSWORD=admin`, `password: admin`);
+            # `self.password = password` or `f(password=password)` is code
+            line_start = match.string.rfind("\n", 0, match.start()) + 1
+            key = re.match(r"[\w.-]+", match.group(0)).group(0)
+            if (not re.fullmatch(r"\s*(?:export\s+|-\s+)?", match.string[line_start:match.start()])
+                    or match.group(0)[len(key):len(key) + 1].isspace()):
+                return None
+        return rule, match.group("weak")
+    if rule == "high-entropy":
+        value = match.group("entropy")
+        hexlike = re.fullmatch(r"[0-9a-fA-F]+", value) is not None
+        if is_placeholder(value) or shannon_entropy(value) < (3.0 if hexlike else 4.0):
+            return None
+        return rule, value
+    if rule == "url-credentials":
+        value = match.group("url_secret")
+        return None if is_placeholder(value) else (rule, value)
+    value = match.group(0)
+    return None if is_placeholder(value) else (rule, value)
+
+
+def redact(line: str, secret: str) -> str:
+    shown = secret[:3] + "…" + secret[-2:] if len(secret) > 8 else "…"
+    at = line.rfind(secret)  # the value follows its key, which may contain the same word
+    return (line[:at] + shown + line[at + len(secret):] if at != -1 else line).strip()[:160]
+
+
+def scan_text(text: str) -> list[tuple[int, str, str]]:
+    """(line number, rule, redacted line) of every credible secret in `text`"""
+    findings = []
+    for match in PATTERN.finditer(text):
+        found = match_secret(match)
+        if found is None:
+            continue
+        start = text.rfind("\n", 0, match.start()) + 1
+        end = text.find("\n", match.end())
+        line = text[start:end if end != -1 else len(text)]
+        if ALLOWLIST_MARKER in line:
+            continue
+        findings.append((text.count("\n", 0, match.start()) + 1, found[0], redact(line, found[1])))
+    return findings
+
+
+def is_excluded(path: str) -> bool:
+    return (path.startswith(EXCLUDED_PREFIXES) or path.endswith(EXCLUDED_SUFFIXES)
+            or any(marker in path for marker in EXCLUDED_MARKERS))
+
+
+# =============================================================================
+# Git
+# =============================================================================
+
+
+def git(repo: Path, *args: str) -> str:
+    return subprocess.run(["git", "-C", str(repo), *args], capture_output=True, text=True, check=True).stdout
+
+
+def list_blobs(repo: Path, history: bool, exclude_tips: Iterable[str] = ()) -> Iterator[tuple[str, str]]:
+    """(sha, path) of the blobs reachable from all refs (or HEAD) but not from `exclude_tips`"""
+    args = ["rev-list", "--objects", "--filter=object:type=blob"] + (["--all"] if history else ["HEAD"])
+    tips = list(exclude_tips)
+    if tips:
+        args += ["--not"] + tips
+    proc = subprocess.Popen(["git", "-C", str(repo), *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True)
+    for line in proc.stdout:
+        sha, _, path = line.rstrip("\n").partition(" ")
+        if path:
+            yield sha, path
+    err = proc.stderr.read()
+    if proc.wait() != 0:
+        raise subprocess.CalledProcessError(proc.returncode, args, stderr=err)
+
+
+def head_paths(repo: Path) -> dict[str, list[str]]:
+    """Blob SHA -> paths in HEAD (a blob may sit at several paths)"""
+    paths: dict[str, list[str]] = {}
+    out = subprocess.run(["git", "-C", str(repo), "ls-tree", "-r", "-z", "HEAD"], capture_output=True,
+                         check=True).stdout.decode("utf-8", "replace")
+    for entry in out.split("\0"):
+        if not entry:
+            continue
+        meta, _, path = entry.partition("\t")
+        kind, sha = meta.split()[1:3]
+        if kind == "blob":
+            paths.setdefault(sha, []).append(path)
+    return paths
+
+
+def read_blobs(repo: Path, shas: list[str]) -> Iterator[tuple[str, Optional[bytes]]]:
+    """(sha, content) through one `git cat-file --batch`; content is None for non-blobs or huge blobs.
+
+    SHAs are written by a feeder thread while this thread reads, so neither
+    side of the pipe can fill up and block the other.
+    """
+    proc = subprocess.Popen(["git", "-C", str(repo), "cat-file", "--batch"], stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE)
+
+    def feed() -> None:
+        try:
+            for sha in shas:
+                proc.stdin.write(f"{sha}\n".encode())
+        except BrokenPipeError:
+            pass
+        finally:
+            proc.stdin.close()
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    out = proc.stdout
+    try:
+        for _ in shas:
+            header = out.readline().decode().split()
+            if len(header) < 3:  # "<sha> missing"
+                yield header[0] if header else "", None
+                continue
+            sha, kind, size = header[0], header[1], int(header[2])
+            if kind == "blob" and size <= MAX_BLOB_SIZE:
+                content = out.read(size)
+                out.read(1)
+                yield sha, content
+            else:
+                remaining = size + 1
+                while remaining:
+                    remaining -= len(out.read(min(remaining, 1 << 20)))
+                yield sha, None
+    finally:
+        feeder.join()
+        out.close()
+        proc.wait()
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+
+class ScanCache:
+    """Scanned blob SHAs, their findings and paths, and the ref tips of the last run"""
+
+    def __init__(self, path: Path):
+        self.db = sqlite3.connect(str(path))
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS blobs (sha TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS findings (sha TEXT NOT NULL, line INTEGER, rule TEXT, excerpt TEXT);
+            CREATE TABLE IF NOT EXISTS paths (sha TEXT NOT NULL, path TEXT NOT NULL, PRIMARY KEY (sha, path));
+            CREATE TABLE IF NOT EXISTS tips (sha TEXT PRIMARY KEY);
+            CREATE INDEX IF NOT EXISTS idx_findings_sha ON findings(sha);
+        """)
+        meta = dict(self.db.execute("SELECT key, value FROM meta"))
+        if meta.get("schema_version") != str(SCHEMA_VERSION) or meta.get("rules") != RULESET_VERSION:
+            self.reset()
+
+    def reset(self) -> None:
+        """Forget everything (new rules mean every blob must be rescanned)"""
+        with self.db:
+            for table in ("meta", "blobs", "findings", "paths", "tips"):
+                self.db.execute(f"DELETE FROM {table}")
+            self.db.executemany("INSERT INTO meta VALUES (?, ?)",
+                                [("schema_version", str(SCHEMA_VERSION)), ("rules", RULESET_VERSION)])
+
+    def tips(self) -> list[str]:
+        return [row[0] for row in self.db.execute("SELECT sha FROM tips")]
+
+    def scanned(self, shas: Iterable[str]) -> set[str]:
+        known = set()
+        shas = list(shas)
+        for i in range(0, len(shas), 500):
+            batch = shas[i:i + 500]
+            known.update(row[0] for row in self.db.execute(
+                f"SELECT sha FROM blobs WHERE sha IN ({','.join('?' * len(batch))})", batch))
+        return known
+
+    def record(self, blobs: list[str], findings: list[tuple[str, int, str, str]],
+               paths: list[tuple[str, str]], tips: list[str]) -> None:
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO blobs VALUES (?)", [(s,) for s in blobs])
+            self.db.executemany("INSERT INTO findings VALUES (?, ?, ?, ?)", findings)
+            self.db.executemany("INSERT OR IGNORE INTO paths VALUES (?, ?)", paths)
+            self.db.execute("DELETE FROM tips")
+            self.db.executemany("INSERT OR IGNORE INTO tips VALUES (?)", [(t,) for t in tips])
+
+    def all_findings(self) -> list[tuple[str, int, str, str]]:
+        return self.db.execute("SELECT sha, line, rule, excerpt FROM findings ORDER BY sha, line").fetchall()
+
+    def paths(self, sha: str) -> list[str]:
+        return [row[0] for row in self.db.execute("SELECT path FROM paths WHERE sha = ? ORDER BY path", (sha,))]
+
+    def close(self) -> None:
+        self.db.close()
+
+
+# =============================================================================
+# Scan
+# =============================================================================
+
+
+@dataclass
+class Finding:
+    """One credible secret in one blob"""
+
+    path: str
+    line: int
+    rule: str
+    excerpt: str
+    blob: str
+    in_head: bool
+
+
+@dataclass
+class ScanResult:
+    """Findings (exclusions applied) and the cost of the scan"""
+
+    findings: list[Finding] = field(default_factory=list)
+    objects_listed: int = 0
+    blobs_scanned: int = 0
+    bytes_scanned: int = 0
+    cached: bool = False
+    duration_s: float = 0.0
+
+
+def scan_repository(repo: Path = Path("."), history: bool = True, cache_path: Optional[Path] = None,
+                    use_cache: bool = True) -> ScanResult:
+    """Scan the blobs of `repo` (all refs, or HEAD), reading only blobs not in the cache.
+
+    Raises:
+        subprocess.CalledProcessError: If git fails (e.g. not a repository)
+    """
+    started = time.monotonic()
+    repo = Path(git(repo, "rev-parse", "--show-toplevel").strip())
+    result = ScanResult(cached=use_cache)
+    if use_cache:
+        cache_path = cache_path or Path(git(repo, "rev-parse", "--absolute-git-dir").strip()) / CACHE_NAME
+    cache = ScanCache(cache_path if use_cache else Path(":memory:"))
+    try:
+        tips = git(repo, "rev-parse", *(["--all"] if history else ["HEAD"])).split()
+        old_tips = cache.tips() if history else []
+        try:
+            listed = list(list_blobs(repo, history, old_tips))
+        except subprocess.CalledProcessError:  # a cached tip is gone (rewritten history, gc)
+            listed = list(list_blobs(repo, history))
+        current = head_paths(repo)
+        result.objects_listed = len(listed)
+
+        paths = [(sha, path) for sha, path in listed] + [(sha, p) for sha, ps in current.items() for p in ps]
+        candidates = list(dict.fromkeys(sha for sha, _ in paths))
+        todo = [sha for sha in candidates if sha not in cache.scanned(candidates)] if candidates else []
+        scanned, findings = [], []
+        for sha, content in read_blobs(repo, todo):
+            scanned.append(sha)
+            if content is None or b"\0" in content[:BINARY_SNIFF]:
+                continue
+            result.blobs_scanned += 1
+            result.bytes_scanned += len(content)
+            for line, rule, excerpt in scan_text(content.decode("utf-8", "replace")):
+                findings.append((sha, line, rule, excerpt))
+        cache.record(scanned, findings, paths, tips)
+
+        for sha, line, rule, excerpt in cache.all_findings():
+            if not history and sha not in current:
+                continue
+            visible = [p for p in cache.paths(sha) if not is_excluded(p)]
+            if visible:
+                result.findings.append(Finding(visible[0], line, rule, excerpt, sha[:12], sha in current))
+    finally:
+        cache.close()
+    result.duration_s = time.monotonic() - started
+    return result
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def report_text(result: ScanResult) -> str:
+    lines = []
+    for f in result.findings:
+        where = "HEAD" if f.in_head else f"history {f.blob}"
+        lines.append(f"{f.path}:{f.line}: [{f.rule}] {f.excerpt}  ({where})")
+    lines.append("")
+    lines.append(
+        f"{len(result.findings)} finding(s); {result.objects_listed} objects listed, {result.blobs_scanned} blobs "
+        f"({result.bytes_scanned / 1024:.0f} KiB) scanned in {result.duration_s:.2f}s"
+        f"{'' if result.cached else ' (no cache)'}"
+    )
+    return "\n".join(lines)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Scan git history for committed secrets",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--repo", type=Path, default=Path("."), help="Repository to scan")
+    parser.add_argument("--no-history", action="store_true", help="Scan HEAD only")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or update the blob cache")
+    parser.add_argument("--cache", type=Path, help=f"Cache path (default .git/{CACHE_NAME})")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    try:
+        result = scan_repository(args.repo, not args.no_history, args.cache, not args.no_cache)
+    except subprocess.CalledProcessError as e:
+        print(f"ERROR: git {' '.join(e.cmd[3:5])}: {(e.stderr or '').strip() or f'exit {e.returncode}'}",
+              file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps({**asdict(result), "count": len(result.findings)}, indent=2))
+    else:
+        print(report_text(result))
+    return 1 if result.findings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+"""
+Warm Site Pool for Press SaaS Platform
+
+This script keeps a pool of pre-provisioned, unclaimed sites so a signup gets
+a working site in seconds instead of waiting for provisioning. Pool sites are
+created from the provisioning template (provision_sites.py) under throwaway
+names; claiming one pops it from a Redis list (LPOP, atomic, O(1)), renames its
+site directory to the tenant's name and sets its Administrator password.
+A replenish job, run every minute by ofelia on the queue-long container
+(overrides/compose.site-pool.yaml), tops the pool back up to its target size.
+
+Features:
+- Pool state in redis-queue (persistent, unlike the LRU cache instance): ready
+  list, per-site metadata, claim records, counters
+- Claim: LPOP, rename, new Administrator password; `--fallback` provisions the
+  site directly when the pool is empty. claim_site() returns a Site record
+  shaped like the createSite response of contracts/press-api.yaml
+- Replenishment rate limiting so refills never starve the database: a Redis
+  token bucket (sites per minute, burst), --max-per-run, --workers, and a skip
+  while PostgreSQL already has more than --max-active-db active backends
+- A Redis lock so overlapping job runs never double-provision
+- Pool sites built from an outdated template are retired on replenish
+- Metrics: pool depth, target, claims, misses, refills, failures, throttles,
+  claim latency histogram, as Prometheus text (--metrics) or JSON
+
+Usage:
+    # Pool status and metrics
+    python scripts/site_pool.py --status
+    python scripts/site_pool.py --metrics
+
+    # Top up to 10 ready sites (what the ofelia job runs)
+    ADMIN_PASSWORD=... DB_PASSWORD=... python scripts/site_pool.py --replenish --target 10
+
+    # Claim a site for a new tenant (acme.localhost)
+    ADMIN_PASSWORD=... python scripts/site_pool.py --claim acme --fallback
+
+Addresses: SC-002, NFR-002
+"""
+
+import argparse
+import json
+import os
+import re
+import secrets
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lib import pgwire, resp  # noqa: E402
+from scripts.lib.bench import DEFAULT_BACKEND, DEFAULT_ENGINE, Bench, BenchError  # noqa: E402
+from scripts.lib.stats import percentile  # noqa: E402
+from scripts.provision_sites import (  # noqa: E402
+    DEFAULT_TEMPLATE,
+    SITE_NAME,
+    ProvisionError,
+    Provisioner,
+    Template,
+    apps_fingerprint,
+    db_name_for,
+    hash_password,
+    load_template,
+    quote_literal,
+)
+
+
+KEY_PREFIX = "fcs:site-pool"
+DEFAULT_TARGET = 5
+DEFAULT_DOMAIN = "localhost"
+POOL_LABEL = "pool-"
+LOCK_TTL_MS = 30 * 60 * 1000
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60)
+LATENCY_SAMPLES = 1000
+TENANT_NAME = re.compile(r"^[a-z0-9][a-z0-9-]{0,62}[a-z0-9]$")
+
+# KEYS[1] bucket; ARGV rate (tokens/s), burst, now (ms), wanted -> tokens granted
+TOKEN_BUCKET = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local rate, burst, now, wanted = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) / 1000 * rate)
+local granted = math.min(wanted, math.floor(tokens))
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - granted), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], 86400000)
+return granted
+"""
+# KEYS[1] lock; ARGV[1] owner token
+RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+return 0
+"""
+
+
+class PoolEmpty(Exception):
+    """No ready site to claim."""
+
+
+class SiteExists(Exception):
+    """The requested site name is taken (HTTP 409 for the API)."""
+
+
+# =============================================================================
+# Redis state
+# =============================================================================
+
+
+class PoolStore:
+    """Pool state and counters in Redis, every key under KEY_PREFIX"""
+
+    def __init__(self, conn: resp.RedisConnection, prefix: str = KEY_PREFIX):
+        self.conn = conn
+        self.prefix = prefix
+
+    def key(self, *parts: str) -> str:
+        return ":".join((self.prefix,) + parts)
+
+    # ready list: RPUSH on refill, LPOP on claim (oldest first)
+    def ready(self) -> list[str]:
+        return self.conn.command("LRANGE", self.key("ready"), 0, -1) or []
+
+    def depth(self) -> int:
+        return int(self.conn.command("LLEN", self.key("ready")))
+
+    def pop(self) -> Optional[str]:
+        return self.conn.command("LPOP", self.key("ready"))
+
+    def push(self, site: str, meta: dict) -> None:
+        self.conn.pipeline([
+            ("HSET", self.key("site", site), *[x for kv in meta.items() for x in kv]),
+            ("RPUSH", self.key("ready"), site),
+        ])
+
+    def put_back(self, site: str) -> None:
+        self.conn.command("LPUSH", self.key("ready"), site)
+
+    def remove(self, site: str) -> bool:
+        removed = int(self.conn.command("LREM", self.key("ready"), 0, site))
+        self.conn.command("DEL", self.key("site", site))
+        return removed > 0
+
+    def meta(self, site: str) -> dict:
+        values = self.conn.command("HGETALL", self.key("site", site)) or []
+        return dict(zip(values[::2], values[1::2]))
+
+    def record_claim(self, record: dict, pool_site: str) -> None:
+        self.conn.pipeline([
+            ("HSET", self.key("claimed"), record["domain"], json.dumps(record)),
+            ("DEL", self.key("site", pool_site)),
+        ])
+
+    # counters and latency histogram
+    def incr(self, counter: str, amount: int = 1) -> None:
+        self.conn.command("HINCRBY", self.key("metrics"), counter, amount)
+
+    def observe_claim(self, seconds: float) -> None:
+        commands = [
+            ("HINCRBYFLOAT", self.key("metrics"), "claim_seconds_sum", f"{seconds:.6f}"),
+            ("HINCRBY", self.key("metrics"), "claim_seconds_count", 1),
+            ("LPUSH", self.key("claim-latency"), f"{seconds:.6f}"),
+            ("LTRIM", self.key("claim-latency"), 0, LATENCY_SAMPLES - 1),
+        ]
+        for bound in LATENCY_BUCKETS:
+            if seconds <= bound:
+                commands.append(("HINCRBY", self.key("metrics"), f"claim_le_{bound}", 1))
+        self.conn.pipeline(commands)
+
+    def metrics(self) -> dict[str, float]:
+        values = self.conn.command("HGETALL", self.key("metrics")) or []
+        return {k: float(v) for k, v in zip(values[::2], values[1::2])}
+
+    def recent_latencies(self) -> list[float]:
+        return [float(v) for v in self.conn.command("LRANGE", self.key("claim-latency"), 0, -1) or []]
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self.conn.command("HSET", self.key("gauges"), name, value)
+
+    def gauges(self) -> dict[str, float]:
+        values = self.conn.command("HGETALL", self.key("gauges")) or []
+        return {k: float(v) for k, v in zip(values[::2], values[1::2])}
+
+    # replenishment rate limit and mutual exclusion
+    def take_tokens(self, wanted: int, per_minute: float, burst: int) -> int:
+        return int(self.conn.command("EVAL", TOKEN_BUCKET, 1, self.key("bucket"), per_minute / 60, burst,
+                                     int(time.time() * 1000), wanted))
+
+    def acquire_lock(self, ttl_ms: int = LOCK_TTL_MS) -> Optional[str]:
+        token = secrets.token_hex(8)
+        return token if self.conn.command("SET", self.key("lock"), token, "NX", "PX", ttl_ms) == "OK" else None
+
+    def release_lock(self, token: str) -> None:
+        self.conn.command("EVAL", RELEASE_LOCK, 1, self.key("lock"), token)
+
+
+# =============================================================================
+# Pool
+# =============================================================================
+
+
+@dataclass
+class ReplenishResult:
+    target: int
+    depth_before: int = 0
+    depth_after: int = 0
+    wanted: int = 0
+    granted: int = 0
+    created: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    retired: list[str] = field(default_factory=list)
+    skipped: str = ""
+    duration_s: float = 0.0
+
+
+@dataclass
+class ClaimResult:
+    site: dict
+    pool_site: str
+    from_pool: bool
+    latency_s: float
+
+
+def pool_site_name(domain: str) -> str:
+    return f"{POOL_LABEL}{secrets.token_hex(4)}.{domain}"
+
+
+def tenant_domain(name: str, domain: str) -> str:
+    """API names are DNS labels (contracts/press-api.yaml); the site is <name>.<domain>"""
+    return name if "." in name else f"{name}.{domain}"
+
+
+class SitePool:
+    """Replenishes and claims pool sites of one bench"""
+
+    def __init__(self, bench: Bench, store: PoolStore, provisioner: Provisioner, domain: str = DEFAULT_DOMAIN):
+        self.bench = bench
+        self.store = store
+        self.provisioner = provisioner
+        self.domain = domain
+
+    @property
+    def template(self) -> Template:
+        return self.provisioner.template
+
+    def _active_backends(self) -> int:
+        p = self.provisioner
+        with pgwire.connect(p.pg_host, p.pg_port, p.pg_user, p.pg_password, "postgres") as conn:
+            rows = conn.query("SELECT count(*) AS n FROM pg_stat_activity "
+                              "WHERE state <> 'idle' AND backend_type = 'client backend' AND pid <> pg_backend_pid()")
+        return int(rows[0]["n"] or 0)
+
+    def retire_stale(self, limit: int) -> list[str]:
+        """Drop up to `limit` ready sites built from another template than the current one"""
+        retired = []
+        for site in self.store.ready():
+            if len(retired) >= limit:
+                break
+            if self.store.meta(site).get("fingerprint") == self.template.fingerprint:
+                continue
+            if self.store.remove(site):
+                self.provisioner.rollback(site, db_name_for(site), created_dir=True)
+                retired.append(site)
+        return retired
+
+    def replenish(self, target: int, per_minute: float, burst: int, max_per_run: int, workers: int,
+                  max_active_db: int) -> ReplenishResult:
+        """Top the pool up towards `target`, within the rate limit.
+
+        Raises:
+            OSError, pgwire.PgError, resp.RespError: Redis or PostgreSQL unreachable.
+        """
+        started = time.monotonic()
+        result = ReplenishResult(target)
+        token = self.store.acquire_lock()
+        if token is None:
+            result.skipped = "another replenish run holds the lock"
+            return result
+        try:
+            result.retired = self.retire_stale(max_per_run)
+            result.depth_before = self.store.depth()
+            result.wanted = max(0, min(target - result.depth_before, max_per_run))
+            if result.wanted == 0:
+                return result
+            active = self._active_backends()
+            if active > max_active_db:
+                result.skipped = f"database busy ({active} active backends > {max_active_db})"
+                self.store.incr("replenish_throttled_total")
+                return result
+            result.granted = self.store.take_tokens(result.wanted, per_minute, burst)
+            if result.granted == 0:
+                result.skipped = f"rate limited ({per_minute:g} sites/min, burst {burst})"
+                self.store.incr("replenish_throttled_total")
+                return result
+
+            names = [pool_site_name(self.domain) for _ in range(result.granted)]
+            for provision in self.provisioner.run(names, workers):
+                if provision.status == "success":
+                    self.store.push(provision.site, {
+                        "fingerprint": self.template.fingerprint,
+                        "template": self.template.site,
+                        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                        "provision_s": f"{provision.total_s:.3f}",
+                    })
+                    self.store.incr("replenished_total")
+                    self.store.conn.command("HINCRBYFLOAT", self.store.key("metrics"), "provision_seconds_sum",
+                                            f"{provision.total_s:.6f}")
+                    result.created.append(provision.site)
+                else:
+                    self.store.incr("replenish_failures_total")
+                    result.failed[provision.site] = provision.error
+        finally:
+            result.depth_after = self.store.depth()
+            self.store.set_gauge("target", target)
+            self.store.release_lock(token)
+            result.duration_s = time.monotonic() - started
+        return result
+
+    def _rename(self, pool_site: str, domain: str) -> bool:
+        """Move the pool site's directory to `domain`; False if the pool site is gone"""
+        result = self.bench.run(["sh", "-c", 'cd sites && { [ -e "$2" ] && exit 3; [ -d "$1" ] || exit 4; '
+                                             'mv "$1" "$2"; }', "sh", pool_site, domain], check=False)
+        if result.returncode == 3:
+            raise SiteExists(f"site {domain} already exists")
+        if result.returncode == 4:
+            return False
+        if result.returncode != 0:
+            raise BenchError(f"mv {pool_site} {domain}: {(result.stderr or result.stdout).strip()}")
+        return True
+
+    def _pop_ready(self, domain: str) -> Optional[str]:
+        """Oldest ready site, renamed to `domain`; ready sites whose directory vanished are dropped"""
+        while True:
+            pool_site = self.store.pop()
+            if pool_site is None:
+                return None
+            try:
+                if self._rename(pool_site, domain):
+                    return pool_site
+            except (SiteExists, BenchError):
+                self.store.put_back(pool_site)
+                raise
+            self.store.remove(pool_site)
+            self.provisioner.rollback(pool_site, db_name_for(pool_site), created_dir=False)
+
+    def _set_admin_password(self, domain: str, admin_password: str) -> str:
+        config = self.bench.site_configs([domain])[domain]
+        p = self.provisioner
+        with pgwire.connect(p.pg_host, p.pg_port, config.db_name, config.db_password, config.db_name) as conn:
+            conn.query(f'UPDATE "__Auth" SET password = {quote_literal(hash_password(admin_password))} '
+                       "WHERE doctype = 'User' AND name = 'Administrator' AND fieldname = 'password'")
+        return config.db_name
+
+    def claim(self, name: str, admin_password: str, display_name: str = "", fallback: bool = False) -> ClaimResult:
+        """Turn a ready pool site into the tenant's site.
+
+        Raises:
+            SiteExists: The name is taken.
+            PoolEmpty: No ready site and no `fallback`.
+            ProvisionError: The fallback provisioning failed.
+            BenchError, OSError, pgwire.PgError, resp.RespError: Infrastructure errors.
+        """
+        started = time.monotonic()
+        domain = tenant_domain(name, self.domain)
+        if domain in self.bench.list_sites():
+            raise SiteExists(f"site {domain} already exists")
+        pool_site = self._pop_ready(domain)
+        if pool_site is None:
+            self.store.incr("claim_misses_total")
+            if not fallback:
+                raise PoolEmpty("no ready site in the pool")
+            # per call: the provisioner is shared by concurrent claims and the replenisher
+            provision = self.provisioner.provision(domain, admin_password)
+            if provision.status != "success":
+                raise ProvisionError(provision.error)
+            db_name = provision.db_name
+        else:
+            db_name = self._set_admin_password(domain, admin_password)
+
+        latency = time.monotonic() - started
+        record = {
+            "id": str(uuid.uuid4()),
+            "name": name,
+            "display_name": display_name or name,
+            "domain": domain,
+            "schema_name": db_name,
+            "status": "running",
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "deleted_at": None,
+            "retention_until": None,
+            "apps": self.template.apps,
+        }
+        self.store.record_claim(record, pool_site or "")
+        self.store.incr("claims_total")
+        self.store.observe_claim(latency)
+        return ClaimResult(record, pool_site or "", pool_site is not None, latency)
+
+
+def claim_site(pool: SitePool, name: str, admin_password: str, display_name: str = "",
+               fallback: bool = True) -> dict:
+    """createSite (POST /api/sites) backend: the Site record of a claimed pool site.
+
+    Raises:
+        ValueError: `name` does not match the contract's DNS-safe pattern (400).
+        SiteExists: The name is taken (409).
+        PoolEmpty: The pool is empty and `fallback` is off.
+    """
+    if not TENANT_NAME.match(name):
+        raise ValueError("Site name must be alphanumeric with hyphens only")
+    return pool.claim(name, admin_password, display_name, fallback).site
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+
+def status(store: PoolStore) -> dict:
+    metrics, gauges = store.metrics(), store.gauges()
+    latencies = sorted(store.recent_latencies())
+
+    def pct(p: float) -> Optional[float]:
+        return round(percentile(latencies, p), 3) if latencies else None
+
+    return {
+        "depth": store.depth(),
+        "target": int(gauges.get("target", 0)),
+        "ready": store.ready(),
+        "claims_total": int(metrics.get("claims_total", 0)),
+        "claim_misses_total": int(metrics.get("claim_misses_total", 0)),
+        "replenished_total": int(metrics.get("replenished_total", 0)),
+        "replenish_failures_total": int(metrics.get("replenish_failures_total", 0)),
+        "replenish_throttled_total": int(metrics.get("replenish_throttled_total", 0)),
+        "claim_latency_p50_s": pct(50),
+        "claim_latency_p95_s": pct(95),
+        "claim_latency_max_s": round(latencies[-1], 3) if latencies else None,
+    }
+
+
+def prometheus(store: PoolStore) -> str:
+    """Pool metrics in the Prometheus text exposition format"""
+    metrics, gauges = store.metrics(), store.gauges()
+    lines = [
+        "# HELP fcs_site_pool_depth Ready (unclaimed) sites in the pool",
+        "# TYPE fcs_site_pool_depth gauge",
+        f"fcs_site_pool_depth {store.depth()}",
+        "# HELP fcs_site_pool_target Pool size the replenish job aims for",
+        "# TYPE fcs_site_pool_target gauge",
+        f"fcs_site_pool_target {int(gauges.get('target', 0))}",
+    ]
+    for name, help_text in (
+        ("claims_total", "Sites claimed"),
+        ("claim_misses_total", "Claims that found the pool empty"),
+        ("replenished_total", "Pool sites provisioned"),
+        ("replenish_failures_total", "Pool sites that failed to provision"),
+        ("replenish_throttled_total", "Replenish runs held back by the rate limit or database load"),
+    ):
+        lines += [f"# HELP fcs_site_pool_{name} {help_text}", f"# TYPE fcs_site_pool_{name} counter",
+                  f"fcs_site_pool_{name} {int(metrics.get(name, 0))}"]
+    lines += ["# HELP fcs_site_pool_claim_seconds Time to claim a site",
+              "# TYPE fcs_site_pool_claim_seconds histogram"]
+    for bound in LATENCY_BUCKETS:
+        lines.append(f'fcs_site_pool_claim_seconds_bucket{{le="{bound}"}} {int(metrics.get(f"claim_le_{bound}", 0))}')
+    count = int(metrics.get("claim_seconds_count", 0))
+    lines += [f'fcs_site_pool_claim_seconds_bucket{{le="+Inf"}} {count}',
+              f"fcs_site_pool_claim_seconds_sum {metrics.get('claim_seconds_sum', 0.0):.6f}",
+              f"fcs_site_pool_claim_seconds_count {count}"]
+    return "\n".join(lines) + "\n"
+
+
+def report_replenish(result: ReplenishResult) -> str:
+    lines = [f"Pool {result.depth_before} -> {result.depth_after} ready (target {result.target}), "
+             f"{len(result.created)} created, {len(result.failed)} failed in {result.duration_s:.1f}s"]
+    if result.retired:
+        lines.append(f"Retired {len(result.retired)} site(s) built from an older template")
+    if result.skipped:
+        lines.append(f"Skipped: {result.skipped}")
+    for site, error in result.failed.items():
+        lines.append(f"  {site}: {error}")
+    return "\n".join(lines)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Keep a warm pool of pre-provisioned sites and claim them for new tenants",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--replenish", action="store_true", help="Top the pool up to --target")
+    action.add_argument("--claim", metavar="NAME", help="Claim a pool site for NAME (or NAME.<domain>)")
+    action.add_argument("--status", action="store_true", help="Pool depth, counters and claim latency")
+    action.add_argument("--metrics", action="store_true", help="Prometheus text format")
+    parser.add_argument("--target", type=int, default=int(os.environ.get("SITE_POOL_TARGET", DEFAULT_TARGET)))
+    parser.add_argument("--rate", type=float, default=2.0, help="Sites provisioned per minute at most")
+    parser.add_argument("--burst", type=int, default=4, help="Sites that may be provisioned back to back")
+    parser.add_argument("--max-per-run", type=int, default=4, help="Sites provisioned per replenish run at most")
+    parser.add_argument("--workers", type=int, default=2, help="Sites provisioned concurrently")
+    parser.add_argument("--jobs", type=int, default=2, help="pg_restore --jobs per site")
+    parser.add_argument("--max-active-db", type=int, default=20,
+                        help="Skip replenishing while PostgreSQL has more active backends")
+    parser.add_argument("--display-name", default="", help="Display name of the claimed site")
+    parser.add_argument("--fallback", action="store_true", help="Provision directly when the pool is empty")
+    parser.add_argument("--domain", default=DEFAULT_DOMAIN, help="Domain of pool and tenant sites")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, help="Template site name")
+    parser.add_argument("--redis-host", default="localhost")
+    parser.add_argument("--redis-port", type=int, default=48511, help="redis-queue (persistent)")
+    parser.add_argument("--pg-host", default="localhost", help="PostgreSQL host as seen from here")
+    parser.add_argument("--pg-port", type=int, default=48532)
+    parser.add_argument("--pg-user", default="postgres")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE, help="Container engine, or 'local' inside the bench")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND)
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    if args.claim and not (TENANT_NAME.match(args.claim) or SITE_NAME.match(args.claim)):
+        parser.error(f"invalid site name {args.claim!r}")
+
+    try:
+        conn = resp.connect(args.redis_host, args.redis_port, os.environ.get("REDIS_PASSWORD"))
+    except (OSError, resp.RespError) as e:
+        print(f"ERROR: redis {args.redis_host}:{args.redis_port}: {e}", file=sys.stderr)
+        return 1
+    store = PoolStore(conn)
+    try:
+        if args.status:
+            data = status(store)
+            if args.json:
+                print(json.dumps(data, indent=2))
+            else:
+                for key, value in data.items():
+                    print(f"{key:<28}{', '.join(value) if isinstance(value, list) else value}")
+            return 0
+        if args.metrics:
+            print(prometheus(store), end="")
+            return 0
+
+        bench = Bench(args.engine, args.backend)
+        template = load_template(bench, args.template)
+        if args.replenish:
+            fingerprint, _ = apps_fingerprint(bench)
+            if fingerprint != template.fingerprint:
+                raise ProvisionError(f"apps changed since template {template.site} was built: "
+                                     "rebuild it (provision_sites.py --build-template) before refilling the pool")
+        admin_password = os.environ.get("ADMIN_PASSWORD")
+        if args.claim and not admin_password:
+            raise ProvisionError("ADMIN_PASSWORD must be set (Administrator password of the claimed site)")
+        provisioner = Provisioner(bench, template, args.pg_host, args.pg_port, args.pg_user,
+                                  os.environ.get("DB_PASSWORD"), admin_password or secrets.token_urlsafe(24),
+                                  args.jobs)
+        pool = SitePool(bench, store, provisioner, args.domain)
+
+        if args.replenish:
+            result = pool.replenish(args.target, args.rate, args.burst, args.max_per_run, args.workers,
+                                    args.max_active_db)
+            print(json.dumps(asdict(result), indent=2) if args.json else report_replenish(result))
+            return 1 if result.failed else 0
+
+        claimed = pool.claim(args.claim, admin_password, args.display_name, args.fallback)
+        if args.json:
+            print(json.dumps({**claimed.site, "pool_site": claimed.pool_site,
+                              "latency_s": round(claimed.latency_s, 3)}, indent=2))
+        else:
+            source = f"pool site {claimed.pool_site}" if claimed.from_pool else "provisioned (pool empty)"
+            print(f"{claimed.site['domain']}: {source}, ready in {claimed.latency_s:.2f}s")
+        return 0
+    except SiteExists as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 3
+    except PoolEmpty as e:
+        print(f"ERROR: {e} (retry later, or pass --fallback)", file=sys.stderr)
+        return 4
+    except (OSError, BenchError, ProvisionError, pgwire.PgError, resp.RespError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Compose Validator for Press SaaS Platform
+
+This script validates the compose project against the constitution and the
+NFRs. compose.yaml and every overrides/*.yaml are parsed once into an
+in-memory merged model (scripts/lib/compose_model.py) and each check is a
+rule over that model, instead of one shell script per check re-finding and
+grepping every YAML file. Parsed files are cached by sha256, so an unchanged
+tree validates in a few milliseconds.
+
+Features:
+- ports: every published host port (ranges, host IPs, long syntax and
+  ${VAR:-default} interpolation included) inside 48510-49800
+- names: every container named fcs-press-* (container_name, or the service
+  name when no container_name is set); the frappe services of COMPOSE_NAMED
+  keep compose's <project>-<service>-N names and LEGACY_CONTAINER_NAMES keep
+  the hostnames other stacks use; both are reported as warnings
+- consistency: NFR values cross-checked between spec.md, tasks.md and the
+  compose model (boot time, site count, documented and published ports,
+  healthcheck start periods, NFR identifiers)
+- File and line of each offending value, after overrides are merged
+- Text or JSON output; scripts/validate_*.sh are thin wrappers over one rule
+
+Usage:
+    # Run every rule
+    python scripts/validate_compose.py
+
+    # Only the port range rule
+    python scripts/validate_compose.py --rule ports
+
+    # Interpolate with a specific env file, output as JSON for CI
+    python scripts/validate_compose.py --env-file .env.example --json
+
+Exit codes:
+    0 - All rules passed
+    1 - Consistency errors
+    2 - Port range or container name violations, or a compose file is
+        missing or cannot be parsed
+
+Addresses: FR-008, CHK011
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lib.compose_model import ComposeError, ComposeModel, load_model  # noqa: E402
+
+
+ROOT = Path(__file__).resolve().parent.parent
+PORT_MIN = 48510
+PORT_MAX = 49800
+CONTAINER_PREFIX = "fcs-press-"
+# Services allowed to keep compose's <project>-<service>-N container names:
+# scripts and docs address them as frappe_docker_git-<service>-1, and the
+# queue workers are scaled with --scale, which a fixed container_name forbids
+COMPOSE_NAMED = ("configurator", "backend", "websocket", "queue-short", "queue-long", "scheduler")
+# container_names other stacks reach as a hostname, kept as they are
+LEGACY_CONTAINER_NAMES = ("mariadb-database",)
+SPEC_DIR = Path("specs/001-press-saas-platform")
+SPEC_FILE = SPEC_DIR / "spec.md"
+TASKS_FILE = SPEC_DIR / "tasks.md"
+
+# Service -> host port documented in spec.md; critical ones must be published
+EXPECTED_PORTS = {
+    "Press/Traefik HTTPS": 48543,
+    "PostgreSQL": 48532,
+    "Redis Queue": 48511,
+    "Redis Cache": 48579,
+    "MinIO API": 48590,
+    "MinIO Console": 48591,
+    "Keycloak": 48595,
+    "Press Manager": 48550,
+}
+CRITICAL_PORTS = (48543, 48532, 48590)
+NFR_IDS = ("NFR-001", "NFR-002", "NFR-003", "NFR-004", "NFR-005")
+
+BOOT_TIME_SPEC = re.compile(r"2\s*minutes?|120\s*seconds?|<\s*2\s*min", re.IGNORECASE)
+BOOT_TIME_TASKS = re.compile(r"2\s*minutes?|120\s*seconds?|NFR-001", re.IGNORECASE)
+SITE_COUNT_SPEC = re.compile(r"10\+?\s*sites?|at\s*least\s*10|10\s*simultaneous", re.IGNORECASE)
+SITE_COUNT_TASKS = re.compile(r"10\+?\s*sites?|NFR-002|multi.?site", re.IGNORECASE)
+
+
+# =============================================================================
+# Findings
+# =============================================================================
+
+
+@dataclass
+class Finding:
+    """One rule result; file/line point at the offending value when known"""
+
+    rule: str
+    level: str  # ok, warning, error
+    message: str
+    file: str = ""
+    line: int = 0
+
+    @property
+    def location(self) -> str:
+        if not self.file:
+            return ""
+        return f"{self.file}:{self.line}" if self.line else self.file
+
+
+@dataclass
+class Report:
+    rules: list[str]
+    files: int = 0
+    cached_files: int = 0
+    services: int = 0
+    duration_ms: float = 0.0
+    findings: list[Finding] = field(default_factory=list)
+
+    def errors(self, rule: Optional[str] = None) -> list[Finding]:
+        return [f for f in self.findings if f.level == "error" and rule in (None, f.rule)]
+
+    def warnings(self) -> list[Finding]:
+        return [f for f in self.findings if f.level == "warning"]
+
+
+# =============================================================================
+# Rules
+# =============================================================================
+
+
+def rule_ports(model: ComposeModel, root: Path) -> list[Finding]:
+    """Every published host port inside the constitution range"""
+    findings = []
+    for port in model.ports():
+        where = {"file": port.file, "line": port.line}
+        if port.unresolved:
+            findings.append(Finding("ports", "warning", f"service '{port.service}': {port.raw} uses unset "
+                                    f"variable(s) {', '.join(port.unresolved)}", **where))
+        if port.error:
+            findings.append(Finding("ports", "error", f"service '{port.service}': {port.error}", **where))
+            continue
+        for number in port.host_ports:
+            if not PORT_MIN <= number <= PORT_MAX:
+                findings.append(Finding("ports", "error", f"port {number} of service '{port.service}' ({port.raw}) "
+                                        f"is outside allowed range {PORT_MIN}-{PORT_MAX}", **where))
+    if not any(f.level == "error" for f in findings):
+        published = len(model.published_ports())
+        findings.append(Finding("ports", "ok", f"{published} published host port(s) inside {PORT_MIN}-{PORT_MAX}"))
+    return findings
+
+
+def rule_names(model: ComposeModel, root: Path) -> list[Finding]:
+    """Every container named with the fcs-press- prefix"""
+    findings = []
+    prefixed = 0
+    for service in model.services.values():
+        if service.container_name:
+            if service.container_name.startswith(CONTAINER_PREFIX):
+                prefixed += 1
+            elif service.container_name in LEGACY_CONTAINER_NAMES:
+                file, line = service.container_name_source
+                findings.append(Finding("names", "warning", f"container_name '{service.container_name}' of service "
+                                        f"'{service.name}' is kept as is (allowed: LEGACY_CONTAINER_NAMES)",
+                                        file, line))
+            else:
+                file, line = service.container_name_source
+                findings.append(Finding("names", "error", f"container_name '{service.container_name}' of service "
+                                        f"'{service.name}' does not start with '{CONTAINER_PREFIX}'", file, line))
+        elif service.name in COMPOSE_NAMED:
+            findings.append(Finding("names", "warning", f"service '{service.name}' keeps its compose project name "
+                                    "(allowed: COMPOSE_NAMED)", service.file, service.line))
+        elif service.name.startswith(CONTAINER_PREFIX):
+            prefixed += 1
+        else:
+            findings.append(Finding("names", "error", f"service '{service.name}' has no container_name and its name "
+                                    f"is not prefixed with '{CONTAINER_PREFIX}'", service.file, service.line))
+    if not any(f.level == "error" for f in findings):
+        allowed = len(model.services) - prefixed
+        findings.append(Finding("names", "ok", f"{prefixed} of {len(model.services)} containers use the "
+                                f"{CONTAINER_PREFIX} prefix" + (f", {allowed} allowlisted" if allowed else "")))
+    return findings
+
+
+def _read(path: Path) -> Optional[str]:
+    return path.read_text(encoding="utf-8", errors="replace") if path.is_file() else None
+
+
+def rule_consistency(model: ComposeModel, root: Path) -> list[Finding]:
+    """NFR values agree between spec.md, tasks.md and the compose model"""
+    findings = []
+
+    def add(level: str, message: str, file: Path | str = "", line: int = 0) -> None:
+        findings.append(Finding("consistency", level, message, str(file), line))
+
+    spec, tasks = _read(root / SPEC_FILE), _read(root / TASKS_FILE)
+    for path, text in ((SPEC_FILE, spec), (TASKS_FILE, tasks)):
+        if text is None:
+            add("error", f"{path} not found", path)
+
+    # NFR-001: boot time
+    if spec is not None:
+        if BOOT_TIME_SPEC.search(spec):
+            add("ok", "spec.md: boot time target found (2 minutes)", SPEC_FILE)
+        else:
+            add("warning", "spec.md: boot time target not explicitly stated", SPEC_FILE)
+    if tasks is not None:
+        if BOOT_TIME_TASKS.search(tasks):
+            add("ok", "tasks.md: boot time target referenced", TASKS_FILE)
+        else:
+            add("warning", "tasks.md: boot time target not found", TASKS_FILE)
+    start_periods = [(service.name, *period) for service in model.services.values() for period in service.start_periods]
+    if start_periods:
+        add("ok", f"compose: {len(start_periods)} healthcheck start_period(s) defined")
+    else:
+        add("warning", "compose: no explicit healthcheck start_period found")
+
+    # NFR-002: site count
+    if spec is not None:
+        if SITE_COUNT_SPEC.search(spec):
+            add("ok", "spec.md: site count target found (10+ sites)", SPEC_FILE)
+        else:
+            add("warning", "spec.md: site count target not explicitly stated", SPEC_FILE)
+    if tasks is not None:
+        if SITE_COUNT_TASKS.search(tasks):
+            add("ok", "tasks.md: site count requirement referenced", TASKS_FILE)
+        else:
+            add("warning", "tasks.md: site count not referenced", TASKS_FILE)
+
+    # Ports: documented in spec.md and published by the compose model
+    published = model.published_ports()
+    for service, port in EXPECTED_PORTS.items():
+        if spec is not None:
+            if str(port) in spec:
+                add("ok", f"spec.md: port {port} ({service}) documented", SPEC_FILE)
+            else:
+                add("warning", f"spec.md: port {port} ({service}) not found in documentation", SPEC_FILE)
+        if port in published:
+            entry = published[port][0]
+            add("ok", f"compose: port {port} ({service}) published by '{entry.service}'", entry.file, entry.line)
+        elif port in CRITICAL_PORTS:
+            add("error", f"compose: critical port {port} ({service}) is not published by any service")
+        else:
+            add("warning", f"compose: port {port} ({service}) is not published by any service")
+
+    # Cross-document references
+    if tasks is not None:
+        if re.search(r"spec\.md|specification", tasks, re.IGNORECASE):
+            add("ok", "tasks.md references specification documents", TASKS_FILE)
+        else:
+            add("warning", "tasks.md does not explicitly reference spec.md", TASKS_FILE)
+    if spec is not None:
+        missing = [nfr for nfr in NFR_IDS if nfr not in spec]
+        if missing:
+            add("warning", f"spec.md: {', '.join(missing)} not defined", SPEC_FILE)
+        else:
+            add("ok", f"spec.md: {NFR_IDS[0]}..{NFR_IDS[-1]} defined", SPEC_FILE)
+    return findings
+
+
+RULES: dict[str, Callable[[ComposeModel, Path], list[Finding]]] = {
+    "ports": rule_ports,
+    "names": rule_names,
+    "consistency": rule_consistency,
+}
+EXIT_CODES = {"ports": 2, "names": 2, "consistency": 1}
+
+
+def validate(root: Path, rules: list[str], env_file: Optional[Path] = None,
+             use_cache: bool = True) -> Report:
+    """Build the compose model once and run the selected rules against it.
+
+    Raises:
+        ComposeError: A compose file is missing or cannot be parsed.
+    """
+    started = time.perf_counter()
+    model = load_model(root, use_cache=use_cache, env_file=env_file)
+    report = Report(rules, len(model.files), sum(f.cached for f in model.files), len(model.services))
+    for name in rules:
+        report.findings.extend(RULES[name](model, root))
+    report.duration_ms = (time.perf_counter() - started) * 1000
+    return report
+
+
+def default_env_file(root: Path) -> Path:
+    """.env as docker compose would use it, else the documented .env.example"""
+    env = root / ".env"
+    return env if env.is_file() else root / ".env.example"
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+
+def report_text(report: Report, verbose: bool = False) -> str:
+    labels = {"ok": "[OK]", "warning": "[WARN]", "error": "[ERROR]"}
+    lines = [f"Compose model: {report.files} file(s) ({report.cached_files} cached), "
+             f"{report.services} service(s), {report.duration_ms:.1f} ms"]
+    for rule in report.rules:
+        lines.append("")
+        lines.append(f"== {rule} ==")
+        for f in report.findings:
+            if f.rule != rule or (f.level == "ok" and not verbose and rule != "consistency"):
+                continue
+            location = f" ({f.location})" if f.location and f.level != "ok" else ""
+            lines.append(f"{labels[f.level]} {f.message}{location}")
+    errors, warnings = report.errors(), report.warnings()
+    lines.append("")
+    if errors:
+        lines.append(f"VALIDATION FAILED: {len(errors)} error(s), {len(warnings)} warning(s)")
+    else:
+        lines.append(f"VALIDATION PASSED: {len(warnings)} warning(s)")
+    return "\n".join(lines)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Validate compose files against the constitution and NFRs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--rule", action="append", choices=list(RULES),
+                        help="Rule to run (repeatable, default: all)")
+    parser.add_argument("--root", type=Path, default=ROOT, help="Project root holding compose.yaml")
+    parser.add_argument("--env-file", type=Path, help="Interpolation variables (default .env, else .env.example)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every file")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Also list passing checks")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    rules = list(dict.fromkeys(args.rule or RULES))
+    try:
+        report = validate(args.root, rules, args.env_file or default_env_file(args.root), not args.no_cache)
+    except ComposeError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps({**asdict(report), "errors": len(report.errors()), "warnings": len(report.warnings())},
+                         indent=2))
+    else:
+        print(report_text(report, args.verbose))
+    return max((EXIT_CODES[rule] for rule in rules if report.errors(rule)), default=0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+#!/usr/bin/env bash
+# Renders an nginx template the way frappe_docker's nginx-entrypoint.sh does
+# (envsubst over the same variables) and checks it with `nginx -t` in a
+# throwaway container. Usage: validate_nginx_template.sh [template]
+set -euo pipefail
+
+ROOT=$(git rev-parse --show-toplevel 2>/dev/null || echo '.')
+template="${1:-$ROOT/overrides/nginx-cache.conf.template}"
+image="${NGINX_IMAGE:-nginx:1.27-alpine}"
+[ -f "$template" ] || { echo "ERROR: $template not found" >&2; exit 2; }
+command -v docker >/dev/null 2>&1 || { echo "docker not available - skipping nginx -t of $template"; exit 0; }
+
+# Upstreams must resolve inside the container, hence loopback addresses
+docker run --rm \
+  -e BACKEND=127.0.0.1:8000 \
+  -e SOCKETIO=127.0.0.1:9000 \
+  -e UPSTREAM_REAL_IP_ADDRESS=127.0.0.1 \
+  -e UPSTREAM_REAL_IP_HEADER=X-Forwarded-For \
+  -e UPSTREAM_REAL_IP_RECURSIVE=off \
+  -e 'FRAPPE_SITE_NAME_HEADER=$host' \
+  -e PROXY_READ_TIMEOUT=120 \
+  -e CLIENT_MAX_BODY_SIZE=50m \
+  -v "$(cd "$(dirname "$template")" && pwd)/$(basename "$template"):/tmp/frappe.conf.template:ro" \
+  "$image" sh -c '
+    envsubst "\${BACKEND} \${SOCKETIO} \${UPSTREAM_REAL_IP_ADDRESS} \${UPSTREAM_REAL_IP_HEADER} \
+      \${UPSTREAM_REAL_IP_RECURSIVE} \${FRAPPE_SITE_NAME_HEADER} \${PROXY_READ_TIMEOUT} \${CLIENT_MAX_BODY_SIZE}" \
+      < /tmp/frappe.conf.template > /etc/nginx/conf.d/default.conf
+    mkdir -p /var/lib/nginx /home/frappe/frappe-bench/sites
+    nginx -t
+  ' || { echo "ERROR: nginx -t rejected $template" >&2; exit 2; }
+
+echo "nginx template validation passed ($template, $image)."
@@ -2,12 +2,33 @@
 """
 Integration Tests - Press SaaS Platform Services
 Tests all Docker/Podman services for proper configuration and connectivity
+
+Container state, health and port bindings come from one `ps --format json`
+plus one batched `inspect`. PostgreSQL and Redis are probed over their
+published ports (scripts/lib/probes.py); only the in-network connectivity
+and site checks exec into containers. All probes run concurrently.
 """
 
+import io
+import json
+import os
 import subprocess
 import sys
+import threading
 import time
-from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.lib.probes import probe_postgres, probe_redis  # noqa: E402
+
+ENGINE = os.environ.get("CONTAINER_ENGINE", "podman")
+STACK_HOST = os.environ.get("STACK_HOST", "localhost")
+DB_PASSWORD = os.environ.get("DB_PASSWORD", "fcs_press_secure_password_2025")
+PROBE_TIMEOUT = 10
+MAX_WORKERS = 8
 
 class Colors:
     GREEN = '\033[92m'
@@ -16,46 +37,108 @@ class Colors:
     BLUE = '\033[94m'
     RESET = '\033[0m'
 
-def run_command(cmd: str) -> Tuple[int, str]:
-    """Execute shell command and return exit code and output"""
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+@dataclass
+class ContainerInfo:
+    """State of one container as reported by ps/inspect"""
+    name: str
+    health: str = ""
+    ports: List[str] = field(default_factory=list)
+
+def run_command(args: List[str], timeout: float = PROBE_TIMEOUT) -> Tuple[int, str]:
+    """Execute command (no shell) and return exit code and output"""
+    try:
+        result = subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+    except FileNotFoundError:
+        return 127, f"{args[0]}: command not found"
+    except subprocess.TimeoutExpired:
+        return 124, f"timed out after {timeout}s"
     return result.returncode, result.stdout + result.stderr
 
-def test_service_running(service_name: str, container_name: str) -> bool:
+def _parse_json_records(text: str) -> List[dict]:
+    """Parse a JSON array (podman) or one JSON object per line (docker)"""
+    text = text.strip()
+    if not text:
+        return []
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return data if isinstance(data, list) else [data]
+
+def _format_ports(ports: Dict[str, list]) -> List[str]:
+    """Render inspect port bindings like `podman port` does"""
+    bindings = []
+    for container_port, hosts in sorted((ports or {}).items()):
+        for host in hosts or []:
+            bindings.append(f"{container_port} -> {host.get('HostIp') or '0.0.0.0'}:{host.get('HostPort')}")
+    return bindings
+
+def load_inventory(container_names: List[str]) -> Dict[str, ContainerInfo]:
+    """Fetch running containers, health and port bindings in two engine calls"""
+    exit_code, output = run_command([ENGINE, "ps", "--format", "json"])
+    if exit_code != 0:
+        print(f"{Colors.RED}✗{Colors.RESET} {ENGINE} ps failed: {output.strip()}")
+        return {}
+
+    wanted = set(container_names)
+    running = []
+    for entry in _parse_json_records(output):
+        names = entry.get("Names") or []
+        if isinstance(names, str):
+            names = names.split(",")
+        running.extend(name for name in names if name in wanted)
+    if not running:
+        return {}
+
+    exit_code, output = run_command([ENGINE, "inspect", *running])
+    inventory = {name: ContainerInfo(name) for name in running}
+    if exit_code != 0:
+        print(f"{Colors.YELLOW}⚠{Colors.RESET} {ENGINE} inspect failed: {output.strip()}")
+        return inventory
+
+    for entry in _parse_json_records(output):
+        name = entry.get("Name", "").lstrip("/")
+        if name not in inventory:
+            continue
+        state = entry.get("State") or {}
+        health = state.get("Health") or state.get("Healthcheck") or {}
+        inventory[name].health = health.get("Status", "")
+        inventory[name].ports = _format_ports((entry.get("NetworkSettings") or {}).get("Ports"))
+    return inventory
+
+def test_service_running(service_name: str, container_name: str, inventory: Dict[str, ContainerInfo]) -> bool:
     """Test if a service container is running"""
     print(f"\n🔍 Testing {service_name}...")
 
-    # Check if container is running
-    exit_code, output = run_command(f"podman ps --filter 'name={container_name}' --format '{{{{.Names}}}}'")
-
-    if exit_code == 0 and container_name in output:
+    if container_name in inventory:
         print(f"  {Colors.GREEN}✓{Colors.RESET} Container {container_name} is running")
         return True
     else:
         print(f"  {Colors.RED}✗{Colors.RESET} Container {container_name} is NOT running")
         return False
 
-def test_service_health(service_name: str, container_name: str) -> bool:
+def test_service_health(service_name: str, container_name: str, inventory: Dict[str, ContainerInfo]) -> bool:
     """Test service health status"""
-    exit_code, output = run_command(f"podman inspect {container_name} --format '{{{{.State.Health.Status}}}}'")
+    health = inventory[container_name].health
 
-    if "healthy" in output.lower() or exit_code != 0:  # Some containers don't have health checks
+    if not health or health.lower() == "healthy":  # Some containers don't have health checks
         print(f"  {Colors.GREEN}✓{Colors.RESET} {service_name} health check passed")
         return True
     else:
-        print(f"  {Colors.YELLOW}⚠{Colors.RESET} {service_name} health status: {output.strip()}")
+        print(f"  {Colors.YELLOW}⚠{Colors.RESET} {service_name} health status: {health}")
         return True  # Don't fail if no health check defined
 
-def test_port_binding(service_name: str, container_name: str, expected_port: str) -> bool:
+def test_port_binding(service_name: str, container_name: str, expected_port: str,
+                      inventory: Dict[str, ContainerInfo]) -> bool:
     """Test if service port is properly bound"""
-    exit_code, output = run_command(f"podman port {container_name}")
+    ports = inventory[container_name].ports
 
-    if expected_port in output:
+    if any(binding.endswith(f":{expected_port}") for binding in ports):
         print(f"  {Colors.GREEN}✓{Colors.RESET} Port {expected_port} is properly bound")
         return True
     else:
         print(f"  {Colors.RED}✗{Colors.RESET} Port {expected_port} is NOT bound")
-        print(f"    Actual ports: {output.strip()}")
+        print(f"    Actual ports: {', '.join(ports) or 'none'}")
         return False
 
 def test_network_connectivity(container_name: str, target_service: str, port: str = None) -> bool:
@@ -64,15 +147,15 @@ def test_network_connectivity(container_name: str, target_service: str, port: st
 
     # Try TCP connection test instead of ping (more reliable)
     if port:
-        # Use nc (netcat) or timeout + bash TCP test
-        exit_code, output = run_command(
-            f"podman exec {container_name} timeout 2 bash -c 'cat < /dev/null > /dev/tcp/{target_service}/{port}' 2>/dev/null && echo OK || echo FAIL"
-        )
-        success = "OK" in output or exit_code == 0
+        # Use timeout + bash TCP test
+        exit_code, _ = run_command([
+            ENGINE, "exec", container_name, "timeout", "2",
+            "bash", "-c", f"cat < /dev/null > /dev/tcp/{target_service}/{port}",
+        ])
     else:
         # Fallback to ping if no port specified
-        exit_code, output = run_command(f"podman exec {container_name} ping -c 1 -W 2 {target_service} 2>/dev/null")
-        success = exit_code == 0
+        exit_code, _ = run_command([ENGINE, "exec", container_name, "ping", "-c", "1", "-W", "2", target_service])
+    success = exit_code == 0
 
     if success:
         print(f"  {Colors.GREEN}✓{Colors.RESET} Network connectivity to {target_service} OK")
@@ -85,38 +168,37 @@ def test_database_connection() -> bool:
     """Test PostgreSQL database connectivity"""
     print(f"\n🔍 Testing PostgreSQL connection...")
 
-    # Test from backend container
-    cmd = "podman exec frappe_docker_git-backend-1 bash -c \"PGPASSWORD=fcs_press_secure_password_2025 psql -h fcs-press-db -U postgres -c 'SELECT version();'\""
-    exit_code, output = run_command(cmd)
+    # Speak the wire protocol to the published port
+    result = probe_postgres(STACK_HOST, 48532, "postgres", DB_PASSWORD)
 
-    if exit_code == 0 and "PostgreSQL" in output:
-        print(f"  {Colors.GREEN}✓{Colors.RESET} PostgreSQL connection successful")
-        print(f"  Database version: {output.split('PostgreSQL')[1].split()[0]}")
+    if result.ok and "PostgreSQL" in result.detail:
+        print(f"  {Colors.GREEN}✓{Colors.RESET} PostgreSQL connection successful ({result.timings()})")
+        print(f"  Database version: {result.detail.split('PostgreSQL')[1].split()[0]}")
         return True
     else:
-        print(f"  {Colors.RED}✗{Colors.RESET} PostgreSQL connection failed")
+        print(f"  {Colors.RED}✗{Colors.RESET} PostgreSQL connection failed: {result.error}")
         return False
 
 def test_redis_connection(redis_name: str, port: str) -> bool:
     """Test Redis connectivity"""
     print(f"\n🔍 Testing Redis ({redis_name})...")
 
-    cmd = f"podman exec {redis_name} redis-cli ping"
-    exit_code, output = run_command(cmd)
+    result = probe_redis(STACK_HOST, int(port), name=redis_name)
 
-    if exit_code == 0 and "PONG" in output:
-        print(f"  {Colors.GREEN}✓{Colors.RESET} Redis {redis_name} is responding")
+    if result.ok:
+        print(f"  {Colors.GREEN}✓{Colors.RESET} Redis {redis_name} is responding ({result.timings()})")
         return True
     else:
-        print(f"  {Colors.RED}✗{Colors.RESET} Redis {redis_name} not responding")
+        print(f"  {Colors.RED}✗{Colors.RESET} Redis {redis_name} not responding: {result.error}")
         return False
 
 def test_frappe_site_exists() -> bool:
     """Test if Frappe site press.localhost exists"""
     print(f"\n🔍 Testing Frappe site configuration...")
 
-    cmd = "podman exec frappe_docker_git-backend-1 ls sites/press.localhost/site_config.json"
-    exit_code, output = run_command(cmd)
+    exit_code, output = run_command([
+        ENGINE, "exec", "frappe_docker_git-backend-1", "ls", "sites/press.localhost/site_config.json",
+    ])
 
     if exit_code == 0:
         print(f"  {Colors.GREEN}✓{Colors.RESET} Site press.localhost exists")
@@ -125,12 +207,61 @@ def test_frappe_site_exists() -> bool:
         print(f"  {Colors.RED}✗{Colors.RESET} Site press.localhost not found")
         return False
 
+class _ThreadBufferedStdout:
+    """stdout proxy giving each worker thread its own buffer so concurrent probes don't interleave"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def capture(self, func: Callable[..., bool], *args) -> Tuple[bool, str]:
+        """Run func, returning its result and everything it printed"""
+        self._local.buffer = io.StringIO()
+        try:
+            ok = func(*args)
+        except Exception as e:
+            print(f"  {Colors.RED}✗{Colors.RESET} {e}")
+            ok = False
+        finally:
+            output = self._local.buffer.getvalue()
+            self._local.buffer = None
+        return ok, output
+
+def run_probes(probes: List[Tuple[str, str, Callable[..., bool], tuple]]) -> List[Tuple[str, bool]]:
+    """Run (suite, label, func, args) probes concurrently, printing output in declaration order"""
+    proxy = _ThreadBufferedStdout(sys.stdout)
+    sys.stdout = proxy
+    try:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(probes))) as pool:
+            futures = [pool.submit(proxy.capture, func, *args) for _, _, func, args in probes]
+            results = [future.result() for future in futures]
+    finally:
+        sys.stdout = proxy.stream
+
+    outcomes = []
+    current_suite = None
+    for (suite, label, _, _), (ok, output) in zip(probes, results):
+        if suite != current_suite:
+            print(f"\n{Colors.YELLOW}{suite}{Colors.RESET}")
+            current_suite = suite
+        sys.stdout.write(output)
+        outcomes.append((label, ok))
+    return outcomes
+
 def main():
     """Run all integration tests"""
     print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
     print(f"{Colors.BLUE}Press SaaS Platform - Integration Tests{Colors.RESET}")
     print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
 
+    started = time.perf_counter()
     tests_passed = []
     tests_failed = []
 
@@ -147,57 +278,34 @@ def main():
         ("Scheduler", "frappe_docker_git-scheduler-1", None),
     ]
 
-    # Test 1: Service Running Status
+    # Test 1: Service Running Status (single ps + inspect)
     print(f"\n{Colors.YELLOW}Test Suite 1: Service Status{Colors.RESET}")
+    inventory = load_inventory([container_name for _, container_name, _ in services])
     for service_name, container_name, port in services:
-        if test_service_running(service_name, container_name):
+        if test_service_running(service_name, container_name, inventory):
             tests_passed.append(f"{service_name} running")
-            test_service_health(service_name, container_name)
+            test_service_health(service_name, container_name, inventory)
             if port:
-                if test_port_binding(service_name, container_name, port):
+                if test_port_binding(service_name, container_name, port, inventory):
                     tests_passed.append(f"{service_name} port binding")
                 else:
                     tests_failed.append(f"{service_name} port binding")
         else:
             tests_failed.append(f"{service_name} running")
 
-    # Test 2: Network Connectivity (with TCP port tests)
-    print(f"\n{Colors.YELLOW}Test Suite 2: Network Connectivity{Colors.RESET}")
-    if test_network_connectivity("frappe_docker_git-backend-1", "fcs-press-db", "5432"):
-        tests_passed.append("Backend -> PostgreSQL connectivity")
-    else:
-        tests_failed.append("Backend -> PostgreSQL connectivity")
-
-    if test_network_connectivity("frappe_docker_git-backend-1", "fcs-press-redis-cache", "6379"):
-        tests_passed.append("Backend -> Redis Cache connectivity")
-    else:
-        tests_failed.append("Backend -> Redis Cache connectivity")
-
-    # Test 3: Database Connection
-    print(f"\n{Colors.YELLOW}Test Suite 3: Database{Colors.RESET}")
-    if test_database_connection():
-        tests_passed.append("PostgreSQL connection")
-    else:
-        tests_failed.append("PostgreSQL connection")
-
-    # Test 4: Redis Connections
-    print(f"\n{Colors.YELLOW}Test Suite 4: Redis{Colors.RESET}")
-    if test_redis_connection("fcs-press-redis-cache", "48510"):
-        tests_passed.append("Redis Cache connection")
-    else:
-        tests_failed.append("Redis Cache connection")
-
-    if test_redis_connection("fcs-press-redis-queue", "48511"):
-        tests_passed.append("Redis Queue connection")
-    else:
-        tests_failed.append("Redis Queue connection")
-
-    # Test 5: Frappe Site
-    print(f"\n{Colors.YELLOW}Test Suite 5: Frappe Configuration{Colors.RESET}")
-    if test_frappe_site_exists():
-        tests_passed.append("Frappe site configuration")
-    else:
-        tests_failed.append("Frappe site configuration")
+    # Tests 2-5: exec-based probes, run concurrently
+    probes = [
+        ("Test Suite 2: Network Connectivity", "Backend -> PostgreSQL connectivity",
+         test_network_connectivity, ("frappe_docker_git-backend-1", "fcs-press-db", "5432")),
+        ("Test Suite 2: Network Connectivity", "Backend -> Redis Cache connectivity",
+         test_network_connectivity, ("frappe_docker_git-backend-1", "fcs-press-redis-cache", "6379")),
+        ("Test Suite 3: Database", "PostgreSQL connection", test_database_connection, ()),
+        ("Test Suite 4: Redis", "Redis Cache connection", test_redis_connection, ("fcs-press-redis-cache", "48510")),
+        ("Test Suite 4: Redis", "Redis Queue connection", test_redis_connection, ("fcs-press-redis-queue", "48511")),
+        ("Test Suite 5: Frappe Configuration", "Frappe site configuration", test_frappe_site_exists, ()),
+    ]
+    for label, ok in run_probes(probes):
+        (tests_passed if ok else tests_failed).append(label)
 
     # Summary
     print(f"\n{Colors.BLUE}{'='*60}{Colors.RESET}")
@@ -205,6 +313,7 @@ def main():
     print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
     print(f"{Colors.GREEN}✓ Passed: {len(tests_passed)}{Colors.RESET}")
     print(f"{Colors.RED}✗ Failed: {len(tests_failed)}{Colors.RESET}")
+    print(f"⏱  Completed in {time.perf_counter() - started:.1f}s")
 
     if tests_failed:
         print(f"\n{Colors.RED}Failed Tests:{Colors.RESET}")
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Performance Baseline Store - Press SaaS Platform
+Keeps latency samples per git revision and compose stack in SQLite and gates
+new runs against a baseline with a Mann-Whitney U test plus a bootstrap CI on p95.
+
+Usage:
+    # Record the samples written by test_performance.py --results
+    python3 tests/performance/perf_baseline.py record --results perf_results.json
+
+    # Compare against the pinned run of the stack, else the pooled samples of
+    # its last --window runs (other revisions only)
+    python3 tests/performance/perf_baseline.py compare --results perf_results.json
+
+    # Pin the latest recorded run (or --run-id) as the stack's reference
+    python3 tests/performance/perf_baseline.py pin
+
+    # Export / import the store as JSON (for committing or sharing baselines)
+    python3 tests/performance/perf_baseline.py export --out baselines.json
+    python3 tests/performance/perf_baseline.py import --file baselines.json
+
+Exit codes (compare):
+    0 - no significant p95 regression (or no baseline yet)
+    1 - significant p95 regression beyond tolerance
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.lib.stats import percentile  # noqa: E402
+
+SCHEMA_VERSION = 1
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_DB = Path(os.environ.get("PERF_BASELINE_DB", Path(__file__).with_name("baselines.sqlite")))
+DEFAULT_COMPOSE_FILES = [
+    "compose.yaml",
+    "overrides/compose.postgres.yaml",
+    "overrides/compose.redis.yaml",
+    "overrides/compose.noproxy.yaml",
+    "overrides/compose.networks.yaml",
+]
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+# =============================================================================
+# Run identity
+# =============================================================================
+
+def current_git_rev() -> str:
+    """HEAD revision, suffixed with -dirty when the work tree has changes"""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+
+    rev = git("rev-parse", "--short=12", "HEAD") or "unknown"
+    return f"{rev}-dirty" if git("status", "--porcelain", "--untracked-files=no") else rev
+
+def stack_id(compose_files: Optional[List[str]] = None) -> str:
+    """Identify the compose stack by file list and content, e.g. 'postgres+redis+...@1a2b3c4d'"""
+    if compose_files is None:
+        env = os.environ.get("COMPOSE_FILE")
+        compose_files = env.split(os.pathsep) if env else DEFAULT_COMPOSE_FILES
+
+    digest = hashlib.sha256()
+    labels = []
+    for name in compose_files:
+        path = ROOT / name
+        digest.update(name.encode())
+        if path.exists():
+            digest.update(path.read_bytes())
+        labels.append(Path(name).stem.replace("compose.", "").replace("compose", "base"))
+    return f"{'+'.join(labels)}@{digest.hexdigest()[:8]}"
+
+# =============================================================================
+# Store
+# =============================================================================
+
+class BaselineStore:
+    """SQLite store of latency samples keyed by (git revision, stack, metric)"""
+
+    def __init__(self, path: Path = DEFAULT_DB):
+        self.db = sqlite3.connect(str(path))
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                git_rev TEXT NOT NULL,
+                stack TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS samples (
+                run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+                metric TEXT NOT NULL,
+                value REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_runs_stack ON runs(stack, created_at);
+            CREATE INDEX IF NOT EXISTS idx_samples_run ON samples(run_id, metric);
+        """)
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None:
+            self.db.execute("INSERT INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            self.db.commit()
+        elif int(row[0]) != SCHEMA_VERSION:
+            raise RuntimeError(f"Baseline store {path} has schema v{row[0]}, expected v{SCHEMA_VERSION}")
+
+    def record(self, git_rev: str, stack: str, metrics: Dict[str, List[float]],
+               created_at: Optional[str] = None) -> int:
+        """Store one run; returns its id"""
+        created_at = created_at or datetime.now(timezone.utc).isoformat()
+        with self.db:
+            run_id = self.db.execute(
+                "INSERT INTO runs (git_rev, stack, created_at) VALUES (?, ?, ?)",
+                (git_rev, stack, created_at)).lastrowid
+            self.db.executemany(
+                "INSERT INTO samples VALUES (?, ?, ?)",
+                [(run_id, metric, v) for metric, values in metrics.items() for v in values])
+        return run_id
+
+    def find_baseline(self, stack: str, exclude_rev: str, git_rev: Optional[str] = None,
+                      window: int = 5) -> List[int]:
+        """
+        Reference runs for the stack: the latest run at git_rev when given, else the
+        pinned run, else the last `window` runs of other revisions. A rolling window
+        keeps regressions just under tolerance from compounding run after run.
+        """
+        if git_rev:
+            rows = self.db.execute(
+                "SELECT id FROM runs WHERE stack = ? AND git_rev = ? ORDER BY created_at DESC LIMIT 1",
+                (stack, git_rev)).fetchall()
+        else:
+            pinned = self.pinned(stack)
+            if pinned is not None:
+                return [pinned]
+            rows = self.db.execute(
+                "SELECT id FROM runs WHERE stack = ? AND git_rev != ? ORDER BY created_at DESC LIMIT ?",
+                (stack, exclude_rev, window)).fetchall()
+        return [row[0] for row in rows]
+
+    def pin(self, stack: str, run_id: int) -> None:
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (f"pinned:{stack}", str(run_id)))
+
+    def unpin(self, stack: str) -> None:
+        with self.db:
+            self.db.execute("DELETE FROM meta WHERE key = ?", (f"pinned:{stack}",))
+
+    def pinned(self, stack: str) -> Optional[int]:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (f"pinned:{stack}",)).fetchone()
+        return int(row[0]) if row else None
+
+    def latest_run(self, stack: str) -> Optional[int]:
+        row = self.db.execute(
+            "SELECT id FROM runs WHERE stack = ? ORDER BY created_at DESC LIMIT 1", (stack,)).fetchone()
+        return row[0] if row else None
+
+    def run_info(self, run_id: int) -> Dict[str, str]:
+        git_rev, stack, created_at = self.db.execute(
+            "SELECT git_rev, stack, created_at FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return {"git_rev": git_rev, "stack": stack, "created_at": created_at}
+
+    def samples(self, *run_ids: int) -> Dict[str, List[float]]:
+        """Samples per metric, pooled across the given runs"""
+        metrics: Dict[str, List[float]] = {}
+        for run_id in run_ids:
+            for metric, value in self.db.execute(
+                    "SELECT metric, value FROM samples WHERE run_id = ?", (run_id,)):
+                metrics.setdefault(metric, []).append(value)
+        return metrics
+
+    def export(self) -> dict:
+        runs = []
+        for (run_id,) in self.db.execute("SELECT id FROM runs ORDER BY created_at").fetchall():
+            runs.append({**self.run_info(run_id), "metrics": self.samples(run_id)})
+        return {"schema_version": SCHEMA_VERSION, "runs": runs}
+
+    def import_(self, data: dict) -> int:
+        if data.get("schema_version") != SCHEMA_VERSION:
+            raise RuntimeError(f"Unsupported baseline export version {data.get('schema_version')}")
+        for run in data["runs"]:
+            self.record(run["git_rev"], run["stack"], run["metrics"], run["created_at"])
+        return len(data["runs"])
+
+# =============================================================================
+# Statistics
+# =============================================================================
+
+def mann_whitney_greater(current: List[float], baseline: List[float]) -> float:
+    """
+    One-sided Mann-Whitney U p-value for "current is stochastically larger".
+
+    Uses the normal approximation with tie correction and continuity
+    correction, which is adequate for the >= 8 samples per side we collect.
+    """
+    n1, n2 = len(current), len(baseline)
+    combined = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+
+    # Average ranks over ties and accumulate the tie correction term
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        tie_term += t ** 3 - t
+        i = j + 1
+
+    rank_sum = sum(r for r, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+    if sigma == 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def bootstrap_p95_ratio_ci(current: List[float], baseline: List[float], rounds: int = 2000,
+                           confidence: float = 0.95, seed: int = 0) -> Tuple[float, float]:
+    """Bootstrap confidence interval for p95(current) / p95(baseline)"""
+    rng = random.Random(seed)
+    ratios = []
+    for _ in range(rounds):
+        cur = percentile(rng.choices(current, k=len(current)), 95)
+        base = percentile(rng.choices(baseline, k=len(baseline)), 95)
+        if base > 0:
+            ratios.append(cur / base)
+    if not ratios:
+        # Every resampled baseline p95 was 0: the ratio is unbounded
+        return math.inf, math.inf
+    tail = (1 - confidence) / 2 * 100
+    return percentile(ratios, tail), percentile(ratios, 100 - tail)
+
+@dataclass
+class Comparison:
+    """Verdict for one metric"""
+    metric: str
+    baseline_p95: float
+    current_p95: float
+    p_value: float
+    ci_low: float
+    ci_high: float
+    regression: bool
+
+    @property
+    def delta_pct(self) -> float:
+        return (self.current_p95 / self.baseline_p95 - 1) * 100 if self.baseline_p95 else 0.0
+
+def compare(current: Dict[str, List[float]], baseline: Dict[str, List[float]],
+            tolerance: float = 0.10, alpha: float = 0.05, min_samples: int = 8) -> List[Comparison]:
+    """
+    Flag a metric as regressed when all of these hold:
+    - its p95 grew by more than `tolerance` (relative),
+    - Mann-Whitney rejects "not slower" at level `alpha`,
+    - the bootstrap CI of the p95 ratio lies entirely above 1.0.
+    """
+    results = []
+    for metric in sorted(set(current) & set(baseline)):
+        cur, base = current[metric], baseline[metric]
+        if len(cur) < min_samples or len(base) < min_samples:
+            continue
+        base_p95, cur_p95 = percentile(base, 95), percentile(cur, 95)
+        p_value = mann_whitney_greater(cur, base)
+        ci_low, ci_high = bootstrap_p95_ratio_ci(cur, base)
+        regression = (base_p95 > 0 and cur_p95 > base_p95 * (1 + tolerance)
+                      and p_value < alpha and ci_low > 1.0)
+        results.append(Comparison(metric, base_p95, cur_p95, p_value, ci_low, ci_high, regression))
+    return results
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def load_results(path: str) -> Dict[str, List[float]]:
+    with open(path) as f:
+        return json.load(f)["metrics"]
+
+def cmd_record(store: BaselineStore, args) -> int:
+    rev, stack = args.rev or current_git_rev(), args.stack or stack_id()
+    if rev.endswith("-dirty") and not args.allow_dirty:
+        # uncommitted changes: the revision does not identify what was measured
+        print(f"{Colors.YELLOW}⚠{Colors.RESET} Not recording {rev}: work tree has uncommitted changes "
+              "(--allow-dirty to force)")
+        return 0
+    run_id = store.record(rev, stack, load_results(args.results))
+    print(f"Recorded run #{run_id} for {rev} on {stack}")
+    return 0
+
+def cmd_compare(store: BaselineStore, args) -> int:
+    rev, stack = args.rev or current_git_rev(), args.stack or stack_id()
+    current = load_results(args.results)
+    baseline_ids = store.find_baseline(stack, exclude_rev=rev, git_rev=args.baseline_rev, window=args.window)
+
+    print(f"{Colors.BLUE}Performance baseline comparison{Colors.RESET}")
+    if not baseline_ids:
+        print(f"  {Colors.YELLOW}⚠{Colors.RESET} No baseline for stack {stack}; nothing to compare")
+        return 0
+
+    infos = [store.run_info(run_id) for run_id in baseline_ids]
+    pinned = not args.baseline_rev and baseline_ids == [store.pinned(stack)]
+    label = "pinned" if pinned else f"{len(infos)} run(s)"
+    print(f"  Baseline: {', '.join(i['git_rev'] for i in infos)} ({label}, "
+          f"{infos[-1]['created_at']} .. {infos[0]['created_at']}) on {stack}")
+    print(f"  Current:  {rev}  tolerance={args.tolerance:.0%} alpha={args.alpha}")
+
+    regressions = 0
+    for c in compare(current, store.samples(*baseline_ids), args.tolerance, args.alpha):
+        mark = f"{Colors.RED}✗" if c.regression else f"{Colors.GREEN}✓"
+        print(f"  {mark}{Colors.RESET} {c.metric:<24} p95 {c.baseline_p95:8.2f} -> {c.current_p95:8.2f}ms "
+              f"({c.delta_pct:+.1f}%)  p={c.p_value:.4f}  ratio CI [{c.ci_low:.2f}, {c.ci_high:.2f}]")
+        regressions += c.regression
+
+    if regressions:
+        print(f"  {Colors.RED}✗ {regressions} significant p95 regression(s){Colors.RESET}")
+        return 1
+    print(f"  {Colors.GREEN}✓ No significant p95 regression{Colors.RESET}")
+    return 0
+
+def cmd_pin(store: BaselineStore, args) -> int:
+    stack = args.stack or stack_id()
+    if args.clear:
+        store.unpin(stack)
+        print(f"Unpinned {stack}; compare uses the rolling window again")
+        return 0
+    run_id = args.run_id or store.latest_run(stack)
+    if run_id is None:
+        print(f"{Colors.RED}✗{Colors.RESET} No recorded run for stack {stack}")
+        return 1
+    info = store.run_info(run_id)
+    store.pin(stack, run_id)
+    print(f"Pinned run #{run_id} ({info['git_rev']}, {info['created_at']}) for {stack}")
+    return 0
+
+def cmd_export(store: BaselineStore, args) -> int:
+    with open(args.out, "w") as f:
+        json.dump(store.export(), f, indent=2)
+    print(f"Exported baseline store to {args.out}")
+    return 0
+
+def cmd_import(store: BaselineStore, args) -> int:
+    with open(args.file) as f:
+        count = store.import_(json.load(f))
+    print(f"Imported {count} run(s) from {args.file}")
+    return 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Performance baseline store and regression gate")
+    parser.add_argument("--db", default=str(DEFAULT_DB), help="SQLite store path (env PERF_BASELINE_DB)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("record", "compare"):
+        p = sub.add_parser(name)
+        p.add_argument("--results", required=True, help="JSON written by test_performance.py --results")
+        p.add_argument("--rev", help="Git revision of this run (default: HEAD)")
+        p.add_argument("--stack", help="Stack id (default: derived from COMPOSE_FILE)")
+        if name == "compare":
+            p.add_argument("--baseline-rev", help="Compare against this revision instead of the pinned/rolling one")
+            p.add_argument("--window", type=int, default=5,
+                           help="Runs pooled into the rolling baseline when none is pinned")
+            p.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative p95 increase")
+            p.add_argument("--alpha", type=float, default=0.05, help="Significance level")
+        else:
+            p.add_argument("--allow-dirty", action="store_true", help="Also record runs of a dirty work tree")
+
+    pin = sub.add_parser("pin")
+    pin.add_argument("--stack", help="Stack id (default: derived from COMPOSE_FILE)")
+    pin.add_argument("--run-id", type=int, help="Run to pin (default: the latest one of the stack)")
+    pin.add_argument("--clear", action="store_true", help="Remove the pin")
+
+    sub.add_parser("export").add_argument("--out", required=True)
+    sub.add_parser("import").add_argument("--file", required=True)
+
+    args = parser.parse_args()
+    store = BaselineStore(Path(args.db))
+    handlers = {"record": cmd_record, "compare": cmd_compare, "pin": cmd_pin, "export": cmd_export,
+                "import": cmd_import}
+    return handlers[args.command](store, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Boot Time Benchmark - Press SaaS Platform
+Runs `compose up` for an override stack, timestamps every service transition
+(created, running, healthy, completed) from the container engine event stream
+plus the first HTTP 200 on the frontend, and reports the startup critical path.
+PostgreSQL and Redis have no compose healthcheck, so they count as ready at
+their first successful wire-protocol probe on the published port rather than
+when the container starts.
+Repeated runs are aggregated into percentiles.
+
+This benchmark tears the stack down before each run, so it is only run
+explicitly (it defines no pytest-collected test functions).
+
+Usage:
+    python3 tests/performance/test_boot_time.py --runs 3
+    python3 tests/performance/test_boot_time.py -f compose.yaml -f overrides/compose.postgres.yaml ...
+
+Addresses: NFR-001, SC-001, CHK001, CHK023
+"""
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.lib.probes import ProbeResult, probe_postgres, probe_redis  # noqa: E402
+from scripts.lib.stats import percentile  # noqa: E402
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+DEFAULT_COMPOSE_FILES = [
+    "compose.yaml",
+    "overrides/compose.postgres.yaml",
+    "overrides/compose.redis.yaml",
+    "overrides/compose.noproxy.yaml",
+    "overrides/compose.networks.yaml",
+]
+FRONTEND_SERVICE = "frontend"
+HTTP_READY = "http_200"
+
+def wire_probes(host: str, db_password: Optional[str]) -> Dict[str, Callable[[], ProbeResult]]:
+    """Host-side protocol probes for the data services, keyed by compose service"""
+    return {
+        "db": lambda: probe_postgres(host, 48532, "postgres", db_password, timeout=1.0, name="db"),
+        "redis-cache": lambda: probe_redis(host, 48510, timeout=1.0, name="redis-cache"),
+        "redis-queue": lambda: probe_redis(host, 48511, timeout=1.0, name="redis-queue"),
+    }
+
+# =============================================================================
+# Compose model
+# =============================================================================
+
+@dataclass
+class ServiceSpec:
+    """The parts of a compose service that matter for startup ordering"""
+
+    name: str
+    depends_on: Dict[str, str] = field(default_factory=dict)  # dependency -> condition
+    container_name: Optional[str] = None
+    has_healthcheck: bool = False
+    one_shot: bool = False  # awaited with service_completed_successfully
+
+def load_services(engine: str, files: List[str]) -> Dict[str, ServiceSpec]:
+    """Resolve the merged stack with `compose config` so anchors/overrides are applied"""
+    cmd = [engine, "compose"] + [a for f in files for a in ("-f", f)] + ["config", "--format", "json"]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"compose config failed: {result.stderr.strip()}")
+
+    raw = json.loads(result.stdout).get("services", {})
+    services = {}
+    for name, spec in raw.items():
+        deps = spec.get("depends_on") or {}
+        if isinstance(deps, list):
+            deps = {d: "service_started" for d in deps}
+        else:
+            deps = {d: (c or {}).get("condition", "service_started") for d, c in deps.items()}
+        healthcheck = spec.get("healthcheck") or {}
+        services[name] = ServiceSpec(
+            name=name,
+            depends_on=deps,
+            container_name=spec.get("container_name"),
+            has_healthcheck=bool(healthcheck) and not healthcheck.get("disable", False),
+        )
+
+    for spec in services.values():
+        for dep, condition in spec.depends_on.items():
+            if condition == "service_completed_successfully" and dep in services:
+                services[dep].one_shot = True
+    return services
+
+# =============================================================================
+# Event stream
+# =============================================================================
+
+@dataclass
+class ServiceTimeline:
+    """Offsets (seconds since `compose up`) of each observed transition"""
+
+    created: Optional[float] = None
+    running: Optional[float] = None
+    healthy: Optional[float] = None
+    completed: Optional[float] = None  # one-shot container exited 0
+    failed: Optional[float] = None     # exited non-zero / unhealthy
+    wire: Optional[float] = None       # first successful protocol probe from the host
+
+def _event_fields(event: dict) -> Tuple[str, str, Dict[str, str], float]:
+    """Normalize docker and podman event JSON into (action, name, attributes, epoch seconds)"""
+    actor = event.get("Actor") or {}
+    attrs = event.get("Attributes") or actor.get("Attributes") or {}
+    action = event.get("Action") or event.get("status") or event.get("Status") or ""
+    if action == "health_status" and event.get("HealthStatus"):
+        action = f"health_status: {event['HealthStatus']}"
+    if action == "die":  # docker says "die", podman "died"
+        action = "died"
+    if "ContainerExitCode" in event:  # podman keeps the exit code outside the attributes
+        attrs = {**attrs, "exitCode": str(event["ContainerExitCode"])}
+    name = event.get("Name") or attrs.get("name") or ""
+    nanos = event.get("timeNano") or event.get("TimeNano")
+    stamp = nanos / 1e9 if nanos else float(event.get("time") or time.time())
+    return action, name, attrs, stamp
+
+class EventRecorder:
+    """Follows `<engine> events` in a background thread and builds per-service timelines
+
+    The subscription starts at `t0` (--since), so events emitted before the
+    engine has attached the stream are replayed rather than lost.
+    """
+
+    def __init__(self, engine: str, services: Dict[str, ServiceSpec], t0: float):
+        self.services = services
+        self.t0 = t0
+        self.timelines: Dict[str, ServiceTimeline] = {name: ServiceTimeline() for name in services}
+        self.changed = threading.Condition()
+        self._by_container = {s.container_name: s.name for s in services.values() if s.container_name}
+        self._stderr = tempfile.TemporaryFile(mode="w+")
+        self._proc = subprocess.Popen(
+            [engine, "events", "--filter", "type=container", "--since", f"{t0:.9f}", "--format", "{{json .}}"],
+            stdout=subprocess.PIPE, stderr=self._stderr, text=True)
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def wait_subscribed(self, grace: float = 0.5) -> None:
+        """Raise if the event stream exits right away (engine unreachable, bad flags)"""
+        try:
+            code = self._proc.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            return
+        self._stderr.seek(0)
+        raise RuntimeError(f"events subscription exited ({code}): {self._stderr.read().strip()}")
+
+    def _service_for(self, name: str, attrs: Dict[str, str]) -> Optional[str]:
+        service = attrs.get("com.docker.compose.service") or self._by_container.get(name)
+        if service:
+            return service
+        # <project>-<service>-<n> / <project>_<service>_<n>
+        for candidate in sorted(self.services, key=len, reverse=True):
+            if f"-{candidate}-" in name or f"_{candidate}_" in name:
+                return candidate
+        return None
+
+    def _read(self) -> None:
+        for line in self._proc.stdout:
+            try:
+                action, name, attrs, stamp = _event_fields(json.loads(line))
+            except (ValueError, TypeError):
+                continue
+            service = self._service_for(name, attrs)
+            if service not in self.timelines or stamp < self.t0:
+                continue
+
+            offset = stamp - self.t0
+            timeline = self.timelines[service]
+            with self.changed:
+                if action == "create" and timeline.created is None:
+                    timeline.created = offset
+                elif action == "start" and timeline.running is None:
+                    timeline.running = offset
+                elif action.startswith("health_status"):
+                    status = action.split(":", 1)[-1].strip()
+                    if status == "healthy" and timeline.healthy is None:
+                        timeline.healthy = offset
+                    elif status == "unhealthy":
+                        timeline.failed = offset
+                elif action == "died":
+                    if attrs.get("exitCode", "0") == "0":
+                        timeline.completed = offset
+                    else:
+                        timeline.failed = offset
+                self.changed.notify_all()
+
+    def stop(self) -> None:
+        if self._proc.poll() is None:
+            self._proc.terminate()
+            self._proc.wait(timeout=5)
+        self._stderr.close()
+
+# =============================================================================
+# Readiness
+# =============================================================================
+
+def ready_at(spec: ServiceSpec, timeline: ServiceTimeline, probed: bool = False) -> Optional[float]:
+    """When a service counts as up: completed (one-shot), healthy (healthcheck),
+    answering its protocol (wire-probed) or running"""
+    if spec.one_shot:
+        return timeline.completed
+    if spec.has_healthcheck:
+        return timeline.healthy
+    if probed:
+        return timeline.wire
+    return timeline.running
+
+def wait_for_wire(name: str, probe: Callable[[], ProbeResult], recorder: "EventRecorder",
+                  deadline: float) -> None:
+    """Poll a protocol probe until it succeeds and record the offset on the timeline"""
+    while time.time() < deadline:
+        started = time.time()
+        if probe().ok:
+            with recorder.changed:
+                recorder.timelines[name].wire = started - recorder.t0
+                recorder.changed.notify_all()
+            return
+        time.sleep(max(0.0, 0.1 - (time.time() - started)))
+
+def wait_for_http(url_host: str, port: int, site: str, t0: float, deadline: float,
+                  result: Dict[str, float]) -> None:
+    """Poll the frontend until it answers 200 for the site"""
+    while time.time() < deadline:
+        conn = http.client.HTTPConnection(url_host, port, timeout=2)
+        try:
+            conn.request("GET", "/api/method/ping", headers={"Host": site})
+            if conn.getresponse().status == 200:
+                result[HTTP_READY] = time.time() - t0
+                return
+        except (OSError, http.client.HTTPException):
+            pass
+        finally:
+            conn.close()
+        time.sleep(0.25)
+
+# =============================================================================
+# Benchmark run
+# =============================================================================
+
+@dataclass
+class BootRun:
+    """Result of one `compose up`"""
+
+    timelines: Dict[str, ServiceTimeline]
+    ready: Dict[str, Optional[float]]
+    total: Optional[float]
+    critical_path: List[str]
+
+def critical_path(services: Dict[str, ServiceSpec], ready: Dict[str, Optional[float]],
+                  last: str) -> List[str]:
+    """Walk back from the last service to become ready through its latest-ready dependency"""
+    path = [last]
+    current = last
+    while current in services:
+        deps = [d for d in services[current].depends_on if ready.get(d) is not None]
+        if not deps:
+            break
+        current = max(deps, key=lambda d: ready[d])
+        path.append(current)
+    return list(reversed(path))
+
+def boot_once(engine: str, files: List[str], services: Dict[str, ServiceSpec], timeout: float,
+              frontend: Tuple[str, int], site: str, down_first: bool,
+              probes: Dict[str, Callable[[], ProbeResult]]) -> BootRun:
+    """Tear down, start the stack and record when each service became ready
+
+    Raises:
+        RuntimeError: The event stream could not be started or `compose up` failed.
+    """
+    compose = [engine, "compose"] + [a for f in files for a in ("-f", f)]
+    if down_first:
+        subprocess.run(compose + ["down"], capture_output=True)
+
+    t0 = time.time()
+    deadline = t0 + timeout
+    recorder = EventRecorder(engine, services, t0)
+    try:
+        recorder.wait_subscribed()
+    except RuntimeError:
+        recorder.stop()
+        raise
+    http_result: Dict[str, float] = {}
+    poller = threading.Thread(target=wait_for_http,
+                              args=(frontend[0], frontend[1], site, t0, deadline, http_result),
+                              daemon=True)
+    poller.start()
+    probed = {name: probe for name, probe in probes.items() if name in services}
+    for name, probe in probed.items():
+        threading.Thread(target=wait_for_wire, args=(name, probe, recorder, deadline), daemon=True).start()
+
+    # A file, not a pipe: pull progress on a cold run would fill a pipe nobody reads until `up` exits
+    with tempfile.TemporaryFile(mode="w+") as up_log:
+        up = subprocess.Popen(compose + ["up", "-d"], stdout=subprocess.DEVNULL, stderr=up_log, text=True)
+
+        def all_ready() -> bool:
+            return all(ready_at(services[n], t, n in probed) is not None for n, t in recorder.timelines.items()) \
+                and HTTP_READY in http_result
+
+        with recorder.changed:
+            while not all_ready() and time.time() < deadline and up.poll() in (None, 0):
+                recorder.changed.wait(timeout=0.5)
+        if up.poll() in (None, 0):
+            poller.join(timeout=max(0.0, deadline - time.time()))
+        up.wait()
+        recorder.stop()
+        if up.returncode != 0:
+            up_log.seek(0)
+            lines = up_log.read().strip().splitlines()
+            raise RuntimeError(f"compose up failed ({up.returncode}): {lines[-1] if lines else 'no output'}")
+
+    ready = {n: ready_at(services[n], t, n in probed) for n, t in recorder.timelines.items()}
+    ready[HTTP_READY] = http_result.get(HTTP_READY)
+    known = {n: v for n, v in ready.items() if v is not None}
+    total = max(known.values()) if len(known) == len(ready) else None
+
+    graph = dict(services)
+    if FRONTEND_SERVICE in services:
+        graph[HTTP_READY] = ServiceSpec(HTTP_READY, depends_on={FRONTEND_SERVICE: "service_started"})
+    last = max(known, key=known.get) if known else HTTP_READY
+    return BootRun(recorder.timelines, ready, total, critical_path(graph, ready, last))
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def fmt(value: Optional[float]) -> str:
+    return f"{value:7.1f}s" if value is not None else "      - "
+
+def print_run(run: BootRun, services: Dict[str, ServiceSpec]) -> None:
+    """Per-service timeline and the critical path of one run"""
+    print(f"    {'service':<16}{'created':>9}{'running':>9}{'healthy':>9}{'wire':>9}{'done':>9}{'ready':>9}"
+          f"{'gate wait':>11}")
+    for name in sorted(services, key=lambda n: run.ready.get(n) or float("inf")):
+        t = run.timelines[name]
+        deps_ready = [run.ready[d] for d in services[name].depends_on if run.ready.get(d) is not None]
+        # Time between the last dependency becoming ready and this container starting
+        gate = (t.running - max(deps_ready)) if t.running is not None and deps_ready else None
+        print(f"    {name:<16}{fmt(t.created):>9}{fmt(t.running):>9}{fmt(t.healthy):>9}{fmt(t.wire):>9}"
+              f"{fmt(t.completed):>9}{fmt(run.ready[name]):>9}{fmt(gate):>11}")
+    print(f"    {'frontend HTTP 200':<16}{'':>54}{fmt(run.ready[HTTP_READY]):>9}")
+    path = " → ".join(f"{n} ({run.ready[n]:.1f}s)" for n in run.critical_path if run.ready.get(n) is not None)
+    print(f"    Critical path: {path}")
+
+def print_aggregate(runs: List[BootRun], services: Dict[str, ServiceSpec]) -> None:
+    """Percentiles of each service's ready offset across runs"""
+    print(f"\n  Aggregate over {len(runs)} run(s) (ready offset, seconds)")
+    print(f"    {'service':<18}{'p50':>8}{'p95':>8}{'max':>8}")
+    for name in list(services) + [HTTP_READY]:
+        values = [r.ready[name] for r in runs if r.ready.get(name) is not None]
+        if values:
+            print(f"    {name:<18}{percentile(values, 50):>8.1f}{percentile(values, 95):>8.1f}{max(values):>8.1f}")
+
+def main():
+    """Run the boot-time benchmark"""
+    parser = argparse.ArgumentParser(description="Stack boot-time benchmark (NFR-001)")
+    parser.add_argument("-f", "--file", action="append", dest="files",
+                        help="Compose file (repeatable; default: README stack)")
+    parser.add_argument("--engine", default=os.environ.get("CONTAINER_ENGINE", "podman"))
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=300, help="Per-run timeout in seconds")
+    parser.add_argument("--target", type=float, default=120, help="NFR-001 boot target in seconds")
+    parser.add_argument("--frontend", default="localhost:48580", help="host:port of the frontend")
+    parser.add_argument("--site", default="press.localhost", help="Host header for the HTTP probe")
+    parser.add_argument("--no-down", action="store_true", help="Don't tear down before each run")
+    parser.add_argument("--db-password", default=os.environ.get("DB_PASSWORD"),
+                        help="PostgreSQL password for the wire probe (default: $DB_PASSWORD)")
+    parser.add_argument("--no-wire", action="store_true",
+                        help="Treat db/redis as ready when running instead of probing their ports")
+    args = parser.parse_args()
+
+    files = args.files or DEFAULT_COMPOSE_FILES
+    host, _, port = args.frontend.partition(":")
+    probes = {} if args.no_wire else wire_probes(host, args.db_password)
+
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+    print(f"{Colors.BLUE}Press SaaS Platform - Boot Time Benchmark{Colors.RESET}")
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+
+    try:
+        services = load_services(args.engine, files)
+    except (OSError, RuntimeError) as e:
+        print(f"  {Colors.RED}✗{Colors.RESET} {e}")
+        return 1
+
+    runs = []
+    for i in range(args.runs):
+        print(f"\n🔍 Boot run {i + 1}/{args.runs}...")
+        try:
+            run = boot_once(args.engine, files, services, args.timeout, (host, int(port or 80)),
+                            args.site, down_first=not args.no_down, probes=probes)
+        except RuntimeError as e:
+            print(f"  {Colors.RED}✗{Colors.RESET} {e}")
+            return 1
+        print_run(run, services)
+        runs.append(run)
+
+    print_aggregate(runs, services)
+
+    totals = [r.total for r in runs]
+    if any(t is None for t in totals):
+        print(f"\n{Colors.RED}✗ Stack did not become fully ready within {args.timeout:.0f}s{Colors.RESET}")
+        return 1
+
+    p95 = percentile(totals, 95)
+    if p95 <= args.target:
+        print(f"\n{Colors.GREEN}✓ Boot time p95 {p95:.1f}s <= {args.target:.0f}s (NFR-001){Colors.RESET}")
+        return 0
+    print(f"\n{Colors.RED}✗ Boot time p95 {p95:.1f}s > {args.target:.0f}s (NFR-001){Colors.RESET}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Connection Pooling Benchmark - Press SaaS Platform
+Replays Frappe's connection pattern (one PostgreSQL connection per request:
+connect, authenticate, a few queries, disconnect) from many concurrent
+clients, directly against fcs-press-db and through the PgBouncer override
+(overrides/compose.pgbouncer.yaml), and reports server backend count and
+connect/query latency for each.
+
+Usage:
+    python3 tests/performance/test_connection_pooling.py --clients 50 --duration 15
+    python3 tests/performance/test_connection_pooling.py --user _5e5899d8 --database _5e5899d8
+
+Addresses: NFR-002, CHK007
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.lib import pgwire  # noqa: E402
+from scripts.lib.stats import percentile  # noqa: E402
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+DB_HOST = os.environ.get("STACK_HOST", "localhost")
+DIRECT_PORT = 48532
+POOLER_PORT = 48533
+QUERY = "SELECT count(*) FROM pg_class"
+
+# =============================================================================
+# Workload
+# =============================================================================
+
+@dataclass
+class ModeResult:
+    """Outcome of one mode (direct or pooled)"""
+
+    name: str
+    port: int
+    duration_s: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    last_error: str = ""
+    connect_ms: List[float] = field(default_factory=list)
+    query_ms: List[float] = field(default_factory=list)
+    backends: List[int] = field(default_factory=list)
+
+    @property
+    def error_rate(self) -> float:
+        total = self.requests + self.errors
+        return self.errors / total if total else 0.0
+
+def _client(result: ModeResult, lock: threading.Lock, deadline: float, user: str,
+            password: Optional[str], database: str, queries: int) -> None:
+    """Connect-per-request loop, like a gunicorn worker serving requests"""
+    while time.time() < deadline:
+        conn = None
+        try:
+            started = time.perf_counter()
+            conn = pgwire.connect(DB_HOST, result.port, user, password, database, timeout=10)
+            connect_ms = (time.perf_counter() - started) * 1000
+            query_ms = []
+            for _ in range(queries):
+                started = time.perf_counter()
+                conn.query(QUERY)
+                query_ms.append((time.perf_counter() - started) * 1000)
+            with lock:
+                result.requests += 1
+                result.connect_ms.append(connect_ms)
+                result.query_ms.extend(query_ms)
+        except (OSError, pgwire.PgError) as e:
+            with lock:
+                result.errors += 1
+                result.last_error = str(e)
+            time.sleep(0.05)
+        finally:
+            if conn is not None:
+                conn.close()
+
+def _sample_backends(result: ModeResult, stop: threading.Event, password: Optional[str]) -> None:
+    """Count client backends on the server itself (always direct, never through the pooler)"""
+    try:
+        conn = pgwire.connect(DB_HOST, DIRECT_PORT, "postgres", password, "postgres", timeout=5)
+    except (OSError, pgwire.PgError):
+        return
+    try:
+        while not stop.wait(0.25):
+            rows = conn.query("SELECT count(*) AS n FROM pg_stat_activity "
+                              "WHERE backend_type = 'client backend' AND pid <> pg_backend_pid()")
+            result.backends.append(int(rows[0]["n"]))
+    except (OSError, pgwire.PgError):
+        pass
+    finally:
+        conn.close()
+
+def run_mode(name: str, port: int, clients: int, duration_s: float, user: str,
+             password: Optional[str], database: str, queries: int,
+             admin_password: Optional[str]) -> ModeResult:
+    """Run all clients against one port for duration_s"""
+    result = ModeResult(name, port)
+    lock = threading.Lock()
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample_backends, args=(result, stop, admin_password), daemon=True)
+    sampler.start()
+
+    started = time.time()
+    deadline = started + duration_s
+    threads = [threading.Thread(target=_client,
+                                args=(result, lock, deadline, user, password, database, queries),
+                                daemon=True)
+               for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    result.duration_s = time.time() - started
+    stop.set()
+    sampler.join(timeout=2)
+    return result
+
+def reachable(port: int, user: str, password: Optional[str], database: str) -> bool:
+    """True if a PostgreSQL-speaking server completes the startup handshake on the port.
+
+    A server error (bad password, unknown database, failed auth_query) still
+    proves a PostgreSQL server or pooler is there; it is printed and the run
+    reports it per request. A port that accepts TCP but does not speak the
+    protocol (another service, a pooler whose entrypoint is still starting) is
+    not reachable.
+    """
+    try:
+        with pgwire.connect(DB_HOST, port, user, password, database, timeout=2):
+            return True
+    except pgwire.PgError as e:
+        if not e.fields and "connection closed" in str(e):
+            return False
+        print(f"  {Colors.YELLOW}⚠{Colors.RESET} {DB_HOST}:{port} answered the handshake with: {e}")
+        return True
+    except OSError:
+        return False
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def print_mode(result: ModeResult) -> None:
+    """One-line-per-metric summary of a mode"""
+    rate = result.requests / result.duration_s if result.duration_s else 0.0
+    peak = max(result.backends) if result.backends else None
+    mean = sum(result.backends) / len(result.backends) if result.backends else None
+    print(f"  {result.name} (:{result.port})")
+    print(f"    Requests: {result.requests} ({rate:.0f}/s), errors: {result.errors} ({result.error_rate:.1%})")
+    print(f"    Connect+auth: p50 {percentile(result.connect_ms, 50):.1f}ms, "
+          f"p95 {percentile(result.connect_ms, 95):.1f}ms")
+    print(f"    Query: p50 {percentile(result.query_ms, 50):.2f}ms, p95 {percentile(result.query_ms, 95):.2f}ms")
+    if peak is not None:
+        print(f"    Server backends: peak {peak}, mean {mean:.1f}")
+    else:
+        print(f"    Server backends: not sampled (direct admin connection failed)")
+    if result.errors:
+        print(f"    {Colors.YELLOW}⚠{Colors.RESET} Last error: {result.last_error}")
+
+def test_connection_pooling(clients: int = 20, duration_s: float = 10, queries: int = 3,
+                            user: str = "postgres", password: Optional[str] = None,
+                            database: str = "postgres", max_error_rate: float = 0.01) -> bool:
+    """Test that the pooler cuts server backends without failing requests"""
+    print(f"\n🔍 Testing connection pooling...")
+
+    password = password if password is not None else os.environ.get("DB_PASSWORD")
+    admin_password = os.environ.get("DB_PASSWORD", password)
+    if not reachable(DIRECT_PORT, user, password, database):
+        print(f"  {Colors.RED}✗{Colors.RESET} PostgreSQL {DB_HOST}:{DIRECT_PORT} not reachable")
+        return False
+
+    print(f"  Clients: {clients}, duration: {duration_s:.0f}s/mode, queries/connection: {queries}")
+    modes = [("direct", DIRECT_PORT)]
+    if reachable(POOLER_PORT, user, password, database):
+        modes.append(("pgbouncer", POOLER_PORT))
+    else:
+        print(f"  {Colors.YELLOW}⚠{Colors.RESET} PgBouncer {DB_HOST}:{POOLER_PORT} not reachable "
+              f"(start with -f overrides/compose.pgbouncer.yaml); measuring direct only")
+
+    results = []
+    for name, port in modes:
+        result = run_mode(name, port, clients, duration_s, user, password, database, queries, admin_password)
+        print_mode(result)
+        results.append(result)
+
+    passed = True
+    for result in results:
+        if result.requests == 0 or result.error_rate > max_error_rate:
+            print(f"  {Colors.RED}✗{Colors.RESET} {result.name}: error rate {result.error_rate:.1%} "
+                  f"> {max_error_rate:.0%}")
+            passed = False
+
+    if len(results) == 2 and results[0].backends and results[1].backends:
+        direct, pooled = results
+        ratio = max(pooled.backends) / max(max(direct.backends), 1)
+        connect_gain = percentile(direct.connect_ms, 50) / max(percentile(pooled.connect_ms, 50), 1e-6)
+        print(f"\n  Pooler: {ratio:.0%} of direct peak backends, connect p50 {connect_gain:.1f}x faster")
+        if max(pooled.backends) >= max(direct.backends):
+            print(f"  {Colors.RED}✗{Colors.RESET} Pooler did not reduce server backends")
+            passed = False
+        else:
+            print(f"  {Colors.GREEN}✓{Colors.RESET} Pooler reduced peak server backends "
+                  f"{max(direct.backends)} → {max(pooled.backends)}")
+    return passed
+
+def main():
+    """Run the connection pooling benchmark"""
+    parser = argparse.ArgumentParser(description="PostgreSQL direct vs PgBouncer benchmark")
+    parser.add_argument("--clients", type=int, default=20, help="Concurrent connect-per-request clients")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per mode")
+    parser.add_argument("--queries", type=int, default=3, help="Queries per connection")
+    parser.add_argument("--user", default="postgres", help="Role to connect as (e.g. a site's db user)")
+    parser.add_argument("--password", help="Password for --user (default: $DB_PASSWORD)")
+    parser.add_argument("--database", default="postgres")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+    print(f"{Colors.BLUE}Press SaaS Platform - Connection Pooling Benchmark{Colors.RESET}")
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+
+    passed = test_connection_pooling(args.clients, args.duration, args.queries, args.user,
+                                     args.password, args.database, args.max_error_rate)
+
+    if passed:
+        print(f"\n{Colors.GREEN}🎉 Connection pooling benchmark passed!{Colors.RESET}")
+        return 0
+    print(f"\n{Colors.RED}✗ Connection pooling benchmark failed{Colors.RESET}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Multi-Site Load Tests - Press SaaS Platform
+Drives weighted traffic across N sites through the frontend nginx and reports
+per-site latency, fairness and noisy-neighbour interference.
+
+Addresses: NFR-002, CHK007
+"""
+
+import argparse
+import concurrent.futures
+import http.client
+import random
+import socket
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.lib.stats import percentile  # noqa: E402
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+FRONTEND_HOST = "localhost"
+FRONTEND_PORT = 48580
+
+# =============================================================================
+# Workload definition
+# =============================================================================
+
+@dataclass
+class Endpoint:
+    """One entry of the weighted per-site request mix."""
+
+    name: str
+    path: str
+    weight: int
+    auth: bool = False  # needs the --api-token Authorization header (guests get 403)
+
+DEFAULT_MIX = [
+    Endpoint("desk", "/login", 2),
+    Endpoint("ping", "/api/method/ping", 4),
+    Endpoint("resource_list", "/api/resource/ToDo?limit_page_length=20", 2, auth=True),
+    Endpoint("static", "/assets/frappe/images/frappe-favicon.svg", 3),
+]
+
+@dataclass
+class Phase:
+    """A timed load phase: how many concurrent clients each site gets."""
+
+    name: str
+    duration_s: float
+    concurrency: Dict[str, int]
+
+@dataclass
+class Sample:
+    """A single request outcome."""
+
+    site: str
+    endpoint: str
+    latency_ms: float
+    status: int  # 0 when the request failed before a response was read
+
+@dataclass
+class SiteStats:
+    """Aggregated results for one site within one phase."""
+
+    site: str
+    concurrency: int
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=dict)
+    errors: int = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + self.errors
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 1.0
+
+    def p(self, pct: float) -> float:
+        return percentile(self.latencies, pct)
+
+# =============================================================================
+# Statistics helpers
+# =============================================================================
+
+def jain_fairness(values: List[float]) -> float:
+    """Jain's fairness index: 1.0 when all values are equal, 1/n at worst"""
+    if not values or not any(values):
+        return 0.0
+    return sum(values) ** 2 / (len(values) * sum(v * v for v in values))
+
+# =============================================================================
+# Load engine
+# =============================================================================
+
+def _pick_endpoint(rng: random.Random, mix: List[Endpoint], total_weight: int) -> Endpoint:
+    """Weighted choice without rebuilding cumulative weights per request"""
+    point = rng.uniform(0, total_weight)
+    for endpoint in mix:
+        point -= endpoint.weight
+        if point <= 0:
+            return endpoint
+    return mix[-1]
+
+def _site_worker(site: str, mix: List[Endpoint], deadline: float, seed: str,
+                 headers: Dict[str, str]) -> List[Sample]:
+    """Issue requests for one site over a keep-alive connection until deadline"""
+    rng = random.Random(seed)
+    total_weight = sum(e.weight for e in mix)
+    samples = []
+    conn = None
+
+    while time.monotonic() < deadline:
+        endpoint = _pick_endpoint(rng, mix, total_weight)
+        if conn is None:
+            conn = http.client.HTTPConnection(FRONTEND_HOST, FRONTEND_PORT, timeout=10)
+
+        start = time.perf_counter()
+        try:
+            # The frontend resolves the site from the Host header
+            # (FRAPPE_SITE_NAME_HEADER=$host), so one upstream serves all sites.
+            conn.request("GET", endpoint.path, headers={"Host": site, **headers})
+            response = conn.getresponse()
+            response.read()
+            elapsed = (time.perf_counter() - start) * 1000
+            samples.append(Sample(site, endpoint.name, elapsed, response.status))
+            if response.will_close:
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException):
+            samples.append(Sample(site, endpoint.name, (time.perf_counter() - start) * 1000, 0))
+            conn.close()
+            conn = None
+            # Back off so a dead frontend doesn't turn into a busy loop
+            time.sleep(0.1)
+
+    if conn is not None:
+        conn.close()
+    return samples
+
+def run_phase(phase: Phase, mix: List[Endpoint], headers: Dict[str, str],
+              seed: int = 0) -> Dict[str, SiteStats]:
+    """Run one phase with one thread per simulated client"""
+    workers = sum(phase.concurrency.values())
+    deadline = time.monotonic() + phase.duration_s
+    stats = {site: SiteStats(site, c) for site, c in phase.concurrency.items()}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for site, clients in phase.concurrency.items():
+            for i in range(clients):
+                futures.append(executor.submit(
+                    # str seeds are hashed with SHA-512, unlike hash() which varies per process
+                    _site_worker, site, mix, deadline, f"{seed}:{site}:{i}", headers))
+
+        for future in concurrent.futures.as_completed(futures):
+            for sample in future.result():
+                site_stats = stats[sample.site]
+                if sample.status == 0 or sample.status >= 400:
+                    site_stats.errors += 1
+                else:
+                    site_stats.latencies.append(sample.latency_ms)
+                site_stats.statuses[sample.status] = site_stats.statuses.get(sample.status, 0) + 1
+
+    return stats
+
+def build_scenario(sites: List[str], clients_per_site: int, duration_s: float,
+                   noisy_site: Optional[str], noisy_factor: int) -> List[Phase]:
+    """Baseline phase with equal load, then one site turned into a noisy neighbour"""
+    phases = [Phase("baseline", duration_s, {s: clients_per_site for s in sites})]
+    if noisy_site and len(sites) > 1:
+        concurrency = {s: clients_per_site for s in sites}
+        concurrency[noisy_site] = clients_per_site * noisy_factor
+        phases.append(Phase("noisy-neighbour", duration_s, concurrency))
+    return phases
+
+def frontend_reachable() -> bool:
+    """Cheap TCP pre-flight so an absent stack fails fast"""
+    try:
+        socket.create_connection((FRONTEND_HOST, FRONTEND_PORT), timeout=2).close()
+        return True
+    except OSError:
+        return False
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def print_phase_report(phase: Phase, stats: Dict[str, SiteStats]) -> None:
+    """Per-site latency table for one phase"""
+    print(f"\n  Phase '{phase.name}' ({phase.duration_s:.0f}s)")
+    print(f"    {'site':<28}{'clients':>8}{'req':>8}{'rps':>8}{'err%':>7}"
+          f"{'p50':>9}{'p95':>9}{'p99':>9}")
+    for site_stats in stats.values():
+        print(f"    {site_stats.site:<28}{site_stats.concurrency:>8}{site_stats.requests:>8}"
+              f"{site_stats.requests / phase.duration_s:>8.1f}{site_stats.error_rate * 100:>7.1f}"
+              f"{site_stats.p(50):>9.1f}{site_stats.p(95):>9.1f}{site_stats.p(99):>9.1f}")
+
+    not_found = [s.site for s in stats.values()
+                 if s.requests and s.statuses.get(404, 0) / s.requests > 0.5]
+    if not_found:
+        print(f"    {Colors.YELLOW}⚠{Colors.RESET} Mostly 404 (site not provisioned?): "
+              f"{', '.join(not_found)}")
+
+def evaluate(results: List[Dict[str, SiteStats]], noisy_site: Optional[str],
+             max_p95_ms: float, max_error_rate: float, min_fairness: float,
+             max_interference: float) -> bool:
+    """Check latency, fairness and interference targets; print the verdicts"""
+    ok = True
+    baseline = results[0]
+
+    for site_stats in baseline.values():
+        if site_stats.error_rate > max_error_rate:
+            print(f"  {Colors.RED}✗{Colors.RESET} {site_stats.site}: error rate "
+                  f"{site_stats.error_rate * 100:.1f}% > {max_error_rate * 100:.0f}%")
+            ok = False
+        elif site_stats.p(95) > max_p95_ms:
+            print(f"  {Colors.RED}✗{Colors.RESET} {site_stats.site}: p95 "
+                  f"{site_stats.p(95):.0f}ms > {max_p95_ms:.0f}ms")
+            ok = False
+
+    # Throughput per client should be even across sites under equal load
+    per_client = [s.requests / s.concurrency for s in baseline.values()]
+    fairness = jain_fairness(per_client)
+    if fairness >= min_fairness:
+        print(f"  {Colors.GREEN}✓{Colors.RESET} Fairness index {fairness:.3f} (>= {min_fairness})")
+    else:
+        print(f"  {Colors.RED}✗{Colors.RESET} Fairness index {fairness:.3f} (< {min_fairness})")
+        ok = False
+
+    if len(results) > 1 and noisy_site:
+        noisy = results[1]
+        ratios = {}
+        for site, site_stats in noisy.items():
+            before = baseline[site].p(95)
+            if site != noisy_site and before > 0 and site_stats.latencies:
+                ratios[site] = site_stats.p(95) / before
+
+        if ratios:
+            worst_site = max(ratios, key=ratios.get)
+            worst = ratios[worst_site]
+            mean = sum(ratios.values()) / len(ratios)
+            print(f"  Noisy neighbour {noisy_site}: quiet-site p95 inflation "
+                  f"mean {mean:.2f}x, worst {worst:.2f}x ({worst_site})")
+            if worst <= max_interference:
+                print(f"  {Colors.GREEN}✓{Colors.RESET} Interference within {max_interference:.1f}x")
+            else:
+                print(f"  {Colors.RED}✗{Colors.RESET} Interference above {max_interference:.1f}x")
+                ok = False
+
+    return ok
+
+# =============================================================================
+# Entry points
+# =============================================================================
+
+def test_multi_site_load(sites: Optional[List[str]] = None, clients_per_site: int = 2,
+                         duration_s: float = 15, noisy_factor: int = 5,
+                         headers: Optional[Dict[str, str]] = None,
+                         max_p95_ms: float = 2000, max_error_rate: float = 0.05,
+                         min_fairness: float = 0.9, max_interference: float = 2.0) -> bool:
+    """Test that 10+ sites share the stack with acceptable latency and fairness"""
+    print(f"\n🔍 Testing multi-site load...")
+
+    sites = sites or [f"site{i:02d}.localhost" for i in range(1, 11)]
+    if not frontend_reachable():
+        print(f"  {Colors.RED}✗{Colors.RESET} Frontend {FRONTEND_HOST}:{FRONTEND_PORT} not reachable")
+        return False
+
+    noisy_site = sites[0] if noisy_factor > 1 else None
+    phases = build_scenario(sites, clients_per_site, duration_s, noisy_site, noisy_factor)
+    print(f"  Sites: {len(sites)}, clients/site: {clients_per_site}, "
+          f"phases: {', '.join(p.name for p in phases)}")
+
+    headers = headers or {}
+    mix = [e for e in DEFAULT_MIX if not e.auth or "Authorization" in headers]
+    if len(mix) < len(DEFAULT_MIX):
+        print(f"  {Colors.YELLOW}⚠{Colors.RESET} No --api-token: skipping "
+              f"{', '.join(e.name for e in DEFAULT_MIX if e not in mix)}")
+
+    results = []
+    for phase in phases:
+        stats = run_phase(phase, mix, headers)
+        print_phase_report(phase, stats)
+        results.append(stats)
+
+    print()
+    return evaluate(results, noisy_site, max_p95_ms, max_error_rate,
+                    min_fairness, max_interference)
+
+def main():
+    """Run the multi-site load scenario"""
+    parser = argparse.ArgumentParser(description="Multi-site load test (NFR-002)")
+    parser.add_argument("--sites", help="Comma-separated site names (default: site01..siteNN.localhost)")
+    parser.add_argument("--site-count", type=int, default=10, help="Generated site count when --sites is omitted")
+    parser.add_argument("--clients-per-site", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per phase")
+    parser.add_argument("--noisy-factor", type=int, default=5,
+                        help="Client multiplier for the noisy site (1 disables the phase)")
+    parser.add_argument("--api-token", help="'key:secret' sent as Authorization for /api/resource")
+    parser.add_argument("--max-p95-ms", type=float, default=2000)
+    parser.add_argument("--max-interference", type=float, default=2.0)
+    args = parser.parse_args()
+
+    sites = args.sites.split(",") if args.sites else \
+        [f"site{i:02d}.localhost" for i in range(1, args.site_count + 1)]
+    headers = {"Authorization": f"token {args.api_token}"} if args.api_token else {}
+
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+    print(f"{Colors.BLUE}Press SaaS Platform - Multi-Site Load Tests{Colors.RESET}")
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+
+    passed = test_multi_site_load(sites, args.clients_per_site, args.duration, args.noisy_factor,
+                                  headers, max_p95_ms=args.max_p95_ms,
+                                  max_interference=args.max_interference)
+
+    if passed:
+        print(f"\n{Colors.GREEN}🎉 Multi-site load test passed!{Colors.RESET}")
+        return 0
+    print(f"\n{Colors.RED}✗ Multi-site load test failed{Colors.RESET}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,11 +4,22 @@ Performance Tests - Press SaaS Platform
 Tests response times, resource usage, and performance metrics
 """
 
+import argparse
+import http.client
+import json
+import socket
 import sys
+import threading
 import time
+import urllib.parse
 import urllib.request
 import urllib.error
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.lib.stats import percentile  # noqa: E402
 
 class Colors:
     GREEN = '\033[92m'
@@ -17,48 +28,173 @@ class Colors:
     BLUE = '\033[94m'
     RESET = '\033[0m'
 
-def measure_response_time(url: str, host_header: str = None, iterations: int = 5) -> List[float]:
-    """Measure HTTP response time over multiple iterations"""
-    times = []
-
-    for i in range(iterations):
-        try:
-            req = urllib.request.Request(url)
-            if host_header:
-                req.add_header('Host', host_header)
-
-            start = time.time()
-            response = urllib.request.urlopen(req, timeout=10)
-            _ = response.read()
-            end = time.time()
-
-            elapsed = (end - start) * 1000  # Convert to ms
-            times.append(elapsed)
+# Latency samples (ms) per metric, written out with --results for perf_baseline.py
+RESULTS: Dict[str, List[float]] = {}
+
+# =============================================================================
+# HTTP timing
+# =============================================================================
+
+@dataclass
+class RequestTiming:
+    """Phase breakdown of one request, in nanoseconds (perf_counter_ns)"""
+    dns_ns: int
+    connect_ns: int
+    ttfb_ns: int
+    transfer_ns: int
+    status: int
+
+    @property
+    def total_ms(self) -> float:
+        return (self.dns_ns + self.connect_ns + self.ttfb_ns + self.transfer_ns) / 1e6
+
+@dataclass
+class ResponseTimes:
+    """Cold (new connection per request) and warm (pooled keep-alive) samples"""
+    cold: List[RequestTiming] = field(default_factory=list)
+    warm: List[RequestTiming] = field(default_factory=list)
+    errors: int = 0  # failed requests and unexpected statuses, warmup included
+
+    def totals(self, kind: str = "cold") -> List[float]:
+        return [t.total_ms for t in getattr(self, kind)]
+
+class ConnectionPool:
+    """Persistent HTTP/1.1 connections to a single host:port"""
+
+    def __init__(self, host: str, port: int, timeout: float = 10):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def connect(self) -> Tuple[http.client.HTTPConnection, int, int]:
+        """Open a fresh connection, timing name resolution and TCP connect separately"""
+        start = time.perf_counter_ns()
+        family, socktype, proto, _, sockaddr = socket.getaddrinfo(
+            self.host, self.port, type=socket.SOCK_STREAM)[0]
+        resolved = time.perf_counter_ns()
+
+        sock = socket.socket(family, socktype, proto)
+        sock.settimeout(self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.connect(sockaddr)
+        connected = time.perf_counter_ns()
+
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        conn.sock = sock
+        return conn, resolved - start, connected - resolved
+
+    def acquire(self) -> Tuple[http.client.HTTPConnection, int, int]:
+        """Reuse an idle connection if there is one (zero DNS/connect cost)"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), 0, 0
+        return self.connect()
+
+    def release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._idle.append(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
+
+def timed_request(pool: ConnectionPool, path: str, headers: dict, reuse: bool) -> RequestTiming:
+    """Issue one GET and split its time into DNS, connect, TTFB and transfer"""
+    conn, dns_ns, connect_ns = pool.acquire() if reuse else pool.connect()
+    try:
+        start = time.perf_counter_ns()
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()  # returns once the status line and headers arrived
+        first_byte = time.perf_counter_ns()
+        response.read()
+        done = time.perf_counter_ns()
+    except Exception:
+        conn.close()
+        raise
+
+    if reuse and not response.will_close:
+        pool.release(conn)
+    else:
+        conn.close()
+    return RequestTiming(dns_ns, connect_ns, first_byte - start, done - first_byte, response.status)
+
+def measure_response_time(url: str, host_header: str = None, iterations: int = 20,
+                          warmup: int = 3, expect: Sequence[int] = range(200, 300)) -> ResponseTimes:
+    """Measure cold and warm HTTP response times, discarding warmup samples.
+
+    Only responses whose status is in `expect` become samples: a fast 502 or 404
+    must not pass for a fast page (nor end up in the baseline store).
+    """
+    parsed = urllib.parse.urlsplit(url)
+    path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+    headers = {"Host": host_header or parsed.netloc}
+    pool = ConnectionPool(parsed.hostname, parsed.port or 80)
+    results = ResponseTimes()
 
-        except Exception as e:
-            print(f"  {Colors.RED}Error on iteration {i+1}: {str(e)}{Colors.RESET}")
+    try:
+        for kind, reuse in (("cold", False), ("warm", True)):
+            samples = getattr(results, kind)
+            for i in range(warmup + iterations):
+                try:
+                    timing = timed_request(pool, path, headers, reuse)
+                except Exception as e:
+                    results.errors += 1
+                    print(f"  {Colors.RED}Error on {kind} iteration {i+1}: {str(e)}{Colors.RESET}")
+                    continue
+                if timing.status not in expect:
+                    results.errors += 1
+                    print(f"  {Colors.RED}Unexpected HTTP {timing.status} on {kind} iteration {i+1}{Colors.RESET}")
+                    continue
+                if i >= warmup:
+                    samples.append(timing)
+    finally:
+        pool.close()
+
+    return results
+
+def print_breakdown(results: ResponseTimes) -> None:
+    """Print per-phase p50/p95 so slow hops can be told apart"""
+    print(f"    {'':<6}{'n':>4}{'dns':>9}{'connect':>9}{'ttfb':>9}{'transfer':>10}{'total p50':>11}{'p95':>9}")
+    for kind in ("cold", "warm"):
+        samples = getattr(results, kind)
+        if not samples:
             continue
+        med = lambda attr: percentile([getattr(t, attr) / 1e6 for t in samples], 50)
+        totals = results.totals(kind)
+        print(f"    {kind:<6}{len(samples):>4}{med('dns_ns'):>9.2f}{med('connect_ns'):>9.2f}"
+              f"{med('ttfb_ns'):>9.2f}{med('transfer_ns'):>10.2f}"
+              f"{percentile(totals, 50):>11.2f}{percentile(totals, 95):>9.2f}")
 
-    return times
-
-def test_http_response_time() -> bool:
+def test_http_response_time(iterations: int = 20, warmup: int = 3) -> bool:
     """Test HTTP response time is acceptable"""
     print(f"\n🔍 Testing HTTP response time...")
 
-    times = measure_response_time("http://localhost:48580", host_header="press.localhost", iterations=5)
+    results = measure_response_time("http://localhost:48580", host_header="press.localhost",
+                                     iterations=iterations, warmup=warmup)
+    times = results.totals("cold")
+    RESULTS["http_response_cold"] = times
+    RESULTS["http_response_warm"] = results.totals("warm")
 
     if not times:
-        print(f"  {Colors.RED}✗{Colors.RESET} No successful requests")
+        print(f"  {Colors.RED}✗{Colors.RESET} No successful requests ({results.errors} errors)")
         return False
+    if results.errors:
+        print(f"  {Colors.YELLOW}⚠{Colors.RESET} {results.errors} failed or non-2xx requests left out")
 
     avg_time = sum(times) / len(times)
     min_time = min(times)
     max_time = max(times)
 
-    print(f"  Response times (ms):")
+    print(f"  Response times (ms, cold connection):")
     print(f"    Average: {avg_time:.2f}ms")
     print(f"    Min:     {min_time:.2f}ms")
     print(f"    Max:     {max_time:.2f}ms")
+    print(f"  Breakdown (ms, median per phase):")
+    print_breakdown(results)
 
     # Check if average response time is acceptable (< 2000ms)
     if avg_time < 2000:
@@ -71,19 +207,28 @@ def test_http_response_time() -> bool:
         print(f"  {Colors.RED}✗{Colors.RESET} Response time is too slow (>{avg_time:.0f}ms)")
         return False
 
-def test_redirect_performance() -> bool:
+def test_redirect_performance(iterations: int = 20, warmup: int = 3) -> bool:
     """Test redirect performance"""
     print(f"\n🔍 Testing redirect performance...")
 
-    times = measure_response_time("http://localhost:48580", iterations=5)
+    # The 301 is answered by nginx alone, so its TTFB is the nginx hop; compare it
+    # with the page TTFB above to see how much of a regression sits in gunicorn.
+    results = measure_response_time("http://localhost:48580", iterations=iterations, warmup=warmup,
+                                    expect=(301,))
+    times = results.totals("cold")
+    RESULTS["redirect_cold"] = times
+    RESULTS["redirect_warm"] = results.totals("warm")
 
     if not times:
-        print(f"  {Colors.RED}✗{Colors.RESET} No successful redirects")
+        print(f"  {Colors.RED}✗{Colors.RESET} No successful redirects ({results.errors} errors)")
         return False
+    if results.errors:
+        print(f"  {Colors.YELLOW}⚠{Colors.RESET} {results.errors} failed or non-301 requests left out")
 
     avg_time = sum(times) / len(times)
 
-    print(f"  Redirect time: {avg_time:.2f}ms (avg)")
+    print(f"  Redirect time: {avg_time:.2f}ms (avg, cold connection)")
+    print_breakdown(results)
 
     # Redirects should be very fast (< 100ms)
     if avg_time < 100:
@@ -165,6 +310,12 @@ def test_static_resource_caching() -> bool:
 
 def main():
     """Run all performance tests"""
+    parser = argparse.ArgumentParser(description="Press SaaS Platform performance tests")
+    parser.add_argument("--iterations", type=int, default=20, help="Measured requests per connection mode")
+    parser.add_argument("--warmup", type=int, default=3, help="Leading requests discarded per mode")
+    parser.add_argument("--results", help="Write latency samples as JSON (input for perf_baseline.py)")
+    args = parser.parse_args()
+
     print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
     print(f"{Colors.BLUE}Press SaaS Platform - Performance Tests{Colors.RESET}")
     print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
@@ -174,14 +325,14 @@ def main():
 
     # Test 1: HTTP Response Time
     print(f"\n{Colors.YELLOW}Test Suite 1: Response Time{Colors.RESET}")
-    if test_http_response_time():
+    if test_http_response_time(args.iterations, args.warmup):
         tests_passed.append("HTTP response time")
     else:
         tests_failed.append("HTTP response time")
 
     # Test 2: Redirect Performance
     print(f"\n{Colors.YELLOW}Test Suite 2: Redirect Performance{Colors.RESET}")
-    if test_redirect_performance():
+    if test_redirect_performance(args.iterations, args.warmup):
         tests_passed.append("Redirect performance")
     else:
         tests_failed.append("Redirect performance")
@@ -200,6 +351,11 @@ def main():
     else:
         tests_failed.append("Static resource caching")
 
+    if args.results:
+        with open(args.results, "w") as f:
+            json.dump({"metrics": RESULTS}, f)
+        print(f"\n  Latency samples written to {args.results}")
+
     # Summary
     print(f"\n{Colors.BLUE}{'='*60}{Colors.RESET}")
     print(f"{Colors.BLUE}Test Summary{Colors.RESET}")
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Background Job Throughput Benchmark - Press SaaS Platform
+Enqueues synthetic RQ jobs (CPU, IO or sleep bound) into `redis-queue` and
+measures enqueue-to-start latency, execution time, drain rate and queue depth
+over time while the `queue-short` / `queue-long` worker replica count changes.
+
+The synthetic jobs only call standard-library functions, so the stock
+frappe/erpnext worker image can execute them without any custom app.
+
+Requires the `redis` and `rq` Python packages on the host:
+    pip install redis rq
+
+Usage:
+    python3 tests/performance/test_queue_throughput.py --queue short --replicas 1,2,4 --jobs 300
+    python3 tests/performance/test_queue_throughput.py --queue long --profile io --io-mb 8
+
+This benchmark rescales worker services, so it is only run explicitly
+(it defines no pytest-collected test functions).
+
+Addresses: CHK007 (background job concurrency)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.lib.stats import percentile  # noqa: E402
+
+try:
+    from redis import Redis
+    from rq import Queue, Worker
+    from rq.job import Job
+except ImportError:  # pragma: no cover - optional dependency
+    Redis = None
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+DEFAULT_COMPOSE_FILES = [
+    "compose.yaml",
+    "overrides/compose.postgres.yaml",
+    "overrides/compose.redis.yaml",
+    "overrides/compose.noproxy.yaml",
+    "overrides/compose.networks.yaml",
+]
+WORKER_SERVICES = {"short": "queue-short", "long": "queue-long"}
+
+# =============================================================================
+# Synthetic job profiles
+# =============================================================================
+
+def job_spec(profile: str, args) -> Tuple[str, tuple, dict]:
+    """(dotted function, args, kwargs) for a profile; all resolvable inside the worker image"""
+    if profile == "cpu":
+        return "hashlib.pbkdf2_hmac", ("sha256", b"press", b"bench", args.cpu_iterations), {}
+    if profile == "io":
+        dd = ["dd", "if=/dev/zero", "of=/tmp/rq-io-bench", "bs=1M", f"count={args.io_mb}", "conv=fsync"]
+        return "subprocess.run", (dd,), {"capture_output": True}
+    if profile == "sleep":
+        return "time.sleep", (args.sleep_s,), {}
+    raise ValueError(f"Unknown profile: {profile}")
+
+# =============================================================================
+# Stack helpers
+# =============================================================================
+
+def compose(engine: str, files: List[str], *args: str) -> subprocess.CompletedProcess:
+    cmd = [engine, "compose"] + [a for f in files for a in ("-f", f)] + list(args)
+    return subprocess.run(cmd, capture_output=True, text=True)
+
+def running_replicas(engine: str, service: str) -> int:
+    result = subprocess.run(
+        [engine, "ps", "-q", "--filter", f"label=com.docker.compose.service={service}"],
+        capture_output=True, text=True)
+    return len(result.stdout.split())
+
+def resolve_queue(conn, queue: str, explicit: Optional[str]) -> str:
+    """Frappe names RQ queues '<bench id>:<type>'; find the one workers listen on"""
+    if explicit:
+        return explicit
+    for worker in Worker.all(connection=conn):
+        for name in worker.queue_names():
+            if name == queue or name.endswith(f":{queue}"):
+                return name
+    raise RuntimeError(f"No worker listens on a '{queue}' queue; pass --queue-name")
+
+def listeners(conn, queue_name: str) -> int:
+    return sum(queue_name in w.queue_names() for w in Worker.all(connection=conn))
+
+def scale_workers(engine: str, files: List[str], service: str, replicas: int, conn,
+                  queue_name: str, baseline_listeners: int, timeout: float = 90) -> int:
+    """Scale a worker service and wait until the new workers registered with RQ"""
+    result = compose(engine, files, "up", "-d", "--no-recreate", "--scale", f"{service}={replicas}", service)
+    if result.returncode != 0:
+        raise RuntimeError(f"Scaling {service} failed: {result.stderr.strip()}")
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        count = listeners(conn, queue_name)
+        if count >= baseline_listeners + replicas:
+            return count
+        time.sleep(1)
+    return listeners(conn, queue_name)
+
+# =============================================================================
+# Measurement
+# =============================================================================
+
+@dataclass
+class StepResult:
+    """One replica-count step of the sweep"""
+
+    replicas: int
+    listeners: int
+    jobs: int
+    enqueue_s: float
+    waits: List[float] = field(default_factory=list)       # enqueue -> start
+    durations: List[float] = field(default_factory=list)   # start -> end
+    failed: int = 0
+    drain_s: Optional[float] = None
+    depth: List[Tuple[float, int]] = field(default_factory=list)
+
+    @property
+    def drain_rate(self) -> float:
+        return len(self.durations) / self.drain_s if self.drain_s else 0.0
+
+class DepthSampler(threading.Thread):
+    """Samples LLEN of the queue at a fixed interval"""
+
+    def __init__(self, conn, queue: "Queue", interval: float = 0.1):
+        super().__init__(daemon=True)
+        self.conn, self.key, self.interval = conn, queue.key, interval
+        self.samples: List[Tuple[float, int]] = []
+        self._done = threading.Event()
+        self._t0 = time.monotonic()
+
+    def run(self) -> None:
+        while not self._done.is_set():
+            self.samples.append((time.monotonic() - self._t0, self.conn.llen(self.key)))
+            self._done.wait(self.interval)
+
+    def stop(self) -> List[Tuple[float, int]]:
+        self._done.set()
+        self.join()
+        return self.samples
+
+def run_step(conn, queue: "Queue", replicas: int, listener_count: int, jobs: int,
+             spec: Tuple[str, tuple, dict], timeout: float) -> StepResult:
+    """Enqueue a burst, wait for it to drain, collect per-job timings"""
+    func, args, kwargs = spec
+    sampler = DepthSampler(conn, queue)
+    sampler.start()
+
+    start = time.monotonic()
+    batch = [Queue.prepare_data(func, args=args, kwargs=kwargs, result_ttl=300, ttl=int(timeout))
+             for _ in range(jobs)]
+    enqueued = queue.enqueue_many(batch)
+    enqueue_s = time.monotonic() - start
+
+    ids = [job.id for job in enqueued]
+    deadline = time.monotonic() + timeout
+    pending = set(ids)
+    while pending and time.monotonic() < deadline:
+        batch_ids = list(pending)
+        for job_id, job in zip(batch_ids, Job.fetch_many(batch_ids, connection=conn)):
+            if job is None or job.is_finished or job.is_failed:
+                pending.discard(job_id)
+        time.sleep(0.25)
+
+    result = StepResult(replicas, listener_count, jobs, enqueue_s, depth=sampler.stop())
+    enqueued_at, ended_at = [], []
+    for job in Job.fetch_many(ids, connection=conn):
+        if job is None:
+            continue
+        if job.is_failed:
+            result.failed += 1
+        elif job.started_at and job.ended_at:
+            result.waits.append((job.started_at - job.enqueued_at).total_seconds())
+            result.durations.append((job.ended_at - job.started_at).total_seconds())
+            enqueued_at.append(job.enqueued_at)
+            ended_at.append(job.ended_at)
+        job.delete()
+
+    if enqueued_at:
+        result.drain_s = (max(ended_at) - min(enqueued_at)).total_seconds()
+    return result
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def print_step(step: StepResult) -> None:
+    peak = max((d for _, d in step.depth), default=0)
+    print(f"    replicas={step.replicas} listeners={step.listeners} jobs={step.jobs} "
+          f"failed={step.failed} enqueue={step.enqueue_s * 1000:.0f}ms")
+    print(f"      enqueue→start p50 {percentile(step.waits, 50):7.2f}s  p95 {percentile(step.waits, 95):7.2f}s")
+    print(f"      execution     p50 {percentile(step.durations, 50):7.3f}s  p95 {percentile(step.durations, 95):7.3f}s")
+    print(f"      drain {step.drain_s or 0:.1f}s → {step.drain_rate:.1f} jobs/s, peak depth {peak}")
+
+    # Compact depth curve: queue length at each 10% of the drain window
+    if step.depth:
+        end = step.depth[-1][0]
+        marks = [min(step.depth, key=lambda s: abs(s[0] - end * i / 10))[1] for i in range(11)]
+        print(f"      depth curve: {' '.join(str(m) for m in marks)}")
+
+def main():
+    """Run the queue throughput sweep"""
+    parser = argparse.ArgumentParser(description="RQ worker throughput benchmark")
+    parser.add_argument("--redis-url", default=os.environ.get("REDIS_QUEUE_URL", "redis://localhost:48511"))
+    parser.add_argument("--queue", choices=sorted(WORKER_SERVICES), default="short")
+    parser.add_argument("--queue-name", help="Full RQ queue name (default: discovered from workers)")
+    parser.add_argument("--replicas", default="1,2,4", help="Comma-separated worker replica counts")
+    parser.add_argument("--jobs", type=int, default=200, help="Jobs per burst")
+    parser.add_argument("--profile", choices=["cpu", "io", "sleep"], default="sleep")
+    parser.add_argument("--cpu-iterations", type=int, default=200_000, help="PBKDF2 rounds per CPU job")
+    parser.add_argument("--io-mb", type=int, default=4, help="MB written + fsynced per IO job")
+    parser.add_argument("--sleep-s", type=float, default=0.2, help="Seconds per sleep job")
+    parser.add_argument("--target-wait", type=float, default=30, help="Acceptable p95 enqueue→start (s)")
+    parser.add_argument("--timeout", type=float, default=600, help="Max seconds to drain one burst")
+    parser.add_argument("--engine", default=os.environ.get("CONTAINER_ENGINE", "podman"))
+    parser.add_argument("-f", "--file", action="append", dest="files")
+    parser.add_argument("--out", help="Write step results as JSON")
+    args = parser.parse_args()
+
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+    print(f"{Colors.BLUE}Press SaaS Platform - Queue Throughput Benchmark{Colors.RESET}")
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+
+    if Redis is None:
+        print(f"  {Colors.RED}✗{Colors.RESET} redis/rq not installed (pip install redis rq)")
+        return 1
+
+    files = args.files or DEFAULT_COMPOSE_FILES
+    service = WORKER_SERVICES[args.queue]
+    conn = Redis.from_url(args.redis_url)
+    try:
+        queue_name = resolve_queue(conn, args.queue, args.queue_name)
+    except Exception as e:
+        print(f"  {Colors.RED}✗{Colors.RESET} {e}")
+        return 1
+
+    queue = Queue(queue_name, connection=conn)
+    spec = job_spec(args.profile, args)
+    original = running_replicas(args.engine, service)
+    # Workers of other services may consume this queue too (queue-long also listens on short)
+    others = listeners(conn, queue_name) - original
+    print(f"  Queue {queue_name} ({service}, {original} replica(s), {others} other listener(s))")
+    print(f"  Profile {args.profile}: {spec[0]}{spec[1]!r}")
+
+    steps = []
+    try:
+        for replicas in [int(r) for r in args.replicas.split(",")]:
+            print(f"\n🔍 {service} × {replicas}")
+            count = scale_workers(args.engine, files, service, replicas, conn, queue_name, others)
+            step = run_step(conn, queue, replicas, count, args.jobs, spec, args.timeout)
+            print_step(step)
+            steps.append(step)
+    finally:
+        compose(args.engine, files, "up", "-d", "--no-recreate", "--scale", f"{service}={original}", service)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump([{**step.__dict__, "drain_rate": step.drain_rate} for step in steps], f, indent=2)
+
+    adequate = [s for s in steps if not s.failed and s.waits and percentile(s.waits, 95) <= args.target_wait]
+    print()
+    if adequate:
+        best = min(adequate, key=lambda s: s.replicas)
+        print(f"{Colors.GREEN}✓ {best.replicas} {service} replica(s) drain a {args.jobs}-job "
+              f"{args.profile} burst with p95 wait {percentile(best.waits, 95):.1f}s "
+              f"(<= {args.target_wait:.0f}s){Colors.RESET}")
+        return 0
+    print(f"{Colors.RED}✗ No replica count kept p95 enqueue→start under {args.target_wait:.0f}s{Colors.RESET}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Host Redirect Scale Benchmark - Press SaaS Platform
+Compares the map-based redirect config from scripts/gen_redirect_config.py
+(one server block, `map $host`) with the one-server-block-per-host layout at
+10, 100 and 1000 configured hostnames. For each layout and size it starts a
+throwaway nginx container, and reports:
+- time from container start to the first correct 301 (config load),
+- redirect latency p50/p95 over keep-alive connections, spread over all hosts,
+- nginx memory (PSS summed over master + workers).
+
+It starts and removes its own container (it defines no pytest-collected
+test functions) and never touches the running stack.
+
+Usage:
+    python3 tests/performance/test_redirect_scale.py
+    python3 tests/performance/test_redirect_scale.py --hosts 10,100,1000,5000 --requests 2000
+
+Addresses: FR-001, NFR-002
+"""
+
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.gen_redirect_config import (  # noqa: E402
+    LISTEN_PORT, PUBLIC_PORT, Redirect, hash_sizes, render_config, synthetic_redirects,
+)
+from scripts.lib.stats import percentile  # noqa: E402
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+ENGINE = os.environ.get("CONTAINER_ENGINE", "podman")
+CONTAINER = "fcs-press-redirect-bench"
+BENCH_PORT = 48597
+DEFAULT_IMAGE = "docker.io/library/nginx:stable-alpine"
+LAYOUTS = ["map", "servers"]
+
+# Answers hosts that are not configured, like the frappe server block does in the stack
+FALLBACK_SERVER = f"""
+server {{
+    listen {LISTEN_PORT} default_server;
+    server_name _;
+    return 404;
+}}
+"""
+
+# Prints "pid <n>" then the memory lines of every nginx process
+MEMORY_SCRIPT = (
+    'for p in /proc/[0-9]*; do '
+    '[ "$(cat $p/comm 2>/dev/null)" = nginx ] || continue; '
+    'echo "pid ${p#/proc/}"; '
+    'cat $p/smaps_rollup 2>/dev/null || grep VmRSS $p/status; '
+    'done'
+)
+
+# =============================================================================
+# Configs
+# =============================================================================
+
+def render_server_blocks(redirects: List[Redirect]) -> str:
+    """Baseline layout: one server block per alias (the current override, repeated)"""
+    max_size, bucket_size = hash_sizes(redirects)
+    blocks = [f"server_names_hash_max_size {max_size};", f"server_names_hash_bucket_size {bucket_size};"]
+    for r in redirects:
+        blocks.append(f"server {{\n    listen {LISTEN_PORT};\n    server_name {r.alias};\n"
+                      f"    return 301 http://{r.target}:{PUBLIC_PORT}$request_uri;\n}}")
+    return "\n".join(blocks) + "\n"
+
+def render_layout(layout: str, redirects: List[Redirect]) -> str:
+    body = render_config(redirects) if layout == "map" else render_server_blocks(redirects)
+    return body + FALLBACK_SERVER
+
+# =============================================================================
+# Container
+# =============================================================================
+
+def run_command(args: List[str], timeout: float = 60) -> Tuple[int, str, str]:
+    """Run without a shell; (returncode, stdout, stderr)"""
+    try:
+        result = subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+        return result.returncode, result.stdout, result.stderr
+    except FileNotFoundError:
+        return 127, "", f"{args[0]}: not found"
+    except subprocess.TimeoutExpired:
+        return 124, "", f"timed out after {timeout}s"
+
+def remove_container() -> None:
+    run_command([ENGINE, "rm", "-f", CONTAINER])
+
+def start_nginx(image: str, config: Path) -> Optional[str]:
+    """Start nginx with the config as its only conf.d file; returns an error or None"""
+    remove_container()
+    code, _, err = run_command([
+        ENGINE, "run", "-d", "--name", CONTAINER,
+        "-p", f"{BENCH_PORT}:{LISTEN_PORT}",
+        "-v", f"{config}:/etc/nginx/conf.d/default.conf:ro",
+        image,
+    ])
+    if code != 0:
+        return err.strip() or f"exit {code}"
+    return None
+
+def nginx_memory_kb() -> Tuple[Optional[int], int]:
+    """(PSS in kB summed over nginx processes, process count); RSS if PSS is unavailable"""
+    code, out, _ = run_command([ENGINE, "exec", CONTAINER, "sh", "-c", MEMORY_SCRIPT], timeout=15)
+    if code != 0:
+        return None, 0
+    per_pid: Dict[str, Dict[str, int]] = {}
+    current: Optional[Dict[str, int]] = None
+    for line in out.splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[0] == "pid":
+            current = per_pid.setdefault(parts[1], {})
+        elif current is not None and len(parts) >= 2 and parts[0] in ("Pss:", "Rss:", "VmRSS:"):
+            current[parts[0].rstrip(":")] = int(parts[1])
+    if not per_pid:
+        return None, 0
+    total = sum(m.get("Pss", m.get("Rss", m.get("VmRSS", 0))) for m in per_pid.values())
+    return total, len(per_pid)
+
+def container_logs() -> str:
+    _, out, err = run_command([ENGINE, "logs", "--tail", "5", CONTAINER], timeout=15)
+    return (out + err).strip()
+
+# =============================================================================
+# Measurement
+# =============================================================================
+
+@dataclass
+class ScaleResult:
+    """One layout at one host count"""
+
+    layout: str
+    hosts: int
+    config_bytes: int = 0
+    ready_ms: Optional[float] = None
+    latencies_ms: List[float] = field(default_factory=list)
+    wrong: int = 0
+    memory_kb: Optional[int] = None
+    processes: int = 0
+    error: str = ""
+
+def expected_location(redirect: Redirect, path: str) -> str:
+    return f"http://{redirect.target}:{PUBLIC_PORT}{path}"
+
+def redirect_once(conn: http.client.HTTPConnection, redirect: Redirect, path: str) -> Tuple[float, bool]:
+    """(latency ms, answer correct) for one request on an open connection"""
+    started = time.perf_counter()
+    conn.request("GET", path, headers={"Host": redirect.alias})
+    response = conn.getresponse()
+    response.read()
+    elapsed = (time.perf_counter() - started) * 1000
+    return elapsed, response.status == 301 and response.getheader("Location") == expected_location(redirect, path)
+
+def wait_ready(redirect: Redirect, started: float, timeout: float) -> Optional[float]:
+    """ms from `started` until nginx answers the first redirect correctly"""
+    while time.perf_counter() - started < timeout:
+        try:
+            conn = http.client.HTTPConnection("localhost", BENCH_PORT, timeout=2)
+            try:
+                _, ok = redirect_once(conn, redirect, "/")
+            finally:
+                conn.close()
+            if ok:
+                return (time.perf_counter() - started) * 1000
+        except (OSError, http.client.HTTPException):
+            pass
+        time.sleep(0.05)
+    return None
+
+def measure(layout: str, count: int, image: str, requests: int, timeout: float) -> ScaleResult:
+    """Start nginx with `count` hosts in `layout`, then time redirects across all hosts"""
+    result = ScaleResult(layout, count)
+    redirects = synthetic_redirects(count)
+    with tempfile.TemporaryDirectory(prefix="fcs-redirect-") as tmp:
+        config = Path(tmp) / "redirect.conf"
+        config.write_text(render_layout(layout, redirects))
+        config.chmod(0o644)
+        Path(tmp).chmod(0o755)
+        result.config_bytes = config.stat().st_size
+
+        started = time.perf_counter()
+        error = start_nginx(image, config)
+        if error:
+            result.error = error
+            return result
+        try:
+            result.ready_ms = wait_ready(redirects[-1], started, timeout)
+            if result.ready_ms is None:
+                result.error = f"no 301 within {timeout:.0f}s: {container_logs()}"
+                return result
+
+            conn = http.client.HTTPConnection("localhost", BENCH_PORT, timeout=5)
+            try:
+                for i in range(requests):
+                    redirect = redirects[(i * 7919) % count]  # stride through all hosts
+                    latency, ok = redirect_once(conn, redirect, f"/app/todo?i={i}")
+                    result.latencies_ms.append(latency)
+                    result.wrong += not ok
+            except (OSError, http.client.HTTPException) as e:
+                result.error = f"request failed: {e}"
+            finally:
+                conn.close()
+            result.memory_kb, result.processes = nginx_memory_kb()
+        finally:
+            remove_container()
+    return result
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def print_results(results: List[ScaleResult]) -> None:
+    print(f"\n  {'layout':<9}{'hosts':>7}{'config':>10}{'ready':>10}{'p50':>9}{'p95':>9}"
+          f"{'memory':>11}{'procs':>7}")
+    for r in results:
+        if r.error:
+            print(f"  {r.layout:<9}{r.hosts:>7}  {Colors.RED}✗{Colors.RESET} {r.error}")
+            continue
+        memory = f"{r.memory_kb / 1024:.1f} MB" if r.memory_kb is not None else "-"
+        print(f"  {r.layout:<9}{r.hosts:>7}{r.config_bytes / 1024:>8.1f}KB{r.ready_ms:>8.0f}ms"
+              f"{percentile(r.latencies_ms, 50):>7.2f}ms{percentile(r.latencies_ms, 95):>7.2f}ms"
+              f"{memory:>11}{r.processes:>7}")
+
+def evaluate(results: List[ScaleResult]) -> bool:
+    """Every run must load and answer correctly; compare map vs server blocks per size"""
+    passed = True
+    for r in results:
+        if r.error:
+            passed = False
+        elif r.wrong:
+            print(f"  {Colors.RED}✗{Colors.RESET} {r.layout}/{r.hosts}: {r.wrong} wrong redirect answers")
+            passed = False
+
+    by_key = {(r.layout, r.hosts): r for r in results if not r.error}
+    for hosts in sorted({r.hosts for r in results}):
+        mapped, blocks = by_key.get(("map", hosts)), by_key.get(("servers", hosts))
+        if not (mapped and blocks):
+            continue
+        latency = percentile(mapped.latencies_ms, 50) - percentile(blocks.latencies_ms, 50)
+        line = f"  {hosts} hosts: map p50 {latency:+.2f}ms vs server blocks"
+        if mapped.memory_kb is not None and blocks.memory_kb is not None:
+            line += f", memory {(mapped.memory_kb - blocks.memory_kb) / 1024:+.1f} MB"
+        print(line)
+    return passed
+
+def main():
+    """Run the redirect scale benchmark"""
+    parser = argparse.ArgumentParser(description="Map-based vs per-host nginx redirect benchmark")
+    parser.add_argument("--hosts", default="10,100,1000", help="Comma-separated host counts")
+    parser.add_argument("--layouts", default=",".join(LAYOUTS), help=f"Comma-separated subset of {LAYOUTS}")
+    parser.add_argument("--requests", type=int, default=1000, help="Redirects timed per run")
+    parser.add_argument("--image", default=DEFAULT_IMAGE, help="nginx image to run")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for nginx to load")
+    args = parser.parse_args()
+
+    counts = [int(c) for c in args.hosts.split(",") if c]
+    layouts = [l for l in args.layouts.split(",") if l in LAYOUTS]
+
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+    print(f"{Colors.BLUE}Press SaaS Platform - Host Redirect Scale Benchmark{Colors.RESET}")
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+    print(f"  Engine: {ENGINE}, image: {args.image}, port: {BENCH_PORT}, requests/run: {args.requests}")
+
+    results = []
+    try:
+        for count in counts:
+            for layout in layouts:
+                print(f"  ▶ {layout} with {count} hosts...")
+                results.append(measure(layout, count, args.image, args.requests, args.timeout))
+    except KeyboardInterrupt:
+        remove_container()
+
+    print_results(results)
+    print()
+    if results and evaluate(results):
+        print(f"\n{Colors.GREEN}🎉 Redirect scale benchmark passed!{Colors.RESET}")
+        return 0
+    print(f"\n{Colors.RED}✗ Redirect scale benchmark failed{Colors.RESET}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
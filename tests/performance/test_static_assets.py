@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Static Asset Performance Tests - Press SaaS Platform
+Crawls the /assets URLs referenced by the desk entry page (and the CSS it
+loads) through the frontend nginx, and checks compression negotiation
+(gzip/brotli), long-lived caching, conditional 304 revalidation and the
+bytes transferred per page load (first visit vs repeat visit).
+
+With --page-cache it also benchmarks the anonymous page cache from
+overrides/compose.nginx-cache.yaml: cached (X-Cache-Status: HIT) vs
+backend-rendered latency for the same pages.
+
+Usage:
+    python3 tests/performance/test_static_assets.py
+    python3 tests/performance/test_static_assets.py --page-cache --requests 200
+
+Addresses: NFR-002, CHK007
+"""
+
+import argparse
+import http.client
+import re
+import socket
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.lib.stats import percentile  # noqa: E402
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+FRONTEND_HOST = "localhost"
+FRONTEND_PORT = 48580
+DEFAULT_SITE = "press.localhost"
+DEFAULT_PAGES = ["/login"]
+ONE_YEAR = 31536000
+# Below this size compression isn't worth it (matches gzip_min_length in spirit)
+MIN_COMPRESSIBLE_BYTES = 1024
+COMPRESSIBLE_TYPES = ("text/", "javascript", "json", "xml", "svg")
+
+# =============================================================================
+# HTTP client
+# =============================================================================
+
+@dataclass
+class Response:
+    """Status, lower-cased headers and raw (still encoded) body"""
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+    @property
+    def header_bytes(self) -> int:
+        return sum(len(k) + len(v) + 4 for k, v in self.headers.items()) + 17
+
+class FrontendClient:
+    """Keep-alive HTTP/1.1 client for one site behind the frontend"""
+
+    def __init__(self, site: str, host: str = FRONTEND_HOST, port: int = FRONTEND_PORT, timeout: float = 10):
+        self.site = site
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def get(self, path: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        """GET without decoding the body, so len(body) is the bytes on the wire"""
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._conn.request("GET", path, headers={"Host": self.site, **(headers or {})})
+                response = self._conn.getresponse()
+                body = response.read()
+                if response.will_close:
+                    self.close()
+                return Response(response.status, {k.lower(): v for k, v in response.getheaders()}, body)
+            except (OSError, http.client.HTTPException):
+                self.close()
+                if attempt:
+                    raise
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+def frontend_reachable() -> bool:
+    """TCP check before spending time on a crawl"""
+    try:
+        socket.create_connection((FRONTEND_HOST, FRONTEND_PORT), timeout=2).close()
+        return True
+    except OSError:
+        return False
+
+# =============================================================================
+# Crawl
+# =============================================================================
+
+class AssetLinkParser(HTMLParser):
+    """Collects /assets URLs from script, link and img tags"""
+
+    def __init__(self):
+        super().__init__()
+        self.urls: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attr = {"script": "src", "link": "href", "img": "src"}.get(tag)
+        value = dict(attrs).get(attr) if attr else None
+        if value and value.startswith("/assets/") and value not in self.urls:
+            self.urls.append(value)
+
+CSS_URL = re.compile(r"""url\(\s*['"]?(/assets/[^'")\s]+)""")
+
+@dataclass
+class AssetReport:
+    """What one asset costs and how it is cached"""
+    path: str
+    status: int
+    content_type: str = ""
+    encoding: str = "identity"
+    wire_bytes: int = 0
+    identity_bytes: int = 0
+    cache_control: str = ""
+    max_age: Optional[int] = None
+    immutable: bool = False
+    validator: str = ""
+    revalidate_status: Optional[int] = None
+
+    @property
+    def compressible(self) -> bool:
+        return any(t in self.content_type for t in COMPRESSIBLE_TYPES) \
+            and self.identity_bytes >= MIN_COMPRESSIBLE_BYTES
+
+def parse_max_age(cache_control: str) -> Optional[int]:
+    match = re.search(r"(?:s-)?max-age=(\d+)", cache_control)
+    return int(match.group(1)) if match else None
+
+def inspect_asset(client: FrontendClient, path: str) -> Tuple[AssetReport, Response]:
+    """Fetch compressed, uncompressed and conditionally; return the report and the decoded body"""
+    compressed = client.get(path, {"Accept-Encoding": "br, gzip"})
+    report = AssetReport(path, compressed.status)
+    if compressed.status != 200:
+        return report, compressed
+
+    report.content_type = compressed.headers.get("content-type", "")
+    report.encoding = compressed.headers.get("content-encoding", "identity")
+    report.wire_bytes = len(compressed.body) + compressed.header_bytes
+    report.cache_control = compressed.headers.get("cache-control", "")
+    report.max_age = parse_max_age(report.cache_control)
+    report.immutable = "immutable" in report.cache_control
+
+    plain = client.get(path, {"Accept-Encoding": "identity"})
+    report.identity_bytes = len(plain.body)
+
+    etag = compressed.headers.get("etag")
+    last_modified = compressed.headers.get("last-modified")
+    if etag or last_modified:
+        report.validator = "ETag" if etag else "Last-Modified"
+        conditional = {"Accept-Encoding": "br, gzip"}
+        if etag:
+            conditional["If-None-Match"] = etag
+        else:
+            conditional["If-Modified-Since"] = last_modified
+        report.revalidate_status = client.get(path, conditional).status
+    return report, plain
+
+@dataclass
+class PageReport:
+    """One entry page and every asset it pulls in"""
+    path: str
+    status: int
+    html_wire_bytes: int = 0
+    assets: List[AssetReport] = field(default_factory=list)
+
+    def first_visit_bytes(self) -> int:
+        return self.html_wire_bytes + sum(a.wire_bytes for a in self.assets)
+
+    def repeat_visit_bytes(self) -> int:
+        """HTML again, plus a 304 round-trip for assets that are not fresh for a day"""
+        stale = [a for a in self.assets if not a.max_age or a.max_age < 86400]
+        return self.html_wire_bytes + sum(300 if a.revalidate_status == 304 else a.wire_bytes for a in stale)
+
+def crawl_page(client: FrontendClient, path: str) -> PageReport:
+    """Fetch the page, its linked assets and the assets referenced from its CSS"""
+    page = client.get(path, {"Accept-Encoding": "br, gzip"})
+    report = PageReport(path, page.status, len(page.body) + page.header_bytes)
+    if page.status != 200:
+        return report
+
+    html = client.get(path, {"Accept-Encoding": "identity"}).body.decode("utf-8", "replace")
+    parser = AssetLinkParser()
+    parser.feed(html)
+
+    queue = list(parser.urls)
+    seen = set(queue)
+    while queue:
+        asset_path = queue.pop(0)
+        asset, plain = inspect_asset(client, asset_path)
+        report.assets.append(asset)
+        if "text/css" in asset.content_type:
+            for nested in CSS_URL.findall(plain.body.decode("utf-8", "replace")):
+                if nested not in seen:
+                    seen.add(nested)
+                    queue.append(nested)
+    return report
+
+# =============================================================================
+# Checks
+# =============================================================================
+
+def kb(value: int) -> str:
+    return f"{value / 1024:.1f} KB"
+
+def print_page(report: PageReport) -> None:
+    """Per-asset table for one page"""
+    print(f"\n  Page {report.path} (HTTP {report.status}, {len(report.assets)} assets)")
+    print(f"    {'asset':<58}{'enc':>6}{'wire':>10}{'raw':>10}{'max-age':>10}{'304':>5}")
+    for a in sorted(report.assets, key=lambda a: a.wire_bytes, reverse=True):
+        name = a.path if len(a.path) <= 56 else "…" + a.path[-55:]
+        max_age = f"{a.max_age}" if a.max_age is not None else "-"
+        flag = "i" if a.immutable else ""
+        encoding = "-" if a.encoding == "identity" else a.encoding
+        print(f"    {name:<58}{encoding:>6}{kb(a.wire_bytes):>10}{kb(a.identity_bytes):>10}"
+              f"{max_age + flag:>10}{a.revalidate_status or '-':>5}")
+    print(f"    First visit: {kb(report.first_visit_bytes())} in {len(report.assets) + 1} requests; "
+          f"repeat visit: {kb(report.repeat_visit_bytes())}")
+
+def evaluate_assets(reports: List[PageReport]) -> bool:
+    """Fail on uncompressed text assets, short cache lifetimes or broken 304s"""
+    assets = {a.path: a for r in reports for a in r.assets}.values()
+    ok = [a for a in assets if a.status == 200]
+    passed = True
+
+    missing = [a for a in assets if a.status != 200]
+    if missing:
+        print(f"  {Colors.RED}✗{Colors.RESET} {len(missing)} referenced assets not served: "
+              f"{', '.join(a.path for a in missing[:3])}")
+        passed = False
+
+    uncompressed = [a for a in ok if a.compressible and a.encoding == "identity"]
+    if uncompressed:
+        print(f"  {Colors.RED}✗{Colors.RESET} {len(uncompressed)} compressible assets sent uncompressed "
+              f"(e.g. {uncompressed[0].path})")
+        passed = False
+    else:
+        print(f"  {Colors.GREEN}✓{Colors.RESET} Text assets compressed")
+    brotli = sum(1 for a in ok if a.encoding == "br")
+    if not brotli:
+        print(f"  {Colors.YELLOW}⚠{Colors.RESET} No brotli responses (gzip only; nginx lacks ngx_brotli)")
+
+    short = [a for a in ok if (a.max_age or 0) < ONE_YEAR]
+    if short:
+        print(f"  {Colors.RED}✗{Colors.RESET} {len(short)} assets cached < 1 year (e.g. {short[0].path}: "
+              f"'{short[0].cache_control or 'no Cache-Control'}')")
+        passed = False
+    else:
+        print(f"  {Colors.GREEN}✓{Colors.RESET} All assets cached for >= 1 year")
+    hashed = [a for a in ok if "/dist/" in a.path]
+    if hashed and not all(a.immutable for a in hashed):
+        print(f"  {Colors.YELLOW}⚠{Colors.RESET} {sum(not a.immutable for a in hashed)}/{len(hashed)} "
+              f"hashed bundles lack 'immutable' (browsers may still revalidate on reload)")
+
+    broken_304 = [a for a in ok if a.validator and a.revalidate_status != 304]
+    no_validator = [a for a in ok if not a.validator]
+    if broken_304:
+        print(f"  {Colors.RED}✗{Colors.RESET} {len(broken_304)} conditional requests did not return 304 "
+              f"(e.g. {broken_304[0].path}: {broken_304[0].revalidate_status})")
+        passed = False
+    else:
+        print(f"  {Colors.GREEN}✓{Colors.RESET} Conditional requests return 304")
+    if no_validator:
+        print(f"  {Colors.YELLOW}⚠{Colors.RESET} {len(no_validator)} assets have no ETag/Last-Modified")
+    return passed
+
+def test_static_assets(site: str = DEFAULT_SITE, pages: Optional[List[str]] = None) -> bool:
+    """Test compression, caching and revalidation of the desk's static assets"""
+    print(f"\n🔍 Testing static assets...")
+
+    if not frontend_reachable():
+        print(f"  {Colors.RED}✗{Colors.RESET} Frontend {FRONTEND_HOST}:{FRONTEND_PORT} not reachable")
+        return False
+
+    client = FrontendClient(site)
+    try:
+        reports = [crawl_page(client, path) for path in pages or DEFAULT_PAGES]
+    except (OSError, http.client.HTTPException) as e:
+        print(f"  {Colors.RED}✗{Colors.RESET} Crawl failed: {e}")
+        return False
+    finally:
+        client.close()
+
+    for report in reports:
+        print_page(report)
+    print()
+    if not any(r.assets for r in reports):
+        print(f"  {Colors.RED}✗{Colors.RESET} No /assets references found")
+        return False
+    return evaluate_assets(reports)
+
+# =============================================================================
+# Page cache benchmark
+# =============================================================================
+
+def _hammer(site: str, path: str, headers: Dict[str, str], count: int, concurrency: int
+            ) -> Tuple[List[float], Dict[str, int], List[str]]:
+    """count GETs over `concurrency` keep-alive connections; latencies (ms), X-Cache-Status counts
+    and the errors of the requests that failed"""
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors: List[str] = []
+    lock = threading.Lock()
+    per_thread = [count // concurrency + (1 if i < count % concurrency else 0) for i in range(concurrency)]
+
+    def worker(n: int) -> None:
+        client = FrontendClient(site)
+        try:
+            for _ in range(n):
+                start = time.perf_counter()
+                try:
+                    response = client.get(path, {"Accept-Encoding": "gzip", **headers})
+                except (OSError, http.client.HTTPException) as e:
+                    with lock:
+                        errors.append(str(e) or type(e).__name__)
+                    continue
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    key = response.headers.get("x-cache-status", "absent")
+                    statuses[key] = statuses.get(key, 0) + 1
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in per_thread]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, statuses, errors
+
+def test_page_cache(site: str = DEFAULT_SITE, pages: Optional[List[str]] = None,
+                    requests: int = 100, concurrency: int = 4) -> bool:
+    """Test that anonymous pages are served from the nginx cache and faster than the backend"""
+    print(f"\n🔍 Testing anonymous page cache...")
+
+    if not frontend_reachable():
+        print(f"  {Colors.RED}✗{Colors.RESET} Frontend {FRONTEND_HOST}:{FRONTEND_PORT} not reachable")
+        return False
+
+    passed = True
+    for path in pages or DEFAULT_PAGES:
+        _hammer(site, path, {}, 1, 1)  # prime the cache
+        cached, cached_status, cached_errors = _hammer(site, path, {}, requests, concurrency)
+        # A session cookie other than Guest always bypasses the cache
+        backend, backend_status, backend_errors = _hammer(site, path, {"Cookie": "sid=page-cache-benchmark"},
+                                                          requests, concurrency)
+        errors = cached_errors + backend_errors
+        if errors:
+            print(f"  {path}")
+            print(f"  {Colors.RED}✗{Colors.RESET} {len(errors)} of {2 * requests} requests failed "
+                  f"(first: {errors[0]})")
+            passed = False
+            continue
+
+        hits = cached_status.get("HIT", 0) + cached_status.get("UPDATING", 0) + cached_status.get("STALE", 0)
+        hit_ratio = hits / max(len(cached), 1)
+        gain = percentile(backend, 50) / max(percentile(cached, 50), 1e-6)
+        print(f"  {path}")
+        print(f"    anonymous: p50 {percentile(cached, 50):.1f}ms, p95 {percentile(cached, 95):.1f}ms, "
+              f"X-Cache-Status {dict(sorted(cached_status.items()))}")
+        print(f"    session:   p50 {percentile(backend, 50):.1f}ms, p95 {percentile(backend, 95):.1f}ms, "
+              f"X-Cache-Status {dict(sorted(backend_status.items()))}")
+
+        if "absent" in cached_status:
+            print(f"  {Colors.RED}✗{Colors.RESET} No X-Cache-Status header: start the frontend with "
+                  f"-f overrides/compose.nginx-cache.yaml")
+            passed = False
+        elif hit_ratio < 0.9:
+            print(f"  {Colors.RED}✗{Colors.RESET} Hit ratio {hit_ratio:.0%} < 90%")
+            passed = False
+        elif gain <= 1.0:
+            print(f"  {Colors.RED}✗{Colors.RESET} Cached pages not faster ({gain:.1f}x)")
+            passed = False
+        else:
+            print(f"  {Colors.GREEN}✓{Colors.RESET} Hit ratio {hit_ratio:.0%}, p50 {gain:.1f}x faster than backend")
+    return passed
+
+def main():
+    """Run the static asset suite"""
+    parser = argparse.ArgumentParser(description="Static asset and page cache performance tests")
+    parser.add_argument("--site", default=DEFAULT_SITE, help="Host header / site name")
+    parser.add_argument("--pages", default=",".join(DEFAULT_PAGES), help="Comma-separated entry pages")
+    parser.add_argument("--page-cache", action="store_true",
+                        help="Also benchmark the nginx page cache (compose.nginx-cache.yaml)")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per page and mode for --page-cache")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    pages = [p for p in args.pages.split(",") if p]
+
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+    print(f"{Colors.BLUE}Press SaaS Platform - Static Asset Tests{Colors.RESET}")
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+
+    passed = test_static_assets(args.site, pages)
+    if args.page_cache:
+        passed = test_page_cache(args.site, pages, args.requests, args.concurrency) and passed
+
+    if passed:
+        print(f"\n{Colors.GREEN}🎉 Static asset tests passed!{Colors.RESET}")
+        return 0
+    print(f"\n{Colors.RED}✗ Static asset tests failed{Colors.RESET}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
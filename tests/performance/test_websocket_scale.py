@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+WebSocket Connection-Scale Test - Press SaaS Platform
+Opens many concurrent socket.io connections to the `websocket` service
+(apps/frappe/socketio.js) through the frontend nginx, spread over sites,
+subscribes them to a doc room, then publishes realtime events on
+redis-queue's "events" channel exactly like frappe.publish_realtime and
+measures:
+- connect + namespace auth time (p50/p95) and failures,
+- fan-out latency: publish → delivery on every subscribed connection,
+- memory of the websocket container's node process, per connection.
+
+Doc rooms need a logged-in session (`can_subscribe_doc`), so each site is
+logged into once (Administrator / $ADMIN_PASSWORD by default) and the sid
+is shared by its connections. `--room website` uses Guest sessions instead.
+
+Usage:
+    python3 tests/performance/test_websocket_scale.py --connections 2000
+    python3 tests/performance/test_websocket_scale.py --sites press.localhost,site2.localhost --events 50
+
+Addresses: NFR-002, SC-003
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.lib import resp, socketio  # noqa: E402
+from scripts.lib.stats import percentile  # noqa: E402
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    RESET = '\033[0m'
+
+ENGINE = os.environ.get("CONTAINER_ENGINE", "podman")
+STACK_HOST = os.environ.get("STACK_HOST", "localhost")
+FRONTEND_PORT = 48580
+REDIS_QUEUE_PORT = 48511
+WEBSOCKET_CONTAINER = "frappe_docker_git-websocket-1"
+BENCH_EVENT = "fcs_bench"
+
+# Prints "pid <n>" then the memory lines of every node process
+MEMORY_SCRIPT = (
+    'for p in /proc/[0-9]*; do '
+    '[ "$(cat $p/comm 2>/dev/null)" = node ] || continue; '
+    'echo "pid ${p#/proc/}"; '
+    'grep -E "^(VmRSS|RssAnon):" $p/status; '
+    'done'
+)
+
+# =============================================================================
+# Setup
+# =============================================================================
+
+def raise_fd_limit(needed: int) -> int:
+    """Lift the soft RLIMIT_NOFILE towards the hard limit; returns the new soft limit"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = hard if hard != resource.RLIM_INFINITY else max(soft, needed)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, target), hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+def login(site: str, user: str, password: str) -> str:
+    """POST /api/method/login for a site; returns the sid cookie
+
+    Raises:
+        RuntimeError: If the login is refused or returns no sid
+    """
+    conn = http.client.HTTPConnection(STACK_HOST, FRONTEND_PORT, timeout=30)
+    try:
+        body = urllib.parse.urlencode({"usr": user, "pwd": password})
+        conn.request("POST", "/api/method/login", body=body, headers={
+            "Host": site, "Content-Type": "application/x-www-form-urlencoded", "Accept": "application/json",
+        })
+        response = conn.getresponse()
+        response.read()
+        cookies = response.msg.get_all("Set-Cookie") or []
+    finally:
+        conn.close()
+    if response.status != 200:
+        raise RuntimeError(f"login on {site} as {user}: HTTP {response.status}")
+    for cookie in cookies:
+        name, _, rest = cookie.partition("=")
+        if name.strip() == "sid":
+            return rest.split(";", 1)[0]
+    raise RuntimeError(f"login on {site} returned no sid cookie")
+
+def node_memory_kb(engine: str, container: str) -> Optional[int]:
+    """Anonymous RSS (heap, buffers) summed over node processes; VmRSS if unavailable"""
+    try:
+        result = subprocess.run([engine, "exec", container, "sh", "-c", MEMORY_SCRIPT],
+                                capture_output=True, text=True, timeout=15)
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    per_pid: Dict[str, Dict[str, int]] = {}
+    current: Optional[Dict[str, int]] = None
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[0] == "pid":
+            current = per_pid.setdefault(parts[1], {})
+        elif current is not None and len(parts) >= 2:
+            current[parts[0].rstrip(":")] = int(parts[1])
+    if not per_pid:
+        return None
+    return sum(m.get("RssAnon", m.get("VmRSS", 0)) for m in per_pid.values())
+
+# =============================================================================
+# Harness
+# =============================================================================
+
+@dataclass
+class ScaleStats:
+    """Shared by every connection task"""
+
+    connect_ms: List[float] = field(default_factory=list)
+    errors: Dict[str, int] = field(default_factory=dict)
+    connected: int = 0
+    subscribed: set = field(default_factory=set)
+    published_at: Dict[Tuple[str, int], float] = field(default_factory=dict)
+    deliveries: Dict[Tuple[str, int], List[float]] = field(default_factory=dict)
+
+    def error(self, reason: str) -> None:
+        reason = reason.splitlines()[0][:80] if reason else "unknown"
+        self.errors[reason] = self.errors.get(reason, 0) + 1
+
+def room_for(args: argparse.Namespace) -> str:
+    """Room name as built by frappe.realtime (get_doc_room / website room)"""
+    return f"doc:{args.doctype}/{args.docname}" if args.room == "doc" else "website"
+
+async def run_connection(index: int, site: str, sid: str, args: argparse.Namespace, stats: ScaleStats,
+                         gate: asyncio.Semaphore, stop: asyncio.Event) -> None:
+    """Connect, subscribe, then record every benchmark event until stop"""
+    headers = {"Host": site, "Origin": f"http://{site}", "Cookie": f"sid={sid}"}
+    async with gate:
+        started = time.perf_counter()
+        try:
+            client = await socketio.connect(STACK_HOST, FRONTEND_PORT, f"/{site}", headers, args.timeout)
+        except (OSError, asyncio.TimeoutError, socketio.SocketIOError) as e:
+            stats.error(f"{type(e).__name__}: {e}")
+            return
+        stats.connect_ms.append((time.perf_counter() - started) * 1000)
+    stats.connected += 1
+
+    try:
+        if args.room == "doc":
+            await client.emit("doc_subscribe", args.doctype, args.docname)
+        stop_wait = asyncio.ensure_future(stop.wait())
+        while not stop.is_set():
+            recv = asyncio.ensure_future(client.recv_event())
+            done, _ = await asyncio.wait({recv, stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+            if recv not in done:
+                recv.cancel()
+                break
+            event = recv.result()
+            if event is None:
+                stats.error("disconnected by server")
+                break
+            name, payload = event
+            if name != BENCH_EVENT or not payload:
+                continue
+            received = time.perf_counter()
+            key = (site, payload[0].get("seq"))
+            stats.subscribed.add(index)
+            if key in stats.published_at:
+                stats.deliveries.setdefault(key, []).append((received - stats.published_at[key]) * 1000)
+        stop_wait.cancel()
+    except (OSError, ValueError, socketio.SocketIOError) as e:
+        stats.error(f"{type(e).__name__}: {e}")
+    finally:
+        stats.connected -= 1
+        await client.close()
+
+def publish(redis: resp.RedisConnection, site: str, room: str, seq: int) -> int:
+    """Publish like frappe.publish_realtime; returns the number of Redis subscribers"""
+    message = {"event": BENCH_EVENT, "message": {"seq": seq}, "room": room, "namespace": site}
+    return redis.command("PUBLISH", "events", json.dumps(message))
+
+async def run_scale(args: argparse.Namespace, sids: Dict[str, str]) -> Tuple[ScaleStats, Dict[str, Optional[int]]]:
+    """Ramp up, settle subscriptions, publish the measured events, tear down"""
+    loop = asyncio.get_running_loop()
+    stats = ScaleStats()
+    stop = asyncio.Event()
+    gate = asyncio.Semaphore(args.ramp)
+    sites = list(sids)
+    room = room_for(args)
+    memory = {"baseline": node_memory_kb(args.engine, args.container)}
+
+    redis = resp.connect(STACK_HOST, args.redis_port, os.environ.get("REDIS_PASSWORD") or None, timeout=10)
+    try:
+        ramp_started = time.perf_counter()
+        tasks = [asyncio.ensure_future(run_connection(i, sites[i % len(sites)], sids[sites[i % len(sites)]],
+                                                      args, stats, gate, stop))
+                 for i in range(args.connections)]
+        ramp_deadline = ramp_started + args.timeout * (args.connections / args.ramp + 1)
+        while len(stats.connect_ms) + sum(stats.errors.values()) < args.connections \
+                and time.perf_counter() < ramp_deadline:
+            await asyncio.sleep(0.2)
+        print(f"  Ramp-up: {stats.connected}/{args.connections} connected in "
+              f"{time.perf_counter() - ramp_started:.1f}s")
+
+        # doc_subscribe has no ack: publish unmeasured probes until every connection got one
+        settle_deadline = time.perf_counter() + args.settle
+        seq = -1
+        while len(stats.subscribed) < stats.connected and time.perf_counter() < settle_deadline:
+            for site in sites:
+                receivers = await loop.run_in_executor(None, publish, redis, site, room, seq)
+                if receivers == 0:
+                    stats.error("no socket.io server subscribed to the Redis 'events' channel")
+            seq -= 1
+            await asyncio.sleep(0.5)
+        print(f"  Subscribed: {len(stats.subscribed)}/{stats.connected} connections to '{room}'")
+        memory["loaded"] = node_memory_kb(args.engine, args.container)
+
+        for seq in range(args.events):
+            for site in sites:
+                stats.published_at[(site, seq)] = time.perf_counter()
+                await loop.run_in_executor(None, publish, redis, site, room, seq)
+            await asyncio.sleep(args.interval)
+        await asyncio.sleep(min(args.timeout, 2.0))  # let the last fan-out drain
+    finally:
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        redis.close()
+    return stats, memory
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def report(stats: ScaleStats, memory: Dict[str, Optional[int]], connections: int, events: int,
+           max_fanout_ms: float) -> bool:
+    """Print the results and apply the pass criteria"""
+    passed = True
+    opened = len(stats.connect_ms)
+    print(f"\n  Connections: {opened}/{connections} opened, connect+auth p50 "
+          f"{percentile(stats.connect_ms, 50):.0f}ms, p95 {percentile(stats.connect_ms, 95):.0f}ms")
+    for reason, count in sorted(stats.errors.items(), key=lambda item: -item[1])[:5]:
+        print(f"    {Colors.YELLOW}⚠{Colors.RESET} {count}× {reason}")
+
+    subscribed = len(stats.subscribed)
+    expected = subscribed * events
+    delivered = [latency for key in stats.published_at for latency in stats.deliveries.get(key, [])]
+    completion = [max(stats.deliveries[key]) for key in stats.published_at if stats.deliveries.get(key)]
+    print(f"  Fan-out: {len(delivered)}/{expected} deliveries ({events} events per site, {subscribed} connections)")
+    print(f"    Delivery latency: p50 {percentile(delivered, 50):.1f}ms, p95 {percentile(delivered, 95):.1f}ms, "
+          f"p99 {percentile(delivered, 99):.1f}ms")
+    print(f"    Event fully delivered: p50 {percentile(completion, 50):.1f}ms, "
+          f"p95 {percentile(completion, 95):.1f}ms")
+
+    if memory.get("baseline") is not None and memory.get("loaded") is not None and opened:
+        per_connection = (memory["loaded"] - memory["baseline"]) / opened
+        print(f"  websocket memory: {memory['baseline'] / 1024:.1f} MB idle → {memory['loaded'] / 1024:.1f} MB "
+              f"loaded, ~{per_connection:.1f} KB per connection")
+    else:
+        print(f"  {Colors.YELLOW}⚠{Colors.RESET} websocket memory not sampled (container exec failed)")
+
+    if opened < connections * 0.99:
+        print(f"  {Colors.RED}✗{Colors.RESET} Only {opened / max(connections, 1):.1%} of connections opened")
+        passed = False
+    if subscribed < opened * 0.99:
+        print(f"  {Colors.RED}✗{Colors.RESET} Only {subscribed}/{opened} connections received events")
+        passed = False
+    if expected and len(delivered) < expected * 0.99:
+        print(f"  {Colors.RED}✗{Colors.RESET} {expected - len(delivered)} deliveries lost")
+        passed = False
+    if completion and percentile(completion, 95) > max_fanout_ms:
+        print(f"  {Colors.RED}✗{Colors.RESET} Fan-out p95 {percentile(completion, 95):.0f}ms > {max_fanout_ms:.0f}ms")
+        passed = False
+    if passed:
+        print(f"  {Colors.GREEN}✓{Colors.RESET} {opened} live connections, fan-out p95 "
+              f"{percentile(completion, 95):.0f}ms")
+    return passed
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="socket.io connection-scale and fan-out benchmark")
+    parser.add_argument("--sites", default="press.localhost", help="Comma-separated sites (connections round-robin)")
+    parser.add_argument("--connections", type=int, default=1000, help="Concurrent realtime connections")
+    parser.add_argument("--ramp", type=int, default=50, help="Connection handshakes in flight at once")
+    parser.add_argument("--room", choices=["doc", "website"], default="doc",
+                        help="doc: doc_subscribe (logged in); website: Guest website room")
+    parser.add_argument("--doctype", default="User")
+    parser.add_argument("--docname", default="Administrator")
+    parser.add_argument("--user", default="Administrator")
+    parser.add_argument("--password", default=os.environ.get("ADMIN_PASSWORD", "admin"))
+    parser.add_argument("--events", type=int, default=20, help="Measured events per site")
+    parser.add_argument("--interval", type=float, default=0.5, help="Seconds between events")
+    parser.add_argument("--settle", type=float, default=30, help="Max seconds to wait for subscriptions")
+    parser.add_argument("--timeout", type=float, default=15, help="Per-connection handshake timeout")
+    parser.add_argument("--max-fanout-ms", type=float, default=1000, help="p95 limit for full delivery")
+    parser.add_argument("--redis-port", type=int, default=REDIS_QUEUE_PORT)
+    parser.add_argument("--engine", default=ENGINE)
+    parser.add_argument("--container", default=WEBSOCKET_CONTAINER)
+    return parser
+
+def run(args: argparse.Namespace) -> bool:
+    """Log in, run the scale scenario and report; True if the pass criteria hold"""
+    site_list = [s for s in args.sites.split(",") if s]
+    try:
+        sids = {site: login(site, args.user, args.password) if args.room == "doc" else "Guest"
+                for site in site_list}
+    except (OSError, http.client.HTTPException, RuntimeError) as e:
+        print(f"  {Colors.RED}✗{Colors.RESET} Login failed: {e}")
+        return False
+
+    limit = raise_fd_limit(args.connections + 256)
+    if limit < args.connections + 64:
+        print(f"  {Colors.YELLOW}⚠{Colors.RESET} Open file limit {limit} is below {args.connections} connections")
+    print(f"  Sites: {', '.join(site_list)}, connections: {args.connections}, room: {room_for(args)}")
+
+    try:
+        stats, memory = asyncio.run(run_scale(args, sids))
+    except (OSError, resp.RespError) as e:
+        print(f"  {Colors.RED}✗{Colors.RESET} redis-queue {STACK_HOST}:{args.redis_port} unavailable: {e}")
+        return False
+    return report(stats, memory, args.connections, args.events, args.max_fanout_ms)
+
+def test_websocket_scale(connections: int = 200, events: int = 10, sites: str = "press.localhost") -> bool:
+    """Test that the websocket service holds N connections and fans events out to all of them"""
+    print(f"\n🔍 Testing websocket connection scale...")
+
+    args = build_parser().parse_args([])
+    args.connections, args.events, args.sites = connections, events, sites
+    return run(args)
+
+def main():
+    """Run the websocket scale test"""
+    args = build_parser().parse_args()
+
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+    print(f"{Colors.BLUE}Press SaaS Platform - WebSocket Scale Test{Colors.RESET}")
+    print(f"{Colors.BLUE}{'='*60}{Colors.RESET}")
+
+    if run(args):
+        print(f"\n{Colors.GREEN}🎉 WebSocket scale test passed!{Colors.RESET}")
+        return 0
+    print(f"\n{Colors.RED}✗ WebSocket scale test failed{Colors.RESET}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
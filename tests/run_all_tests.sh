@@ -26,13 +26,14 @@ FAILED_TESTS=0
 run_test() {
     local test_name="$1"
     local test_script="$2"
+    shift 2
 
     echo -e "\n${BLUE}▶ Running: ${test_name}${NC}"
     echo -e "${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
 
     TOTAL_TESTS=$((TOTAL_TESTS + 1))
 
-    if python3 "$test_script"; then
+    if python3 "$test_script" "$@"; then
         echo -e "${GREEN}✓ ${test_name} PASSED${NC}"
         PASSED_TESTS=$((PASSED_TESTS + 1))
         return 0
@@ -73,6 +74,25 @@ run_test "End-to-End Tests" "tests/e2e/test_http_access.py" || true
 # 3. Security Tests
 run_test "Security Tests" "tests/security/test_security.py" || true
 
+# 4. Performance Tests (latency samples feed the baseline regression gate)
+if [ -z "${PERF_RESULTS:-}" ]; then
+    PERF_RESULTS="$(mktemp -t press-perf-XXXXXX.json)"
+    trap 'rm -f "$PERF_RESULTS"' EXIT
+fi
+PERF_PASSED=0
+run_test "Performance Tests" "tests/performance/test_performance.py" --results "$PERF_RESULTS" && PERF_PASSED=1 || true
+
+# 5. Performance Regression Gate: fails on a significant p95 regression against
+#    the pinned baseline of the same compose stack (else its last runs pooled);
+#    only runs whose suite and gate both passed are recorded (dirty trees never are)
+if [ -s "$PERF_RESULTS" ]; then
+    if run_test "Performance Regression Gate" "tests/performance/perf_baseline.py" compare --results "$PERF_RESULTS" \
+            && [ "$PERF_PASSED" -eq 1 ]; then
+        python3 tests/performance/perf_baseline.py record --results "$PERF_RESULTS" \
+            || echo -e "${YELLOW}⚠ Could not record the performance baseline${NC}"
+    fi
+fi
+
 # Final Summary
 echo -e "\n${BLUE}╔════════════════════════════════════════════════════════════╗${NC}"
 echo -e "${BLUE}║                    FINAL TEST REPORT                       ║${NC}"
@@ -7,8 +7,13 @@ Tests security configurations, secrets management, and best practices
 import os
 import sys
 import subprocess
+from pathlib import Path
 from typing import List, Tuple
 
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+from scripts.scan_secrets import WEAK_PASSWORDS, scan_repository  # noqa: E402
+
 class Colors:
     GREEN = '\033[92m'
     RED = '\033[91m'
@@ -52,46 +57,38 @@ def test_env_file_security() -> bool:
     return len(tests_failed) == 0
 
 def test_secrets_not_in_git() -> bool:
-    """Test that no secrets are committed to git"""
+    """Test that no secrets are committed to git (whole history, see scripts/scan_secrets.py)"""
     print(f"\n🔍 Testing for secrets in git history...")
 
-    # Search for actual secret patterns (not documentation)
-    # Exclude: .md files, .github/, tests/, comments
-    result = subprocess.run(
-        "git ls-files | grep -v '\\.md$' | grep -v '^\\.github/' | grep -v '^tests/' | xargs grep -i -E 'password=|secret=|api_key=|token=' 2>/dev/null | grep -v '.example' | grep -v '#' || true",
-        shell=True,
-        capture_output=True,
-        text=True
-    )
-
-    # Filter out false positives
-    lines = result.stdout.strip().split('\n') if result.stdout.strip() else []
-    real_secrets = []
-
-    for line in lines:
-        # Skip empty lines and documentation
-        if not line or 'placeholder' in line.lower() or 'template' in line.lower():
-            continue
-        # Skip if it's a variable reference like ${PASSWORD}
-        if '${' in line and '}' in line:
-            continue
-        real_secrets.append(line)
+    # Documentation (*.md), .github/, tests/ and *.example files are excluded by the scanner
+    try:
+        result = scan_repository(ROOT)
+    except (subprocess.CalledProcessError, OSError) as e:
+        # A scan that did not run proves nothing: fail in CI, warn loudly elsewhere
+        if os.environ.get("CI"):
+            print(f"  {Colors.RED}✗{Colors.RESET} Cannot scan git history: {e}")
+            return False
+        print(f"  {Colors.YELLOW}⚠ SECRET SCAN DID NOT RUN{Colors.RESET}: cannot scan git history: {e}")
+        print("    (fails when CI is set, as on GitHub Actions)")
+        return True
 
-    if not real_secrets:
-        print(f"  {Colors.GREEN}✓{Colors.RESET} No secrets found in git (documentation excluded)")
+    if not result.findings:
+        print(f"  {Colors.GREEN}✓{Colors.RESET} No secrets found in git history "
+              f"({result.blobs_scanned} new blobs scanned in {result.duration_s:.2f}s, documentation excluded)")
         return True
     else:
         print(f"  {Colors.RED}✗{Colors.RESET} Potential secrets found:")
-        for line in real_secrets[:5]:  # Show first 5 matches
-            print(f"    {line}")
+        for finding in result.findings[:5]:  # Show first 5 matches
+            where = "HEAD" if finding.in_head else f"history {finding.blob}"
+            print(f"    {finding.path}:{finding.line}: [{finding.rule}] {finding.excerpt} ({where})")
         return False
 
 def test_default_passwords_changed() -> bool:
     """Test that default passwords are not used"""
     print(f"\n🔍 Testing for default passwords...")
 
-    # Common default passwords to check
-    default_passwords = ['admin', 'password', '123456', 'frappe', 'erpnext']
+    # Common default passwords to check (the list the secret scanner flags in git)
+    default_passwords = WEAK_PASSWORDS
 
     if not os.path.exists('.env'):
         print(f"  {Colors.YELLOW}⚠{Colors.RESET} .env not found, cannot verify passwords")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the FastCDC chunker (scripts/lib/cdc.py): chunks cover
+the input exactly, respect the size bounds, are deterministic, and an
+insertion only changes the chunks around it.
+"""
+
+import hashlib
+import io
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.lib.cdc import ChunkParams, chunk_segment, chunk_stream, cut_point  # noqa: E402
+
+# Small sizes keep the pure-Python hash loop fast
+PARAMS = ChunkParams(min_size=256, avg_size=1024, max_size=4096, segment_size=64 * 1024)
+
+def data(size: int, seed: int = 1) -> bytes:
+    return random.Random(seed).randbytes(size)
+
+def digests(payload: bytes, params: ChunkParams = PARAMS) -> List[str]:
+    return [c.digest for _, chunks in chunk_stream(io.BytesIO(payload), params) for c in chunks]
+
+def test_params_validation():
+    with pytest.raises(ValueError):
+        ChunkParams(min_size=1024, avg_size=1024, max_size=4096, segment_size=8192)
+    with pytest.raises(ValueError):
+        ChunkParams(min_size=256, avg_size=1024, max_size=8192, segment_size=4096)
+
+def test_chunks_cover_segment_within_bounds():
+    payload = data(200_000)
+    chunks = chunk_segment(payload, PARAMS)
+    assert sum(size for _, size, _ in chunks) == len(payload)
+    offset = 0
+    for i, (start, size, digest) in enumerate(chunks):
+        assert start == offset
+        assert size <= PARAMS.max_size
+        if i < len(chunks) - 1:
+            assert size > PARAMS.min_size
+        assert digest == hashlib.sha256(payload[start:start + size]).hexdigest()
+        offset += size
+    # normalized chunking keeps the mean near avg_size
+    mean = len(payload) / len(chunks)
+    assert PARAMS.avg_size / 2 < mean < PARAMS.avg_size * 2
+
+def test_short_input_is_one_chunk():
+    assert cut_point(b"x" * 100, 0, PARAMS) == 100
+    assert chunk_segment(b"", PARAMS) == []
+
+def test_uniform_input_cuts_at_max_size():
+    # a constant byte never satisfies the mask: every chunk but the last is max_size
+    chunks = chunk_segment(b"\0" * 20_000, PARAMS)
+    assert [size for _, size, _ in chunks[:-1]] == [PARAMS.max_size] * (len(chunks) - 1)
+
+def test_deterministic():
+    payload = data(150_000, seed=7)
+    assert digests(payload) == digests(payload)
+
+def test_stream_offsets_span_segments():
+    payload = data(3 * PARAMS.segment_size + 123)
+    offset = 0
+    for segment, chunks in chunk_stream(io.BytesIO(payload), PARAMS):
+        # a boundary is forced at each segment end
+        assert sum(c.size for c in chunks) == len(segment)
+        for chunk in chunks:
+            assert chunk.offset == offset
+            offset += chunk.size
+    assert offset == len(payload)
+
+def test_executor_matches_serial():
+    payload = data(4 * PARAMS.segment_size + 1)
+    with ThreadPoolExecutor(2) as executor:
+        pooled = [c.digest for _, chunks in chunk_stream(io.BytesIO(payload), PARAMS, executor) for c in chunks]
+    assert pooled == digests(payload)
+
+def test_insertion_only_changes_nearby_chunks():
+    payload = data(60_000, seed=3)
+    edited = payload[:30_000] + b"inserted bytes" + payload[30_000:]
+    before, after = digests(payload), digests(edited)
+    shared = set(before) & set(after)
+    # everything but the couple of chunks around the edit is reused
+    assert len(before) - len(shared) <= 3
+    assert before[0] == after[0] and before[-1] == after[-1]
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the free-space interval tree (scripts/lib/intervals.py),
+checked case by case and against a plain set of claimed values.
+"""
+
+import random
+import sys
+from pathlib import Path
+from typing import Optional, Set
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.lib.intervals import IntervalTree  # noqa: E402
+
+def reference_first_fit(claimed: Set[int], lo: int, hi: int, size: int, start: int) -> Optional[int]:
+    run = 0
+    for value in range(max(start, lo), hi + 1):
+        run = 0 if value in claimed else run + 1
+        if run == size:
+            return value - size + 1
+    return None
+
+def test_empty_range_rejected():
+    with pytest.raises(ValueError):
+        IntervalTree(10, 9)
+
+def test_claims_coalesce():
+    tree = IntervalTree(100, 200)
+    tree.claim(110, 119)
+    tree.claim(130)
+    tree.claim(120, 125)  # touches the first interval
+    tree.claim(126, 129)  # bridges into 130
+    assert list(tree.intervals()) == [(110, 130)]
+    tree.claim(105, 140)  # swallows it
+    assert list(tree.intervals()) == [(105, 140)]
+
+def test_claims_are_clipped_to_the_range():
+    tree = IntervalTree(100, 110)
+    tree.claim(90, 102)
+    tree.claim(109, 150)
+    tree.claim(50, 60)
+    assert list(tree.intervals()) == [(100, 102), (109, 110)]
+    assert tree.free_count() == 6
+
+def test_is_free():
+    tree = IntervalTree(100, 200)
+    tree.claim(150, 159)
+    assert tree.is_free(100, 149)
+    assert not tree.is_free(140, 150)
+    assert not tree.is_free(159)
+    assert tree.is_free(160, 200)
+    assert not tree.is_free(99)
+    assert not tree.is_free(195, 201)
+    assert not tree.is_free(120, 110)
+
+def test_first_fit():
+    tree = IntervalTree(100, 200)
+    tree.claim(100, 104)
+    tree.claim(108, 150)
+    assert tree.first_fit(3) == 105
+    assert tree.first_fit(4) == 151
+    assert tree.first_fit(3, start=106) == 151
+    assert tree.first_fit(50) == 151
+    assert tree.first_fit(51) is None
+    assert tree.largest_free() == 50
+    with pytest.raises(ValueError):
+        tree.first_fit(0)
+
+def test_full_range():
+    tree = IntervalTree(1, 10)
+    tree.claim(1, 10)
+    assert tree.first_fit(1) is None
+    assert tree.free_count() == 0
+    assert tree.largest_free() == 0
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_set_reference(seed):
+    rng = random.Random(seed)
+    lo, hi = 48510, 48900
+    tree, claimed = IntervalTree(lo, hi), set()
+    for _ in range(150):
+        start = rng.randint(lo - 5, hi)
+        end = start + rng.choice((0, 0, 1, 4, 9, 20))
+        tree.claim(start, end)
+        claimed.update(v for v in range(start, end + 1) if lo <= v <= hi)
+
+        size, at = rng.choice((1, 2, 5, 10, 30)), rng.randint(lo, hi)
+        assert tree.first_fit(size) == reference_first_fit(claimed, lo, hi, size, lo)
+        assert tree.first_fit(size, start=at) == reference_first_fit(claimed, lo, hi, size, at)
+        probe = rng.randint(lo, hi)
+        assert tree.is_free(probe, probe + 3) == all(
+            v not in claimed and v <= hi for v in range(probe, probe + 4))
+    assert tree.free_count() == (hi - lo + 1) - len(claimed)
+    largest = max((size for size in range(1, hi - lo + 2)
+                   if reference_first_fit(claimed, lo, hi, size, lo) is not None), default=0)
+    assert tree.largest_free() == largest
+    assert [v for a, b in tree.intervals() for v in range(a, b + 1)] == sorted(claimed)
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the backup retention policy and the chunk sweep
+(scripts/prune_backups.py). No MinIO: backups are built as IndexedBackup
+lists, and the sweep runs against an in-memory bucket.
+"""
+
+import datetime
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.lib.s3 import ObjectInfo  # noqa: E402
+from scripts.prune_backups import (  # noqa: E402
+    BackupIndex, IndexedBackup, Pruner, RetentionPolicy, TIMESTAMP_FORMAT,
+)
+
+NOW = datetime.datetime(2026, 6, 15, 12, 0, tzinfo=datetime.timezone.utc)
+
+def backup(days_ago: float, complete: bool = True, site: str = "a.localhost",
+           in_progress: bool = False) -> IndexedBackup:
+    when = NOW - datetime.timedelta(days=days_ago)
+    stamp = when.strftime(TIMESTAMP_FORMAT)
+    prefix = f"backups/{site}/{stamp}"
+    keys = [f"{prefix}/database.dump.zst"]
+    if in_progress:
+        keys.append(f"{prefix}/in-progress.json")
+    b = IndexedBackup(site, stamp, when, keys, size_bytes=100)
+    if complete:
+        b.manifest = f"{prefix}/backup.json"
+        b.keys.append(b.manifest)
+    return b
+
+def ages(backups: List[IndexedBackup]) -> List[float]:
+    return sorted(round((NOW - b.backup_time).total_seconds() / 86400, 2) for b in backups)
+
+# =============================================================================
+# RetentionPolicy.plan
+# =============================================================================
+
+def test_keep_days_window():
+    backups = [backup(d) for d in (1, 10, 29.9, 30, 45)]
+    keep, delete = RetentionPolicy(keep_days=30, keep_last=1).plan(backups, NOW)
+    assert ages(keep) == [1, 10, 29.9]
+    assert ages(delete) == [30, 45]
+
+def test_keep_last_beyond_window():
+    backups = [backup(d) for d in (40, 50, 60)]
+    keep, delete = RetentionPolicy(keep_days=30, keep_last=2).plan(backups, NOW)
+    assert ages(keep) == [40, 50]
+    assert ages(delete) == [60]
+
+def test_keep_last_zero_drops_everything_old():
+    keep, delete = RetentionPolicy(keep_days=30, keep_last=0).plan([backup(40)], NOW)
+    assert keep == [] and ages(delete) == [40]
+
+def test_gfs_slots_start_beyond_keep_days():
+    # Daily backups for 120 days: the window keeps the first 30, the slots
+    # must pick from the older ones instead of re-counting days already kept
+    backups = [backup(d) for d in range(120)]
+    keep, _ = RetentionPolicy(keep_days=30, keep_last=1, daily=3).plan(backups, NOW)
+    assert ages(keep) == list(range(30)) + [30, 31, 32]
+
+def test_gfs_weekly_slots():
+    # 30 days before NOW (Mon 2026-06-15) is Sat 2026-05-16; the ISO week
+    # before starts Mon 05-04 and its newest backup is Sun 05-10 (36 days)
+    backups = [backup(d) for d in range(200)]
+    keep, _ = RetentionPolicy(keep_days=30, keep_last=1, weekly=2).plan(backups, NOW)
+    assert ages(keep) == list(range(30)) + [30, 36]
+
+def test_gfs_monthly_slots():
+    # newest of May beyond the window is 05-16 (30 days), of April 04-30 (46 days)
+    backups = [backup(d) for d in range(200)]
+    keep, _ = RetentionPolicy(keep_days=30, keep_last=1, monthly=2).plan(backups, NOW)
+    assert ages(keep) == list(range(30)) + [30, 46]
+
+def test_incomplete_backups_kept_during_grace_only():
+    backups = [backup(0.5, complete=False), backup(2, complete=False), backup(1)]
+    keep, delete = RetentionPolicy(incomplete_grace_h=24).plan(backups, NOW)
+    assert ages(keep) == [0.5, 1]
+    assert ages(delete) == [2]
+
+def test_incomplete_backups_never_fill_keep_last():
+    backups = [backup(0.1, complete=False), backup(40)]
+    keep, _ = RetentionPolicy(keep_days=30, keep_last=1).plan(backups, NOW)
+    assert ages(keep) == [0.1, 40]
+
+# =============================================================================
+# Pruner.run chunk sweep
+# =============================================================================
+
+class MemoryBucket:
+    """The S3Client calls Pruner and BackupIndex make, over a dict"""
+
+    def __init__(self, objects: Dict[str, bytes], modified: str = "2026-01-01T00:00:00.000Z"):
+        self.objects = dict(objects)
+        self.modified = modified
+        self.deleted: List[str] = []
+
+    def list_objects(self, bucket, prefix=""):
+        for key in sorted(self.objects):
+            if key.startswith(prefix):
+                yield ObjectInfo(key, len(self.objects[key]), self.modified, "")
+
+    def get_object(self, bucket, key, start=None, end=None):
+        return self.objects[key]
+
+    def delete_objects(self, bucket, keys):
+        for key in keys:
+            self.objects.pop(key, None)
+            self.deleted.append(key)
+        return []
+
+def manifest(*digests: str) -> bytes:
+    return json.dumps({"format": "fcs-cdc-v1",
+                       "streams": {"database": {"chunks": [[d, 1] for d in digests]}}}).encode()
+
+def stamp(days_ago: float) -> str:
+    return (NOW - datetime.timedelta(days=days_ago)).strftime(TIMESTAMP_FORMAT)
+
+def chunk(digest: str) -> str:
+    return f"chunks/{digest[:2]}/{digest}.zz"
+
+def prune(objects: Dict[str, bytes], **policy) -> MemoryBucket:
+    bucket = MemoryBucket(objects)
+    index = BackupIndex(Path(":memory:"))
+    index.refresh(bucket, "b")
+    Pruner(bucket, "b", index, RetentionPolicy(**policy)).run(NOW)
+    return bucket
+
+def test_sweep_deletes_chunks_of_expired_backups_only():
+    objects = {
+        f"backups/s/{stamp(1)}/manifest.json": manifest("aa1", "bb2"),
+        f"backups/s/{stamp(40)}/manifest.json": manifest("aa1", "cc3"),
+        chunk("aa1"): b"x", chunk("bb2"): b"x", chunk("cc3"): b"x",
+    }
+    bucket = prune(objects, keep_days=30, keep_last=1)
+    assert sorted(bucket.deleted) == sorted([f"backups/s/{stamp(40)}/manifest.json", chunk("cc3")])
+
+def test_sweep_skipped_while_backup_in_progress():
+    objects = {
+        f"backups/s/{stamp(1)}/manifest.json": manifest("aa1"),
+        f"backups/s/{stamp(0.01)}/in-progress.json": b"{}",
+        chunk("aa1"): b"x", chunk("dd4"): b"x",
+    }
+    bucket = prune(objects, keep_days=30, keep_last=1)
+    assert chunk("dd4") not in bucket.deleted
+    assert bucket.deleted == []
+
+def test_stale_in_progress_marker_does_not_block_sweep():
+    objects = {
+        f"backups/s/{stamp(1)}/manifest.json": manifest("aa1"),
+        f"backups/s/{stamp(3)}/in-progress.json": b"{}",
+        chunk("aa1"): b"x", chunk("dd4"): b"x",
+    }
+    bucket = prune(objects, keep_days=30, keep_last=1, incomplete_grace_h=24)
+    assert chunk("dd4") in bucket.deleted
+    assert chunk("aa1") not in bucket.deleted
+
+def test_manifest_written_after_index_refresh_protects_its_chunks():
+    class LateBackup(MemoryBucket):
+        def list_objects(self, bucket, prefix=""):
+            if prefix:  # the re-listing right before the sweep deletes
+                self.objects[f"backups/s/{stamp(0)}/manifest.json"] = manifest("dd4")
+            return super().list_objects(bucket, prefix)
+
+    bucket = LateBackup({
+        f"backups/s/{stamp(1)}/manifest.json": manifest("aa1"),
+        chunk("aa1"): b"x", chunk("dd4"): b"x", chunk("ee5"): b"x",
+    })
+    index = BackupIndex(Path(":memory:"))
+    index.refresh(bucket, "b")
+    Pruner(bucket, "b", index, RetentionPolicy()).run(NOW)
+    assert bucket.deleted == [chunk("ee5")]
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))